@@ -0,0 +1,58 @@
+"""
+召回合并策略离线评测脚本
+
+基于标注评测集对比各合并策略（weighted/rrf/自定义）的 recall@k 和合并延迟。
+
+使用方法:
+    python scripts/eval_recall_merge.py
+    python scripts/eval_recall_merge.py --data scripts/data/recall_merge_eval.json --rrf-k 60
+    python scripts/eval_recall_merge.py --strategies weighted rrf --k 1 3 5
+
+评测集格式见 src/agent/recall/evaluation.py。
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 允许从项目根目录直接运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from src.agent.recall.evaluation import (  # noqa: E402
+    evaluate_merge_strategies,
+    format_report,
+    load_eval_set,
+)
+from src.agent.recall.merge import list_merge_strategies  # noqa: E402
+
+DEFAULT_DATA = Path(__file__).resolve().parent / "data" / "recall_merge_eval.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="召回合并策略离线评测")
+    parser.add_argument("--data", default=str(DEFAULT_DATA), help="评测集 JSON 文件路径")
+    parser.add_argument(
+        "--strategies", nargs="+", default=list_merge_strategies(), help="待评测的合并策略"
+    )
+    parser.add_argument("--k", nargs="+", type=int, default=[1, 3, 5], help="recall@k 的 k 值")
+    parser.add_argument("--rrf-k", type=int, default=60, help="RRF 平滑常数")
+    args = parser.parse_args()
+
+    eval_set = load_eval_set(args.data)
+    print(f"📊 评测集: {args.data}（{len(eval_set['queries'])} 条查询）")
+
+    report = evaluate_merge_strategies(
+        eval_set,
+        strategies=args.strategies,
+        k_values=tuple(args.k),
+        rrf_k=args.rrf_k,
+    )
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+路由离线评测脚本
+
+基于标注评测集对比纯关键词路由与关键词 + 意图分类器路由（使用配置的 Embedding 模型）
+的准确率、跳过检索比例和路由延迟，并可扫描分类器相似度阈值。
+
+使用方法:
+    python scripts/eval_router.py
+    python scripts/eval_router.py --data scripts/data/router_eval.json --min-similarity 0.5 0.6 0.7
+    python scripts/eval_router.py --intents config/router_intents.json --show-errors
+
+评测集格式见 src/agent/main/evaluation.py，意图示例格式见 src/agent/main/router.py。
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# 允许从项目根目录直接运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from src.agent.main.evaluation import evaluate_routers, format_report, load_eval_set  # noqa: E402
+from src.agent.main.router import IntentClassifier, RouterEngine, load_intents  # noqa: E402
+from src.services.llm_factory import create_embeddings  # noqa: E402
+
+DEFAULT_DATA = Path(__file__).resolve().parent / "data" / "router_eval.json"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="路由离线评测")
+    parser.add_argument("--data", default=str(DEFAULT_DATA), help="评测集 JSON 文件路径")
+    parser.add_argument("--intents", default=None, help="意图示例 JSON 文件路径（默认内置示例）")
+    parser.add_argument(
+        "--min-similarity", nargs="+", type=float, default=[0.5, 0.6, 0.7],
+        help="待评测的分类器相似度阈值",
+    )
+    parser.add_argument("--show-errors", action="store_true", help="打印路由错误的查询")
+    args = parser.parse_args()
+
+    eval_set = load_eval_set(args.data)
+    print(f"📊 评测集: {args.data}（{len(eval_set['queries'])} 条查询）")
+
+    classifier = IntentClassifier(load_intents(args.intents), create_embeddings())
+    routers = {"keywords": RouterEngine()}
+    for threshold in args.min_similarity:
+        # 评测不设分类超时，避免网络抖动影响准确率；各阈值共用查询向量缓存，
+        # 只有第一个阈值的延迟包含 Embedding 调用
+        routers[f"classifier@{threshold}"] = RouterEngine(
+            classifier=classifier, min_similarity=threshold, classifier_timeout_ms=60000
+        )
+
+    report, errors = await evaluate_routers(eval_set, routers)
+    print(format_report(report))
+
+    if args.show_errors:
+        for name, wrong in errors.items():
+            print(f"\n{name} 路由错误（{len(wrong)}）: {', '.join(wrong)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,263 @@
+"""
+有界内存 Checkpointer
+
+MemorySaver 永久保存每个会话（thread）的全部 checkpoint，会话数随流量线性增长。
+BoundedMemorySaver 在其基础上限制内存占用：
+- 会话数上限：超过 max_threads 时淘汰最久未访问的会话（LRU）
+- 每个会话的 checkpoint 深度：只保留最近 max_checkpoints_per_thread 个 checkpoint，
+  同时删除只被已删除 checkpoint 引用的通道值和中间写入
+- TTL：超过 ttl_seconds 未访问的会话过期（读取时检查，写入时清理）
+
+stats() 返回会话数、checkpoint 数和序列化数据的字节数（近似内存占用）以及淘汰计数。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Iterator, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    有界内存 Checkpointer（线程安全）
+
+    Args:
+        max_threads: 最多保存的会话数
+        max_checkpoints_per_thread: 每个会话（每个命名空间）保留的 checkpoint 数
+        ttl_seconds: 会话空闲过期时间（秒，0 表示不过期）
+        clock: 时钟函数（测试用）
+    """
+
+    def __init__(
+        self,
+        max_threads: int,
+        max_checkpoints_per_thread: int,
+        ttl_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        **kwargs: Any,
+    ) -> None:
+        if max_threads < 1 or max_checkpoints_per_thread < 1:
+            raise ValueError("max_threads and max_checkpoints_per_thread must be >= 1")
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.RLock()
+
+        # 会话 → 最近访问时间（按访问顺序，最久未访问的在前）
+        self._access: OrderedDict[str, float] = OrderedDict()
+        # 会话 → 写入过的 writes / blobs 键（删除会话时无需扫描全部键）
+        self._thread_writes: dict[str, set[tuple]] = {}
+        self._thread_blobs: dict[str, set[tuple]] = {}
+        # 会话 → {(checkpoint_ns, checkpoint_id): 该 checkpoint 引用的 (通道, 版本)}
+        self._versions: dict[str, dict[tuple[str, str], set[tuple[str, Any]]]] = {}
+
+        self.evicted = 0
+        self.expired = 0
+        self.pruned = 0
+
+    # ===== 会话生命周期 =====
+
+    def _is_expired(self, thread_id: str, now: float) -> bool:
+        last = self._access.get(thread_id)
+        return last is not None and self.ttl_seconds > 0 and now - last > self.ttl_seconds
+
+    def _touch(self, thread_id: str) -> None:
+        """记录访问，并清理过期和超出上限的会话"""
+        now = self._clock()
+        self._access[thread_id] = now
+        self._access.move_to_end(thread_id)
+
+        while self.ttl_seconds > 0:
+            oldest, last = next(iter(self._access.items()))
+            if now - last <= self.ttl_seconds:
+                break
+            self._drop_thread(oldest)
+            self.expired += 1
+
+        while len(self._access) > self.max_threads:
+            self._drop_thread(next(iter(self._access)))
+            self.evicted += 1
+
+    def _expire_on_read(self, config: RunnableConfig | None) -> None:
+        """读取前删除已过期的会话（过期会话视为不存在）"""
+        if not config:
+            return
+        thread_id = config["configurable"].get("thread_id")
+        if thread_id is not None and self._is_expired(thread_id, self._clock()):
+            self._drop_thread(thread_id)
+            self.expired += 1
+
+    def _drop_thread(self, thread_id: str) -> None:
+        self._access.pop(thread_id, None)
+        # MemorySaver 读取时也会创建空的 writes 项，按会话的 checkpoint 一并删除
+        for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        for key in self._thread_writes.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._thread_blobs.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        self._versions.pop(thread_id, None)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """只保留最近的 checkpoint，并删除不再被引用的中间写入和通道值"""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        excess = len(checkpoints) - self.max_checkpoints_per_thread
+        if excess <= 0:
+            return
+
+        versions = self._versions.get(thread_id, {})
+        # checkpoint id 按时间递增，按插入顺序取最旧的
+        for checkpoint_id in list(checkpoints)[:excess]:
+            del checkpoints[checkpoint_id]
+            key = (thread_id, checkpoint_ns, checkpoint_id)
+            self.writes.pop(key, None)
+            self._thread_writes.get(thread_id, set()).discard(key)
+            versions.pop((checkpoint_ns, checkpoint_id), None)
+        self.pruned += excess
+
+        referenced = {
+            version
+            for (ns, _), channel_versions in versions.items()
+            if ns == checkpoint_ns
+            for version in channel_versions
+        }
+        blobs = self._thread_blobs.get(thread_id, set())
+        for blob_key in [k for k in blobs if k[1] == checkpoint_ns and k[2:] not in referenced]:
+            self.blobs.pop(blob_key, None)
+            blobs.discard(blob_key)
+
+    # ===== BaseCheckpointSaver =====
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        with self._lock:
+            self._expire_on_read(config)
+            thread_id = config["configurable"]["thread_id"]
+            if thread_id not in self._access:
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            self._expire_on_read(config)
+            if config and config["configurable"]["thread_id"] not in self._access:
+                return iter(())
+            # 在锁内取出结果，避免迭代期间会话被淘汰
+            return iter(list(super().list(config, filter=filter, before=before, limit=limit)))
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._expire_on_read(config)
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._thread_blobs.setdefault(thread_id, set()).update(
+                (thread_id, checkpoint_ns, k, v) for k, v in new_versions.items()
+            )
+            self._versions.setdefault(thread_id, {})[(checkpoint_ns, checkpoint["id"])] = set(
+                checkpoint["channel_versions"].items()
+            )
+            self._touch(thread_id)
+            self._prune(thread_id, checkpoint_ns)
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self._thread_writes.setdefault(thread_id, set()).add(key)
+            self._touch(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop_thread(thread_id)
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    # ===== 统计 =====
+
+    def stats(self) -> dict[str, Any]:
+        """
+        内存占用统计
+
+        Returns:
+            会话数、checkpoint 数、中间写入数、通道值数、序列化数据字节数和淘汰计数
+        """
+        with self._lock:
+            checkpoints = sum(
+                len(by_id) for namespaces in self.storage.values() for by_id in namespaces.values()
+            )
+            size = sum(
+                len(checkpoint[1]) + len(metadata[1])
+                for namespaces in self.storage.values()
+                for by_id in namespaces.values()
+                for checkpoint, metadata, _ in by_id.values()
+            )
+            size += sum(len(blob[1]) for blob in self.blobs.values())
+            size += sum(
+                len(write[2][1]) for inner in self.writes.values() for write in inner.values()
+            )
+            return {
+                "threads": len(self._access),
+                "checkpoints": checkpoints,
+                "writes": sum(len(inner) for inner in self.writes.values()),
+                "blobs": len(self.blobs),
+                "serialized_bytes": size,
+                "max_threads": self.max_threads,
+                "max_checkpoints_per_thread": self.max_checkpoints_per_thread,
+                "ttl_seconds": self.ttl_seconds,
+                "evicted": self.evicted,
+                "expired": self.expired,
+                "pruned_checkpoints": self.pruned,
+            }
@@ -0,0 +1,127 @@
+"""
+多轮对话历史
+
+OpenAI 兼容接口的客户端每次请求都发送完整（或截断的）对话历史，而 Checkpointer 中也保存了同一会话的历史。
+reconcile_messages() 对比两者，只返回需要写入状态的增量消息，避免重复：
+
+- 会话无历史：写入客户端历史（首轮或无状态请求）
+- 存储历史的后缀与客户端历史的前缀重叠：追加重叠之后的部分（客户端发送完整历史、最近几轮或只发送最新一条）
+- 其他情况（客户端编辑或重新生成了历史）：保留与客户端历史相同的前缀，删除其后存储的消息，再追加客户端的后续消息
+
+消息按 (角色, 内容) 比较。会话已有存储历史时，客户端发送的助手消息只用于与存储历史对齐，
+未对齐的助手消息不写入状态（否则客户端可以篡改已保存的模型回复）；会话无历史时客户端历史原样写入
+（没有可对照的记录，去掉助手回复会使后续问题失去指代）。
+客户端的 system 消息不进入对话状态（系统提示词由 llm 节点生成）。
+写入后的会话历史不超过 max_messages 条（超出时删除最早的消息）。
+"""
+
+import logging
+from typing import Any, Iterable, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage
+
+logger = logging.getLogger(__name__)
+
+_ROLES = {"user": HumanMessage, "assistant": AIMessage}
+
+
+def to_state_messages(messages: Iterable[Any]) -> list[BaseMessage]:
+    """
+    将 OpenAI 格式的消息转换为对话状态中的消息
+
+    丢弃 system 消息以及最后一条用户消息之后的助手消息（不支持助手回复预填充）。
+
+    Args:
+        messages: 具有 role / content 属性的消息（ChatMessage）
+
+    Returns:
+        HumanMessage / AIMessage 列表，以用户消息结尾（没有用户消息时为空列表）
+    """
+    converted: list[BaseMessage] = [
+        _ROLES[message.role](content=message.content)
+        for message in messages
+        if message.role in _ROLES
+    ]
+    while converted and not isinstance(converted[-1], HumanMessage):
+        converted.pop()
+    return converted
+
+
+def window_messages(messages: Sequence[BaseMessage], max_messages: int) -> list[BaseMessage]:
+    """
+    取最近的对话历史
+
+    Args:
+        messages: 对话历史
+        max_messages: 最多保留的消息数（0 表示不限制）
+
+    Returns:
+        最近不超过 max_messages 条消息，从用户消息开始（不以孤立的助手回复开头）
+    """
+    window = list(messages[-max_messages:]) if max_messages > 0 else list(messages)
+    start = next((i for i, m in enumerate(window) if isinstance(m, HumanMessage)), len(window))
+    return window[start:]
+
+
+def _signature(message: BaseMessage) -> tuple[str, Any]:
+    return message.type, message.content
+
+
+def reconcile_messages(
+    stored: Sequence[BaseMessage],
+    incoming: Sequence[BaseMessage],
+    max_messages: int = 0,
+) -> list[BaseMessage]:
+    """
+    计算需要写入对话状态的消息
+
+    Args:
+        stored: Checkpointer 中保存的会话消息
+        incoming: 客户端发送的对话历史（to_state_messages 的结果）
+        max_messages: 写入后会话历史的最大消息数（0 表示不限制）
+
+    Returns:
+        交给 add_messages reducer 的消息更新（可能以 RemoveMessage 开头）
+    """
+    kept: list[BaseMessage] = [m for m in stored if isinstance(m, (HumanMessage, AIMessage))]
+    removed: list[BaseMessage] = []
+    stored_sigs = [_signature(m) for m in kept]
+    incoming_sigs = [_signature(m) for m in incoming]
+
+    # 最长的重叠：存储历史的后缀 == 客户端历史的前缀
+    overlap = next(
+        (
+            n
+            for n in range(min(len(stored_sigs), len(incoming_sigs)), 0, -1)
+            if stored_sigs[-n:] == incoming_sigs[:n]
+        ),
+        0,
+    )
+    if overlap or not kept or len(incoming) == 1:
+        # 只发送最新一条消息的客户端同样直接追加
+        appended = list(incoming[overlap:])
+    else:
+        prefix = 0
+        while (
+            prefix < min(len(stored_sigs), len(incoming_sigs))
+            and stored_sigs[prefix] == incoming_sigs[prefix]
+        ):
+            prefix += 1
+        logger.info(
+            f"🔀 Client history diverged from stored session "
+            f"(stored: {len(kept)}, incoming: {len(incoming)}, common prefix: {prefix})"
+        )
+        kept, removed = kept[:prefix], kept[prefix:]
+        appended = list(incoming[prefix:])
+
+    # 未与存储历史对齐的助手消息来自客户端，不写入（会话无历史时原样写入）
+    if stored_sigs:
+        appended = [m for m in appended if isinstance(m, HumanMessage)]
+
+    if max_messages > 0:
+        combined = kept + appended
+        cut = len(combined) - len(window_messages(combined, max_messages))
+        removed += kept[:cut]
+        appended = appended[max(0, cut - len(kept)):]
+
+    return [RemoveMessage(id=m.id) for m in removed if m.id] + appended
@@ -0,0 +1,117 @@
+"""
+路由离线评测
+
+基于标注评测集（查询 + 期望路由）对比路由引擎配置：
+- accuracy: 路由结果与标注一致的比例
+- retrieve_precision / retrieve_recall: 以"需要检索"为正类的精确率和召回率
+- skip_rate: 路由为 direct（跳过检索）的比例
+- 路由延迟: 单次 route() 调用耗时（p50/p99，不使用路由缓存）
+
+评测集格式（JSON）：
+    {
+        "queries": [
+            {"query": "东西坏了能换吗", "route": "retrieve"},
+            {"query": "谢谢", "route": "direct"}
+        ]
+    }
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from src.agent.main.router import RETRIEVE, RouterEngine
+
+
+def load_eval_set(path: str | Path) -> dict[str, Any]:
+    """
+    加载评测集
+
+    Args:
+        path: 评测集 JSON 文件路径
+
+    Returns:
+        评测集字典
+    """
+    with open(path, encoding="utf-8") as f:
+        data: dict[str, Any] = json.load(f)
+    return data
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+async def evaluate_routers(
+    eval_set: dict[str, Any],
+    routers: dict[str, RouterEngine],
+) -> tuple[dict[str, dict[str, float]], dict[str, list[str]]]:
+    """
+    对比路由引擎的准确率和路由延迟
+
+    Args:
+        eval_set: 评测集
+        routers: 名称 → 路由引擎（应不带路由缓存，否则延迟只反映缓存命中）
+
+    Returns:
+        (名称 → 指标字典, 名称 → 路由错误的查询列表)
+    """
+    queries = eval_set["queries"]
+    report: dict[str, dict[str, float]] = {}
+    errors: dict[str, list[str]] = {}
+
+    for name, router in routers.items():
+        await router.warmup()
+
+        latencies: list[float] = []
+        correct = true_positive = predicted_positive = actual_positive = skipped = 0
+        wrong: list[str] = []
+
+        for item in queries:
+            start = time.perf_counter()
+            decision = await router.route(item["query"])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            predicted = decision.decision == RETRIEVE
+            actual = item["route"] == RETRIEVE
+            correct += predicted == actual
+            true_positive += predicted and actual
+            predicted_positive += predicted
+            actual_positive += actual
+            skipped += not predicted
+            if predicted != actual:
+                wrong.append(item["query"])
+
+        report[name] = {
+            "accuracy": correct / len(queries),
+            "retrieve_precision": true_positive / predicted_positive if predicted_positive else 0.0,
+            "retrieve_recall": true_positive / actual_positive if actual_positive else 0.0,
+            "skip_rate": skipped / len(queries),
+            "latency_p50_ms": _percentile(latencies, 0.50),
+            "latency_p99_ms": _percentile(latencies, 0.99),
+        }
+        errors[name] = wrong
+
+    return report, errors
+
+
+def format_report(report: dict[str, dict[str, float]]) -> str:
+    """
+    格式化评测结果为文本表格
+
+    Args:
+        report: evaluate_routers 返回的指标字典
+
+    Returns:
+        表格文本
+    """
+    if not report:
+        return ""
+
+    columns = list(next(iter(report.values())).keys())
+    lines = ["router".ljust(20) + "".join(col.rjust(20) for col in columns)]
+    for name, metrics in report.items():
+        lines.append(name.ljust(20) + "".join(f"{metrics[col]:20.4f}" for col in columns))
+    return "\n".join(lines)
@@ -5,10 +5,12 @@ LangGraph StateGraph 构建
 """
 
 import logging
+from typing import Any
 
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, StateGraph
 
+from src.agent.main.checkpointer import BoundedMemorySaver
 from src.agent.main.edges import should_continue, should_retrieve
 from src.agent.main.nodes import call_llm_node, retrieve_node, router_node
 from src.agent.main.state import AgentState
@@ -21,11 +23,14 @@ def create_agent_graph() -> StateGraph:
     """
     创建 LangGraph Agent 工作流
 
-    工作流程：
+    工作流程（LANGGRAPH_RETRIEVAL_MODE=sequential）：
     1. START → router → 判断是否需要检索
     2. 需要检索 → retrieve → llm → END
     3. 不需要检索 → llm → END
 
+    LANGGRAPH_RETRIEVAL_MODE=speculative 时 router 节点在路由判断的同时执行召回
+    （路由为 direct 时取消），工作流为 START → router → llm → END。
+
     Returns:
         编译后的 LangGraph App
     """
@@ -34,6 +39,18 @@ def create_agent_graph() -> StateGraph:
     # 创建 StateGraph
     workflow = StateGraph(AgentState)
 
+    if settings.langgraph_retrieval_mode == "speculative":
+        from src.agent.main.speculative import speculative_router_node
+
+        workflow.add_node("router", speculative_router_node)
+        workflow.add_node("llm", call_llm_node)
+        workflow.set_entry_point("router")
+        workflow.add_edge("router", "llm")
+        workflow.add_conditional_edges("llm", should_continue, {"END": END})
+
+        logger.info("✅ StateGraph built successfully (speculative retrieval)")
+        return workflow
+
     # 添加节点
     workflow.add_node("router", router_node)
     workflow.add_node("retrieve", retrieve_node)
@@ -68,14 +85,32 @@ def create_agent_graph() -> StateGraph:
     return workflow
 
 
-def compile_agent_graph() -> any:
+def _create_bounded_memory_saver() -> BoundedMemorySaver:
+    """按配置创建有界内存 Checkpointer"""
+    logger.info(
+        f"📝 Using BoundedMemorySaver for checkpointing "
+        f"(max_threads={settings.checkpointer_max_threads}, "
+        f"max_checkpoints_per_thread={settings.checkpointer_max_checkpoints_per_thread}, "
+        f"ttl={settings.checkpointer_ttl_seconds}s)"
+    )
+    return BoundedMemorySaver(
+        max_threads=settings.checkpointer_max_threads,
+        max_checkpoints_per_thread=settings.checkpointer_max_checkpoints_per_thread,
+        ttl_seconds=settings.checkpointer_ttl_seconds,
+    )
+
+
+def compile_agent_graph() -> Any:
     """
     编译 Agent Graph
 
     根据配置选择 Checkpointer：
     - memory: MemorySaver（开发/测试）
+    - bounded_memory: BoundedMemorySaver（有会话数、深度和 TTL 上限的内存 Checkpointer）
     - redis: RedisSaver（生产环境）
 
+    RedisSaver 不可用时退回 BoundedMemorySaver，避免内存随会话数无限增长。
+
     Returns:
         编译后的 LangGraph App
     """
@@ -85,6 +120,8 @@ def compile_agent_graph() -> any:
     if settings.langgraph_checkpointer == "memory":
         logger.info("📝 Using MemorySaver for checkpointing")
         checkpointer = MemorySaver()
+    elif settings.langgraph_checkpointer == "bounded_memory":
+        checkpointer = _create_bounded_memory_saver()
     elif settings.langgraph_checkpointer == "redis":
         logger.info("📝 Using RedisSaver for checkpointing")
         try:
@@ -101,11 +138,13 @@ def compile_agent_graph() -> any:
 
             checkpointer = RedisSaver(redis_client)
         except ImportError:
-            logger.warning("⚠️ langgraph-checkpoint-redis not installed, falling back to MemorySaver")
-            checkpointer = MemorySaver()
+            logger.warning(
+                "⚠️ langgraph-checkpoint-redis not installed, falling back to BoundedMemorySaver"
+            )
+            checkpointer = _create_bounded_memory_saver()
         except Exception as e:
-            logger.error(f"❌ Failed to create RedisSaver: {e}, falling back to MemorySaver")
-            checkpointer = MemorySaver()
+            logger.error(f"❌ Failed to create RedisSaver: {e}, falling back to BoundedMemorySaver")
+            checkpointer = _create_bounded_memory_saver()
     else:
         logger.warning(f"⚠️ Unknown checkpointer: {settings.langgraph_checkpointer}, using MemorySaver")
         checkpointer = MemorySaver()
@@ -121,7 +160,7 @@ def compile_agent_graph() -> any:
 _agent_app = None
 
 
-def get_agent_app() -> any:
+def get_agent_app() -> Any:
     """
     获取 Agent App 单例
 
@@ -134,6 +173,24 @@ def get_agent_app() -> any:
     return _agent_app
 
 
+def checkpointer_stats() -> dict:
+    """
+    Checkpointer 统计
+
+    Returns:
+        Checkpointer 类型；BoundedMemorySaver 还包含会话数、checkpoint 数和近似内存占用。
+        Agent App 尚未创建时返回空字典。
+    """
+    if _agent_app is None:
+        return {}
+
+    checkpointer = _agent_app.checkpointer
+    stats = {"type": type(checkpointer).__name__}
+    if isinstance(checkpointer, BoundedMemorySaver):
+        stats.update(checkpointer.stats())
+    return stats
+
+
 async def run_agent(
     user_message: str,
     session_id: str,
@@ -181,7 +238,7 @@ async def run_agent(
 async def stream_agent(
     user_message: str,
     session_id: str,
-) -> any:
+) -> Any:
     """
     流式执行 Agent（用于 SSE）
 
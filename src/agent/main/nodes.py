@@ -12,8 +12,11 @@ from typing import Any
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
+from src.agent.main.conversation import window_messages
+from src.agent.main.router import get_router
 from src.agent.main.state import AgentState
 from src.core.config import settings
+from src.core.message_filter import check_message
 from src.services.llm_factory import create_llm
 
 logger = logging.getLogger(__name__)
@@ -24,6 +27,7 @@ def _is_valid_user_query(query: str) -> bool:
     验证是否为有效的用户查询
 
     过滤外部指令模板和异常消息，确保只有真正的用户查询才能进入检索流程。
+    规则见 src.core.message_filter（与 API 层共用同一个编译后的过滤器）。
 
     Args:
         query: 待验证的查询文本
@@ -31,87 +35,21 @@ def _is_valid_user_query(query: str) -> bool:
     Returns:
         bool: True表示是有效的用户查询，False表示应该被过滤
     """
-    # 检查是否启用消息过滤
-    if not settings.message_filter_enabled:
-        return True
-
-    # 检查长度限制（防止超长指令模板）
-    if len(query) > settings.message_max_length:
-        logger.warning(f"Query too long: {len(query)} chars (max: {settings.message_max_length})")
-        return False
-
-    # 获取配置的指令关键词
-    instruction_keywords = [kw.strip() for kw in settings.instruction_keywords.split(",") if kw.strip()]
-
-    # 检查是否包含指令模板关键词
-    query_lower = query.lower()
-    for keyword in instruction_keywords:
-        if keyword.lower() in query_lower:
-            logger.warning(f"Instruction template detected: {keyword}")
-            return False
-
-    # 检查是否以指令开头
-    instruction_starts = ["You are", "Your role", "Please", "Convert", "Transform"]
-    if query.strip().startswith(tuple(instruction_starts)):
-        logger.warning("Query starts with instruction pattern")
-        return False
-
-    # 检查是否包含过多的技术术语（可能是系统消息）
-    technical_terms = [term.strip() for term in settings.technical_terms.split(",") if term.strip()]
-    technical_count = sum(1 for term in technical_terms if term.lower() in query_lower)
-    if technical_count >= settings.technical_terms_threshold:
-        logger.warning(f"Too many technical terms detected: {technical_count} (threshold: {settings.technical_terms_threshold})")
-        return False
-
-    return True
-
-
-def _get_filter_reason(query: str) -> str:
-    """
-    获取消息过滤的具体原因
-
-    Args:
-        query: 待验证的查询文本
-
-    Returns:
-        str: 过滤原因
-    """
-    # 检查长度限制
-    if len(query) > settings.message_max_length:
-        return "message_too_long"
-
-    # 获取配置的指令关键词
-    instruction_keywords = [kw.strip() for kw in settings.instruction_keywords.split(",") if kw.strip()]
-
-    # 检查是否包含指令模板关键词
-    query_lower = query.lower()
-    for keyword in instruction_keywords:
-        if keyword.lower() in query_lower:
-            return "instruction_template_detected"
-
-    # 检查是否以指令开头
-    instruction_starts = ["You are", "Your role", "Please", "Convert", "Transform"]
-    if query.strip().startswith(tuple(instruction_starts)):
-        return "instruction_pattern_detected"
-
-    # 检查是否包含过多的技术术语
-    technical_terms = [term.strip() for term in settings.technical_terms.split(",") if term.strip()]
-    technical_count = sum(1 for term in technical_terms if term.lower() in query_lower)
-    if technical_count >= settings.technical_terms_threshold:
-        return "too_many_technical_terms"
-
-    return "unknown"
+    verdict = check_message(query)
+    if not verdict.allowed:
+        logger.warning(f"Query filtered: {verdict.reason} (matched: {', '.join(verdict.matched)})")
+    return verdict.allowed
 
 
 async def router_node(state: AgentState) -> dict[str, Any]:
     """
     路由节点：判断是否需要检索知识库
 
-    策略：
-    1. 检查消息中是否包含特定关键词（产品、政策、价格等）
-    2. 检查问题类型（疑问句、指令等）
-    3. 简单打招呼 → 直接回答
-    4. 复杂问题 → 检索知识库
+    策略见 src.agent.main.router：
+    1. 简单打招呼 → 直接回答
+    2. 业务关键词（产品、政策、价格等）→ 检索知识库
+    3. 意图分类器（可选）→ 按最近的意图决定
+    4. 疑问词 → 检索知识库，否则直接回答
 
     Args:
         state: 当前 Agent 状态
@@ -125,42 +63,9 @@ async def router_node(state: AgentState) -> dict[str, Any]:
         # 如果不是用户消息，直接跳过检索
         return {"next_step": "direct", "tool_calls": []}
 
-    query = last_message.content
-
-    # 关键词检测（需要检索的关键词）
-    knowledge_keywords = [
-        "产品", "价格", "政策", "如何", "什么", "哪里", "怎么",
-        "退货", "保修", "发货", "配送", "支付", "订单",
-        "功能", "参数", "规格", "优惠", "活动"
-    ]
-
-    # 简单打招呼关键词（不需要检索）
-    greeting_keywords = ["你好", "您好", "hi", "hello", "早上好", "晚上好"]
-
-    # 判断是否为简单打招呼
-    is_greeting = any(kw in query.lower() for kw in greeting_keywords)
-    if is_greeting and len(query) < 20:  # 短消息且是打招呼
-        logger.info("🎯 Router: Direct response (greeting)")
-        return {
-            "next_step": "direct",
-            "tool_calls": [{"node": "router", "decision": "direct", "reason": "greeting"}]
-        }
-
-    # 判断是否需要知识库检索
-    needs_retrieval = any(kw in query for kw in knowledge_keywords)
-
-    if needs_retrieval:
-        logger.info("🎯 Router: Retrieve from knowledge base (keywords matched)")
-        return {
-            "next_step": "retrieve",
-            "tool_calls": [{"node": "router", "decision": "retrieve", "reason": "keywords"}]
-        }
-    else:
-        logger.info("🎯 Router: Direct response (no keywords)")
-        return {
-            "next_step": "direct",
-            "tool_calls": [{"node": "router", "decision": "direct", "reason": "no_keywords"}]
-        }
+    decision = await get_router().route(str(last_message.content))
+    logger.info(f"🎯 Router: {decision.decision} (reason: {decision.reason}, intent: {decision.intent})")
+    return {"next_step": decision.decision, "tool_calls": [decision.as_tool_call()]}
 
 
 async def retrieve_node(state: AgentState) -> dict[str, Any]:
@@ -365,10 +270,14 @@ async def call_llm_node(state: AgentState) -> dict[str, Any]:
 4. 不要编造具体的产品信息或政策细节
 """
 
-    # 构建消息列表
+    # 构建消息列表（只发送最近的对话历史）
+    max_messages = settings.conversation_max_messages
+    history = window_messages(
+        state["messages"], max_messages if isinstance(max_messages, int) else 0
+    )
     messages = [
         SystemMessage(content=system_prompt),
-        *state["messages"]
+        *history
     ]
 
     # 调用 LLM
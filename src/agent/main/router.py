@@ -0,0 +1,486 @@
+"""
+意图路由
+
+判断用户消息需要知识库检索（retrieve）还是由 LLM 直接回答（direct），按顺序：
+1. 短的打招呼 → direct
+2. 业务关键词（产品、价格、退货……）→ retrieve
+3. 意图分类器（可选，ROUTER_CLASSIFIER_ENABLED）：查询向量与各意图示例向量的中心（centroid）
+   计算余弦相似度，取最近的意图；相似度达到 ROUTER_CLASSIFIER_MIN_SIMILARITY 时采用该意图的路由
+4. 疑问词（如何、什么……）→ retrieve，否则 → direct
+
+关键词编译为正则，一次扫描完成匹配；路由结果按归一化查询缓存（ROUTER_CACHE_*）。
+分类器使用 create_embeddings() 返回的带缓存 Embeddings，需要检索的查询在向量召回时直接命中查询向量缓存。
+
+意图示例文件格式（ROUTER_INTENT_EXAMPLES_PATH，为空时使用内置示例）：
+
+    {
+      "intents": [
+        {"name": "after_sales", "route": "retrieve", "examples": ["东西坏了能换吗", "..."]},
+        {"name": "chitchat", "route": "direct", "examples": ["谢谢", "..."]}
+      ]
+    }
+"""
+
+import asyncio
+import json
+import logging
+import math
+import operator
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from langchain_core.embeddings import Embeddings
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.runtime_state import register_reset
+from src.services.embedding_cache import normalize_query_text
+
+logger = logging.getLogger(__name__)
+
+RETRIEVE = "retrieve"
+DIRECT = "direct"
+
+# 打招呼关键词（不区分大小写，仅对短消息生效）
+GREETING_KEYWORDS = ("你好", "您好", "hi", "hello", "早上好", "晚上好")
+GREETING_MAX_LENGTH = 20
+
+# 业务关键词（命中即检索）
+KNOWLEDGE_KEYWORDS = (
+    "产品", "价格", "政策", "退货", "保修", "发货", "配送", "支付", "订单",
+    "功能", "参数", "规格", "优惠", "活动",
+)
+
+# 疑问词（分类器未启用或不确定时命中即检索）
+QUESTION_KEYWORDS = ("如何", "什么", "哪里", "怎么")
+
+
+@dataclass(frozen=True)
+class Intent:
+    """意图定义"""
+    name: str
+    route: str  # retrieve / direct
+    examples: tuple[str, ...]
+
+
+# 内置意图示例
+DEFAULT_INTENTS: tuple[Intent, ...] = (
+    Intent("product_info", RETRIEVE, (
+        "这个东西有哪些型号", "你们卖的东西质量好吗", "有没有适合老人用的", "能介绍一下你们的服务吗",
+        "新款和旧款有什么区别", "这个多少钱", "有现货吗", "支持哪些系统",
+    )),
+    Intent("after_sales", RETRIEVE, (
+        "东西坏了能换吗", "收到的商品有质量问题", "多久能到货", "我的快递到哪了",
+        "可以开发票吗", "账号登录不上去", "怎么申请退款", "会员有什么权益",
+    )),
+    Intent("greeting", DIRECT, (
+        "你好", "在吗", "hello", "早上好", "嗨", "有人吗",
+    )),
+    Intent("chitchat", DIRECT, (
+        "谢谢", "好的知道了", "你是机器人吗", "讲个笑话", "今天天气不错", "再见",
+        "哈哈哈", "你叫什么名字", "你是谁开发的", "辛苦了",
+    )),
+)
+
+
+def parse_intents(data: dict[str, Any]) -> tuple[Intent, ...]:
+    """
+    解析并校验意图示例
+
+    Args:
+        data: 意图示例配置（见模块文档）
+
+    Returns:
+        意图列表
+
+    Raises:
+        ValueError: 意图名称重复或为空、路由不合法、没有示例
+    """
+    intents = []
+    seen: set[str] = set()
+
+    for item in data.get("intents", []):
+        name = item.get("name")
+        if not name or name in seen:
+            raise ValueError(f"Invalid or duplicate intent name: {name!r}")
+        seen.add(name)
+
+        route = item.get("route")
+        if route not in (RETRIEVE, DIRECT):
+            raise ValueError(f"Unsupported intent route: {route}. Available: {RETRIEVE}, {DIRECT}")
+
+        examples = tuple(example for example in item.get("examples", []) if example.strip())
+        if not examples:
+            raise ValueError(f"Intent {name} has no examples")
+
+        intents.append(Intent(name=name, route=route, examples=examples))
+
+    return tuple(intents)
+
+
+def load_intents(path: str | None) -> tuple[Intent, ...]:
+    """
+    加载意图示例
+
+    Args:
+        path: 意图示例 JSON 文件路径；为空时使用内置示例
+
+    Returns:
+        意图列表
+
+    Raises:
+        OSError: 文件读取失败
+        ValueError: 配置格式错误
+    """
+    if not path:
+        return DEFAULT_INTENTS
+
+    with open(path, encoding="utf-8") as f:
+        return parse_intents(json.load(f))
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """路由结果"""
+    decision: str  # retrieve / direct
+    reason: str  # greeting / keywords / classifier / no_keywords
+    intent: str | None = None  # 分类器判定的意图
+    similarity: float | None = None  # 与意图中心的余弦相似度
+
+    def as_tool_call(self) -> dict[str, Any]:
+        """转换为 AgentState.tool_calls 中的记录"""
+        record: dict[str, Any] = {"node": "router", "decision": self.decision, "reason": self.reason}
+        if self.intent is not None:
+            record["intent"] = self.intent
+            record["similarity"] = round(self.similarity, 4) if self.similarity is not None else None
+        return record
+
+
+def _normalize(vector: Iterable[float]) -> tuple[float, ...]:
+    values = tuple(vector)
+    norm = math.sqrt(sum(map(operator.mul, values, values)))
+    return tuple(v / norm for v in values) if norm else values
+
+
+class IntentClassifier:
+    """
+    最近中心意图分类器
+
+    每个意图的中心为其示例向量（归一化后）的均值，首次分类时批量计算；
+    查询向量与各中心的余弦相似度最高的意图即为分类结果。
+
+    Args:
+        intents: 意图列表
+        embeddings: Embeddings 实例（查询向量使用 aembed_query，示例使用 aembed_documents）
+    """
+
+    def __init__(self, intents: tuple[Intent, ...], embeddings: Embeddings) -> None:
+        if not intents:
+            raise ValueError("IntentClassifier requires at least one intent")
+        self.intents = intents
+        self._embeddings = embeddings
+        self._centroids: list[tuple[float, ...]] | None = None
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        """获取当前事件循环的意图中心计算锁"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    @property
+    def ready(self) -> bool:
+        """意图中心是否已计算"""
+        return self._centroids is not None
+
+    async def warmup(self) -> list[tuple[float, ...]]:
+        """计算（首次调用时）并返回各意图的中心向量"""
+        if self._centroids is None:
+            async with self._get_lock():
+                if self._centroids is None:
+                    texts = [example for intent in self.intents for example in intent.examples]
+                    vectors = iter(await self._embeddings.aembed_documents(texts))
+
+                    centroids = []
+                    for intent in self.intents:
+                        members = [_normalize(next(vectors)) for _ in intent.examples]
+                        centroids.append(_normalize(
+                            sum(column) / len(members) for column in zip(*members)
+                        ))
+                    self._centroids = centroids
+                    logger.info(f"Intent centroids computed: {len(centroids)} intents, {len(texts)} examples")
+        return self._centroids
+
+    async def classify(self, query: str) -> tuple[Intent, float]:
+        """
+        分类查询
+
+        Args:
+            query: 查询文本
+
+        Returns:
+            (最近的意图, 余弦相似度)
+        """
+        centroids = await self.warmup()
+        vector = _normalize(await self._embeddings.aembed_query(query))
+
+        similarities = [sum(map(operator.mul, vector, centroid)) for centroid in centroids]
+        best = max(range(len(similarities)), key=similarities.__getitem__)
+        return self.intents[best], similarities[best]
+
+
+def _compile(keywords: Iterable[str]) -> re.Pattern:
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+
+class RouterEngine:
+    """
+    路由引擎
+
+    Args:
+        classifier: 意图分类器（为空时只使用关键词规则）
+        min_similarity: 采用分类结果所需的最低相似度
+        classifier_timeout_ms: 分类（含查询向量计算）超时，超时或失败时退回关键词规则
+        cache: 路由结果缓存（为空时不缓存）
+    """
+
+    def __init__(
+        self,
+        classifier: IntentClassifier | None = None,
+        min_similarity: float = 0.6,
+        classifier_timeout_ms: int = 300,
+        cache: TTLCache | None = None,
+        warmup_timeout_ms: int = 5000,
+        warmup_retry_seconds: float = 30.0,
+    ) -> None:
+        self.classifier = classifier
+        self.min_similarity = min_similarity
+        self.classifier_timeout_ms = classifier_timeout_ms
+        self.warmup_timeout_ms = warmup_timeout_ms
+        self.warmup_retry_seconds = warmup_retry_seconds
+        self._cache = cache
+        # 意图中心计算失败后，在该时间点（time.monotonic）之前不再尝试
+        self._warmup_retry_at = 0.0
+
+        self._greeting = _compile(GREETING_KEYWORDS)
+        self._knowledge = _compile(KNOWLEDGE_KEYWORDS)
+        self._question = _compile(QUESTION_KEYWORDS)
+
+        self._lock = threading.Lock()
+        self._decisions: dict[str, int] = {}
+        self._classifier_calls = 0
+        self._classifier_errors = 0
+        self._classifier_ms = 0.0
+
+    def _count(self, decision: RouteDecision) -> RouteDecision:
+        with self._lock:
+            key = f"{decision.decision}:{decision.reason}"
+            self._decisions[key] = self._decisions.get(key, 0) + 1
+        return decision
+
+    async def warmup(self) -> None:
+        """
+        预先计算意图中心（未启用分类器时为空操作）
+
+        计算受 warmup_timeout_ms 约束，失败（含超时）时只记录日志，不阻塞应用启动：
+        warmup_retry_seconds 内按关键词规则路由，之后首次分类时重试。
+        """
+        if self.classifier is None:
+            return
+        try:
+            await asyncio.wait_for(self.classifier.warmup(), timeout=self.warmup_timeout_ms / 1000)
+        except Exception as e:
+            self._warmup_retry_at = time.monotonic() + self.warmup_retry_seconds
+            logger.warning(
+                f"⚠️ Intent centroid warmup failed, routing by keywords for "
+                f"{self.warmup_retry_seconds:.0f}s: {e!r}"
+            )
+
+    async def _classify(self, query: str) -> tuple[Intent, float] | None:
+        """
+        调用分类器；超时或失败时返回 None
+
+        意图中心的一次性计算不计入分类超时，使用单独的 warmup_timeout_ms；
+        计算失败（含超时）后 warmup_retry_seconds 内不再尝试，直接退回关键词规则。
+        """
+        classifier = self.classifier
+        if classifier is None:
+            return None
+        if not classifier.ready and time.monotonic() < self._warmup_retry_at:
+            return None
+
+        start = time.perf_counter()
+        try:
+            if not classifier.ready:
+                try:
+                    await asyncio.wait_for(
+                        classifier.warmup(), timeout=self.warmup_timeout_ms / 1000
+                    )
+                except Exception:
+                    self._warmup_retry_at = time.monotonic() + self.warmup_retry_seconds
+                    raise
+            return await asyncio.wait_for(
+                classifier.classify(query), timeout=self.classifier_timeout_ms / 1000
+            )
+        except Exception as e:
+            with self._lock:
+                self._classifier_errors += 1
+            logger.warning(f"⚠️ Intent classifier failed, falling back to keywords: {e!r}")
+            return None
+        finally:
+            with self._lock:
+                self._classifier_calls += 1
+                self._classifier_ms += (time.perf_counter() - start) * 1000
+
+    async def route(self, query: str) -> RouteDecision:
+        """
+        路由查询
+
+        Args:
+            query: 用户消息
+
+        Returns:
+            路由结果
+        """
+        key = normalize_query_text(query)
+        if self._cache is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return self._count(cached)
+
+        decision, cacheable = await self._decide(query)
+        if self._cache is not None and cacheable:
+            self._cache.set(key, decision)
+        return self._count(decision)
+
+    async def _decide(self, query: str) -> tuple[RouteDecision, bool]:
+        """计算路由结果；返回 (结果, 是否可缓存)，分类器失败时的退回结果不缓存"""
+        if len(query) < GREETING_MAX_LENGTH and self._greeting.search(query.lower()):
+            return RouteDecision(DIRECT, "greeting"), True
+
+        if self._knowledge.search(query):
+            return RouteDecision(RETRIEVE, "keywords"), True
+
+        cacheable = True
+        if self.classifier is not None:
+            result = await self._classify(query)
+            if result is None:
+                cacheable = False
+            else:
+                intent, similarity = result
+                if similarity >= self.min_similarity:
+                    return RouteDecision(intent.route, "classifier", intent.name, similarity), True
+
+        if self._question.search(query):
+            return RouteDecision(RETRIEVE, "keywords"), cacheable
+        return RouteDecision(DIRECT, "no_keywords"), cacheable
+
+    def stats(self) -> dict[str, Any]:
+        """
+        路由统计
+
+        Returns:
+            各路由结果（决策:原因）的次数、检索比例、分类器调用次数/失败次数/平均耗时和缓存统计
+        """
+        with self._lock:
+            decisions = dict(self._decisions)
+            calls = self._classifier_calls
+            errors = self._classifier_errors
+            total_ms = self._classifier_ms
+
+        total = sum(decisions.values())
+        retrieved = sum(count for key, count in decisions.items() if key.startswith(RETRIEVE))
+        return {
+            "decisions": decisions,
+            "retrieve_rate": retrieved / total if total else 0.0,
+            "classifier": {
+                "enabled": self.classifier is not None,
+                "calls": calls,
+                "errors": errors,
+                "avg_ms": total_ms / calls if calls else 0.0,
+            },
+            "cache": self._cache.stats() if self._cache is not None else None,
+        }
+
+
+_router: RouterEngine | None = None
+_router_lock = threading.Lock()
+
+
+def build_router(source: Any = None) -> RouterEngine:
+    """
+    按配置构建路由引擎
+
+    Args:
+        source: 配置对象（默认全局 settings）
+
+    Returns:
+        路由引擎
+
+    Raises:
+        OSError: 意图示例文件读取失败
+        ValueError: 意图示例格式错误
+    """
+    source = source if source is not None else settings
+
+    classifier = None
+    if source.router_classifier_enabled:
+        from src.services.llm_factory import create_embeddings
+
+        classifier = IntentClassifier(
+            load_intents(source.router_intent_examples_path), create_embeddings()
+        )
+
+    cache = None
+    if source.router_cache_enabled and source.router_cache_ttl_seconds > 0:
+        cache = TTLCache(
+            max_entries=source.router_cache_max_entries,
+            ttl_seconds=source.router_cache_ttl_seconds,
+        )
+
+    return RouterEngine(
+        classifier=classifier,
+        min_similarity=source.router_classifier_min_similarity,
+        classifier_timeout_ms=source.router_classifier_timeout_ms,
+        cache=cache,
+        warmup_timeout_ms=source.router_classifier_warmup_timeout_ms,
+        warmup_retry_seconds=source.router_classifier_warmup_retry_seconds,
+    )
+
+
+def get_router() -> RouterEngine:
+    """获取（必要时按配置构建）进程内共享的路由引擎"""
+    global _router
+
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = build_router()
+                logger.info(f"Router built: classifier={'on' if _router.classifier else 'off'}")
+    return _router
+
+
+def router_stats() -> dict[str, Any]:
+    """
+    路由统计（尚未构建路由引擎时返回空字典）
+
+    Returns:
+        RouterEngine.stats() 的返回值
+    """
+    router = _router
+    return router.stats() if router is not None else {}
+
+
+@register_reset
+def reset_router() -> None:
+    """丢弃路由引擎（配置变化后下次使用时重新构建，同时清空路由缓存和统计）"""
+    global _router
+
+    with _router_lock:
+        _router = None
@@ -0,0 +1,130 @@
+"""
+推测式检索
+
+LANGGRAPH_RETRIEVAL_MODE=speculative 时，router 节点在做路由判断的同时启动召回：
+- 路由为 retrieve：等待已在进行中的召回，路由耗时被召回耗时掩盖
+- 路由为 direct：取消仍在进行的召回（已完成的结果直接丢弃）
+
+被取消或丢弃的召回为浪费的工作量（召回源调用、Embedding 计算），由 speculative_stats() 统计。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any
+
+from src.agent.main.nodes import retrieve_node, router_node
+from src.agent.main.state import AgentState
+from src.core.runtime_state import register_reset
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeStats:
+    """推测式检索统计（线程安全）"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = 0
+        self.used = 0  # 路由为 retrieve，召回结果被使用
+        self.cancelled = 0  # 路由为 direct 时召回仍在进行，已取消
+        self.discarded = 0  # 路由为 direct 时召回已完成，结果丢弃
+        self.router_ms = 0.0
+        self.wait_ms = 0.0  # 路由完成后继续等待召回的时间（仅 used）
+
+    def record(self, outcome: str, router_ms: float, wait_ms: float = 0.0) -> None:
+        """
+        记录一次推测式检索
+
+        Args:
+            outcome: used / cancelled / discarded
+            router_ms: 路由耗时（毫秒）
+            wait_ms: 路由完成后等待召回的时间（毫秒）
+        """
+        with self._lock:
+            self.started += 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.router_ms += router_ms
+            self.wait_ms += wait_ms
+
+    def stats(self) -> dict[str, Any]:
+        """
+        统计快照
+
+        Returns:
+            启动/使用/取消/丢弃次数、浪费比例、平均路由耗时和平均等待召回时间
+        """
+        with self._lock:
+            started = self.started
+            return {
+                "started": started,
+                "used": self.used,
+                "cancelled": self.cancelled,
+                "discarded": self.discarded,
+                "wasted_ratio": (self.cancelled + self.discarded) / started if started else 0.0,
+                "avg_router_ms": self.router_ms / started if started else 0.0,
+                "avg_wait_ms": self.wait_ms / self.used if self.used else 0.0,
+            }
+
+
+_stats = SpeculativeStats()
+
+
+async def speculative_router_node(state: AgentState) -> dict[str, Any]:
+    """
+    路由节点（推测式检索）：路由判断与召回并发执行
+
+    返回值与顺序执行 router → retrieve 的合并结果一致（tool_calls 中路由记录在前）。
+
+    Args:
+        state: 当前 Agent 状态
+
+    Returns:
+        更新的状态（包含 next_step、tool_calls；路由为 retrieve 时还包含检索结果）
+    """
+    recall_task = asyncio.create_task(retrieve_node(state))
+    start = time.perf_counter()
+
+    try:
+        route = await router_node(state)
+    except BaseException:
+        recall_task.cancel()
+        raise
+    router_ms = (time.perf_counter() - start) * 1000
+
+    if route["next_step"] != "retrieve":
+        outcome = "discarded" if recall_task.done() else "cancelled"
+        recall_task.cancel()
+        await asyncio.gather(recall_task, return_exceptions=True)
+        _stats.record(outcome, router_ms)
+        logger.info(f"🔮 Speculative retrieval {outcome} (router: {route['next_step']}, {router_ms:.1f}ms)")
+        return route
+
+    wait_start = time.perf_counter()
+    retrieved = await recall_task
+    wait_ms = (time.perf_counter() - wait_start) * 1000
+    _stats.record("used", router_ms, wait_ms)
+    logger.info(f"🔮 Speculative retrieval used (router: {router_ms:.1f}ms hidden, waited {wait_ms:.1f}ms)")
+
+    # retrieve_node 以路由前的 tool_calls 为基础追加记录，换成路由后的记录
+    previous = len(state.get("tool_calls") or [])
+    tool_calls = route["tool_calls"] + retrieved.get("tool_calls", [])[previous:]
+    return {**retrieved, **route, "tool_calls": tool_calls}
+
+
+def speculative_stats() -> dict[str, Any]:
+    """
+    推测式检索统计
+
+    Returns:
+        SpeculativeStats.stats() 的返回值
+    """
+    return _stats.stats()
+
+
+@register_reset
+def reset_speculative_stats() -> None:
+    """清空推测式检索统计"""
+    global _stats
+    _stats = SpeculativeStats()
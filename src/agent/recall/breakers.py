@@ -0,0 +1,70 @@
+"""
+召回源熔断器
+
+每个召回源一个熔断器（进程内共享），由 fanout_node 在调用召回源前检查、调用后记录结果。
+熔断期间召回源直接返回空结果（状态 circuit_open），不再重试或等待超时。
+"""
+
+import logging
+import threading
+from typing import Any
+
+from src.core.circuit_breaker import CircuitBreaker
+from src.core.config import settings
+from src.core.runtime_state import register_reset
+
+logger = logging.getLogger(__name__)
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(source_name: str) -> CircuitBreaker | None:
+    """
+    获取召回源的熔断器（首次使用时按配置创建）
+
+    Args:
+        source_name: 召回源名称
+
+    Returns:
+        熔断器；未启用熔断时返回 None
+    """
+    if not settings.recall_breaker_enabled:
+        return None
+
+    breaker = _breakers.get(source_name)
+    if breaker is not None:
+        return breaker
+
+    with _breakers_lock:
+        breaker = _breakers.get(source_name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name=source_name,
+                failure_rate_threshold=settings.recall_breaker_failure_rate,
+                slow_call_ms=settings.recall_breaker_slow_call_ms,
+                slow_call_rate_threshold=settings.recall_breaker_slow_call_rate,
+                window_size=settings.recall_breaker_window_size,
+                min_calls=settings.recall_breaker_min_calls,
+                open_seconds=settings.recall_breaker_open_seconds,
+                half_open_max_calls=settings.recall_breaker_half_open_calls,
+            )
+            _breakers[source_name] = breaker
+        return breaker
+
+
+def breaker_stats() -> dict[str, dict[str, Any]]:
+    """
+    所有召回源熔断器的统计
+
+    Returns:
+        召回源名称 → 熔断器统计
+    """
+    return {name: breaker.stats() for name, breaker in list(_breakers.items())}
+
+
+@register_reset
+def reset_breakers() -> None:
+    """丢弃所有熔断器（下次使用时按当前配置重新创建）"""
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,151 @@
+"""
+召回结果缓存
+
+invoke_recall_agent 之前按 (归一化查询, top_k, 召回配置指纹, 合并策略, 实验 ID) 缓存 RecallResult，
+相同的热门问题不再重复执行 fanout/merge：
+- 进程内 LRU + TTL（src.core.cache.TTLCache）
+- 降级结果不缓存
+- 知识库写入（/api/v1/knowledge/upsert）后调用 invalidate_recall_cache() 清空缓存；
+  代数（generation）保证失效前开始、失效后完成的召回不会写回旧结果
+"""
+
+import logging
+import threading
+from typing import Any, Hashable
+
+from src.agent.recall.config import get_recall_snapshot
+from src.agent.recall.schema import RecallRequest, RecallResult
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.runtime_state import register_reset
+from src.services.embedding_cache import normalize_query_text
+
+logger = logging.getLogger(__name__)
+
+_cache: TTLCache | None = None
+_cache_lock = threading.Lock()
+_generation = 0
+_invalidations = 0
+
+
+def _get_cache() -> TTLCache | None:
+    """获取召回结果缓存（首次使用时按配置创建）；未启用时返回 None"""
+    global _cache
+
+    if not settings.recall_cache_enabled or settings.recall_cache_ttl_seconds <= 0:
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTLCache(
+                    max_entries=settings.recall_cache_max_entries,
+                    ttl_seconds=settings.recall_cache_ttl_seconds,
+                )
+    return _cache
+
+
+def recall_cache_key(request: RecallRequest) -> Hashable:
+    """
+    计算召回请求的缓存键
+
+    召回源、权重、合并策略等配置由召回配置快照的指纹代表（配置重载后指纹改变）；
+    实验配置由实验 ID（显式指定或按 session_id 分桶）决定，因此实验 ID 也是键的一部分。
+
+    Args:
+        request: 召回请求
+
+    Returns:
+        缓存键
+    """
+    snapshot = get_recall_snapshot()
+    return (
+        normalize_query_text(request.query),
+        request.top_k,
+        snapshot.fingerprint,
+        request.merge_strategy,
+        snapshot.resolve_experiment(request) if snapshot.base["experiment_enabled"] else None,
+    )
+
+
+def current_generation() -> int:
+    """当前缓存代数（每次失效加一）"""
+    return _generation
+
+
+def get_cached_result(key: Hashable) -> RecallResult | None:
+    """
+    读取缓存的召回结果
+
+    Args:
+        key: recall_cache_key() 返回的缓存键
+
+    Returns:
+        缓存的召回结果；未启用缓存或未命中时返回 None
+    """
+    cache = _get_cache()
+    if cache is None:
+        return None
+    return cache.get(key)
+
+
+# 召回源未正常完成的状态：结果不完整，不写入缓存
+_FAILED_SOURCE_STATUSES = frozenset({"timeout", "error", "circuit_open"})
+
+
+def store_result(key: Hashable, result: RecallResult, generation: int) -> None:
+    """
+    写入召回结果
+
+    降级结果、有召回源超时/失败/熔断的结果（其他召回源的结果可能不完整）
+    以及召回期间缓存已失效时不写入。
+
+    Args:
+        key: 缓存键
+        result: 召回结果
+        generation: 召回开始时的缓存代数
+    """
+    cache = _get_cache()
+    if cache is None or result.degraded or generation != _generation:
+        return
+    if any(stats.status in _FAILED_SOURCE_STATUSES for stats in result.source_stats.values()):
+        return
+    cache.set(key, result)
+
+
+def invalidate_recall_cache() -> None:
+    """清空召回结果缓存（知识库内容变化后调用）"""
+    global _generation, _invalidations
+
+    with _cache_lock:
+        _generation += 1
+        _invalidations += 1
+        if _cache is not None:
+            _cache.clear()
+    logger.info("Recall result cache invalidated")
+
+
+def recall_cache_stats() -> dict[str, Any]:
+    """
+    召回结果缓存统计
+
+    Returns:
+        是否启用、条目数、命中/未命中、命中率和失效次数
+    """
+    cache = _cache
+    stats = cache.stats() if cache is not None else {}
+    return {
+        "enabled": bool(settings.recall_cache_enabled),
+        **stats,
+        "invalidations": _invalidations,
+    }
+
+
+@register_reset
+def reset_recall_cache() -> None:
+    """丢弃召回结果缓存及统计（下次使用时按当前配置重新创建）"""
+    global _cache, _invalidations
+
+    with _cache_lock:
+        _cache = None
+        _invalidations = 0
@@ -1,43 +1,39 @@
 """
 召回Agent配置加载
 
-从settings加载召回配置，包括：
+从settings编译召回配置快照，包括：
 - 召回源配置
 - 权重配置
 - 超时和重试配置
 - 合并策略配置
 - 降级配置
 - 实验配置
+
+prepare_node 使用的配置快照（RecallConfigSnapshot）在首次使用或配置重载时编译一次：
+权重解析、默认权重补全、各实验的配置覆盖和流量划分都预先计算好，请求时只需分桶和查表。
+快照在请求间共享，因此整体只读（列表冻结为元组，字典冻结为只读映射）。
 """
 
-from typing import Any
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
 
+from src.agent.recall.experiments import (
+    bucket_of,
+    experiment_for_bucket,
+    load_experiments,
+    traffic_allocation,
+)
+from src.agent.recall.schema import RecallRequest
+from src.agent.recall.sources import list_sources
 from src.core.config import settings
+from src.core.runtime_state import register_reset
 
-
-def load_recall_config() -> dict[str, Any]:
-    """
-    从settings加载召回配置
-
-    Returns:
-        召回配置字典
-    """
-    # 解析权重配置
-    weights = parse_source_weights(settings.recall_source_weights)
-
-    config = {
-        "sources": settings.recall_sources,
-        "weights": weights,
-        "timeout_ms": settings.recall_timeout_ms,
-        "retry": settings.recall_retry,
-        "merge_strategy": settings.recall_merge_strategy,
-        "degrade_threshold": settings.recall_degrade_threshold,
-        "fallback_enabled": settings.recall_fallback_enabled,
-        "experiment_enabled": settings.recall_experiment_enabled,
-        "experiment_platform": settings.recall_experiment_platform,
-    }
-
-    return config
+logger = logging.getLogger(__name__)
 
 
 def parse_source_weights(weights_str: str) -> dict[str, float]:
@@ -68,7 +64,7 @@ def parse_source_weights(weights_str: str) -> dict[str, float]:
     return weights
 
 
-def validate_recall_config(config: dict[str, Any]) -> dict[str, bool]:
+def validate_recall_config(config: dict[str, Any]) -> dict[str, Any]:
     """
     验证召回配置的有效性
 
@@ -76,12 +72,12 @@ def validate_recall_config(config: dict[str, Any]) -> dict[str, bool]:
         config: 召回配置
 
     Returns:
-        验证结果字典
+        验证结果字典（各项是否有效；有未注册的召回源时 invalid_sources 为其列表）
     """
-    results = {}
+    results: dict[str, Any] = {}
 
-    # 验证召回源
-    valid_sources = ["vector", "faq", "keyword"]
+    # 验证召回源（内置及已注册的第三方召回源）
+    valid_sources = list_sources()
     invalid_sources = [s for s in config["sources"] if s not in valid_sources]
     results["sources_valid"] = len(invalid_sources) == 0
     if invalid_sources:
@@ -106,3 +102,180 @@ def validate_recall_config(config: dict[str, Any]) -> dict[str, bool]:
     results["threshold_valid"] = 0.0 <= threshold <= 1.0
 
     return results
+
+
+def _freeze(value: Any) -> Any:
+    """将配置中的字典和列表递归冻结为只读映射和元组"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class RecallConfigSnapshot:
+    """
+    编译后的召回配置（只读）
+
+    Attributes:
+        base: 基础配置（未命中实验时使用）
+        experiments: 实验 ID → 已合并实验覆盖的完整配置（未启用实验时为空）
+        fingerprint: 配置指纹（基础配置、实验配置和流量划分的哈希），配置变化时改变
+        salt: 实验分桶 salt
+        allocation: 实验流量划分（桶区间上界, 实验 ID）
+    """
+
+    base: Mapping[str, Any]
+    experiments: Mapping[str, Mapping[str, Any]]
+    fingerprint: str
+    salt: str = ""
+    allocation: tuple[tuple[int, str], ...] = ()
+
+    def resolve_experiment(self, request: RecallRequest) -> str | None:
+        """
+        确定请求所属的实验
+
+        请求显式指定的 experiment_id 优先，否则按 session_id 分桶分配。
+
+        Args:
+            request: 召回请求
+
+        Returns:
+            实验 ID；对照组返回 None
+        """
+        if request.experiment_id is not None or not self.allocation:
+            return request.experiment_id
+        return experiment_for_bucket(bucket_of(request.session_id, self.salt), self.allocation)
+
+    def config_for(self, experiment_id: str | None) -> Mapping[str, Any]:
+        """
+        获取实验对应的配置
+
+        Args:
+            experiment_id: 实验 ID
+
+        Returns:
+            实验配置；未启用实验或未知实验 ID 时返回基础配置
+        """
+        if experiment_id is None:
+            return self.base
+        return self.experiments.get(experiment_id, self.base)
+
+
+def build_recall_snapshot(source: Any = None) -> RecallConfigSnapshot:
+    """
+    根据配置编译召回配置快照
+
+    Args:
+        source: 配置对象（默认为全局 settings）
+
+    Returns:
+        召回配置快照
+    """
+    source = source if source is not None else settings
+
+    sources = list(source.recall_sources)
+    weights = parse_source_weights(source.recall_source_weights)
+    for name in sources:
+        weights.setdefault(name, 1.0)
+
+    base = {
+        "sources": sources,
+        "weights": weights,
+        "timeout_ms": source.recall_timeout_ms,
+        "retry": source.recall_retry,
+        "merge_strategy": source.recall_merge_strategy,
+        "custom_merge_strategy": source.recall_custom_merge_strategy,
+        "rrf_k": source.recall_rrf_k,
+        "early_exit_threshold": (
+            source.recall_early_exit_threshold if source.recall_early_exit_enabled else None
+        ),
+        "early_exit_sources": source.recall_early_exit_sources,
+        "near_dup_threshold": (
+            source.recall_near_dup_threshold if source.recall_near_dup_enabled else None
+        ),
+        "degrade_threshold": source.recall_degrade_threshold,
+        "fallback_enabled": source.recall_fallback_enabled,
+        "experiment_enabled": source.recall_experiment_enabled,
+    }
+
+    experiments: dict[str, dict[str, Any]] = {}
+    salt = ""
+    allocation: tuple[tuple[int, str], ...] = ()
+    if source.recall_experiment_enabled:
+        salt, registry = load_experiments(source.recall_experiment_config_path)
+        allocation = traffic_allocation(registry)
+        for experiment in registry:
+            overlay = experiment.overrides
+            experiments[experiment.id] = {
+                **base,
+                **overlay,
+                "weights": {**weights, **overlay.get("weights", {})},
+            }
+
+    payload = json.dumps(
+        {"base": base, "experiments": experiments, "salt": salt, "allocation": allocation},
+        sort_keys=True,
+        default=repr,
+    )
+    return RecallConfigSnapshot(
+        base=_freeze(base),
+        experiments=MappingProxyType({k: _freeze(v) for k, v in experiments.items()}),
+        fingerprint=hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16],
+        salt=salt,
+        allocation=allocation,
+    )
+
+
+_snapshot: RecallConfigSnapshot | None = None
+_snapshot_source: Any = None
+_snapshot_lock = threading.Lock()
+
+
+def get_recall_snapshot(source: Any = None) -> RecallConfigSnapshot:
+    """
+    获取召回配置快照（首次使用时编译，之后复用，直到 refresh_recall_snapshot()）
+
+    Args:
+        source: 配置对象（默认为全局 settings）；与编译快照时的对象不同时重新编译
+
+    Returns:
+        召回配置快照
+    """
+    source = source if source is not None else settings
+    snapshot = _snapshot
+    if snapshot is not None and _snapshot_source is source:
+        return snapshot
+    return refresh_recall_snapshot(source)
+
+
+def refresh_recall_snapshot(source: Any = None) -> RecallConfigSnapshot:
+    """
+    重新编译召回配置快照（配置重载后调用）
+
+    Args:
+        source: 配置对象（默认为全局 settings）
+
+    Returns:
+        新的召回配置快照
+    """
+    global _snapshot, _snapshot_source
+
+    source = source if source is not None else settings
+    snapshot = build_recall_snapshot(source)
+    with _snapshot_lock:
+        _snapshot = snapshot
+        _snapshot_source = source
+    logger.info(f"Recall config snapshot compiled: fingerprint={snapshot.fingerprint}")
+    return snapshot
+
+
+@register_reset
+def reset_recall_snapshot() -> None:
+    """丢弃召回配置快照（下次使用时重新编译）"""
+    global _snapshot, _snapshot_source
+
+    with _snapshot_lock:
+        _snapshot = None
+        _snapshot_source = None
@@ -0,0 +1,135 @@
+"""
+召回合并策略离线评测
+
+基于标注评测集（各召回源记录的候选结果 + 相关文档 ID）对比合并策略：
+- recall@k: 前 k 条结果中命中的相关文档占全部相关文档的比例（按查询平均）
+- 合并延迟: 单次合并调用耗时（p50/p99）
+
+评测集格式（JSON）：
+    {
+        "weights": {"vector": 1.0, "faq": 0.8},
+        "queries": [
+            {
+                "query": "...",
+                "relevant": ["doc_id", ...],
+                "hits": {"vector": [{"doc_id": "...", "content": "...", "score": 0.8}, ...], ...}
+            }
+        ]
+    }
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from src.agent.recall.merge import get_merge_strategy
+from src.agent.recall.schema import RecallHit
+
+
+def load_eval_set(path: str | Path) -> dict[str, Any]:
+    """
+    加载评测集
+
+    Args:
+        path: 评测集 JSON 文件路径
+
+    Returns:
+        评测集字典
+    """
+    with open(path, encoding="utf-8") as f:
+        data: dict[str, Any] = json.load(f)
+    return data
+
+
+def _to_hits(source_hits: dict[str, list[dict[str, Any]]]) -> list[RecallHit]:
+    """将记录的候选结果转换为 RecallHit 列表"""
+    hits = []
+    for source, items in source_hits.items():
+        for item in items:
+            hits.append(RecallHit(
+                source=source,
+                score=item["score"],
+                confidence=item["score"],
+                reason="offline eval",
+                content=item["content"],
+                metadata={"doc_id": item["doc_id"]},
+            ))
+    return hits
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+def evaluate_merge_strategies(
+    eval_set: dict[str, Any],
+    strategies: list[str],
+    k_values: tuple[int, ...] = (1, 3, 5),
+    rrf_k: int = 60,
+    repeats: int = 20,
+) -> dict[str, dict[str, float]]:
+    """
+    对比合并策略的 recall@k 和合并延迟
+
+    Args:
+        eval_set: 评测集
+        strategies: 待评测的策略名称（需已注册）
+        k_values: 计算 recall@k 的 k 值
+        rrf_k: RRF 平滑常数
+        repeats: 每条查询重复合并次数（用于稳定延迟统计）
+
+    Returns:
+        策略名称 → 指标字典（recall@k、latency_p50_ms、latency_p99_ms）
+    """
+    config = {"weights": eval_set.get("weights", {}), "rrf_k": rrf_k}
+    queries = eval_set["queries"]
+    report: dict[str, dict[str, float]] = {}
+
+    for name in strategies:
+        strategy = get_merge_strategy(name)
+        recall_sums = {k: 0.0 for k in k_values}
+        latencies: list[float] = []
+
+        for item in queries:
+            hits = _to_hits(item["hits"])
+            relevant = set(item["relevant"])
+
+            merged: list[RecallHit] = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                merged = strategy(hits, config)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            ranked_ids = [hit.metadata["doc_id"] for hit in merged]
+            for k in k_values:
+                found = relevant.intersection(ranked_ids[:k])
+                recall_sums[k] += len(found) / len(relevant)
+
+        metrics = {f"recall@{k}": recall_sums[k] / len(queries) for k in k_values}
+        metrics["latency_p50_ms"] = _percentile(latencies, 0.50)
+        metrics["latency_p99_ms"] = _percentile(latencies, 0.99)
+        report[name] = metrics
+
+    return report
+
+
+def format_report(report: dict[str, dict[str, float]]) -> str:
+    """
+    格式化评测结果为文本表格
+
+    Args:
+        report: evaluate_merge_strategies 的返回值
+
+    Returns:
+        表格文本
+    """
+    if not report:
+        return ""
+
+    columns = list(next(iter(report.values())).keys())
+    lines = ["strategy".ljust(12) + "".join(col.rjust(16) for col in columns)]
+    for name, metrics in report.items():
+        lines.append(name.ljust(12) + "".join(f"{metrics[col]:16.4f}" for col in columns))
+    return "\n".join(lines)
@@ -0,0 +1,295 @@
+"""
+召回实验
+
+- 实验注册表：从 JSON 文件加载（RECALL_EXPERIMENT_CONFIG_PATH），未配置时使用内置实验
+- 分桶：session_id 经 SHA-256 哈希映射到 [0, BUCKETS) 的桶，按实验顺序划分连续的桶区间，
+  同一会话始终落入同一实验；未落入任何实验的流量为对照组（control）
+- 指标：按实验统计召回请求数、延迟分位数、有结果率和降级率
+
+实验配置文件格式：
+
+    {
+      "salt": "recall-2026q4",
+      "experiments": [
+        {
+          "id": "exp-cheap-recall",
+          "traffic": 0.1,
+          "description": "只用 FAQ + 关键词，top_k=3",
+          "overrides": {"sources": ["faq", "keyword"], "top_k": 3}
+        }
+      ]
+    }
+
+修改 salt 会重新打散所有会话的分桶。
+"""
+
+import bisect
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.agent.recall.latency import LatencyTracker
+from src.agent.recall.schema import RecallResult
+from src.core.runtime_state import register_reset
+
+BUCKETS = 10000
+DEFAULT_SALT = "recall"
+CONTROL = "control"
+
+# 实验可覆盖的配置项（top_k 覆盖请求的 top_k，weights 与基础权重合并，其余直接覆盖）
+OVERRIDE_KEYS = (
+    "sources",
+    "weights",
+    "timeout_ms",
+    "retry",
+    "merge_strategy",
+    "rrf_k",
+    "top_k",
+    "early_exit_threshold",
+    "early_exit_sources",
+    "near_dup_threshold",
+    "degrade_threshold",
+)
+
+
+@dataclass(frozen=True)
+class Experiment:
+    """召回实验定义"""
+    id: str
+    traffic: float = 0.0  # 自动分配的流量占比（0 表示只能通过 experiment_id 显式指定）
+    overrides: dict[str, Any] = field(default_factory=dict)
+    description: str = ""
+
+
+# 内置实验（未配置实验文件时使用，不自动分配流量）
+DEFAULT_EXPERIMENTS: tuple[Experiment, ...] = (
+    Experiment(
+        id="exp-recall-v2",
+        overrides={
+            "sources": ["vector", "faq", "keyword"],
+            "weights": {"vector": 0.6, "faq": 0.3, "keyword": 0.1},
+            "timeout_ms": 5000,  # 实验允许更长超时
+        },
+        description="启用更多召回源",
+    ),
+    Experiment(
+        id="exp-weight-adjust",
+        overrides={"weights": {"vector": 0.4, "faq": 0.6}},
+        description="调整权重",
+    ),
+)
+
+
+def parse_experiments(data: dict[str, Any]) -> tuple[str, tuple[Experiment, ...]]:
+    """
+    解析并校验实验配置
+
+    Args:
+        data: 实验配置（见模块文档）
+
+    Returns:
+        (分桶 salt, 实验列表)
+
+    Raises:
+        ValueError: 实验 ID 重复或为空、流量占比非法或总和超过 1、覆盖了不支持的配置项
+    """
+    salt = str(data.get("salt") or DEFAULT_SALT)
+    experiments = []
+    seen: set[str] = set()
+    total_traffic = 0.0
+
+    for item in data.get("experiments", []):
+        experiment_id = item.get("id")
+        if not experiment_id or experiment_id == CONTROL:
+            raise ValueError(f"Invalid experiment id: {experiment_id!r}")
+        if experiment_id in seen:
+            raise ValueError(f"Duplicate experiment id: {experiment_id}")
+        seen.add(experiment_id)
+
+        traffic = float(item.get("traffic", 0.0))
+        if not 0.0 <= traffic <= 1.0:
+            raise ValueError(f"Invalid traffic for experiment {experiment_id}: {traffic}")
+        total_traffic += traffic
+
+        overrides = dict(item.get("overrides", {}))
+        for key in overrides:
+            if key not in OVERRIDE_KEYS:
+                raise ValueError(
+                    f"Unsupported experiment override: {key}. Available: {', '.join(OVERRIDE_KEYS)}"
+                )
+
+        experiments.append(Experiment(
+            id=experiment_id,
+            traffic=traffic,
+            overrides=overrides,
+            description=item.get("description", ""),
+        ))
+
+    if total_traffic > 1.0 + 1e-9:
+        raise ValueError(f"Total experiment traffic exceeds 1.0: {total_traffic}")
+
+    return salt, tuple(experiments)
+
+
+def load_experiments(path: str | None) -> tuple[str, tuple[Experiment, ...]]:
+    """
+    加载实验注册表
+
+    Args:
+        path: 实验配置 JSON 文件路径；为空时使用内置实验
+
+    Returns:
+        (分桶 salt, 实验列表)
+
+    Raises:
+        OSError: 文件读取失败
+        ValueError: 配置格式错误
+    """
+    if not path:
+        return DEFAULT_SALT, DEFAULT_EXPERIMENTS
+
+    with open(path, encoding="utf-8") as f:
+        return parse_experiments(json.load(f))
+
+
+def bucket_of(session_id: str, salt: str = DEFAULT_SALT) -> int:
+    """
+    计算会话所在的桶（确定性，跨进程一致）
+
+    Args:
+        session_id: 会话 ID
+        salt: 分桶 salt
+
+    Returns:
+        桶编号 [0, BUCKETS)
+    """
+    digest = hashlib.sha256(f"{salt}:{session_id}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % BUCKETS
+
+
+def traffic_allocation(experiments: tuple[Experiment, ...]) -> tuple[tuple[int, str], ...]:
+    """
+    按实验顺序划分桶区间
+
+    Args:
+        experiments: 实验列表
+
+    Returns:
+        (区间上界（不含）, 实验 ID) 列表，按上界递增
+    """
+    allocation = []
+    upper = 0.0
+    for experiment in experiments:
+        if experiment.traffic <= 0:
+            continue
+        upper += experiment.traffic * BUCKETS
+        allocation.append((round(upper), experiment.id))
+    return tuple(allocation)
+
+
+def experiment_for_bucket(bucket: int, allocation: tuple[tuple[int, str], ...]) -> str | None:
+    """
+    查找桶所属的实验
+
+    Args:
+        bucket: 桶编号
+        allocation: traffic_allocation() 的返回值
+
+    Returns:
+        实验 ID；落在对照组时返回 None
+    """
+    index = bisect.bisect_right(allocation, bucket, key=lambda item: item[0])
+    return allocation[index][1] if index < len(allocation) else None
+
+
+class ExperimentMetrics:
+    """
+    单个实验的召回指标（线程安全）
+
+    Args:
+        window_size: 延迟样本窗口大小
+    """
+
+    def __init__(self, window_size: int = 1000) -> None:
+        self._latency = LatencyTracker(window_size)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.with_hits = 0
+        self.total_hits = 0
+        self.degraded = 0
+        self.cached = 0
+
+    def record(self, result: RecallResult) -> None:
+        """
+        记录一次召回结果
+
+        Args:
+            result: 召回结果
+        """
+        self._latency.record(result.latency_ms)
+        with self._lock:
+            self.requests += 1
+            self.total_hits += len(result.hits)
+            if result.hits:
+                self.with_hits += 1
+            if result.degraded:
+                self.degraded += 1
+            if result.cached:
+                self.cached += 1
+
+    def stats(self) -> dict[str, Any]:
+        """
+        实验指标
+
+        Returns:
+            请求数、延迟分位数、有结果率、平均命中数、降级率和缓存命中率
+        """
+        requests = self.requests
+        return {
+            "requests": requests,
+            "p50_ms": self._latency.percentile(0.50),
+            "p95_ms": self._latency.percentile(0.95),
+            "p99_ms": self._latency.percentile(0.99),
+            "hit_rate": self.with_hits / requests if requests else 0.0,
+            "avg_hits": self.total_hits / requests if requests else 0.0,
+            "degraded_rate": self.degraded / requests if requests else 0.0,
+            "cached_rate": self.cached / requests if requests else 0.0,
+        }
+
+
+_metrics: dict[str, ExperimentMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def record_experiment_result(result: RecallResult) -> None:
+    """
+    按实验记录召回结果（未分配实验的请求计入对照组）
+
+    Args:
+        result: 召回结果
+    """
+    name = result.experiment_id or CONTROL
+    metrics = _metrics.get(name)
+    if metrics is None:
+        with _metrics_lock:
+            metrics = _metrics.setdefault(name, ExperimentMetrics())
+    metrics.record(result)
+
+
+def experiment_stats() -> dict[str, dict[str, Any]]:
+    """
+    所有实验的召回指标
+
+    Returns:
+        实验 ID（对照组为 control）→ 实验指标
+    """
+    return {name: metrics.stats() for name, metrics in list(_metrics.items())}
+
+
+@register_reset
+def reset_experiment_stats() -> None:
+    """清空实验指标"""
+    with _metrics_lock:
+        _metrics.clear()
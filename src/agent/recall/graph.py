@@ -7,12 +7,27 @@
 - merge: 汇总、排序、去重
 - fallback: 降级处理
 - output: 组装RecallResult
+
+工作流是线性的，RECALL_PIPELINE_MODE=direct 时 invoke_recall_agent 不经过 LangGraph，
+直接按顺序 await 同一组节点（run_recall_pipeline），省去通道和状态合并的开销，结果与图执行一致。
 """
 
+import dataclasses
 import logging
+import time
+from typing import Any, Awaitable, Callable
 
 from langgraph.graph import StateGraph
+from langgraph.graph.state import CompiledStateGraph
 
+from src.agent.recall.cache import (
+    current_generation,
+    get_cached_result,
+    recall_cache_key,
+    store_result,
+)
+from src.agent.recall.config import get_recall_snapshot
+from src.agent.recall.experiments import record_experiment_result
 from src.agent.recall.nodes import (
     fallback_node,
     fanout_node,
@@ -22,11 +37,21 @@ from src.agent.recall.nodes import (
 )
 from src.agent.recall.schema import RecallRequest, RecallResult
 from src.agent.recall.state import RecallState
+from src.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# 召回工作流的节点（按执行顺序），图执行和直接执行共用
+RECALL_PIPELINE: list[tuple[str, Callable[[RecallState], Awaitable[dict[str, Any]]]]] = [
+    ("prepare", prepare_node),
+    ("fanout", fanout_node),
+    ("merge", merge_node),
+    ("fallback", fallback_node),
+    ("output", output_node),
+]
+
 
-def create_recall_graph() -> StateGraph:
+def create_recall_graph() -> CompiledStateGraph:
     """
     创建召回Agent LangGraph子图
 
@@ -37,20 +62,15 @@ def create_recall_graph() -> StateGraph:
     workflow = StateGraph(RecallState)
 
     # 添加节点
-    workflow.add_node("prepare", prepare_node)
-    workflow.add_node("fanout", fanout_node)
-    workflow.add_node("merge", merge_node)
-    workflow.add_node("fallback", fallback_node)
-    workflow.add_node("output", output_node)
+    for name, node in RECALL_PIPELINE:
+        workflow.add_node(name, node)
 
     # 设置入口点
-    workflow.set_entry_point("prepare")
+    workflow.set_entry_point(RECALL_PIPELINE[0][0])
 
-    # 添加边
-    workflow.add_edge("prepare", "fanout")
-    workflow.add_edge("fanout", "merge")
-    workflow.add_edge("merge", "fallback")
-    workflow.add_edge("fallback", "output")
+    # 添加边（线性）
+    for (current, _), (following, _) in zip(RECALL_PIPELINE, RECALL_PIPELINE[1:]):
+        workflow.add_edge(current, following)
 
     # 编译图
     recall_agent = workflow.compile()
@@ -64,27 +84,83 @@ def create_recall_graph() -> StateGraph:
 recall_agent = create_recall_graph()
 
 
+async def run_recall_pipeline(state: RecallState) -> RecallState:
+    """
+    不经过 LangGraph，按顺序执行召回节点
+
+    每个节点返回的字段覆盖到状态上（与 LangGraph 对无 reducer 字段的处理一致）。
+
+    Args:
+        state: 初始状态（至少包含 request）
+
+    Returns:
+        执行完成后的状态
+    """
+    state = state.copy()
+    for _, node in RECALL_PIPELINE:
+        # 节点只返回 RecallState 中定义的字段
+        state.update(await node(state))  # type: ignore[typeddict-item]
+    return state
+
+
 async def invoke_recall_agent(request: RecallRequest) -> RecallResult:
     """
     调用召回Agent的便捷接口
 
+    启用召回结果缓存时（RECALL_CACHE_ENABLED），相同查询和配置直接返回缓存结果
+    （trace_id 和 latency_ms 替换为本次请求的值，cached 为 True）。
+    RECALL_PIPELINE_MODE 为 direct 时通过 run_recall_pipeline 执行，否则通过 LangGraph 子图执行。
+    启用实验时按实验（未分配实验为 control）记录召回指标。
+
     Args:
         request: 召回请求
 
     Returns:
         召回结果
     """
+    result = await _invoke(request)
+    if get_recall_snapshot().base["experiment_enabled"] is True:
+        record_experiment_result(result)
+    return result
+
+
+async def _invoke(request: RecallRequest) -> RecallResult:
+    """执行召回（含结果缓存）"""
+    start_time = time.time()
+    cache_key = recall_cache_key(request)
+    cached = get_cached_result(cache_key)
+    if cached is not None:
+        logger.info(f"Recall cache hit: trace_id={request.trace_id}")
+        return dataclasses.replace(
+            cached,
+            hits=list(cached.hits),
+            latency_ms=(time.time() - start_time) * 1000,
+            trace_id=request.trace_id,
+            cached=True,
+        )
+
     try:
+        generation = current_generation()
+
         # 构建初始状态
-        initial_state = {
+        initial_state: RecallState = {
             "request": request,
         }
 
         # 调用召回Agent
-        result = await recall_agent.ainvoke(initial_state)
+        final_state: RecallState | dict[str, Any]
+        if settings.recall_pipeline_mode == "direct":
+            final_state = await run_recall_pipeline(initial_state)
+        else:
+            final_state = await recall_agent.ainvoke(initial_state)
+
+        result = final_state.get("result")
+        if not isinstance(result, RecallResult):
+            raise RuntimeError("Recall pipeline finished without a result")
 
         # 返回召回结果
-        return result["result"]
+        store_result(cache_key, result, generation)
+        return result
 
     except Exception as e:
         logger.error(f"Recall agent invocation failed: {e}")
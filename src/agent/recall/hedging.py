@@ -0,0 +1,226 @@
+"""
+对冲请求（hedged requests）
+
+请求在近期延迟的指定分位数（如 P95）内仍未返回时，再发起一个重复请求，
+取先成功返回的结果并取消另一个。对冲请求占比受上限约束，避免放大后端负载。
+
+每个召回源一个 Hedger（进程内共享），统计信息可通过指标端点查看。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, TypeVar
+
+from src.agent.recall.latency import LatencyTracker
+from src.core.config import settings
+from src.core.runtime_state import register_reset
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Hedger:
+    """
+    对冲请求执行器
+
+    Args:
+        percentile: 触发对冲的延迟分位数（0-1）
+        min_delay_ms: 触发延迟下限（毫秒）
+        max_hedge_rate: 对冲请求占比上限（最近 window_size 次请求内）
+        min_samples: 延迟样本数达到该值后才开始对冲
+        window_size: 延迟样本和对冲占比的统计窗口
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_delay_ms: float = 10.0,
+        max_hedge_rate: float = 0.1,
+        min_samples: int = 20,
+        window_size: int = 200,
+    ) -> None:
+        self._percentile = percentile
+        self._min_delay_ms = min_delay_ms
+        self._max_hedge_rate = max_hedge_rate
+        self._min_samples = min_samples
+        self._latency = LatencyTracker(window_size)
+        self._recent: deque[bool] = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay_ms(self) -> float | None:
+        """
+        当前的对冲触发延迟
+
+        Returns:
+            延迟（毫秒）；样本不足时返回 None（不对冲）
+        """
+        if len(self._latency) < self._min_samples:
+            return None
+        observed = self._latency.percentile(self._percentile)
+        if observed is None:
+            return None
+        return max(self._min_delay_ms, observed)
+
+    def _try_acquire_hedge(self) -> bool:
+        """检查对冲占比上限，允许时记一次对冲"""
+        with self._lock:
+            recent_hedges = sum(self._recent)
+            if recent_hedges + 1 > self._max_hedge_rate * (len(self._recent) + 1):
+                self._recent.append(False)
+                return False
+            self._recent.append(True)
+            self.hedges += 1
+            return True
+
+    def _record_unhedged(self) -> None:
+        with self._lock:
+            self._recent.append(False)
+
+    async def _timed(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行一次调用，成功或被取消时记录耗时
+
+        输给对冲请求而被取消的慢请求正是延迟尾部，其已耗时（实际延迟的下界）同样计入样本，
+        否则分位数只反映较快的请求，触发延迟会逐渐偏低。
+        """
+        start = time.perf_counter()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self._latency.record((time.perf_counter() - start) * 1000)
+            raise
+        self._latency.record((time.perf_counter() - start) * 1000)
+        return result
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]] | None = None,
+    ) -> T:
+        """
+        执行请求，必要时发起对冲请求
+
+        Args:
+            primary: 主请求（无参协程函数）
+            hedge: 对冲请求（如发往副本），为空时重复调用 primary
+
+        Returns:
+            先成功返回的结果
+
+        Raises:
+            Exception: 主请求（未对冲时）或两个请求均失败时的最后一个异常
+        """
+        self.requests += 1
+        delay_ms = self.hedge_delay_ms()
+
+        primary_task = asyncio.ensure_future(self._timed(primary))
+        tasks = [primary_task]
+        try:
+            if delay_ms is None:
+                self._record_unhedged()
+                return await primary_task
+
+            done, _ = await asyncio.wait({primary_task}, timeout=delay_ms / 1000)
+            if done:
+                self._record_unhedged()
+                return await primary_task
+            if not self._try_acquire_hedge():
+                # 对冲占比已达上限，继续等待主请求
+                return await primary_task
+
+            logger.debug(f"Hedging request after {delay_ms:.1f}ms")
+            hedge_task = asyncio.ensure_future(self._timed(hedge or primary))
+            tasks.append(hedge_task)
+
+            pending = {primary_task, hedge_task}
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            # 两个请求均已失败（循环至少记录了一个异常）
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        对冲统计
+
+        Returns:
+            请求数、对冲数、对冲率、对冲胜出次数和当前触发延迟
+        """
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_rate": self.hedges / self.requests if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "delay_ms": self.hedge_delay_ms(),
+            "samples": len(self._latency),
+        }
+
+
+_hedgers: dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(source_name: str) -> Hedger | None:
+    """
+    获取召回源的对冲执行器（首次使用时按配置创建）
+
+    Args:
+        source_name: 召回源名称
+
+    Returns:
+        对冲执行器；未启用对冲时返回 None
+    """
+    if not settings.recall_hedge_enabled:
+        return None
+
+    hedger = _hedgers.get(source_name)
+    if hedger is not None:
+        return hedger
+
+    with _hedgers_lock:
+        hedger = _hedgers.get(source_name)
+        if hedger is None:
+            hedger = Hedger(
+                percentile=settings.recall_hedge_percentile,
+                min_delay_ms=settings.recall_hedge_min_delay_ms,
+                max_hedge_rate=settings.recall_hedge_max_rate,
+                min_samples=settings.recall_hedge_min_samples,
+            )
+            _hedgers[source_name] = hedger
+        return hedger
+
+
+def hedger_stats() -> dict[str, dict[str, Any]]:
+    """
+    所有召回源对冲执行器的统计
+
+    Returns:
+        召回源名称 → 对冲统计
+    """
+    return {name: hedger.stats() for name, hedger in list(_hedgers.items())}
+
+
+@register_reset
+def reset_hedgers() -> None:
+    """丢弃所有对冲执行器（下次使用时按当前配置重新创建）"""
+    with _hedgers_lock:
+        _hedgers.clear()
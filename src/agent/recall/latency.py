@@ -0,0 +1,173 @@
+"""
+召回延迟统计
+
+LatencyTracker 保存最近 N 次调用的耗时，用于计算延迟分位数
+（对冲请求的触发延迟、各召回源的自适应超时等）。
+
+fanout_node 为每个召回源维护一个 LatencyTracker，并据此计算该召回源的有效超时：
+    clamp(p{percentile} × factor, 下限, 召回总超时)
+样本不足时使用召回总超时。这样 FAQ 等快召回源不会继承为向量检索准备的超时预算。
+"""
+
+import bisect
+import threading
+from collections import deque
+from typing import Any, Mapping
+
+from src.core.config import settings
+from src.core.runtime_state import register_reset
+
+# 直方图桶上界（毫秒），最后一个桶为 +inf
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyTracker:
+    """
+    滑动窗口延迟统计（线程安全）
+
+    Args:
+        window_size: 保留最近多少个样本
+    """
+
+    def __init__(self, window_size: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency_ms: float) -> None:
+        """
+        记录一次调用耗时
+
+        Args:
+            latency_ms: 耗时（毫秒）
+        """
+        with self._lock:
+            self._samples.append(latency_ms)
+
+    def percentile(self, pct: float) -> float | None:
+        """
+        计算延迟分位数
+
+        Args:
+            pct: 分位（0-1），如 0.95
+
+        Returns:
+            分位数（毫秒）；没有样本时返回 None
+        """
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def histogram(self) -> dict[str, int]:
+        """
+        按 HISTOGRAM_BUCKETS_MS 统计窗口内样本分布
+
+        Returns:
+            桶上界（如 "le_50"，最后为 "le_inf"）→ 样本数（非累计）
+        """
+        counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        with self._lock:
+            samples = list(self._samples)
+        for value in samples:
+            counts[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, value)] += 1
+
+        labels = [f"le_{bound}" for bound in HISTOGRAM_BUCKETS_MS] + ["le_inf"]
+        return dict(zip(labels, counts))
+
+    def clear(self) -> None:
+        """清空样本"""
+        with self._lock:
+            self._samples.clear()
+
+
+_trackers: dict[str, LatencyTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(source_name: str) -> LatencyTracker:
+    """
+    获取召回源的延迟统计（首次使用时创建）
+
+    Args:
+        source_name: 召回源名称
+
+    Returns:
+        延迟统计
+    """
+    tracker = _trackers.get(source_name)
+    if tracker is not None:
+        return tracker
+
+    with _trackers_lock:
+        tracker = _trackers.get(source_name)
+        if tracker is None:
+            tracker = LatencyTracker(settings.recall_latency_window_size)
+            _trackers[source_name] = tracker
+        return tracker
+
+
+def effective_timeout_ms(source_name: str, ceiling_ms: float) -> float:
+    """
+    计算召回源的有效超时
+
+    Args:
+        source_name: 召回源名称
+        ceiling_ms: 超时上限（召回总超时）
+
+    Returns:
+        有效超时（毫秒）；未启用自适应超时或样本不足时返回 ceiling_ms
+    """
+    if not settings.recall_adaptive_timeout_enabled:
+        return ceiling_ms
+
+    tracker = _trackers.get(source_name)
+    if tracker is None or len(tracker) < settings.recall_adaptive_timeout_min_samples:
+        return ceiling_ms
+
+    observed = tracker.percentile(settings.recall_adaptive_timeout_percentile)
+    if observed is None:
+        return ceiling_ms
+    timeout = observed * settings.recall_adaptive_timeout_factor
+    return min(ceiling_ms, max(settings.recall_adaptive_timeout_min_ms, timeout))
+
+
+def latency_stats(
+    ceiling_ms: float, experiment_ceilings_ms: Mapping[str, float] | None = None
+) -> dict[str, dict[str, Any]]:
+    """
+    所有召回源的延迟统计
+
+    Args:
+        ceiling_ms: 当前基础配置的召回超时（用于计算当前有效超时）
+        experiment_ceilings_ms: 实验 ID → 实验配置的召回超时（实验覆盖了 timeout_ms 时有效超时不同）
+
+    Returns:
+        召回源名称 → 样本数、p50/p95/p99、有效超时（含各实验的有效超时）和直方图
+    """
+    stats: dict[str, dict[str, Any]] = {}
+    for name, tracker in list(_trackers.items()):
+        stats[name] = {
+            "samples": len(tracker),
+            "p50_ms": tracker.percentile(0.50),
+            "p95_ms": tracker.percentile(0.95),
+            "p99_ms": tracker.percentile(0.99),
+            "timeout_ms": effective_timeout_ms(name, ceiling_ms),
+            "histogram": tracker.histogram(),
+        }
+        if experiment_ceilings_ms:
+            stats[name]["experiment_timeout_ms"] = {
+                experiment_id: effective_timeout_ms(name, ceiling)
+                for experiment_id, ceiling in experiment_ceilings_ms.items()
+            }
+    return stats
+
+
+@register_reset
+def reset_latency_trackers() -> None:
+    """丢弃所有召回源的延迟统计"""
+    with _trackers_lock:
+        _trackers.clear()
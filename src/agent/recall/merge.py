@@ -0,0 +1,259 @@
+"""
+召回结果合并策略
+
+merge_node 根据配置中的 merge_strategy 选择合并策略：
+- weighted: 按召回源权重缩放原始分数后排序
+- rrf: Reciprocal Rank Fusion，按各召回源内的排名融合，
+  适用于向量/FAQ/关键词等分数尺度不可比的召回源
+- custom: 使用 register_merge_strategy 注册的自定义策略
+  （名称由 recall_custom_merge_strategy 指定）
+
+合并策略签名为 (hits, config) -> list[RecallHit]，返回去重并按最终顺序排好的结果，
+由 merge_node 去除近似重复（suppress_near_duplicates）后截取 top_k。
+"""
+
+import logging
+from typing import Any, Callable
+
+from src.agent.recall.schema import RecallHit
+from src.core.text_similarity import char_shingles, jaccard_similarity
+
+logger = logging.getLogger(__name__)
+
+MergeStrategy = Callable[[list[RecallHit], dict[str, Any]], list[RecallHit]]
+
+DEFAULT_RRF_K = 60
+
+
+def _content_key(hit: RecallHit) -> str:
+    """去重键：内容的前100个字符"""
+    return hit.content[:100]
+
+
+def deduplicate_hits(hits: list[RecallHit]) -> list[RecallHit]:
+    """
+    去重召回结果（保留高分）
+
+    Args:
+        hits: 召回结果列表
+
+    Returns:
+        去重后的结果列表
+    """
+    seen_content: dict[str, RecallHit] = {}
+
+    for hit in hits:
+        key = _content_key(hit)
+        if key not in seen_content or hit.score > seen_content[key].score:
+            seen_content[key] = hit
+
+    return list(seen_content.values())
+
+
+def suppress_near_duplicates(
+    hits: list[RecallHit],
+    threshold: float,
+    limit: int | None = None,
+) -> list[RecallHit]:
+    """
+    去除近似重复的召回结果
+
+    按给定顺序遍历，与已保留结果的字符 shingle Jaccard 相似度达到阈值的结果被丢弃
+    （同一文档的不同切片、FAQ 与向量召回措辞略有差异的相同答案等）。
+    只与已保留的结果比较，保留 limit 条后停止，比较次数不超过 len(hits) × limit。
+
+    Args:
+        hits: 按最终顺序排好的召回结果
+        threshold: 相似度阈值（0-1）
+        limit: 最多保留多少条（通常为 top_k），为空时不限制
+
+    Returns:
+        去除近似重复后的结果列表（保持原顺序）
+    """
+    kept: list[RecallHit] = []
+    kept_shingles: list[frozenset[str]] = []
+
+    for hit in hits:
+        if limit is not None and len(kept) >= limit:
+            break
+
+        shingles = char_shingles(hit.content)
+        if any(jaccard_similarity(shingles, other) >= threshold for other in kept_shingles):
+            continue
+
+        kept.append(hit)
+        kept_shingles.append(shingles)
+
+    return kept
+
+
+def weighted_merge(hits: list[RecallHit], config: dict[str, Any]) -> list[RecallHit]:
+    """
+    加权合并：分数乘以召回源权重，去重后按分数降序
+
+    Args:
+        hits: 各召回源返回的结果
+        config: 召回配置（使用 weights）
+
+    Returns:
+        合并后的结果列表
+    """
+    weights = config.get("weights", {})
+
+    weighted_hits = []
+    for hit in hits:
+        weight = weights.get(hit.source, 1.0)
+        weighted_hits.append(RecallHit(
+            source=hit.source,
+            score=hit.score * weight,
+            confidence=hit.confidence,
+            reason=hit.reason,
+            content=hit.content,
+            metadata={
+                **hit.metadata,
+                "original_score": hit.score,
+                "weight": weight,
+            }
+        ))
+
+    # 去重（按内容，保留加权后分数更高的）
+    return sorted(deduplicate_hits(weighted_hits), key=lambda x: x.score, reverse=True)
+
+
+def rrf_merge(hits: list[RecallHit], config: dict[str, Any]) -> list[RecallHit]:
+    """
+    Reciprocal Rank Fusion 合并
+
+    每个召回源内按原始分数排名，文档的融合分数为
+    sum(weight_s / (k + rank_s))，同一内容在多个召回源中出现时累加。
+    结果按融合分数排序；score 保留该内容在各源中的最高原始分数
+    （供降级阈值判断），融合分数写入 metadata["rrf_score"]。
+
+    Args:
+        hits: 各召回源返回的结果
+        config: 召回配置（使用 weights、rrf_k）
+
+    Returns:
+        合并后的结果列表
+    """
+    weights = config.get("weights", {})
+    k = config.get("rrf_k", DEFAULT_RRF_K)
+
+    # 按召回源分组并在源内排名
+    by_source: dict[str, list[RecallHit]] = {}
+    for hit in hits:
+        by_source.setdefault(hit.source, []).append(hit)
+
+    fused_scores: dict[str, float] = {}
+    best: dict[str, RecallHit] = {}
+    contributing: dict[str, list[str]] = {}
+
+    for source, source_hits in by_source.items():
+        weight = weights.get(source, 1.0)
+        ranked = sorted(source_hits, key=lambda x: x.score, reverse=True)
+        seen_in_source: set[str] = set()
+        for rank, hit in enumerate(ranked, start=1):
+            key = _content_key(hit)
+            # 同一召回源内的重复内容只计算最高排名
+            if key in seen_in_source:
+                continue
+            seen_in_source.add(key)
+
+            fused_scores[key] = fused_scores.get(key, 0.0) + weight / (k + rank)
+            contributing.setdefault(key, []).append(source)
+            if key not in best or hit.score > best[key].score:
+                best[key] = hit
+
+    merged = []
+    for key, hit in best.items():
+        merged.append(RecallHit(
+            source=hit.source,
+            score=hit.score,
+            confidence=hit.confidence,
+            reason=hit.reason,
+            content=hit.content,
+            metadata={
+                **hit.metadata,
+                "original_score": hit.score,
+                "rrf_score": fused_scores[key],
+                "rrf_sources": contributing[key],
+            }
+        ))
+
+    return sorted(
+        merged,
+        key=lambda x: (x.metadata["rrf_score"], x.score),
+        reverse=True,
+    )
+
+
+# 合并策略注册表
+_MERGE_STRATEGY_REGISTRY: dict[str, MergeStrategy] = {
+    "weighted": weighted_merge,
+    "rrf": rrf_merge,
+}
+
+
+def register_merge_strategy(name: str, strategy: MergeStrategy) -> None:
+    """
+    注册合并策略
+
+    Args:
+        name: 策略名称（通过 RECALL_CUSTOM_MERGE_STRATEGY、实验配置或请求选择）
+        strategy: 合并函数 (hits, config) -> list[RecallHit]
+    """
+    _MERGE_STRATEGY_REGISTRY[name] = strategy
+
+
+def get_merge_strategy(name: str) -> MergeStrategy:
+    """
+    获取合并策略
+
+    Args:
+        name: 策略名称
+
+    Returns:
+        合并函数
+
+    Raises:
+        ValueError: 未注册的策略
+    """
+    if name not in _MERGE_STRATEGY_REGISTRY:
+        available = ", ".join(_MERGE_STRATEGY_REGISTRY.keys())
+        raise ValueError(f"Unsupported merge strategy: {name}. Available: {available}")
+
+    return _MERGE_STRATEGY_REGISTRY[name]
+
+
+def list_merge_strategies() -> list[str]:
+    """
+    列出所有已注册的合并策略
+
+    Returns:
+        策略名称列表
+    """
+    return list(_MERGE_STRATEGY_REGISTRY.keys())
+
+
+def resolve_merge_strategy(config: dict[str, Any]) -> tuple[str, MergeStrategy]:
+    """
+    根据召回配置解析合并策略
+
+    merge_strategy 为 "custom" 时使用 custom_merge_strategy 指定的名称；
+    未注册的策略回退为 weighted。
+
+    Args:
+        config: 召回配置
+
+    Returns:
+        (策略名称, 合并函数)
+    """
+    name = config.get("merge_strategy") or "weighted"
+    if name == "custom":
+        name = config.get("custom_merge_strategy") or "weighted"
+
+    try:
+        return name, get_merge_strategy(name)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Merge strategy fallback to weighted: {e}")
+        return "weighted", weighted_merge
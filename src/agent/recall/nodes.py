@@ -10,13 +10,17 @@
 """
 
 import asyncio
+import dataclasses
 import logging
 import time
 from typing import Any
 
-from src.agent.recall.schema import RecallHit, RecallRequest, RecallResult
-from src.agent.recall.sources.faq_source import FAQRecallSource
-from src.agent.recall.sources.vector_source import VectorRecallSource
+from src.agent.recall.breakers import get_breaker
+from src.agent.recall.config import get_recall_snapshot
+from src.agent.recall.latency import effective_timeout_ms, get_latency_tracker
+from src.agent.recall.merge import resolve_merge_strategy, suppress_near_duplicates
+from src.agent.recall.schema import RecallHit, RecallRequest, RecallResult, SourceStats
+from src.agent.recall.sources import RecallSource, get_source
 from src.agent.recall.state import RecallState
 from src.core.config import settings
 
@@ -35,66 +39,35 @@ async def prepare_node(state: RecallState) -> dict[str, Any]:
     """
     request: RecallRequest = state["request"]
 
-    # 解析召回源配置
-    sources = settings.recall_sources
-    weights_str = settings.recall_source_weights
-
-    # 解析权重配置
-    weights = {}
-    if weights_str:
-        for item in weights_str.split(","):
-            if ":" in item:
-                source, weight = item.strip().split(":", 1)
-                weights[source] = float(weight)
-
-    # 为未配置的源设置默认权重
-    for source in sources:
-        if source not in weights:
-            weights[source] = 1.0
-
-    # 实验配置处理
-    experiment_id = request.experiment_id
-    experiment_config = {}
-
-    if settings.recall_experiment_enabled and experiment_id:
-        # 预留实验配置接口
-        # 根据实验ID调整配置（如不同的召回源组合、权重等）
-        logger.info(f"Prepare node: experiment enabled, experiment_id={experiment_id}")
+    # 配置快照在首次使用或配置重载时编译（权重解析、实验覆盖均已预先计算），这里只需分桶和查表
+    snapshot = get_recall_snapshot(settings)
+    experiment_id = snapshot.resolve_experiment(request)
+    base_config = snapshot.config_for(experiment_id)
 
-        # 实验配置示例（预留接口）
-        if experiment_id == "exp-recall-v2":
-            # 实验：启用更多召回源
-            experiment_config = {
-                "sources": ["vector", "faq", "keyword"],
-                "weights": {"vector": 0.6, "faq": 0.3, "keyword": 0.1},
-                "timeout_ms": 5000,  # 实验允许更长超时
-            }
-        elif experiment_id == "exp-weight-adjust":
-            # 实验：调整权重
-            experiment_config = {
-                "weights": {"vector": 0.4, "faq": 0.6},
-            }
+    if base_config.get("experiment_enabled") and experiment_id:
+        logger.info(f"Prepare node: experiment enabled, experiment_id={experiment_id}")
 
-    # 合并基础配置和实验配置
+    # 合并策略优先级：请求 > 实验 > 全局配置
     config = {
-        "sources": experiment_config.get("sources", sources),
-        "weights": {**weights, **experiment_config.get("weights", {})},
-        "timeout_ms": experiment_config.get("timeout_ms", settings.recall_timeout_ms),
-        "retry": settings.recall_retry,
-        "merge_strategy": settings.recall_merge_strategy,
-        "degrade_threshold": settings.recall_degrade_threshold,
-        "fallback_enabled": settings.recall_fallback_enabled,
+        **base_config,
+        "merge_strategy": request.merge_strategy or base_config["merge_strategy"],
         "experiment_id": experiment_id,
-        "experiment_enabled": settings.recall_experiment_enabled,
     }
 
-    logger.info(f"Prepare node: loaded config for sources {sources}")
+    # 分桶分配的实验 ID 和实验覆盖的 top_k 写回请求，后续节点和召回源直接使用
+    top_k = base_config.get("top_k", request.top_k)
+    if experiment_id != request.experiment_id or top_k != request.top_k:
+        request = dataclasses.replace(request, experiment_id=experiment_id, top_k=top_k)
+
+    logger.info(f"Prepare node: loaded config for sources {config['sources']}")
 
-    # 只返回新增/变化的字段，LangGraph会自动保留request字段
+    # 只返回新增/变化的字段
     return {
+        "request": request,
         "config": config,
         "start_time": time.time(),
         "hits": [],  # 初始化hits为空列表
+        "source_stats": {},
         "result": None,  # 初始化result为None
     }
 
@@ -103,6 +76,13 @@ async def fanout_node(state: RecallState) -> dict[str, Any]:
     """
     并行调用召回源
 
+    每个召回源有独立的截止时间（自适应超时，按该召回源近期延迟计算，
+    上限为 timeout_ms，均从扇出开始计时），按完成顺序收集结果；
+    到达截止时间仍未完成的召回源被取消并记为超时。
+
+    启用提前结束时（early_exit_threshold），early_exit_sources 中的召回源
+    返回置信度不低于阈值的结果后，其余召回源被取消（记为 skipped），直接进入合并。
+
     Args:
         state: 召回状态
 
@@ -113,51 +93,128 @@ async def fanout_node(state: RecallState) -> dict[str, Any]:
     config = state["config"]
     sources = config["sources"]
 
-    # 创建召回源实例
+    # 获取召回源实例（注册表中按名称复用）
     source_instances = {}
-    if "vector" in sources:
-        source_instances["vector"] = VectorRecallSource()
-    if "faq" in sources:
-        source_instances["faq"] = FAQRecallSource()
-    if "keyword" in sources:
-        from src.agent.recall.sources.keyword_source import KeywordRecallSource
-        source_instances["keyword"] = KeywordRecallSource()
+    for source_name in sources:
+        source = get_source(source_name)
+        if source is not None:
+            source_instances[source_name] = source
 
     # 并行调用召回源
-    tasks = []
-    for source_name in sources:
-        if source_name in source_instances:
-            task = asyncio.create_task(
-                _call_recall_source(source_instances[source_name], request, config)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    tasks: dict[asyncio.Task, str] = {}
+    deadlines: dict[asyncio.Task, float] = {}
+    timeouts_ms: dict[str, float] = {}
+    for source_name, source in source_instances.items():
+        timeout_ms = effective_timeout_ms(source_name, config["timeout_ms"])
+        timeouts_ms[source_name] = timeout_ms
+        task = asyncio.create_task(_run_recall_source(source_name, source, request, config))
+        tasks[task] = source_name
+        deadlines[task] = start + timeout_ms / 1000
+
+    # 按完成顺序收集，直到全部完成或全部到达各自的截止时间
+    results: dict[str, list[RecallHit]] = {}
+    source_stats: dict[str, SourceStats] = {}
+    pending = set(tasks)
+    timed_out: list[asyncio.Task] = []
+    early_exit = _early_exit_policy(config)
+    early_exit_by: str | None = None
+    try:
+        while pending and early_exit_by is None:
+            now = loop.time()
+            expired = {task for task in pending if deadlines[task] <= now}
+            if expired:
+                timed_out.extend(expired)
+                pending -= expired
+                if not pending:
+                    break
+
+            remaining = min(deadlines[task] for task in pending) - now
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
             )
-            tasks.append((source_name, task))
-
-    # 等待所有召回源完成
-    results = {}
-    for source_name, task in tasks:
-        try:
-            hits = await asyncio.wait_for(task, timeout=config["timeout_ms"] / 1000)
-            results[source_name] = hits
-            logger.info(f"Fanout node: {source_name} returned {len(hits)} hits")
-        except asyncio.TimeoutError:
-            logger.warning(f"Fanout node: {source_name} timed out")
-            results[source_name] = []
-        except Exception as e:
-            logger.error(f"Fanout node: {source_name} failed: {e}")
+            for task in done:
+                hits, stats = task.result()
+                stats.timeout_ms = timeouts_ms[stats.source]
+                results[stats.source] = hits
+                source_stats[stats.source] = stats
+                if early_exit is not None and early_exit_by is None:
+                    threshold, trigger_sources = early_exit
+                    if stats.source in trigger_sources and any(
+                        hit.confidence >= threshold for hit in hits
+                    ):
+                        early_exit_by = stats.source
+    except BaseException:
+        # 扇出本身被取消（如推测式检索的路由结果不是 retrieve）：取消仍在执行的召回源
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+                breaker = get_breaker(tasks[task])
+                if breaker is not None:
+                    breaker.release()
+        raise
+
+    # 提前结束：取消其余召回源（不计入熔断和延迟统计）
+    if early_exit_by is not None:
+        elapsed_ms = (loop.time() - start) * 1000
+        for task in pending:
+            task.cancel()
+            source_name = tasks[task]
+            breaker = get_breaker(source_name)
+            if breaker is not None:
+                breaker.release()
             results[source_name] = []
+            source_stats[source_name] = SourceStats(
+                source=source_name,
+                status="skipped",
+                latency_ms=elapsed_ms,
+                timeout_ms=timeouts_ms[source_name],
+            )
+        if pending:
+            logger.info(
+                f"Fanout node: early exit on high-confidence {early_exit_by} hit after "
+                f"{elapsed_ms:.1f}ms, skipped {[tasks[task] for task in pending]}"
+            )
 
-    # 只返回hits，其他字段自动保留
+    # 取消超时的召回源（不等待其退出，保证耗时不超过截止时间）
+    for task in timed_out:
+        task.cancel()
+        source_name = tasks[task]
+        elapsed_ms = (loop.time() - start) * 1000
+        breaker = get_breaker(source_name)
+        if breaker is not None:
+            breaker.record_failure()
+        # 超时也计入延迟样本，使自适应超时能随召回源变慢而放宽
+        get_latency_tracker(source_name).record(elapsed_ms)
+        logger.warning(
+            f"Fanout node: {source_name} timed out after {elapsed_ms:.1f}ms "
+            f"(timeout: {timeouts_ms[source_name]:.0f}ms)"
+        )
+        results[source_name] = []
+        source_stats[source_name] = SourceStats(
+            source=source_name,
+            status="timeout",
+            latency_ms=elapsed_ms,
+            timeout_ms=timeouts_ms[source_name],
+        )
+
+    # 按配置顺序汇总，保证合并结果稳定
     all_hits = []
-    for hits in results.values():
-        all_hits.extend(hits)
+    for source_name in sources:
+        all_hits.extend(results.get(source_name, []))
 
-    return {"hits": all_hits}
+    return {"hits": all_hits, "source_stats": source_stats}
 
 
 async def merge_node(state: RecallState) -> dict[str, Any]:
     """
     汇总、排序、去重
 
+    按配置的合并策略（weighted/rrf/自定义）融合各召回源结果；
+    配置了 near_dup_threshold 时去除近似重复的结果。
+
     Args:
         state: 召回状态
 
@@ -167,37 +224,21 @@ async def merge_node(state: RecallState) -> dict[str, Any]:
     hits = state["hits"]
     config = state["config"]
     request = state["request"]
-    weights = config.get("weights", {})
-
-    # 应用权重
-    weighted_hits = []
-    for hit in hits:
-        weight = weights.get(hit.source, 1.0)
-        weighted_hit = RecallHit(
-            source=hit.source,
-            score=hit.score * weight,
-            confidence=hit.confidence,
-            reason=hit.reason,
-            content=hit.content,
-            metadata={
-                **hit.metadata,
-                "original_score": hit.score,
-                "weight": weight,
-            }
-        )
-        weighted_hits.append(weighted_hit)
 
-    # 去重（按内容哈希）
-    deduplicated_hits = _deduplicate_hits(weighted_hits)
+    # 合并（含去重和排序）
+    strategy_name, strategy = resolve_merge_strategy(config)
+    merged_hits = strategy(hits, config)
 
-    # 排序
-    sorted_hits = sorted(deduplicated_hits, key=lambda x: x.score, reverse=True)
-
-    # 限制返回数量
-    top_hits = sorted_hits[:request.top_k]
+    # 去除近似重复并限制返回数量
+    threshold = config.get("near_dup_threshold")
+    if isinstance(threshold, (int, float)) and not isinstance(threshold, bool):
+        top_hits = suppress_near_duplicates(merged_hits, threshold, limit=request.top_k)
+    else:
+        top_hits = merged_hits[:request.top_k]
 
     logger.info(
-        f"Merge node: merged {len(hits)} hits into {len(top_hits)} final results"
+        f"Merge node: merged {len(hits)} hits into {len(top_hits)} final results "
+        f"(strategy: {strategy_name})"
     )
 
     # 只返回更新后的hits
@@ -217,6 +258,12 @@ async def fallback_node(state: RecallState) -> dict[str, Any]:
     hits = state["hits"]
     config = state["config"]
 
+    # 熔断/超时/失败的召回源（提前结束跳过的不算）
+    unavailable_sources = [
+        name for name, stats in (state.get("source_stats") or {}).items()
+        if stats.status not in ("ok", "skipped")
+    ]
+
     # 检查是否需要降级
     needs_fallback = (
         len(hits) == 0 or
@@ -224,7 +271,17 @@ async def fallback_node(state: RecallState) -> dict[str, Any]:
     )
 
     if needs_fallback and config["fallback_enabled"]:
-        logger.warning("Fallback node: triggering fallback due to poor results")
+        if hits:
+            degrade_reason = "low_score"
+        elif unavailable_sources:
+            degrade_reason = "sources_unavailable"
+        else:
+            degrade_reason = "no_results"
+
+        logger.warning(
+            f"Fallback node: triggering fallback due to poor results "
+            f"(reason: {degrade_reason}, unavailable sources: {unavailable_sources})"
+        )
 
         # 创建兜底响应
         fallback_hit = RecallHit(
@@ -235,7 +292,8 @@ async def fallback_node(state: RecallState) -> dict[str, Any]:
             content="抱歉，我暂时无法找到相关信息。建议您：\n1. 尝试使用不同的关键词\n2. 联系人工客服获取帮助",
             metadata={
                 "fallback": True,
-                "degrade_reason": "low_score" if hits else "no_results"
+                "degrade_reason": degrade_reason,
+                "unavailable_sources": unavailable_sources,
             }
         )
 
@@ -262,8 +320,13 @@ async def output_node(state: RecallState) -> dict[str, Any]:
     # 计算耗时
     latency_ms = (time.time() - start_time) * 1000
 
-    # 检查是否降级（通过hits中是否有fallback标记）
-    degraded = any(hit.metadata.get("fallback", False) for hit in hits)
+    source_stats = state.get("source_stats") or {}
+
+    # 检查是否降级（hits中有fallback标记，或有召回源处于熔断状态）
+    degraded = (
+        any(hit.metadata.get("fallback", False) for hit in hits)
+        or any(stats.status == "circuit_open" for stats in source_stats.values())
+    )
 
     # 创建召回结果
     result = RecallResult(
@@ -272,6 +335,7 @@ async def output_node(state: RecallState) -> dict[str, Any]:
         degraded=degraded,
         trace_id=request.trace_id,
         experiment_id=request.experiment_id,
+        source_stats=source_stats,
     )
 
     # 记录详细的召回指标
@@ -298,11 +362,88 @@ async def output_node(state: RecallState) -> dict[str, Any]:
         "avg_score": avg_score,
         "max_score": max_score,
         "top_hit_source": hits[0].source if hits else None,
+        "source_stats": {
+            name: {"status": stats.status, "latency_ms": stats.latency_ms, "hits": stats.hits_count}
+            for name, stats in source_stats.items()
+        },
     })
 
     return {"result": result}
 
 
+def _early_exit_policy(config: dict[str, Any]) -> tuple[float, set[str]] | None:
+    """
+    解析提前结束策略
+
+    Args:
+        config: 召回配置
+
+    Returns:
+        (置信度阈值, 可触发的召回源)；未启用或配置无效时返回 None
+    """
+    threshold = config.get("early_exit_threshold")
+    trigger_sources = config.get("early_exit_sources")
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)):
+        return None
+    if not isinstance(trigger_sources, (list, tuple, set)):
+        return None
+    return float(threshold), set(trigger_sources)
+
+
+async def _run_recall_source(
+    source_name: str,
+    source: RecallSource,
+    request: RecallRequest,
+    config: dict[str, Any],
+) -> tuple[list[RecallHit], SourceStats]:
+    """
+    调用单个召回源并记录执行统计（异常不向上抛出）
+
+    召回源熔断时直接返回空结果；调用结果计入熔断器统计。
+
+    Args:
+        source_name: 召回源名称
+        source: 召回源实例
+        request: 召回请求
+        config: 配置
+
+    Returns:
+        (召回结果, 执行统计)
+    """
+    breaker = get_breaker(source_name)
+    if breaker is not None and not breaker.allow_request():
+        # 熔断期间直接返回空结果，不重试也不等待超时
+        logger.warning(f"Fanout node: {source_name} circuit open, skipped")
+        return [], SourceStats(source=source_name, status="circuit_open", latency_ms=0.0)
+
+    start = time.perf_counter()
+    try:
+        hits = await _call_recall_source(source, request, config)
+    except Exception as e:
+        latency_ms = (time.perf_counter() - start) * 1000
+        if breaker is not None:
+            breaker.record_failure()
+        logger.error(f"Fanout node: {source_name} failed: {e}")
+        return [], SourceStats(
+            source=source_name,
+            status="error",
+            latency_ms=latency_ms,
+            error=str(e),
+        )
+
+    latency_ms = (time.perf_counter() - start) * 1000
+    if breaker is not None:
+        breaker.record_success(latency_ms)
+    get_latency_tracker(source_name).record(latency_ms)
+    logger.info(f"Fanout node: {source_name} returned {len(hits)} hits in {latency_ms:.1f}ms")
+    return hits, SourceStats(
+        source=source_name,
+        status="ok",
+        latency_ms=latency_ms,
+        hits_count=len(hits),
+    )
+
+
 async def _call_recall_source(source, request: RecallRequest, config: dict[str, Any]) -> list[RecallHit]:
     """
     调用单个召回源（带重试）
@@ -327,29 +468,3 @@ async def _call_recall_source(source, request: RecallRequest, config: dict[str,
             else:
                 logger.error(f"Recall source {source.source_name} failed after {retry_count + 1} attempts: {e}")
                 raise
-
-
-def _deduplicate_hits(hits: list[RecallHit]) -> list[RecallHit]:
-    """
-    去重召回结果（保留高分）
-
-    Args:
-        hits: 召回结果列表
-
-    Returns:
-        去重后的结果列表
-    """
-    seen_content = {}
-
-    for hit in hits:
-        # 使用内容的前100个字符作为去重键
-        content_key = hit.content[:100]
-
-        if content_key not in seen_content:
-            seen_content[content_key] = hit
-        else:
-            # 保留分数更高的
-            if hit.score > seen_content[content_key].score:
-                seen_content[content_key] = hit
-
-    return list(seen_content.values())
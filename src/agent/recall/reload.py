@@ -0,0 +1,108 @@
+"""
+配置热重载
+
+重新加载环境变量和 .env，校验通过后一次性替换全局 settings 的内容，并刷新依赖配置的进程内状态，无需重启 worker：
+- 重新编译召回配置快照（含实验注册表），清空召回结果缓存（缓存配置变化时按新容量/TTL 重建）
+- 熔断器 / 对冲执行器 / 延迟统计配置变化时重建
+- 召回源配置变化时关闭并重新预热召回源
+- LLM / Embedding 等非召回配置变化时清空模型实例缓存
+- 路由或 Embedding 配置变化时丢弃路由引擎（意图中心按新模型重新计算）
+
+由 POST /api/v1/config/reload 和 SIGHUP 信号触发；每个 worker 进程独立重载。
+"""
+
+import logging
+from typing import Any
+
+from src.agent.main.router import reset_router
+from src.agent.recall.breakers import reset_breakers
+from src.agent.recall.cache import invalidate_recall_cache, reset_recall_cache
+from src.agent.recall.config import (
+    build_recall_snapshot,
+    get_recall_snapshot,
+    refresh_recall_snapshot,
+    validate_recall_config,
+)
+from src.agent.recall.hedging import reset_hedgers
+from src.agent.recall.latency import reset_latency_trackers
+from src.agent.recall.sources import close_sources, list_sources, warmup_sources
+from src.core.config import apply_settings, load_settings, settings
+from src.services.llm_factory import clear_model_cache
+
+logger = logging.getLogger(__name__)
+
+# 召回源实例构造时读取的配置
+_SOURCE_SETTINGS_PREFIXES = ("recall_sources", "recall_faq_")
+
+
+def _changed_with_prefix(changed: list[str], *prefixes: str) -> bool:
+    return any(name.startswith(prefixes) for name in changed)
+
+
+async def reload_config() -> dict[str, Any]:
+    """
+    重新加载配置并刷新相关状态
+
+    先按新配置编译召回配置快照并校验，通过后才替换全局 settings；
+    新配置中的召回源未注册或实验注册表无效时不做任何修改。
+    配置项不变但实验注册表文件内容变化时同样重新编译快照。
+
+    Returns:
+        变化的配置项列表和新的召回配置指纹
+
+    Raises:
+        pydantic.ValidationError: 新配置校验失败
+        ValueError: 新配置包含未注册的召回源，或实验注册表读取/校验失败
+    """
+    fresh = load_settings()
+
+    try:
+        candidate = build_recall_snapshot(fresh)
+        # 基础配置和各实验用到的召回源都必须已注册
+        all_sources = list(dict.fromkeys([
+            *candidate.base["sources"],
+            *(name for config in candidate.experiments.values() for name in config["sources"]),
+        ]))
+        validation = validate_recall_config({
+            **candidate.base,
+            "sources": all_sources,
+            "weights": dict(candidate.base["weights"]),
+        })
+        if not validation["sources_valid"]:
+            invalid = validation["invalid_sources"]
+            raise ValueError(
+                f"Unsupported recall source: {', '.join(invalid)}. "
+                f"Available: {', '.join(list_sources())}"
+            )
+    except OSError as e:
+        raise ValueError(f"Failed to load experiment config: {e}") from e
+
+    changed = apply_settings(fresh)
+
+    # 实验注册表文件可能在配置项不变的情况下被修改，以快照指纹判断
+    if not changed and candidate.fingerprint == get_recall_snapshot().fingerprint:
+        logger.info("Config reloaded: no changes")
+        return {"changed": [], "fingerprint": candidate.fingerprint}
+
+    snapshot = refresh_recall_snapshot(settings)
+    invalidate_recall_cache()
+    if _changed_with_prefix(changed, "recall_cache_"):
+        reset_recall_cache()
+
+    if _changed_with_prefix(changed, "recall_breaker_"):
+        reset_breakers()
+    if _changed_with_prefix(changed, "recall_hedge_"):
+        reset_hedgers()
+    if _changed_with_prefix(changed, "recall_latency_"):
+        reset_latency_trackers()
+    if any(not name.startswith("recall_") for name in changed):
+        clear_model_cache()
+    if _changed_with_prefix(changed, "router_", "embedding_"):
+        reset_router()
+    if _changed_with_prefix(changed, *_SOURCE_SETTINGS_PREFIXES):
+        await close_sources()
+        await warmup_sources(settings.recall_sources)
+
+    logger.info(f"🔄 Config reloaded: {len(changed)} changed ({', '.join(changed)}), "
+                f"fingerprint={snapshot.fingerprint}")
+    return {"changed": changed, "fingerprint": snapshot.fingerprint}
@@ -4,10 +4,11 @@
 定义召回Agent的输入输出数据结构：
 - RecallRequest: 召回请求
 - RecallHit: 召回命中结果
+- SourceStats: 单个召回源的执行统计
 - RecallResult: 召回结果汇总
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 
@@ -21,6 +22,7 @@ class RecallRequest:
     context: list[str] | None = None
     experiment_id: str | None = None
     top_k: int = 5
+    merge_strategy: str | None = None  # 覆盖配置的合并策略（weighted/rrf/已注册的自定义策略）
 
 
 @dataclass
@@ -34,6 +36,17 @@ class RecallHit:
     metadata: dict[str, Any]
 
 
+@dataclass
+class SourceStats:
+    """单个召回源的执行统计"""
+    source: str
+    status: str  # ok / timeout / error / circuit_open / skipped
+    latency_ms: float
+    hits_count: int = 0
+    error: str | None = None
+    timeout_ms: float | None = None  # 本次使用的有效超时
+
+
 @dataclass
 class RecallResult:
     """召回结果汇总"""
@@ -42,3 +55,5 @@ class RecallResult:
     degraded: bool
     trace_id: str
     experiment_id: str | None = None
+    source_stats: dict[str, SourceStats] = field(default_factory=dict)  # 召回源名称 → 执行统计
+    cached: bool = False  # 是否来自召回结果缓存
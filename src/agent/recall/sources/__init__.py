@@ -6,4 +6,135 @@
 - FAQ召回源
 - 关键词召回源
 - 业务API召回源
+
+召回源通过注册表按名称管理：每个召回源在进程内只实例化一次，
+跨请求复用（数据索引、客户端等随实例长期存在）。
+第三方召回源通过 register_source 注册后即可在 RECALL_SOURCES 中使用。
 """
+
+import logging
+import threading
+from functools import partial
+from typing import Callable
+
+from src.agent.recall.sources.base import RecallSource
+from src.agent.recall.sources.faq_source import FAQRecallSource
+from src.agent.recall.sources.keyword_source import KeywordRecallSource
+from src.agent.recall.sources.vector_source import VectorRecallSource
+
+logger = logging.getLogger(__name__)
+
+SourceFactory = Callable[[], RecallSource]
+
+# 召回源注册表：名称 → 工厂（类或无参函数）
+_SOURCE_REGISTRY: dict[str, SourceFactory] = {
+    # 召回异常交给 fanout_node 处理（计入熔断统计）
+    "vector": partial(VectorRecallSource, swallow_errors=False),
+    "faq": partial(FAQRecallSource, swallow_errors=False),
+    "keyword": partial(KeywordRecallSource, swallow_errors=False),
+}
+
+# 已创建的召回源实例：名称 → 实例
+_source_instances: dict[str, RecallSource] = {}
+_source_lock = threading.Lock()
+
+
+def register_source(name: str, factory: SourceFactory) -> None:
+    """
+    注册召回源
+
+    重复注册会替换原有工厂，并丢弃已创建的实例（下次使用时重新创建）。
+
+    Args:
+        name: 召回源名称（与 RECALL_SOURCES 中的名称对应）
+        factory: 召回源类或返回召回源实例的无参函数
+    """
+    with _source_lock:
+        _SOURCE_REGISTRY[name] = factory
+        _source_instances.pop(name, None)
+
+
+def list_sources() -> list[str]:
+    """
+    列出所有已注册的召回源
+
+    Returns:
+        召回源名称列表
+    """
+    return list(_SOURCE_REGISTRY.keys())
+
+
+def get_source(name: str) -> RecallSource | None:
+    """
+    获取召回源实例（首次使用时创建，之后复用）
+
+    Args:
+        name: 召回源名称
+
+    Returns:
+        召回源实例；未注册的名称返回 None
+    """
+    source = _source_instances.get(name)
+    if source is not None:
+        return source
+
+    with _source_lock:
+        source = _source_instances.get(name)
+        if source is None:
+            factory = _SOURCE_REGISTRY.get(name)
+            if factory is None:
+                logger.warning(f"Unknown recall source: {name}")
+                return None
+            source = factory()
+            _source_instances[name] = source
+            logger.info(f"Recall source created: {name}")
+        return source
+
+
+async def warmup_sources(names: list[str]) -> None:
+    """
+    创建并预热召回源（应用启动时调用）
+
+    单个召回源预热失败只记录日志，不影响其他召回源。
+
+    Args:
+        names: 召回源名称列表（通常为 settings.recall_sources）
+    """
+    for name in names:
+        try:
+            source = get_source(name)
+            if source is not None:
+                await source.warmup()
+                logger.info(f"✅ Recall source warmed up: {name}")
+        except Exception as e:
+            logger.error(f"❌ Failed to warm up recall source {name}: {e}")
+
+
+async def close_sources() -> None:
+    """
+    关闭并丢弃所有已创建的召回源实例
+
+    应用关闭或配置变更时调用；之后再使用召回源会按当前配置重新创建。
+    """
+    with _source_lock:
+        instances = list(_source_instances.items())
+        _source_instances.clear()
+
+    for name, source in instances:
+        try:
+            await source.close()
+        except Exception as e:
+            logger.error(f"Error closing recall source {name}: {e}")
+
+
+__all__ = [
+    "RecallSource",
+    "FAQRecallSource",
+    "KeywordRecallSource",
+    "VectorRecallSource",
+    "register_source",
+    "list_sources",
+    "get_source",
+    "warmup_sources",
+    "close_sources",
+]
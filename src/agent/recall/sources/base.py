@@ -35,3 +35,19 @@ class RecallSource(ABC):
             召回源名称
         """
         pass
+
+    async def warmup(self) -> None:
+        """
+        预热（应用启动时调用）
+
+        用于提前加载数据、建立客户端连接等，默认不做任何事。
+        """
+        return None
+
+    async def close(self) -> None:
+        """
+        释放资源（应用关闭或配置变更时调用）
+
+        默认不做任何事。
+        """
+        return None
@@ -2,52 +2,215 @@
 FAQ召回源适配器
 
 实现FAQ数据访问的召回源，支持关键词匹配和向量检索。
+FAQ 数据加载时构建倒排索引，查询时只对候选 FAQ 打分。
 """
 
+import json
 import logging
+import threading
+import time
+from array import array
 from typing import Any
 
 from src.agent.recall.schema import RecallHit, RecallRequest
 from src.agent.recall.sources.base import RecallSource
+from src.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# 内置 FAQ 数据（未配置 recall_faq_data_path 时使用）
+_DEFAULT_FAQ_DATA: list[dict[str, Any]] = [
+    {
+        "id": "faq_001",
+        "question": "你们的退货政策是什么？",
+        "answer": "我们提供30天无理由退货服务，商品需保持原包装和标签完整。",
+        "category": "退货政策",
+        "keywords": ["退货", "退款", "退换", "30天", "无理由"]
+    },
+    {
+        "id": "faq_002",
+        "question": "如何联系客服？",
+        "answer": "您可以通过在线客服、电话400-123-4567或邮件support@example.com联系我们。",
+        "category": "联系方式",
+        "keywords": ["客服", "联系", "电话", "邮箱", "在线"]
+    },
+    {
+        "id": "faq_003",
+        "question": "配送时间需要多久？",
+        "answer": "标准配送3-5个工作日，加急配送1-2个工作日，偏远地区可能需要额外1-2天。",
+        "category": "配送",
+        "keywords": ["配送", "发货", "快递", "时间", "工作日"]
+    },
+    {
+        "id": "faq_004",
+        "question": "支持哪些支付方式？",
+        "answer": "我们支持支付宝、微信支付、银行卡支付和货到付款等多种支付方式。",
+        "category": "支付",
+        "keywords": ["支付", "支付宝", "微信", "银行卡", "货到付款"]
+    }
+]
+
+
+class FAQIndex:
+    """
+    FAQ 倒排索引
+
+    加载时构建：
+    - 问题/答案文本的字符 unigram/bigram → FAQ 下标
+    - 关键词 → FAQ 下标
+
+    查询时只对候选 FAQ 调用原有打分逻辑。FAQ 分数的四个组成部分中，
+    "问题包含查询词"、"查询包含关键词"、"答案包含查询词" 三项通过索引定位候选；
+    "查询是问题的子串" 蕴含前者（空查询除外）。不满足任一条件的 FAQ 分数至多 0.2，
+    低于召回阈值，因此候选打分结果与全量扫描一致。
+    """
+
+    def __init__(self, faq_data: list[dict[str, Any]]):
+        self._questions: list[str] = []
+        self._answers: list[str] = []
+        gram_postings: dict[str, list[int]] = {}
+        keyword_postings: dict[str, list[int]] = {}
+
+        for faq_idx, faq in enumerate(faq_data):
+            question = faq["question"].lower()
+            answer = faq["answer"].lower()
+            self._questions.append(question)
+            self._answers.append(answer)
+
+            for gram in _char_grams(question) | _char_grams(answer):
+                postings = gram_postings.get(gram)
+                if postings is None:
+                    gram_postings[gram] = postings = []
+                postings.append(faq_idx)
+
+            # 关键词按原样索引（与打分逻辑中 keyword in query 的语义一致）
+            for keyword in set(faq["keywords"]):
+                if keyword:
+                    keyword_postings.setdefault(keyword, []).append(faq_idx)
+
+        # 倒排表使用紧凑数组存储
+        self._gram_postings = {gram: array("I", ids) for gram, ids in gram_postings.items()}
+        self._keyword_postings = {kw: array("I", ids) for kw, ids in keyword_postings.items()}
+        self._keyword_lengths = sorted({len(k) for k in self._keyword_postings})
+
+    def __len__(self) -> int:
+        return len(self._questions)
+
+    def candidates(self, query: str) -> list[int]:
+        """
+        查找候选 FAQ
+
+        Args:
+            query: 小写化后的查询文本
+
+        Returns:
+            候选 FAQ 下标（升序，与全量扫描的遍历顺序一致）
+        """
+        candidates: set[int] = set()
+
+        # 问题/答案包含查询词
+        for word in set(query.split()):
+            candidates.update(self._text_matches(word))
+
+        # 查询包含关键词：枚举查询中长度等于某个关键词长度的子串
+        for length in self._keyword_lengths:
+            for start in range(len(query) - length + 1):
+                postings = self._keyword_postings.get(query[start:start + length])
+                if postings is not None:
+                    candidates.update(postings)
+
+        return sorted(candidates)
+
+    def _text_matches(self, word: str) -> list[int]:
+        """查找问题或答案中包含 word 的 FAQ"""
+        grams = [word] if len(word) == 1 else [word[i:i + 2] for i in range(len(word) - 1)]
+
+        shortest = None
+        for gram in grams:
+            postings = self._gram_postings.get(gram)
+            if postings is None:
+                return []
+            if shortest is None or len(postings) < len(shortest):
+                shortest = postings
+
+        if shortest is None:
+            return []
+        if len(word) <= 2:
+            return list(shortest)
+
+        # 所有 bigram 都出现不代表连续出现，需逐个验证
+        return [
+            faq_idx for faq_idx in shortest
+            if word in self._questions[faq_idx] or word in self._answers[faq_idx]
+        ]
+
+
+def _char_grams(text: str) -> set[str]:
+    """字符 unigram 和 bigram"""
+    grams = set(text)
+    grams.update(map(str.__add__, text, text[1:]))
+    return grams
+
+
+def load_faq_data(path: str) -> list[dict[str, Any]]:
+    """
+    从 JSON 文件加载 FAQ 数据
+
+    Args:
+        path: JSON 文件路径，内容为 FAQ 列表（每项包含 id/question/answer/category/keywords）
+
+    Returns:
+        FAQ 数据列表
+    """
+    with open(path, encoding="utf-8") as f:
+        data: list[dict[str, Any]] = json.load(f)
+    return data
+
+
+# 进程内共享的 FAQ 数据与索引：数据路径 → (FAQ 数据, 索引)
+_shared_indexes: dict[str | None, tuple[list[dict[str, Any]], FAQIndex]] = {}
+_shared_indexes_lock = threading.Lock()
+
+
+def _get_shared_faq_index(path: str | None) -> tuple[list[dict[str, Any]], FAQIndex]:
+    """获取（必要时构建）共享的 FAQ 数据与索引"""
+    entry = _shared_indexes.get(path)
+    if entry is not None:
+        return entry
+
+    with _shared_indexes_lock:
+        entry = _shared_indexes.get(path)
+        if entry is None:
+            faq_data = load_faq_data(path) if path else _DEFAULT_FAQ_DATA
+            start = time.perf_counter()
+            entry = (faq_data, FAQIndex(faq_data))
+            logger.info(
+                f"FAQ index built: {len(faq_data)} FAQs in "
+                f"{(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+            _shared_indexes[path] = entry
+        return entry
+
 
 class FAQRecallSource(RecallSource):
     """FAQ召回源适配器"""
 
-    def __init__(self):
-        # FAQ数据存储（实际项目中可能从数据库或文件加载）
-        self._faq_data = [
-            {
-                "id": "faq_001",
-                "question": "你们的退货政策是什么？",
-                "answer": "我们提供30天无理由退货服务，商品需保持原包装和标签完整。",
-                "category": "退货政策",
-                "keywords": ["退货", "退款", "退换", "30天", "无理由"]
-            },
-            {
-                "id": "faq_002",
-                "question": "如何联系客服？",
-                "answer": "您可以通过在线客服、电话400-123-4567或邮件support@example.com联系我们。",
-                "category": "联系方式",
-                "keywords": ["客服", "联系", "电话", "邮箱", "在线"]
-            },
-            {
-                "id": "faq_003",
-                "question": "配送时间需要多久？",
-                "answer": "标准配送3-5个工作日，加急配送1-2个工作日，偏远地区可能需要额外1-2天。",
-                "category": "配送",
-                "keywords": ["配送", "发货", "快递", "时间", "工作日"]
-            },
-            {
-                "id": "faq_004",
-                "question": "支持哪些支付方式？",
-                "answer": "我们支持支付宝、微信支付、银行卡支付和货到付款等多种支付方式。",
-                "category": "支付",
-                "keywords": ["支付", "支付宝", "微信", "银行卡", "货到付款"]
-            }
-        ]
+    def __init__(
+        self, faq_data: list[dict[str, Any]] | None = None, swallow_errors: bool = True
+    ):
+        """
+        Args:
+            faq_data: FAQ 数据列表；为空时使用 recall_faq_data_path 指定的文件或内置 FAQ
+                （二者的索引在进程内共享，只构建一次）
+            swallow_errors: 召回异常时返回空结果（默认）；为 False 时向上抛出，
+                由 fanout_node 统一记录失败并计入熔断统计
+        """
+        self._swallow_errors = swallow_errors
+        if faq_data is None:
+            self._faq_data, self._index = _get_shared_faq_index(settings.recall_faq_data_path)
+        else:
+            self._faq_data = faq_data
+            self._index = FAQIndex(faq_data)
 
     @property
     def source_name(self) -> str:
@@ -68,8 +231,14 @@ class FAQRecallSource(RecallSource):
             query = request.query.lower()
             hits = []
 
+            # 索引模式只对候选 FAQ 打分；扫描模式逐条打分（兼容模式）
+            if settings.recall_faq_index_enabled:
+                faqs = [self._faq_data[i] for i in self._index.candidates(query)]
+            else:
+                faqs = self._faq_data
+
             # 关键词匹配策略
-            for faq in self._faq_data:
+            for faq in faqs:
                 score = self._calculate_faq_score(query, faq)
 
                 if score > 0.3:  # 设置最低匹配阈值
@@ -105,6 +274,8 @@ class FAQRecallSource(RecallSource):
 
         except Exception as e:
             logger.error(f"FAQ recall failed for '{request.query}': {e}")
+            if not self._swallow_errors:
+                raise
             return []
 
     def _calculate_faq_score(self, query: str, faq: dict[str, Any]) -> float:
@@ -2,66 +2,270 @@
 关键词召回源适配器
 
 实现基于关键词/规则的召回，支持分词、同义词匹配、正则表达式等策略。
+规则与同义词在加载时编译为多模式匹配自动机，每次查询只扫描一遍。
 """
 
 import logging
 import re
+import threading
 from typing import Any
 
 from src.agent.recall.schema import RecallHit, RecallRequest
 from src.agent.recall.sources.base import RecallSource
+from src.core.matcher import AhoCorasickMatcher
 
 logger = logging.getLogger(__name__)
 
+# 内置关键词规则库（实际项目中可能从数据库或配置文件加载）
+_DEFAULT_KEYWORD_RULES: list[dict[str, Any]] = [
+    {
+        "id": "rule_001",
+        "keywords": ["价格", "多少钱", "费用", "收费", "成本"],
+        "content": "我们的产品价格信息：\n- 基础版：¥99/月\n- 专业版：¥299/月\n- 企业版：¥999/月\n\n具体价格请咨询销售团队。",
+        "category": "价格咨询",
+        "priority": 0.9,
+        "patterns": [r"价格|多少钱|费用|收费|成本"]
+    },
+    {
+        "id": "rule_002",
+        "keywords": ["技术支持", "帮助", "问题", "故障", "bug"],
+        "content": "技术支持服务：\n- 工作时间：周一至周五 9:00-18:00\n- 联系方式：support@example.com\n- 在线客服：7x24小时\n- 响应时间：2小时内",
+        "category": "技术支持",
+        "priority": 0.8,
+        "patterns": [r"技术支持|帮助|问题|故障|bug"]
+    },
+    {
+        "id": "rule_003",
+        "keywords": ["登录", "密码", "账号", "注册", "认证"],
+        "content": "账号相关服务：\n- 忘记密码：点击登录页面的'忘记密码'链接\n- 账号注册：访问注册页面完成注册\n- 账号安全：建议定期更换密码\n- 多因素认证：支持短信和邮箱验证",
+        "category": "账号管理",
+        "priority": 0.7,
+        "patterns": [r"登录|密码|账号|注册|认证"]
+    },
+    {
+        "id": "rule_004",
+        "keywords": ["API", "接口", "开发", "文档", "SDK"],
+        "content": "开发者资源：\n- API文档：https://docs.example.com/api\n- SDK下载：支持Python、Java、Node.js\n- 开发者社区：https://dev.example.com\n- 技术支持：dev-support@example.com",
+        "category": "开发者",
+        "priority": 0.6,
+        "patterns": [r"API|接口|开发|文档|SDK"]
+    }
+]
+
+# 内置同义词映射
+_DEFAULT_SYNONYMS: dict[str, list[str]] = {
+    "价格": ["费用", "收费", "成本", "价钱"],
+    "帮助": ["支持", "协助", "指导"],
+    "问题": ["故障", "错误", "bug", "异常"],
+    "登录": ["登入", "进入", "访问"],
+    "API": ["接口", "服务", "端点"]
+}
+
+# 正则元字符：不含这些字符的模式分支可视为字面量
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+def _literal_alternatives(pattern: str) -> list[str] | None:
+    """
+    将形如 "价格|多少钱|费用" 的纯字面量分支模式拆分为字面量列表
+
+    Returns:
+        字面量列表；模式包含其他正则语法时返回 None
+    """
+    parts = pattern.split("|")
+    if any(not part or _REGEX_METACHARS.intersection(part) for part in parts):
+        return None
+    return parts
+
+
+def _rule_score(
+    matched_keywords: int,
+    total_keywords: int,
+    pattern_matched: bool,
+    synonym_matches: int,
+    priority: float,
+) -> float:
+    """
+    关键词规则打分公式（KeywordRuleMatcher 与逐条计算共用）
+
+    Args:
+        matched_keywords: 查询中出现的关键词数
+        total_keywords: 规则的关键词总数
+        pattern_matched: 是否命中任一正则模式
+        synonym_matches: 有同义词出现在查询中的关键词数
+        priority: 规则优先级
+
+    Returns:
+        匹配分数 (0-1)
+    """
+    score = 0.0
+
+    # 1. 直接关键词匹配
+    if matched_keywords > 0:
+        score += (matched_keywords / total_keywords) * 0.4
+
+    # 2. 正则表达式匹配
+    if pattern_matched:
+        score += 0.3
+
+    # 3. 同义词匹配
+    if synonym_matches > 0:
+        score += (synonym_matches / total_keywords) * 0.2
+
+    # 4. 规则优先级加权
+    score *= priority
+
+    # 5. 完全匹配奖励
+    if matched_keywords > 0:
+        score += 0.1
+
+    return min(score, 1.0)
+
+
+class KeywordRuleMatcher:
+    """
+    编译后的关键词规则匹配器
+
+    将所有规则的关键词、同义词和字面量正则分支编译为一个 Aho-Corasick 自动机，
+    一次扫描查询即可得到所有规则的命中情况；打分与
+    KeywordRecallSource._calculate_keyword_score 共用 _rule_score。
+    含其他正则语法的模式无法编译进自动机，仍逐条 re.search（预编译）。
+    """
+
+    def __init__(self, rules: list[dict[str, Any]], synonyms: dict[str, list[str]]):
+        self._rules = rules
+        literals: dict[str, int] = {}
+
+        def literal_id(text: str) -> int:
+            if text not in literals:
+                literals[text] = len(literals)
+            return literals[text]
+
+        # 每条规则：关键词字面量、各关键词的同义词字面量、模式字面量、回退正则
+        self._keyword_ids: list[list[int]] = []
+        self._synonym_ids: list[list[list[int]]] = []
+        self._pattern_ids: list[list[int]] = []
+        self._pattern_regexes: list[list[re.Pattern]] = []
+
+        for rule in rules:
+            keywords = rule["keywords"]
+            self._keyword_ids.append([literal_id(keyword) for keyword in keywords])
+            self._synonym_ids.append([
+                [literal_id(syn) for syn in synonyms[keyword]] if keyword in synonyms else []
+                for keyword in keywords
+            ])
+
+            pattern_ids: list[int] = []
+            regexes: list[re.Pattern] = []
+            for pattern in rule.get("patterns", []):
+                alternatives = _literal_alternatives(pattern)
+                if alternatives is None:
+                    regexes.append(re.compile(pattern, re.IGNORECASE))
+                else:
+                    # 查询已小写化，字面量小写后等价于 IGNORECASE 匹配
+                    pattern_ids.extend(literal_id(alt.lower()) for alt in alternatives)
+            self._pattern_ids.append(pattern_ids)
+            self._pattern_regexes.append(regexes)
+
+        # 字面量 → 引用它的规则（用于只对命中规则打分）
+        literal_rules: list[set[int]] = [set() for _ in literals]
+        for rule_idx in range(len(rules)):
+            for lid in self._keyword_ids[rule_idx] + self._pattern_ids[rule_idx]:
+                literal_rules[lid].add(rule_idx)
+            for syn_ids in self._synonym_ids[rule_idx]:
+                for lid in syn_ids:
+                    literal_rules[lid].add(rule_idx)
+        self._literal_rules = literal_rules
+
+        # 含回退正则的规则每次都需检查
+        self._regex_rules = {i for i, regexes in enumerate(self._pattern_regexes) if regexes}
+        # 空字符串总是"出现"在查询中（与 "" in query 一致）
+        self._empty_literal = literals.get("")
+        self._matcher = AhoCorasickMatcher(literals)
+
+    def score(self, query: str) -> list[tuple[int, float]]:
+        """
+        一次扫描计算所有规则的匹配分数
+
+        Args:
+            query: 小写化后的查询文本
+
+        Returns:
+            [(规则下标, 分数)]，按规则顺序排列，只包含分数大于 0 的规则
+        """
+        found = self._matcher.find_all(query)
+        if self._empty_literal is not None:
+            found.add(self._empty_literal)
+
+        candidates = set(self._regex_rules)
+        for lid in found:
+            candidates.update(self._literal_rules[lid])
+
+        results = []
+        for rule_idx in sorted(candidates):
+            score = self._score_rule(rule_idx, query, found)
+            if score > 0:
+                results.append((rule_idx, score))
+        return results
+
+    def _score_rule(self, rule_idx: int, query: str, found: set[int]) -> float:
+        """按自动机的命中结果计算单条规则分数"""
+        keyword_ids = self._keyword_ids[rule_idx]
+        pattern_matched = any(lid in found for lid in self._pattern_ids[rule_idx]) or any(
+            regex.search(query) for regex in self._pattern_regexes[rule_idx]
+        )
+        return _rule_score(
+            matched_keywords=sum(1 for lid in keyword_ids if lid in found),
+            total_keywords=len(keyword_ids),
+            pattern_matched=pattern_matched,
+            synonym_matches=sum(
+                1 for syn_ids in self._synonym_ids[rule_idx]
+                if any(lid in found for lid in syn_ids)
+            ),
+            priority=float(self._rules[rule_idx].get("priority", 0.5)),
+        )
+
+
+_default_matcher: KeywordRuleMatcher | None = None
+_default_matcher_lock = threading.Lock()
+
+
+def _get_default_matcher() -> KeywordRuleMatcher:
+    """获取（必要时编译）内置规则的共享匹配器"""
+    global _default_matcher
+
+    if _default_matcher is None:
+        with _default_matcher_lock:
+            if _default_matcher is None:
+                _default_matcher = KeywordRuleMatcher(_DEFAULT_KEYWORD_RULES, _DEFAULT_SYNONYMS)
+    return _default_matcher
+
 
 class KeywordRecallSource(RecallSource):
     """关键词召回源适配器"""
 
-    def __init__(self):
-        # 关键词规则库（实际项目中可能从数据库或配置文件加载）
-        self._keyword_rules = [
-            {
-                "id": "rule_001",
-                "keywords": ["价格", "多少钱", "费用", "收费", "成本"],
-                "content": "我们的产品价格信息：\n- 基础版：¥99/月\n- 专业版：¥299/月\n- 企业版：¥999/月\n\n具体价格请咨询销售团队。",
-                "category": "价格咨询",
-                "priority": 0.9,
-                "patterns": [r"价格|多少钱|费用|收费|成本"]
-            },
-            {
-                "id": "rule_002",
-                "keywords": ["技术支持", "帮助", "问题", "故障", "bug"],
-                "content": "技术支持服务：\n- 工作时间：周一至周五 9:00-18:00\n- 联系方式：support@example.com\n- 在线客服：7x24小时\n- 响应时间：2小时内",
-                "category": "技术支持",
-                "priority": 0.8,
-                "patterns": [r"技术支持|帮助|问题|故障|bug"]
-            },
-            {
-                "id": "rule_003",
-                "keywords": ["登录", "密码", "账号", "注册", "认证"],
-                "content": "账号相关服务：\n- 忘记密码：点击登录页面的'忘记密码'链接\n- 账号注册：访问注册页面完成注册\n- 账号安全：建议定期更换密码\n- 多因素认证：支持短信和邮箱验证",
-                "category": "账号管理",
-                "priority": 0.7,
-                "patterns": [r"登录|密码|账号|注册|认证"]
-            },
-            {
-                "id": "rule_004",
-                "keywords": ["API", "接口", "开发", "文档", "SDK"],
-                "content": "开发者资源：\n- API文档：https://docs.example.com/api\n- SDK下载：支持Python、Java、Node.js\n- 开发者社区：https://dev.example.com\n- 技术支持：dev-support@example.com",
-                "category": "开发者",
-                "priority": 0.6,
-                "patterns": [r"API|接口|开发|文档|SDK"]
-            }
-        ]
-
-        # 同义词映射
-        self._synonyms = {
-            "价格": ["费用", "收费", "成本", "价钱"],
-            "帮助": ["支持", "协助", "指导"],
-            "问题": ["故障", "错误", "bug", "异常"],
-            "登录": ["登入", "进入", "访问"],
-            "API": ["接口", "服务", "端点"]
-        }
+    def __init__(
+        self,
+        rules: list[dict[str, Any]] | None = None,
+        synonyms: dict[str, list[str]] | None = None,
+        swallow_errors: bool = True,
+    ):
+        """
+        Args:
+            rules: 关键词规则列表；为空时使用内置规则（编译结果在进程内共享）
+            synonyms: 同义词映射；为空时使用内置同义词
+            swallow_errors: 召回异常时返回空结果（默认）；为 False 时向上抛出，
+                由 fanout_node 统一记录失败并计入熔断统计
+        """
+        self._swallow_errors = swallow_errors
+        if rules is None and synonyms is None:
+            self._keyword_rules = _DEFAULT_KEYWORD_RULES
+            self._synonyms = _DEFAULT_SYNONYMS
+            self._matcher = _get_default_matcher()
+        else:
+            self._keyword_rules = rules if rules is not None else _DEFAULT_KEYWORD_RULES
+            self._synonyms = synonyms if synonyms is not None else _DEFAULT_SYNONYMS
+            self._matcher = KeywordRuleMatcher(self._keyword_rules, self._synonyms)
 
     @property
     def source_name(self) -> str:
@@ -82,9 +286,9 @@ class KeywordRecallSource(RecallSource):
             query = request.query.lower()
             hits = []
 
-            # 关键词匹配策略
-            for rule in self._keyword_rules:
-                score = self._calculate_keyword_score(query, rule)
+            # 关键词匹配策略（一次扫描得到所有规则的分数）
+            for rule_idx, score in self._matcher.score(query):
+                rule = self._keyword_rules[rule_idx]
 
                 if score > 0.3:  # 设置最低匹配阈值
                     hit = RecallHit(
@@ -119,11 +323,13 @@ class KeywordRecallSource(RecallSource):
 
         except Exception as e:
             logger.error(f"Keyword recall failed for '{request.query}': {e}")
+            if not self._swallow_errors:
+                raise
             return []
 
     def _calculate_keyword_score(self, query: str, rule: dict[str, Any]) -> float:
         """
-        计算关键词匹配分数
+        计算关键词匹配分数（逐条计算的参考实现，与 KeywordRuleMatcher 结果一致）
 
         Args:
             query: 查询文本
@@ -132,38 +338,16 @@ class KeywordRecallSource(RecallSource):
         Returns:
             匹配分数 (0-1)
         """
-        score = 0.0
-
-        # 1. 直接关键词匹配
         keywords = rule["keywords"]
-        matched_keywords = sum(1 for keyword in keywords if keyword in query)
-        if matched_keywords > 0:
-            score += (matched_keywords / len(keywords)) * 0.4
-
-        # 2. 正则表达式匹配
-        patterns = rule.get("patterns", [])
-        for pattern in patterns:
-            if re.search(pattern, query, re.IGNORECASE):
-                score += 0.3
-                break
-
-        # 3. 同义词匹配
-        synonym_matches = 0
-        for keyword in keywords:
-            if keyword in self._synonyms:
-                synonyms = self._synonyms[keyword]
-                if any(syn in query for syn in synonyms):
-                    synonym_matches += 1
-
-        if synonym_matches > 0:
-            score += (synonym_matches / len(keywords)) * 0.2
-
-        # 4. 规则优先级加权
-        priority = rule.get("priority", 0.5)
-        score *= priority
-
-        # 5. 完全匹配奖励
-        if any(keyword in query for keyword in keywords):
-            score += 0.1
-
-        return min(score, 1.0)
+        return _rule_score(
+            matched_keywords=sum(1 for keyword in keywords if keyword in query),
+            total_keywords=len(keywords),
+            pattern_matched=any(
+                re.search(pattern, query, re.IGNORECASE) for pattern in rule.get("patterns", [])
+            ),
+            synonym_matches=sum(
+                1 for keyword in keywords
+                if any(syn in query for syn in self._synonyms.get(keyword, ()))
+            ),
+            priority=float(rule.get("priority", 0.5)),
+        )
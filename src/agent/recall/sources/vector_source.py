@@ -2,31 +2,44 @@
 向量召回源适配器
 
 封装现有Milvus检索为RecallSource实现，复用milvus_service。
+启用对冲请求时，慢请求会再发往只读副本（未配置时为主实例），取先返回的结果。
 """
 
 import logging
+from typing import Any
 
+from src.agent.recall.hedging import get_hedger
 from src.agent.recall.schema import RecallHit, RecallRequest
 from src.agent.recall.sources.base import RecallSource
 from src.core.config import settings
 from src.core.utils import truncate_text_to_tokens
 from src.services.llm_factory import create_embeddings
-from src.services.milvus_service import milvus_service
+from src.services.milvus_service import milvus_replica_service, milvus_service
 
 logger = logging.getLogger(__name__)
 
 
 class VectorRecallSource(RecallSource):
-    """向量召回源适配器"""
+    """
+    向量召回源适配器
 
-    def __init__(self):
-        self._embeddings = None
+    Args:
+        swallow_errors: 检索异常时返回空结果（默认）；为 False 时向上抛出，
+            由 fanout_node 统一记录失败并计入熔断统计
+    """
+
+    def __init__(self, swallow_errors: bool = True):
+        self._swallow_errors = swallow_errors
 
     @property
     def source_name(self) -> str:
         """召回源名称"""
         return "vector"
 
+    async def warmup(self) -> None:
+        """预先创建 Embeddings 实例（由 llm_factory 按配置缓存）"""
+        create_embeddings()
+
     async def acquire(self, request: RecallRequest) -> list[RecallHit]:
         """
         执行向量召回
@@ -38,10 +51,6 @@ class VectorRecallSource(RecallSource):
             召回命中结果列表
         """
         try:
-            # 获取embeddings实例
-            if self._embeddings is None:
-                self._embeddings = create_embeddings()
-
             # 截断查询文本以避免token限制错误
             # 使用vector_chunk_size作为最大token数，确保不超过嵌入模型的限制
             truncated_query = truncate_text_to_tokens(
@@ -56,14 +65,14 @@ class VectorRecallSource(RecallSource):
                     f"to avoid token limit (max_tokens: {settings.vector_chunk_size})"
                 )
 
-            # 生成查询向量
-            query_embedding = await self._embeddings.aembed_query(truncated_query)
-
-            # 调用Milvus检索
-            results = await milvus_service.search_knowledge(
-                query_embedding=query_embedding,
-                top_k=request.top_k,
-            )
+            hedger = get_hedger(self.source_name)
+            if hedger is not None:
+                results = await hedger.run(
+                    lambda: self._search(truncated_query, request.top_k),
+                    lambda: self._search(truncated_query, request.top_k, replica=True),
+                )
+            else:
+                results = await self._search(truncated_query, request.top_k)
 
             if not results:
                 logger.info(f"Vector recall: no results found for '{request.query}'")
@@ -99,5 +108,35 @@ class VectorRecallSource(RecallSource):
 
         except Exception as e:
             logger.error(f"Vector recall failed for '{request.query}': {e}")
+            if not self._swallow_errors:
+                raise
             # 返回空结果而不是抛出异常，让上层处理
             return []
+
+    async def _search(self, query: str, top_k: int, replica: bool = False) -> list[dict[str, Any]]:
+        """
+        生成查询向量并检索 Milvus
+
+        Args:
+            query: 查询文本（已截断）
+            top_k: 返回数量
+            replica: 是否发往只读副本（未配置副本时使用主实例）
+
+        Returns:
+            检索结果列表
+        """
+        # 获取embeddings实例（llm_factory 按配置缓存，配置变更后自动重建）
+        embeddings = create_embeddings()
+
+        # 生成查询向量
+        query_embedding = await embeddings.aembed_query(query)
+
+        # 调用Milvus检索
+        service = milvus_service
+        if replica and milvus_replica_service is not None:
+            service = milvus_replica_service
+
+        return await service.search_knowledge(
+            query_embedding=query_embedding,
+            top_k=top_k,
+        )
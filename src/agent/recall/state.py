@@ -4,27 +4,29 @@
 RecallState定义了召回Agent在执行过程中的所有状态信息。
 """
 
-from typing import TypedDict
+from typing import Required, TypedDict
 
-from src.agent.recall.schema import RecallHit, RecallRequest, RecallResult
+from src.agent.recall.schema import RecallHit, RecallRequest, RecallResult, SourceStats
 
 
-class RecallState(TypedDict):
+class RecallState(TypedDict, total=False):
     """
     召回Agent状态
 
     使用TypedDict定义状态结构，LangGraph会自动处理状态更新。
+    初始状态只包含 request，其余字段由各节点依次写入。
 
     Attributes:
-        request: 召回请求（入口参数，整个流程不变）
+        request: 召回请求（入口参数；prepare节点写入分桶分配的实验ID和实验覆盖的top_k，之后不变）
         config: 召回配置（prepare节点设置，后续不变）
         start_time: 开始时间戳（prepare节点设置）
         hits: 召回命中结果列表（fanout产生，merge更新）
+        source_stats: 各召回源的耗时和超时/失败情况（fanout产生）
         result: 最终召回结果（output节点设置）
     """
 
-    # 输入（不变）
-    request: RecallRequest
+    # 输入（prepare之后不变）
+    request: Required[RecallRequest]
 
     # 配置（prepare设置后不变）
     config: dict
@@ -32,6 +34,7 @@ class RecallState(TypedDict):
 
     # 中间结果（fanout/merge更新）
     hits: list[RecallHit]
+    source_stats: dict[str, SourceStats]
 
     # 输出（output设置）
     result: RecallResult | None
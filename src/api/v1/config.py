@@ -0,0 +1,45 @@
+"""
+配置管理 API
+
+提供配置热重载，无需重启 worker 即可使 .env / 环境变量的修改生效。
+"""
+
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from src.agent.recall.reload import reload_config
+from src.core.security import verify_api_key
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(dependencies=[Depends(verify_api_key)])
+
+
+@router.post("/config/reload")
+async def reload_configuration() -> dict:
+    """
+    重新加载配置
+
+    仅作用于处理本请求的 worker 进程；多 worker 部署时向每个 worker 发送 SIGHUP。
+
+    Returns:
+        变化的配置项和新的召回配置指纹
+    """
+    try:
+        result = await reload_config()
+    except ValueError as e:
+        # 包括 pydantic.ValidationError（ValueError 子类）
+        logger.error(f"❌ Config reload rejected: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": {
+                    "message": str(e),
+                    "type": "invalid_request_error",
+                    "code": "invalid_config",
+                }
+            },
+        ) from e
+
+    return {"success": True, **result}
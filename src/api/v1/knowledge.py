@@ -9,6 +9,7 @@ import uuid
 
 from fastapi import APIRouter, Depends, Query
 
+from src.agent.recall.cache import invalidate_recall_cache
 from src.core.security import verify_api_key
 from src.models.knowledge import (
     KnowledgeSearchResponse,
@@ -33,6 +34,7 @@ async def upsert_knowledge(request: KnowledgeUpsertRequest) -> KnowledgeUpsertRe
     1. 文档切片（TODO: 实现文本切片逻辑）
     2. 生成 Embedding
     3. 存入 Milvus
+    4. 清空召回结果缓存（避免返回写入前的召回结果）
     """
     logger.info(f"📥 Upserting {len(request.documents)} documents to knowledge base")
 
@@ -83,6 +85,9 @@ async def upsert_knowledge(request: KnowledgeUpsertRequest) -> KnowledgeUpsertRe
 
         logger.info(f"✅ Successfully inserted {inserted_count} documents")
 
+        # 知识库内容已变化，缓存的召回结果不再可信
+        invalidate_recall_cache()
+
         return KnowledgeUpsertResponse(
             success=True,
             inserted_count=inserted_count,
@@ -0,0 +1,64 @@
+"""
+运行时指标 API
+
+提供路由统计、推测式检索统计和召回编排层的运行时状态（实验指标、召回结果缓存、查询向量缓存、熔断器、对冲请求、各召回源延迟与有效超时），供监控系统采集。
+"""
+
+import time
+
+from fastapi import APIRouter, Depends
+
+from src.agent.main.graph import checkpointer_stats
+from src.agent.main.router import router_stats
+from src.agent.main.speculative import speculative_stats
+from src.agent.recall.breakers import breaker_stats
+from src.agent.recall.cache import recall_cache_stats
+from src.agent.recall.config import get_recall_snapshot
+from src.agent.recall.experiments import experiment_stats
+from src.agent.recall.hedging import hedger_stats
+from src.agent.recall.latency import latency_stats
+from src.core.security import verify_api_key
+from src.services.llm_factory import embedding_cache_stats
+
+router = APIRouter(dependencies=[Depends(verify_api_key)])
+
+
+@router.get("/metrics")
+async def get_metrics() -> dict:
+    """
+    获取运行时指标
+
+    Returns:
+        路由结果分布、检索比例、意图分类器调用统计和路由缓存命中率；
+        推测式检索的使用/取消/丢弃次数和浪费比例；
+        Checkpointer 类型（有界内存 Checkpointer 还包含会话数、checkpoint 数、近似内存占用和淘汰次数）；
+        当前召回配置指纹；
+        各实验（含对照组 control）的请求数、延迟分位数、有结果率和降级率；
+        召回结果缓存的条目数、命中率和失效次数；
+        查询向量缓存（按 Embeddings 模型）的进程内/Redis 命中与未命中次数；
+        召回源熔断器状态（closed/open/half_open）、失败率和拒绝次数；
+        对冲请求数、对冲率和当前触发延迟；
+        各召回源的延迟分位数、延迟直方图和当前有效超时（按当前召回配置和各实验的超时计算）
+    """
+    snapshot = get_recall_snapshot()
+    return {
+        "router": router_stats(),
+        "speculative_retrieval": speculative_stats(),
+        "checkpointer": checkpointer_stats(),
+        "recall": {
+            "config_fingerprint": snapshot.fingerprint,
+            "experiments": experiment_stats(),
+            "cache": recall_cache_stats(),
+            "embedding_cache": embedding_cache_stats(),
+            "circuit_breakers": breaker_stats(),
+            "hedging": hedger_stats(),
+            "latency": latency_stats(
+                snapshot.base["timeout_ms"],
+                {
+                    experiment_id: config["timeout_ms"]
+                    for experiment_id, config in snapshot.experiments.items()
+                },
+            ),
+        },
+        "timestamp": int(time.time()),
+    }
@@ -2,19 +2,26 @@
 OpenAI 兼容的 Chat Completions API
 
 提供完全兼容 OpenAI 格式的 /v1/chat/completions 端点。
+
+会话：请求头（默认 X-Session-ID）或请求体的 user 字段携带会话 ID 时，以其作为 Checkpointer 的 thread_id，
+加载该会话已保存的历史，并与请求中的 messages 对齐（只写入新增的用户消息）；未携带时每个请求使用新会话。
+请求中的每条用户消息都经过消息过滤。
 """
 
 import logging
+import re
 import time
 import uuid
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
 
+from src.agent.main.conversation import reconcile_messages, to_state_messages
 from src.agent.main.graph import get_agent_app
 from src.core.config import settings
+from src.core.message_filter import ALLOWED, FilterVerdict, check_message
 from src.core.security import verify_api_key
 from src.models.openai_schema import (
     ChatCompletionChoice,
@@ -29,50 +36,122 @@ from src.models.openai_schema import (
     OpenAIModelRef,
 )
 
+logger = logging.getLogger(__name__)
+
+router = APIRouter(dependencies=[Depends(verify_api_key)])
+
+# 消息被过滤时返回的内容（按过滤原因）
+_SYSTEM_MESSAGE_REJECTION = "抱歉，系统消息无法处理。请发送用户问题。"
+_INVALID_MESSAGE_REJECTION = "抱歉，您的消息包含无效内容，无法处理。请重新发送您的问题。"
+_FILTER_REJECTIONS = {
+    "system_message_detected": _SYSTEM_MESSAGE_REJECTION,
+    "too_many_technical_terms": _SYSTEM_MESSAGE_REJECTION,
+}
+
+
+_SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_.:@-]+")
 
-def _validate_message_source(message: str) -> bool:
+
+def _rejection_content(verdict: FilterVerdict) -> str:
+    """消息被过滤时返回给客户端的内容"""
+    return _FILTER_REJECTIONS.get(verdict.reason or "", _INVALID_MESSAGE_REJECTION)
+
+
+def _invalid_request(message: str, code: str) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail={"error": {"message": message, "type": "invalid_request_error", "code": code}},
+    )
+
+
+def _resolve_session_id(http_request: Request, request: ChatCompletionRequest) -> str | None:
     """
-    验证消息来源，过滤非用户来源的消息
+    从请求中获取会话 ID
 
     Args:
-        message: 待验证的消息内容
+        http_request: HTTP 请求（读取会话请求头）
+        request: Chat Completion 请求（读取 user 字段）
 
     Returns:
-        bool: True表示是用户来源的消息，False表示应该被过滤
+        会话 ID；请求未携带时返回 None
+
+    Raises:
+        HTTPException: 会话 ID 过长或包含不允许的字符
     """
-    # 检查是否启用消息过滤
-    if not settings.message_filter_enabled:
-        return True
-
-    # 检查是否包含系统标识符
-    system_indicators = [
-        "system:", "assistant:", "ai:", "bot:", "agent:",
-        "SYSTEM:", "ASSISTANT:", "AI:", "BOT:", "AGENT:"
-    ]
-
-    message_lower = message.lower()
-    for indicator in system_indicators:
-        if indicator.lower() in message_lower:
-            logger.warning(f"System message detected: {indicator}")
-            return False
-
-    # 检查是否以系统标识符开头
-    if message.strip().startswith(tuple(system_indicators)):
-        logger.warning("Message starts with system indicator")
-        return False
-
-    # 检查是否包含过多的技术术语（可能是系统消息）
-    technical_terms = [term.strip() for term in settings.technical_terms.split(",") if term.strip()]
-    technical_count = sum(1 for term in technical_terms if term.lower() in message_lower)
-    if technical_count >= settings.technical_terms_threshold:
-        logger.warning(f"Too many technical terms detected: {technical_count} (threshold: {settings.technical_terms_threshold})")
-        return False
-
-    return True
+    session_id = http_request.headers.get(settings.session_header_name)
+    if not session_id and settings.session_from_user_field:
+        session_id = request.user
+    if not session_id:
+        return None
+
+    session_id = session_id.strip()
+    if (
+        len(session_id) > settings.session_id_max_length
+        or not _SESSION_ID_PATTERN.fullmatch(session_id)
+    ):
+        raise _invalid_request(
+            f"Invalid session id (allowed: letters, digits and _-.:@, "
+            f"max {settings.session_id_max_length} characters)",
+            "invalid_session_id",
+        )
+    return session_id
 
-logger = logging.getLogger(__name__)
 
-router = APIRouter(dependencies=[Depends(verify_api_key)])
+def _check_user_turns(history: list[BaseMessage]) -> FilterVerdict:
+    """
+    检查请求中的每条用户消息
+
+    历史轮次同样会写入对话状态并发送给模型，因此不能只检查最后一条。
+
+    Args:
+        history: 请求中的对话历史
+
+    Returns:
+        第一条被过滤的用户消息的过滤结果；全部放行时返回 ALLOWED
+    """
+    for message in history:
+        if isinstance(message, HumanMessage):
+            verdict = check_message(str(message.content))
+            if not verdict.allowed:
+                return verdict
+    return ALLOWED
+
+
+async def _session_messages(
+    app: Any,
+    config: dict[str, Any],
+    history: list[BaseMessage],
+    persistent: bool,
+) -> list[BaseMessage]:
+    """
+    计算本轮写入对话状态的消息
+
+    Args:
+        app: Agent App
+        config: 包含 thread_id 的运行配置
+        history: 请求中的对话历史（以用户消息结尾）
+        persistent: 会话 ID 是否来自客户端（否则为新会话，无需加载历史）
+
+    Returns:
+        交给 messages reducer 的消息更新
+    """
+    if not persistent:
+        return reconcile_messages([], history, settings.conversation_max_messages)
+
+    try:
+        snapshot = await app.aget_state(config)
+        stored = list(snapshot.values.get("messages", [])) if snapshot else []
+    except Exception as e:
+        # 无法确认已保存的历史时只写入最新的用户消息，避免重复写入整段历史
+        logger.warning(f"⚠️ Failed to load session history ({config['configurable']['thread_id']}): {e}")
+        return history[-1:]
+
+    messages = reconcile_messages(stored, history, settings.conversation_max_messages)
+    logger.info(
+        f"🧵 Session {config['configurable']['thread_id']}: "
+        f"stored={len(stored)}, incoming={len(history)}, appended={len(messages)}"
+    )
+    return messages
 
 
 @router.get("/models")
@@ -149,11 +228,12 @@ async def list_models() -> OpenAIModelList:
 @router.post("/chat/completions", response_model=None)
 async def chat_completions(
     request: ChatCompletionRequest,
+    http_request: Request,
 ) -> ChatCompletionResponse | StreamingResponse:
     """
     OpenAI 兼容的 Chat Completions 端点
 
-    支持流式和非流式响应。
+    支持流式和非流式响应；携带会话 ID 时支持多轮对话（见模块文档）。
     """
     logger.info(
         f"📨 Received chat completion request: "
@@ -183,31 +263,16 @@ async def chat_completions(
     completion_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
     created_timestamp = int(time.time())
 
-    # 提取用户消息（最后一条）
-    last_message = request.messages[-1]
-    if last_message.role != "user":
-        # 如果最后一条不是用户消息，使用倒数第二条
-        user_messages = [msg for msg in request.messages if msg.role == "user"]
-        if not user_messages:
-            # 没有用户消息，返回错误
-            from fastapi import HTTPException
-
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "error": {
-                        "message": "No user message found in request",
-                        "type": "invalid_request_error",
-                        "code": "no_user_message",
-                    }
-                },
-            )
-        user_message = user_messages[-1].content
-    else:
-        user_message = last_message.content
+    # 对话历史（以最后一条用户消息结尾）
+    history = to_state_messages(request.messages)
+    if not history:
+        raise _invalid_request("No user message found in request", "no_user_message")
+    user_message = str(history[-1].content)
 
-    # 生成 session_id（可选：从请求中提取）
-    session_id = f"session-{uuid.uuid4().hex[:12]}"
+    # 会话 ID：请求头 / user 字段，未携带时使用新会话
+    resolved_session_id = _resolve_session_id(http_request, request)
+    persistent = resolved_session_id is not None
+    session_id = resolved_session_id or f"session-{uuid.uuid4().hex[:12]}"
 
     # 流式响应
     if request.stream:
@@ -219,6 +284,8 @@ async def chat_completions(
                 created_timestamp=created_timestamp,
                 model=request.model,
                 requested_model=requested_model,
+                history=history,
+                persistent=persistent,
             ),
             media_type="text/event-stream",
         )
@@ -231,6 +298,8 @@ async def chat_completions(
         created_timestamp=created_timestamp,
         model=request.model,
         requested_model=requested_model,
+        history=history,
+        persistent=persistent,
     )
 
 
@@ -241,35 +310,19 @@ async def _non_stream_response(
     created_timestamp: int,
     model: str,
     requested_model: str,
+    history: list[BaseMessage] | None = None,
+    persistent: bool = False,
 ) -> ChatCompletionResponse:
-    """非流式响应"""
-    from src.agent.main.nodes import _get_filter_reason, _is_valid_user_query
-
-    # 在非流式路径中也进行消息验证，过滤外部指令模板
-    if not _validate_message_source(user_message):
-        logger.warning("⚠️ 非流式API层过滤非用户来源消息")
-        return ChatCompletionResponse(
-            id=completion_id,
-            created=created_timestamp,
-            model=requested_model,
-            choices=[
-                ChatCompletionChoice(
-                    index=0,
-                    message=ChatMessage(
-                        role="assistant",
-                        content="抱歉，系统消息无法处理。请发送用户问题。"
-                    ),
-                    finish_reason="content_filter",
-                )
-            ],
-            usage=ChatCompletionUsage(
-                prompt_tokens=0, completion_tokens=0, total_tokens=0
-            ),
+    """非流式响应（history 为空时只使用 user_message）"""
+    history = history or [HumanMessage(content=user_message)]
+
+    # 在非流式路径中也进行消息验证，过滤非用户来源消息和外部指令模板（检查每条用户消息）
+    verdict = _check_user_turns(history)
+    if not verdict.allowed:
+        logger.warning(
+            f"⚠️ 非流式API层过滤消息 (reason: {verdict.reason}, "
+            f"matched: {', '.join(verdict.matched)}, length: {len(user_message)})"
         )
-
-    if not _is_valid_user_query(user_message):
-        filter_reason = _get_filter_reason(user_message)
-        logger.warning(f"⚠️ 非流式API层过滤无效消息 (reason: {filter_reason}, length: {len(user_message)})")
         return ChatCompletionResponse(
             id=completion_id,
             created=created_timestamp,
@@ -279,7 +332,7 @@ async def _non_stream_response(
                     index=0,
                     message=ChatMessage(
                         role="assistant",
-                        content="抱歉，您的消息包含无效内容，无法处理。请重新发送您的问题。"
+                        content=_rejection_content(verdict)
                     ),
                     finish_reason="content_filter",
                 )
@@ -292,8 +345,11 @@ async def _non_stream_response(
     # 调用 Agent
     app = get_agent_app()
 
+    config = {"configurable": {"thread_id": session_id}}
+    messages = await _session_messages(app, config, history, persistent)
+
     initial_state = {
-        "messages": [HumanMessage(content=user_message)],
+        "messages": messages,
         "retrieved_docs": [],
         "tool_calls": [],
         "session_id": session_id,
@@ -302,8 +358,6 @@ async def _non_stream_response(
         "confidence_score": None,
     }
 
-    config = {"configurable": {"thread_id": session_id}}
-
     try:
         result = await app.ainvoke(initial_state, config)
 
@@ -367,40 +421,20 @@ async def _stream_response(
     created_timestamp: int,
     model: str,
     requested_model: str,
+    history: list[BaseMessage] | None = None,
+    persistent: bool = False,
 ) -> AsyncGenerator[str, None]:
-    """流式响应（SSE）"""
-    from src.agent.main.nodes import _is_valid_user_query
-
+    """流式响应（SSE；history 为空时只使用 user_message）"""
     app = get_agent_app()
-
-    # 在API层进行消息来源验证
-    # 检查消息来源，过滤非用户来源的消息
-    if not _validate_message_source(user_message):
-        logger.warning("⚠️ API层过滤非用户来源消息")
-        # 返回错误响应，不进入Agent流程
-        error_chunk = ChatCompletionChunk(
-            id=completion_id,
-            created=created_timestamp,
-            model=requested_model,
-            choices=[
-                ChatCompletionChunkChoice(
-                    index=0,
-                    delta=ChatCompletionChunkDelta(
-                        content="抱歉，系统消息无法处理。请发送用户问题。"
-                    ),
-                    finish_reason="content_filter",
-                )
-            ],
+    history = history or [HumanMessage(content=user_message)]
+
+    # 在API层进行消息验证，过滤非用户来源消息和外部指令模板（检查每条用户消息）
+    verdict = _check_user_turns(history)
+    if not verdict.allowed:
+        logger.warning(
+            f"⚠️ API层过滤消息 (reason: {verdict.reason}, "
+            f"matched: {', '.join(verdict.matched)}, length: {len(user_message)})"
         )
-        yield f"data: {error_chunk.model_dump_json()}\n\n"
-        yield "data: [DONE]\n\n"
-        return
-
-    # 在API层进行消息验证，过滤外部指令模板
-    if not _is_valid_user_query(user_message):
-        from src.agent.main.nodes import _get_filter_reason
-        filter_reason = _get_filter_reason(user_message)
-        logger.warning(f"⚠️ API层过滤无效消息 (reason: {filter_reason}, length: {len(user_message)})")
         # 返回错误响应，不进入Agent流程
         error_chunk = ChatCompletionChunk(
             id=completion_id,
@@ -410,7 +444,7 @@ async def _stream_response(
                 ChatCompletionChunkChoice(
                     index=0,
                     delta=ChatCompletionChunkDelta(
-                        content="抱歉，您的消息包含无效内容，无法处理。请重新发送您的问题。"
+                        content=_rejection_content(verdict)
                     ),
                     finish_reason="content_filter",
                 )
@@ -420,8 +454,11 @@ async def _stream_response(
         yield "data: [DONE]\n\n"
         return
 
+    config = {"configurable": {"thread_id": session_id}}
+    messages = await _session_messages(app, config, history, persistent)
+
     initial_state = {
-        "messages": [HumanMessage(content=user_message)],
+        "messages": messages,
         "retrieved_docs": [],
         "tool_calls": [],
         "session_id": session_id,
@@ -430,8 +467,6 @@ async def _stream_response(
         "confidence_score": None,
     }
 
-    config = {"configurable": {"thread_id": session_id}}
-
     try:
         # 发送初始 chunk（role）
         first_chunk = ChatCompletionChunk(
@@ -448,48 +483,51 @@ async def _stream_response(
         )
         yield f"data: {first_chunk.model_dump_json()}\n\n"
 
-        # 导入AIMessage类到函数作用域
-        from langchain_core.messages import AIMessage
+        def _content_chunk(content: str) -> str:
+            content_chunk = ChatCompletionChunk(
+                id=completion_id,
+                created=created_timestamp,
+                model=requested_model,  # 返回用户请求的模型名（保持一致性）
+                choices=[
+                    ChatCompletionChunkChoice(
+                        index=0,
+                        delta=ChatCompletionChunkDelta(content=content),
+                        finish_reason=None,
+                    )
+                ],
+            )
+            return f"data: {content_chunk.model_dump_json()}\n\n"
 
         # 流式执行 Agent
-        async for chunk in app.astream(initial_state, config):
+        # token 模式下同时订阅 updates（节点输出）和 messages（LLM token 增量），
+        # LLM 每产生一个 token 即推送一个 chunk；若模型未产生增量（如错误兜底消息），
+        # 则回退为推送 llm 节点的完整输出
+        if settings.llm_streaming_enabled:
+            stream = app.astream(initial_state, config, stream_mode=["updates", "messages"])
+        else:
+            stream = app.astream(initial_state, config)
+
+        tokens_streamed = False
+        async for chunk in stream:
+            if isinstance(chunk, tuple) and len(chunk) == 2:
+                mode, payload = chunk
+                if mode == "messages":
+                    delta = _extract_token_delta(payload)
+                    if delta:
+                        tokens_streamed = True
+                        yield _content_chunk(delta)
+                    continue
+                chunk = payload
+
             # 检查是否有新的 AI 消息
-            if "llm" in chunk:  # LLM 节点的输出
-                llm_output = chunk["llm"]
-
-                # 类型检查：确保llm_output是字典类型
-                if isinstance(llm_output, dict):
-                    messages = llm_output.get("messages", [])
-                elif isinstance(llm_output, str):
-                    # 如果llm_output是字符串，可能是错误信息或直接内容
-                    logger.warning(f"⚠️ LLM output is string: {llm_output}")
-                    # 创建一个临时的AI消息
-                    messages = [AIMessage(content=llm_output)]
-                else:
-                    logger.error(f"❌ Unexpected llm_output type: {type(llm_output)}")
+            if isinstance(chunk, dict) and "llm" in chunk:  # LLM 节点的输出
+                if tokens_streamed:
+                    # 内容已通过 token 增量推送，避免重复发送
                     continue
 
-                if messages:
-                    ai_message = messages[-1]
-                    if isinstance(ai_message, AIMessage):
-                        content = ai_message.content
-
-                        # 发送内容 chunk
-                        # 注意：这里发送完整内容，实际应该发送增量
-                        # 为了简化，我们一次性发送（LangGraph 不原生支持 token-by-token 流式）
-                        content_chunk = ChatCompletionChunk(
-                            id=completion_id,
-                            created=created_timestamp,
-                            model=requested_model,  # 返回用户请求的模型名（保持一致性）
-                            choices=[
-                                ChatCompletionChunkChoice(
-                                    index=0,
-                                    delta=ChatCompletionChunkDelta(content=content),
-                                    finish_reason=None,
-                                )
-                            ],
-                        )
-                        yield f"data: {content_chunk.model_dump_json()}\n\n"
+                content = _extract_llm_content(chunk["llm"])
+                if content is not None:
+                    yield _content_chunk(content)
 
         # 发送结束 chunk
         final_chunk = ChatCompletionChunk(
@@ -527,3 +565,65 @@ async def _stream_response(
         yield f"data: {error_chunk.model_dump_json()}\n\n"
         yield "data: [DONE]\n\n"
 
+
+
+def _extract_llm_content(llm_output: Any) -> str | None:
+    """
+    从 llm 节点的输出中提取完整回复内容
+
+    Args:
+        llm_output: llm 节点的状态更新（通常为包含 messages 的字典）
+
+    Returns:
+        str | None: 回复内容，无法提取时返回 None
+    """
+    # 类型检查：确保llm_output是字典类型
+    if isinstance(llm_output, dict):
+        messages = llm_output.get("messages", [])
+    elif isinstance(llm_output, str):
+        # 如果llm_output是字符串，可能是错误信息或直接内容
+        logger.warning(f"⚠️ LLM output is string: {llm_output}")
+        # 创建一个临时的AI消息
+        messages = [AIMessage(content=llm_output)]
+    else:
+        logger.error(f"❌ Unexpected llm_output type: {type(llm_output)}")
+        return None
+
+    if messages:
+        ai_message = messages[-1]
+        if isinstance(ai_message, AIMessage) and isinstance(ai_message.content, str):
+            return ai_message.content
+
+    return None
+
+
+def _extract_token_delta(payload: Any) -> str | None:
+    """
+    从 LangGraph messages 流中提取 llm 节点的 token 增量
+
+    Args:
+        payload: messages 模式下的 (message, metadata) 元组
+
+    Returns:
+        str | None: 文本增量，非 llm 节点或空内容时返回 None
+    """
+    if not isinstance(payload, tuple) or len(payload) != 2:
+        return None
+
+    message, metadata = payload
+    if not isinstance(metadata, dict) or metadata.get("langgraph_node") != "llm":
+        return None
+
+    # AIMessageChunk 是 token 增量；AIMessage 是未经流式产生的完整消息（如错误兜底）
+    if not isinstance(message, (AIMessage, AIMessageChunk)):
+        return None
+
+    content = message.content
+    if isinstance(content, list):
+        # 部分提供商以内容块列表返回增量
+        content = "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+
+    return content or None
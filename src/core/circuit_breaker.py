@@ -0,0 +1,184 @@
+"""
+熔断器
+
+按滑动窗口统计最近调用的失败率和慢调用率，超过阈值后熔断：
+- closed: 正常放行，记录每次调用结果
+- open: 直接拒绝调用，冷却时间结束后进入 half_open
+- half_open: 放行有限数量的探测调用，全部成功则恢复 closed，任一失败重新 open
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    基于滑动窗口的熔断器（线程安全）
+
+    Args:
+        name: 名称（用于日志和指标）
+        failure_rate_threshold: 失败率阈值（0-1），达到后熔断
+        slow_call_ms: 慢调用阈值（毫秒），<=0 表示不统计慢调用
+        slow_call_rate_threshold: 慢调用率阈值（0-1），达到后熔断
+        window_size: 滑动窗口大小（最近 N 次调用）
+        min_calls: 窗口内至少有多少次调用才计算比率
+        open_seconds: 熔断持续时间（秒），之后进入半开状态
+        half_open_max_calls: 半开状态允许的探测调用数
+        clock: 时间函数（测试可替换）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_ms: float = 0.0,
+        slow_call_rate_threshold: float = 1.0,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._failure_rate_threshold = failure_rate_threshold
+        self._slow_call_ms = slow_call_ms
+        self._slow_call_rate_threshold = slow_call_rate_threshold
+        self._min_calls = min_calls
+        self._open_seconds = open_seconds
+        self._half_open_max_calls = half_open_max_calls
+        self._clock = clock
+
+        # 窗口元素：(是否失败, 是否慢调用)
+        self._window: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._half_open_successes = 0
+        self._lock = threading.Lock()
+
+        self.rejected = 0
+        self.opened_count = 0
+
+    @property
+    def state(self) -> str:
+        """当前状态（open 冷却结束后自动变为 half_open）"""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self._open_seconds:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+            self._half_open_successes = 0
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._window.clear()
+        self.opened_count += 1
+        logger.warning(f"⚠️  Circuit breaker opened: {self.name} (for {self._open_seconds}s)")
+
+    def allow_request(self) -> bool:
+        """
+        是否放行本次调用
+
+        放行后必须调用 record_success、record_failure 或 release 报告结果。
+
+        Returns:
+            是否放行
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._half_open_calls < self._half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency_ms: float = 0.0) -> None:
+        """
+        记录成功调用
+
+        Args:
+            latency_ms: 调用耗时（毫秒），超过慢调用阈值计为慢调用
+        """
+        slow = self._slow_call_ms > 0 and latency_ms >= self._slow_call_ms
+        self._record(failed=False, slow=slow)
+
+    def record_failure(self) -> None:
+        """记录失败调用（异常或超时）"""
+        self._record(failed=True, slow=False)
+
+    def release(self) -> None:
+        """放行的调用被主动取消（无结果），归还半开状态的探测名额"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                    return
+                self._half_open_successes += 1
+                if self._half_open_successes >= self._half_open_max_calls:
+                    self._state = CLOSED
+                    self._window.clear()
+                    logger.info(f"✅ Circuit breaker closed: {self.name}")
+                return
+
+            if self._state == OPEN:
+                # 熔断前已放行的调用迟到的结果，不再计入
+                return
+
+            self._window.append((failed, slow))
+            if len(self._window) < self._min_calls:
+                return
+
+            total = len(self._window)
+            failure_rate = sum(1 for f, _ in self._window if f) / total
+            slow_rate = sum(1 for _, s in self._window if s) / total
+            if failure_rate >= self._failure_rate_threshold or slow_rate >= self._slow_call_rate_threshold:
+                self._open()
+
+    def reset(self) -> None:
+        """重置为 closed 并清空统计"""
+        with self._lock:
+            self._state = CLOSED
+            self._window.clear()
+            self._half_open_calls = 0
+            self._half_open_successes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """
+        熔断器统计
+
+        Returns:
+            状态、窗口内失败率/慢调用率、拒绝次数和熔断次数
+        """
+        with self._lock:
+            self._maybe_half_open()
+            total = len(self._window)
+            failures = sum(1 for f, _ in self._window if f)
+            slow = sum(1 for _, s in self._window if s)
+            return {
+                "state": self._state,
+                "window_calls": total,
+                "failure_rate": failures / total if total else 0.0,
+                "slow_call_rate": slow / total if total else 0.0,
+                "rejected": self.rejected,
+                "opened_count": self.opened_count,
+            }
@@ -135,6 +135,26 @@ class Settings(BaseSettings):
         default=None, description="Anthropic Embedding Base URL"
     )
 
+    # ===== HTTP 连接池配置 =====
+    http_max_connections: int = Field(
+        default=100, ge=1, description="共享 HTTP 客户端最大连接数"
+    )
+    http_max_keepalive_connections: int = Field(
+        default=20, ge=0, description="共享 HTTP 客户端最大 keep-alive 连接数"
+    )
+    http_keepalive_expiry: float = Field(
+        default=30.0, ge=0.0, description="keep-alive 空闲连接过期时间（秒）"
+    )
+    http_connect_timeout: float = Field(
+        default=5.0, gt=0.0, description="HTTP 连接建立超时（秒）"
+    )
+    http2_enabled: bool = Field(
+        default=False, description="是否启用 HTTP/2（需安装 h2）"
+    )
+    embedding_timeout: float = Field(
+        default=30.0, gt=0.0, description="Embedding 请求超时（秒）"
+    )
+
     # ===== Milvus 配置 =====
     milvus_host: str = Field(..., description="Milvus 服务器地址（必填）")
     milvus_port: int = Field(default=19530, description="Milvus 端口")
@@ -148,6 +168,21 @@ class Settings(BaseSettings):
     milvus_history_collection: str = Field(
         default="conversation_history", description="对话历史 Collection 名称"
     )
+    milvus_max_workers: int = Field(
+        default=8, ge=1, le=64, description="Milvus 调用线程池大小"
+    )
+    milvus_max_concurrency: int = Field(
+        default=8, ge=1, le=256, description="单个事件循环内 Milvus 调用最大并发数"
+    )
+    milvus_timeout_ms: int = Field(
+        default=10000, ge=100, description="单次 Milvus 调用超时（毫秒）"
+    )
+    milvus_replica_host: str | None = Field(
+        default=None, description="Milvus 只读副本地址（对冲请求使用，为空时对冲到主实例）"
+    )
+    milvus_replica_port: int | None = Field(
+        default=None, description="Milvus 只读副本端口（为空时使用 milvus_port）"
+    )
 
     # ===== Redis 配置 =====
     redis_host: str = Field(default="localhost", description="Redis 服务器地址")
@@ -172,8 +207,40 @@ class Settings(BaseSettings):
     langgraph_max_iterations: int = Field(
         default=10, ge=1, le=50, description="Agent 最大迭代次数"
     )
-    langgraph_checkpointer: Literal["memory", "redis"] = Field(
-        default="redis", description="Checkpointer 类型"
+    langgraph_checkpointer: Literal["memory", "bounded_memory", "redis"] = Field(
+        default="redis",
+        description="Checkpointer 类型（bounded_memory 为有淘汰策略的内存 Checkpointer）"
+    )
+    checkpointer_max_threads: int = Field(
+        default=10000, ge=1, description="bounded_memory: 最多保存的会话数（超出时淘汰最久未访问的会话）"
+    )
+    checkpointer_max_checkpoints_per_thread: int = Field(
+        default=10, ge=1, description="bounded_memory: 每个会话保留的 checkpoint 数"
+    )
+    checkpointer_ttl_seconds: int = Field(
+        default=3600, ge=0, description="bounded_memory: 会话空闲过期时间（秒，0 表示不过期）"
+    )
+    langgraph_retrieval_mode: Literal["sequential", "speculative"] = Field(
+        default="sequential",
+        description="检索执行方式：sequential 路由后再检索；speculative 路由与检索并发，路由为 direct 时取消检索"
+    )
+
+    # ===== 会话配置 =====
+    session_header_name: str = Field(
+        default="X-Session-ID",
+        description="携带会话 ID 的请求头（优先于请求体的 user 字段）"
+    )
+    session_from_user_field: bool = Field(
+        default=False,
+        description="请求头未携带会话 ID 时是否使用请求体的 user 字段作为会话 ID"
+        "（user 通常是终端用户的固定标识，开启后同一用户的所有对话共用一个会话）"
+    )
+    session_id_max_length: int = Field(
+        default=128, ge=8, le=512, description="会话 ID 最大长度"
+    )
+    conversation_max_messages: int = Field(
+        default=20, ge=1, le=200,
+        description="会话保存和发送给 LLM 的最大历史消息数（超出时丢弃最早的消息）"
     )
 
     # ===== 向量召回配置 =====
@@ -215,6 +282,32 @@ class Settings(BaseSettings):
         default=2000, ge=1, le=10000, description="LLM 最大 Token 数"
     )
     cache_ttl: int = Field(default=300, ge=0, description="缓存 TTL（秒）")
+    llm_streaming_enabled: bool = Field(
+        default=True, description="是否启用 token 级流式输出（逐 token 推送 SSE）"
+    )
+
+    # ===== 查询向量缓存配置 =====
+    embedding_cache_enabled: bool = Field(
+        default=True, description="是否启用查询向量缓存（TTL 使用 cache_ttl，为 0 时不缓存）"
+    )
+    embedding_cache_max_entries: int = Field(
+        default=10000, ge=0, description="查询向量缓存最大条目数（超出后按 LRU 淘汰）"
+    )
+    embedding_cache_backend: Literal["memory", "redis"] = Field(
+        default="memory",
+        description="查询向量缓存后端（memory: 进程内；redis: 进程内 + Redis 共享）",
+    )
+
+    # ===== 查询向量微批处理配置 =====
+    embedding_batch_enabled: bool = Field(
+        default=False, description="是否合并并发的查询向量请求为批量请求"
+    )
+    embedding_batch_max_size: int = Field(
+        default=32, ge=1, le=256, description="单批最大查询数（攒满立即发送）"
+    )
+    embedding_batch_max_wait_ms: float = Field(
+        default=5.0, ge=0.0, le=100.0, description="批次最长等待时间（毫秒）"
+    )
 
     # ===== 消息过滤配置 =====
     message_filter_enabled: bool = Field(
@@ -235,6 +328,41 @@ class Settings(BaseSettings):
         description="技术术语列表（逗号分隔）"
     )
 
+    # ===== 路由配置 =====
+    router_classifier_enabled: bool = Field(
+        default=False,
+        description="是否启用意图分类器（无业务关键词的查询按最近的意图中心决定是否检索）"
+    )
+    router_classifier_min_similarity: float = Field(
+        default=0.6, ge=0.0, le=1.0,
+        description="采用分类结果所需的最低余弦相似度（低于该值时退回关键词规则）"
+    )
+    router_classifier_timeout_ms: int = Field(
+        default=300, ge=10, le=5000,
+        description="意图分类（含查询向量计算）超时（毫秒），超时退回关键词规则"
+    )
+    router_classifier_warmup_timeout_ms: int = Field(
+        default=5000, ge=100, le=60000,
+        description="意图中心（示例向量）计算超时（毫秒）"
+    )
+    router_classifier_warmup_retry_seconds: float = Field(
+        default=30.0, ge=0.0,
+        description="意图中心计算失败后多久再重试（秒），期间直接退回关键词规则"
+    )
+    router_intent_examples_path: str | None = Field(
+        default=None,
+        description="意图示例 JSON 文件路径（为空时使用内置示例）"
+    )
+    router_cache_enabled: bool = Field(
+        default=True, description="是否按归一化查询缓存路由结果"
+    )
+    router_cache_ttl_seconds: int = Field(
+        default=300, ge=0, description="路由结果缓存过期时间（秒），0 表示不缓存"
+    )
+    router_cache_max_entries: int = Field(
+        default=10000, ge=1, description="路由结果缓存最大条目数"
+    )
+
     # ===== 召回编排层配置 =====
     recall_sources: list[str] = Field(
         default=["vector"],
@@ -247,7 +375,7 @@ class Settings(BaseSettings):
     recall_timeout_ms: int = Field(
         default=3000,
         ge=100, le=10000,
-        description="召回超时时间（毫秒）"
+        description="召回总超时时间（毫秒），所有召回源共享同一截止时间"
     )
     recall_retry: int = Field(
         default=1,
@@ -258,6 +386,155 @@ class Settings(BaseSettings):
         default="weighted",
         description="召回结果合并策略"
     )
+    recall_rrf_k: int = Field(
+        default=60,
+        ge=1, le=1000,
+        description="RRF 合并的平滑常数 k（越大排名差异的影响越小）"
+    )
+    recall_custom_merge_strategy: str = Field(
+        default="",
+        description="合并策略为 custom 时使用的已注册策略名称"
+    )
+    recall_faq_index_enabled: bool = Field(
+        default=True,
+        description="FAQ 召回是否使用倒排索引（False 时逐条扫描，兼容模式）"
+    )
+    recall_faq_data_path: str | None = Field(
+        default=None,
+        description="FAQ 数据 JSON 文件路径（为空时使用内置 FAQ）"
+    )
+    recall_near_dup_enabled: bool = Field(
+        default=True,
+        description="合并时是否去除近似重复的召回结果（字符 shingle Jaccard 相似度）"
+    )
+    recall_near_dup_threshold: float = Field(
+        default=0.8,
+        gt=0.0, le=1.0,
+        description="近似重复的相似度阈值（Jaccard，达到即视为重复）"
+    )
+    recall_early_exit_enabled: bool = Field(
+        default=False,
+        description="是否启用提前结束：指定召回源返回高置信度结果时取消其余召回源"
+    )
+    recall_early_exit_threshold: float = Field(
+        default=0.9,
+        ge=0.0, le=1.0,
+        description="提前结束的置信度阈值"
+    )
+    recall_early_exit_sources: list[str] = Field(
+        default=["faq", "keyword"],
+        description="可触发提前结束的召回源"
+    )
+    recall_adaptive_timeout_enabled: bool = Field(
+        default=True,
+        description="是否按各召回源的近期延迟计算独立超时（上限为 recall_timeout_ms）"
+    )
+    recall_adaptive_timeout_percentile: float = Field(
+        default=0.99,
+        ge=0.5, le=1.0,
+        description="自适应超时取近期延迟的分位数"
+    )
+    recall_adaptive_timeout_factor: float = Field(
+        default=2.0,
+        ge=1.0, le=10.0,
+        description="自适应超时 = 延迟分位数 × 该系数"
+    )
+    recall_adaptive_timeout_min_ms: int = Field(
+        default=50,
+        ge=1,
+        description="自适应超时下限（毫秒）"
+    )
+    recall_adaptive_timeout_min_samples: int = Field(
+        default=50,
+        ge=1,
+        description="延迟样本数达到该值后才使用自适应超时"
+    )
+    recall_latency_window_size: int = Field(
+        default=500,
+        ge=10, le=100000,
+        description="每个召回源保留的最近延迟样本数"
+    )
+    recall_hedge_enabled: bool = Field(
+        default=False,
+        description="向量召回是否启用对冲请求（慢请求时发起重复请求，取先返回的结果）"
+    )
+    recall_hedge_percentile: float = Field(
+        default=0.95,
+        ge=0.5, le=0.999,
+        description="对冲触发延迟取近期延迟的分位数"
+    )
+    recall_hedge_min_delay_ms: float = Field(
+        default=10.0,
+        ge=0.0,
+        description="对冲触发延迟下限（毫秒）"
+    )
+    recall_hedge_max_rate: float = Field(
+        default=0.1,
+        ge=0.0, le=1.0,
+        description="对冲请求占比上限（最近窗口内）"
+    )
+    recall_hedge_min_samples: int = Field(
+        default=20,
+        ge=1,
+        description="延迟样本数达到该值后才开始对冲"
+    )
+    recall_pipeline_mode: Literal["graph", "direct"] = Field(
+        default="graph",
+        description="召回工作流执行方式（graph: LangGraph 子图；direct: 按顺序直接 await 节点）"
+    )
+    recall_cache_enabled: bool = Field(
+        default=True,
+        description="是否缓存召回结果（按归一化查询、top_k、召回源、权重、合并策略和实验 ID）"
+    )
+    recall_cache_ttl_seconds: int = Field(
+        default=60,
+        ge=0,
+        description="召回结果缓存 TTL（秒），0 表示不缓存"
+    )
+    recall_cache_max_entries: int = Field(
+        default=10000,
+        ge=0,
+        description="召回结果缓存最大条目数（超出后按 LRU 淘汰）"
+    )
+    recall_breaker_enabled: bool = Field(
+        default=True,
+        description="是否为每个召回源启用熔断器"
+    )
+    recall_breaker_failure_rate: float = Field(
+        default=0.5,
+        gt=0.0, le=1.0,
+        description="熔断失败率阈值（滑动窗口内失败/超时调用占比）"
+    )
+    recall_breaker_slow_call_ms: int = Field(
+        default=0,
+        ge=0,
+        description="慢调用阈值（毫秒），0 表示不按慢调用熔断"
+    )
+    recall_breaker_slow_call_rate: float = Field(
+        default=0.8,
+        gt=0.0, le=1.0,
+        description="熔断慢调用率阈值"
+    )
+    recall_breaker_window_size: int = Field(
+        default=20,
+        ge=1, le=1000,
+        description="熔断统计的滑动窗口大小（最近 N 次调用）"
+    )
+    recall_breaker_min_calls: int = Field(
+        default=5,
+        ge=1,
+        description="窗口内至少有多少次调用才判断是否熔断"
+    )
+    recall_breaker_open_seconds: float = Field(
+        default=30.0,
+        gt=0.0,
+        description="熔断持续时间（秒），之后放行探测调用"
+    )
+    recall_breaker_half_open_calls: int = Field(
+        default=1,
+        ge=1, le=100,
+        description="半开状态允许的探测调用数"
+    )
     recall_degrade_threshold: float = Field(
         default=0.5,
         ge=0.0, le=1.0,
@@ -275,6 +552,10 @@ class Settings(BaseSettings):
         default=None,
         description="实验平台类型（None/internal/growthbook等）"
     )
+    recall_experiment_config_path: str | None = Field(
+        default=None,
+        description="召回实验注册表 JSON 文件路径（实验覆盖配置和流量占比，为空时使用内置实验）"
+    )
 
     # ===== Pydantic 配置 =====
     model_config = SettingsConfigDict(
@@ -497,6 +778,55 @@ class Settings(BaseSettings):
         return self.vector_chunk_overlap
 
 
+def load_settings() -> Settings:
+    """
+    从环境变量和 .env 加载配置（不修改全局 settings）
+
+    Returns:
+        校验通过的新配置
+
+    Raises:
+        pydantic.ValidationError: 配置校验失败
+    """
+    return Settings()
+
+
 # 全局配置实例（单例）
-settings = Settings()
+settings = load_settings()
+
+
+def apply_settings(new: Settings) -> list[str]:
+    """
+    用新配置替换全局 settings 的内容
+
+    其他模块通过 `from src.core.config import settings` 持有同一实例，因此不重新绑定名称，
+    而是通过模型的属性赋值逐项复制发生变化的字段（新配置已完整校验）。
+    复制过程中没有 await，事件循环中的请求看到的要么全是旧配置，要么全是新配置。
+
+    Args:
+        new: 新配置（通常来自 load_settings()）
+
+    Returns:
+        发生变化的配置项名称列表
+    """
+    changed = [
+        name for name in Settings.model_fields if getattr(settings, name) != getattr(new, name)
+    ]
+    for name in changed:
+        setattr(settings, name, getattr(new, name))
+    return changed
+
+
+def reload_settings() -> list[str]:
+    """
+    重新从环境变量和 .env 加载配置，并替换全局 settings 的内容
+
+    新配置校验失败时不做任何修改。
+
+    Returns:
+        发生变化的配置项名称列表
 
+    Raises:
+        pydantic.ValidationError: 新配置校验失败
+    """
+    return apply_settings(load_settings())
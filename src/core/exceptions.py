@@ -35,6 +35,13 @@ class MilvusConnectionError(MilvusError):
         super().__init__(message, code="milvus_connection_error")
 
 
+class MilvusTimeoutError(MilvusError):
+    """Milvus 调用超时"""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message, code="milvus_timeout_error")
+
+
 class RedisConnectionError(AppException):
     """Redis 连接错误"""
 
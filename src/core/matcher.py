@@ -0,0 +1,131 @@
+"""
+多模式字符串匹配
+
+基于 Aho-Corasick 自动机，一次扫描文本即可找出所有出现的模式串，
+匹配耗时与模式数量无关（O(文本长度 + 匹配数)）。
+"""
+
+from collections import deque
+from typing import Iterable, Iterator
+
+
+class AhoCorasickMatcher:
+    """
+    Aho-Corasick 多模式匹配器
+
+    模式串在构造时编译为自动机，之后可对任意文本重复匹配（只读，线程安全）。
+    模式按传入顺序编号；空字符串模式会被忽略。
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: list[str] = list(patterns)
+
+        # 状态 0 为根节点；_goto[state][char] → 下一状态
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[int, ...]] = [()]
+
+        outputs: list[list[int]] = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(pattern_id)
+
+        # 广度优先计算失败指针，并合并失败链上的输出
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                outputs[next_state].extend(outputs[self._fail[next_state]])
+
+        self._output = [tuple(ids) for ids in outputs]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        遍历文本中的所有匹配
+
+        Args:
+            text: 待匹配文本
+
+        Yields:
+            (匹配结束位置（不含）, 模式编号)
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                yield pos + 1, pattern_id
+
+    def find_all(self, text: str) -> set[int]:
+        """
+        查找文本中出现的所有模式
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            出现过的模式编号集合
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        found: set[int] = set()
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+
+        return found
+
+    def contains_any(self, text: str) -> bool:
+        """
+        文本中是否出现任一模式
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            是否匹配
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                return True
+
+        return False
@@ -0,0 +1,217 @@
+"""
+消息过滤
+
+在调用任何模型之前识别非用户来源的消息（系统/助手消息、外部指令模板、技术性系统消息）。
+系统标识符、指令模板关键词和技术术语在构造时编译为同一个 Aho-Corasick 自动机，
+每条消息只做一次小写化和一次扫描即得到是否放行、过滤原因和命中的全部词（包括互相重叠的词）。
+不含任何词中字符的消息（如纯中文的用户消息）在扫描前即放行。
+
+过滤原因按优先级（与原先 API 层的检查顺序一致）：
+- system_message_detected：包含系统标识符（如 "system:"）
+- too_many_technical_terms：命中的技术术语数达到阈值
+- message_too_long：超过最大长度
+- instruction_template_detected：包含指令模板关键词
+- instruction_pattern_detected：以指令开头（区分大小写）
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from src.core.config import settings
+from src.core.matcher import AhoCorasickMatcher
+
+# 系统标识符（不区分大小写）
+SYSTEM_INDICATORS = ("system:", "assistant:", "ai:", "bot:", "agent:")
+
+# 指令开头（区分大小写）
+INSTRUCTION_STARTS = ("You are", "Your role", "Please", "Convert", "Transform")
+
+_SYSTEM = "system"
+_INSTRUCTION = "instruction"
+_TECHNICAL = "technical"
+
+
+@dataclass(frozen=True)
+class FilterVerdict:
+    """消息过滤结果"""
+    allowed: bool
+    reason: str | None = None  # 被过滤时的原因
+    matched: tuple[str, ...] = ()  # 导致过滤的词（配置中的原始写法）
+
+
+ALLOWED = FilterVerdict(allowed=True)
+
+
+def _split_terms(value: str) -> list[str]:
+    """解析逗号分隔的词表"""
+    return [term.strip() for term in value.split(",") if term.strip()]
+
+
+class MessageFilter:
+    """
+    编译后的消息过滤器（只读，线程安全）
+
+    Args:
+        max_length: 消息最大长度（字符）
+        instruction_keywords: 指令模板关键词
+        technical_terms: 技术术语
+        technical_terms_threshold: 命中多少个不同的技术术语时过滤
+        system_indicators: 系统标识符
+        instruction_starts: 指令开头
+        enabled: 是否启用过滤（False 时放行所有消息）
+    """
+
+    def __init__(
+        self,
+        max_length: int,
+        instruction_keywords: Iterable[str],
+        technical_terms: Iterable[str],
+        technical_terms_threshold: int,
+        system_indicators: Iterable[str] = SYSTEM_INDICATORS,
+        instruction_starts: Iterable[str] = INSTRUCTION_STARTS,
+        enabled: bool = True,
+    ) -> None:
+        self.enabled = enabled
+        self.max_length = max_length
+        self.technical_terms_threshold = technical_terms_threshold
+        self._instruction_starts = tuple(instruction_starts)
+
+        # 小写词 → {类别: 配置中的原始写法}；同一个词可同时属于多个类别
+        self._kinds: dict[str, dict[str, str]] = {}
+        for kind, terms in (
+            (_SYSTEM, system_indicators),
+            (_INSTRUCTION, instruction_keywords),
+            (_TECHNICAL, technical_terms),
+        ):
+            for term in terms:
+                literal = term.lower()
+                if literal:
+                    self._kinds.setdefault(literal, {}).setdefault(kind, term)
+
+        self._literals = tuple(self._kinds)
+        self._matcher = AhoCorasickMatcher(self._literals)
+        # 词中出现的字符：文本不含其中任何字符时不可能命中，无需逐字符扫描（字符集查找在 C 层完成）
+        alphabet = "".join(sorted(set("".join(self._literals))))
+        self._alphabet = re.compile(f"[{re.escape(alphabet)}]") if alphabet else None
+
+    def _find_terms(self, text: str) -> list[str]:
+        """查找小写化文本中出现的词（按配置顺序）"""
+        if self._alphabet is None or self._alphabet.search(text) is None:
+            return []
+        return [self._literals[i] for i in sorted(self._matcher.find_all(text))]
+
+    @classmethod
+    def from_settings(cls, source: Any) -> "MessageFilter":
+        """
+        按配置编译过滤器
+
+        Args:
+            source: 配置对象（Settings）
+
+        Returns:
+            消息过滤器
+        """
+        return cls(
+            max_length=source.message_max_length,
+            instruction_keywords=_split_terms(source.instruction_keywords),
+            technical_terms=_split_terms(source.technical_terms),
+            technical_terms_threshold=source.technical_terms_threshold,
+            enabled=source.message_filter_enabled,
+        )
+
+    def check(self, message: str) -> FilterVerdict:
+        """
+        检查消息
+
+        Args:
+            message: 消息内容
+
+        Returns:
+            过滤结果
+        """
+        if not self.enabled:
+            return ALLOWED
+
+        matched: dict[str, list[str]] = {_SYSTEM: [], _INSTRUCTION: [], _TECHNICAL: []}
+        for literal in self._find_terms(message.lower()):
+            for kind, term in self._kinds[literal].items():
+                matched[kind].append(term)
+
+        if matched[_SYSTEM]:
+            return FilterVerdict(False, "system_message_detected", tuple(matched[_SYSTEM]))
+        if len(matched[_TECHNICAL]) >= self.technical_terms_threshold:
+            return FilterVerdict(False, "too_many_technical_terms", tuple(matched[_TECHNICAL]))
+
+        if len(message) > self.max_length:
+            return FilterVerdict(allowed=False, reason="message_too_long")
+
+        if matched[_INSTRUCTION]:
+            return FilterVerdict(
+                False, "instruction_template_detected", tuple(matched[_INSTRUCTION])
+            )
+
+        start = message.strip()
+        if start.startswith(self._instruction_starts):
+            prefix = next(p for p in self._instruction_starts if start.startswith(p))
+            return FilterVerdict(False, "instruction_pattern_detected", (prefix,))
+
+        return ALLOWED
+
+
+_filter: MessageFilter | None = None
+_filter_key: tuple | None = None
+_filter_lock = threading.Lock()
+
+
+def _settings_key() -> tuple:
+    return (
+        settings.message_filter_enabled,
+        settings.message_max_length,
+        settings.instruction_keywords,
+        settings.technical_terms,
+        settings.technical_terms_threshold,
+    )
+
+
+def get_message_filter() -> MessageFilter:
+    """
+    获取按当前配置编译的消息过滤器
+
+    配置变化（热重载或测试中修改 settings）后首次调用时重新编译。
+
+    Returns:
+        消息过滤器
+    """
+    global _filter, _filter_key
+
+    key = _settings_key()
+    if _filter is None or key != _filter_key:
+        with _filter_lock:
+            if _filter is None or key != _filter_key:
+                _filter = MessageFilter.from_settings(settings)
+                _filter_key = key
+    return _filter
+
+
+def check_message(message: str) -> FilterVerdict:
+    """
+    按当前配置检查消息
+
+    Args:
+        message: 消息内容
+
+    Returns:
+        过滤结果
+    """
+    return get_message_filter().check(message)
+
+
+def reset_message_filter() -> None:
+    """丢弃已编译的过滤器（下次使用时重新编译）"""
+    global _filter, _filter_key
+
+    with _filter_lock:
+        _filter = None
+        _filter_key = None
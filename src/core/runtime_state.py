@@ -0,0 +1,43 @@
+"""
+进程内运行时状态
+
+熔断器、对冲执行器、延迟统计、缓存等模块在进程内保存单例状态。
+各模块通过 register_reset 登记自己的重置函数，reset_runtime_state() 依次调用，
+用于测试隔离（避免状态跨测试累积）；未导入的模块没有状态，也无需重置。
+"""
+
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+ResetHook = Callable[[], None]
+
+# 已登记的重置函数（按登记顺序调用）
+_reset_hooks: list[ResetHook] = []
+_reset_hooks_lock = threading.Lock()
+
+
+def register_reset(hook: ResetHook) -> ResetHook:
+    """
+    登记重置函数（可作为装饰器使用；重复登记同一函数只保留一次）
+
+    Args:
+        hook: 无参的重置函数
+
+    Returns:
+        原函数
+    """
+    with _reset_hooks_lock:
+        if hook not in _reset_hooks:
+            _reset_hooks.append(hook)
+    return hook
+
+
+def reset_runtime_state() -> None:
+    """调用所有已登记的重置函数"""
+    with _reset_hooks_lock:
+        hooks = list(_reset_hooks)
+    for hook in hooks:
+        hook()
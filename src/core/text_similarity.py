@@ -0,0 +1,61 @@
+"""
+文本相似度
+
+基于字符 shingle（连续 n 个字符）的 Jaccard 相似度，适用于中文等不以空格分词的文本：
+文本先做 NFKC 归一化、转小写并去掉空白和标点，措辞上的细微差异只影响少量 shingle。
+"""
+
+import unicodedata
+
+DEFAULT_SHINGLE_SIZE = 2
+
+
+def normalize_for_shingles(text: str) -> str:
+    """
+    归一化文本（全角/半角统一、转小写、只保留文字和数字）
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        归一化后的文本
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    return "".join(char for char in text if char.isalnum())
+
+
+def char_shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> frozenset[str]:
+    """
+    提取字符 shingle 集合
+
+    Args:
+        text: 原始文本
+        size: shingle 长度（中文建议 2）
+
+    Returns:
+        shingle 集合；归一化后短于 size 的文本返回整个文本（空文本返回空集合）
+    """
+    normalized = normalize_for_shingles(text)
+    if len(normalized) <= size:
+        return frozenset((normalized,)) if normalized else frozenset()
+    return frozenset(normalized[i:i + size] for i in range(len(normalized) - size + 1))
+
+
+def jaccard_similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    """
+    两个 shingle 集合的 Jaccard 相似度
+
+    Args:
+        a: shingle 集合
+        b: shingle 集合
+
+    Returns:
+        |a ∩ b| / |a ∪ b|，两者均为空时返回 1.0
+    """
+    if not a and not b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+
+    intersection = len(a & b)
+    return intersection / (len(a) + len(b) - intersection)
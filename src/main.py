@@ -5,7 +5,9 @@ FastAPI 应用入口
     uvicorn src.main:app --reload --host 0.0.0.0 --port 8000
 """
 
+import asyncio
 import logging
+import signal
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
@@ -24,18 +26,44 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def _reload_on_sighup() -> None:
+    """SIGHUP 触发的配置重载（失败只记录日志，保留当前配置）"""
+    from src.agent.recall.reload import reload_config
+
+    try:
+        await reload_config()
+    except Exception as e:
+        logger.error(f"❌ Config reload on SIGHUP failed: {e}")
+
+
+def _install_reload_signal_handler() -> None:
+    """注册 SIGHUP → 配置重载（平台不支持或不在主线程时跳过）"""
+    try:
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(
+            signal.SIGHUP, lambda: asyncio.ensure_future(_reload_on_sighup())
+        )
+        logger.info("✅ SIGHUP config reload handler installed")
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError) as e:
+        logger.warning(f"⚠️  SIGHUP config reload unavailable: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
     应用生命周期管理
 
     启动时:
-    - 初始化 Milvus 连接
+    - 初始化 Milvus 连接（含可选的只读副本）
     - 初始化 Redis 连接
     - 创建 Milvus Collections（如果不存在）
+    - 编译召回配置快照，创建并预热召回源
+    - 注册 SIGHUP 配置热重载
+    - 构建路由引擎
 
     关闭时:
-    - 关闭所有连接
+    - 关闭召回源
+    - 关闭所有连接（Milvus、共享 HTTP 连接池）
     """
     logger.info("🚀 Starting Website Live Chat Agent...")
     logger.info(f"📊 LLM Provider: {settings.llm_provider}")
@@ -52,6 +80,31 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         logger.error(f"❌ Failed to initialize Milvus: {e}")
         logger.warning("⚠️  Continuing without Milvus (some features will not work)")
 
+    # 初始化 Milvus 只读副本（向量召回对冲请求使用）
+    try:
+        from src.services.milvus_service import milvus_replica_service
+        if milvus_replica_service is not None:
+            await milvus_replica_service.initialize()
+            logger.info("✅ Milvus replica initialized successfully")
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize Milvus replica: {e}")
+
+    # 编译召回配置快照（含实验注册表），配置错误在启动时暴露
+    try:
+        from src.agent.recall.config import refresh_recall_snapshot
+        refresh_recall_snapshot()
+    except Exception as e:
+        logger.error(f"❌ Failed to compile recall config: {e}")
+
+    # 创建并预热召回源
+    try:
+        from src.agent.recall.sources import warmup_sources
+        await warmup_sources(settings.recall_sources)
+    except Exception as e:
+        logger.error(f"❌ Failed to warm up recall sources: {e}")
+
+    _install_reload_signal_handler()
+
     # 预编译 LangGraph App
     try:
         from src.agent.main.graph import get_agent_app
@@ -60,16 +113,42 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.error(f"❌ Failed to compile LangGraph Agent: {e}")
 
+    # 构建路由引擎（启用意图分类器时预先计算意图中心）
+    try:
+        from src.agent.main.router import get_router
+        await get_router().warmup()
+    except Exception as e:
+        logger.error(f"❌ Failed to warm up router: {e}")
+
     yield
 
     # 清理资源
     logger.info("🛑 Shutting down Website Live Chat Agent...")
+    try:
+        from src.agent.recall.sources import close_sources
+        await close_sources()
+    except Exception as e:
+        logger.error(f"Error closing recall sources: {e}")
+
     try:
         from src.services.milvus_service import milvus_service
         await milvus_service.close()
     except Exception as e:
         logger.error(f"Error closing Milvus: {e}")
 
+    try:
+        from src.services.milvus_service import milvus_replica_service
+        if milvus_replica_service is not None:
+            await milvus_replica_service.close()
+    except Exception as e:
+        logger.error(f"Error closing Milvus replica: {e}")
+
+    try:
+        from src.services.http_client import close_http_client
+        await close_http_client()
+    except Exception as e:
+        logger.error(f"Error closing HTTP client: {e}")
+
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -110,11 +189,13 @@ async def app_exception_handler(request, exc: AppException) -> JSONResponse:
 
 # 注册路由
 # ruff: noqa: E402 - 导入必须在app创建后，避免循环依赖
-from src.api.v1 import knowledge, openai_compat
+from src.api.v1 import config, knowledge, metrics, openai_compat
 from src.services.milvus_service import milvus_service
 
 app.include_router(openai_compat.router, prefix="/v1", tags=["Chat"])
 app.include_router(knowledge.router, prefix="/api/v1", tags=["Knowledge"])
+app.include_router(metrics.router, prefix="/api/v1", tags=["Metrics"])
+app.include_router(config.router, prefix="/api/v1", tags=["Configuration"])
 
 
 # 健康检查端点
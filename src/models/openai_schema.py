@@ -26,6 +26,9 @@ class ChatCompletionRequest(BaseModel):
     temperature: float = Field(default=0.7, ge=0.0, le=2.0, description="温度参数")
     max_tokens: int | None = Field(default=None, ge=1, description="最大生成 Token 数")
     top_p: float = Field(default=1.0, ge=0.0, le=1.0, description="核采样参数")
+    user: str | None = Field(
+        default=None, description="终端用户标识（未携带会话请求头时作为会话 ID）"
+    )
 
 
 # ===== 响应模型 =====
@@ -0,0 +1,170 @@
+"""
+查询向量微批处理
+
+高并发下每个请求单独调用 aembed_query，会产生大量单条输入的 Embedding HTTP 请求。
+BatchingEmbeddings 在短时间窗口内收集并发的 aembed_query 调用，合并为一次
+aembed_documents 调用，再将结果分发给各调用方：
+
+- 攒够 embedding_batch_max_size 条立即发送
+- 否则等待 embedding_batch_max_wait_ms 毫秒后发送
+- 批内重复文本只嵌入一次
+
+注意：批处理通过 aembed_documents 计算查询向量，仅适用于查询/文档使用同一编码方式的模型
+（OpenAI 兼容接口、硅基流动等）。
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingEmbeddings(Embeddings):
+    """合并并发查询请求的 Embeddings 包装器"""
+
+    def __init__(self, inner: Embeddings, max_batch_size: int = 32, max_wait_ms: float = 5.0) -> None:
+        self._inner = inner
+        self._max_batch_size = max_batch_size
+        self._max_wait_s = max_wait_ms / 1000
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.batched_queries = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # 透传底层实例的属性（如 model、base_url）
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._inner, name)
+
+    @property
+    def inner(self) -> Embeddings:
+        """被包装的 Embeddings 实例"""
+        return self._inner
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """嵌入文档列表（不批处理）"""
+        return self._inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        """嵌入查询文本（同步接口不批处理）"""
+        return self._inner.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        """异步嵌入文档列表（不批处理）"""
+        return await self._inner.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """
+        异步嵌入查询文本（加入当前批次，等待批次结果）
+
+        Args:
+            text: 查询文本
+
+        Returns:
+            查询向量
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._pending and self._loop is not None and not self._loop.is_closed():
+                # 当前批次属于另一个事件循环（如工作线程中的 asyncio.run），直接调用
+                return await self._inner.aembed_query(text)
+            # 原事件循环已结束：丢弃其遗留批次，绑定到当前事件循环
+            self._pending = []
+            self._timer = None
+            self._loop = loop
+
+        future: asyncio.Future[list[float]] = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait_s, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """取出当前批次并发送"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._dispatch(batch))
+        # 保留任务引用，避免被垃圾回收
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        """发送一次 aembed_documents 请求并分发结果"""
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        self.batched_queries += len(batch)
+
+        try:
+            vectors = await self._inner.aembed_documents(unique_texts)
+            if len(vectors) != len(unique_texts):
+                raise ValueError(
+                    f"Embedding batch size mismatch: expected {len(unique_texts)}, got {len(vectors)}"
+                )
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(unique_texts)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(unique_texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(list(by_text[text]))
+
+    def stats(self) -> dict[str, Any]:
+        """
+        批处理统计
+
+        Returns:
+            批次数、合并的查询数和平均批大小
+        """
+        return {
+            "batches": self.batches,
+            "batched_queries": self.batched_queries,
+            "avg_batch_size": self.batched_queries / self.batches if self.batches else 0.0,
+            "max_batch_size": self._max_batch_size,
+            "max_wait_ms": self._max_wait_s * 1000,
+        }
+
+
+def wrap_with_batching(embeddings: Embeddings) -> Embeddings:
+    """
+    按配置为 Embeddings 实例添加查询微批处理
+
+    Args:
+        embeddings: 原始 Embeddings 实例
+
+    Returns:
+        启用批处理时返回 BatchingEmbeddings，否则原样返回
+    """
+    if not settings.embedding_batch_enabled:
+        return embeddings
+
+    logger.info(
+        f"Embedding batching enabled: max_size={settings.embedding_batch_max_size}, "
+        f"max_wait={settings.embedding_batch_max_wait_ms}ms"
+    )
+    return BatchingEmbeddings(
+        embeddings,
+        max_batch_size=settings.embedding_batch_max_size,
+        max_wait_ms=settings.embedding_batch_max_wait_ms,
+    )
@@ -0,0 +1,223 @@
+"""
+查询向量缓存
+
+包装 create_embeddings() 返回的 Embeddings 实例，按 (模型, 归一化文本) 缓存查询向量：
+- 一级缓存：进程内 LRU + TTL（TTL 使用 settings.cache_ttl）
+- 二级缓存（可选）：Redis，多 worker 共享
+- 统计命中/未命中次数
+
+仅缓存查询向量（embed_query/aembed_query），文档向量直接透传。
+"""
+
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query_text(text: str) -> str:
+    """
+    归一化查询文本（用于缓存键）
+
+    全角/半角统一（NFKC）、折叠空白、去除首尾空白并转小写。
+
+    Args:
+        text: 原始查询文本
+
+    Returns:
+        归一化后的文本
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+class RedisEmbeddingStore:
+    """Redis 查询向量存储（多 worker 共享的二级缓存）"""
+
+    def __init__(self, client: Any, ttl_seconds: int, prefix: str = "emb:") -> None:
+        self._client = client
+        self._ttl_seconds = ttl_seconds
+        self._prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _redis_key(self, model: str, normalized: str) -> str:
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"{self._prefix}{model}:{digest}"
+
+    async def get(self, model: str, normalized: str) -> list[float] | None:
+        """读取查询向量，Redis 异常时视为未命中"""
+        try:
+            raw = await self._client.get(self._redis_key(model, normalized))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Embedding cache redis get failed: {e}")
+            return None
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        vector: list[float] = json.loads(raw)
+        return vector
+
+    async def set(self, model: str, normalized: str, vector: list[float]) -> None:
+        """写入查询向量，Redis 异常时忽略"""
+        try:
+            await self._client.set(
+                self._redis_key(model, normalized),
+                json.dumps(vector),
+                ex=self._ttl_seconds,
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Embedding cache redis set failed: {e}")
+
+    def stats(self) -> dict[str, int]:
+        """Redis 缓存统计"""
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+class CachedEmbeddings(Embeddings):
+    """带查询向量缓存的 Embeddings 包装器"""
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        model: str,
+        cache: TTLCache,
+        redis_store: RedisEmbeddingStore | None = None,
+    ) -> None:
+        self._inner = inner
+        self._model = model
+        self._cache = cache
+        self._redis_store = redis_store
+
+    def __getattr__(self, name: str) -> Any:
+        # 透传底层实例的属性（如 model、base_url）
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._inner, name)
+
+    @property
+    def inner(self) -> Embeddings:
+        """被包装的 Embeddings 实例"""
+        return self._inner
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """嵌入文档列表（不缓存）"""
+        return self._inner.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        """异步嵌入文档列表（不缓存）"""
+        return await self._inner.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        """嵌入查询文本（仅使用进程内缓存）"""
+        key = (self._model, normalize_query_text(text))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        vector = self._inner.embed_query(text)
+        self._cache.set(key, tuple(vector))
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """异步嵌入查询文本（进程内缓存 → Redis → 实际调用）"""
+        normalized = normalize_query_text(text)
+        key = (self._model, normalized)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        if self._redis_store is not None:
+            vector = await self._redis_store.get(self._model, normalized)
+            if vector is not None:
+                self._cache.set(key, tuple(vector))
+                return vector
+
+        vector = await self._inner.aembed_query(text)
+        self._cache.set(key, tuple(vector))
+
+        if self._redis_store is not None:
+            await self._redis_store.set(self._model, normalized, vector)
+
+        return vector
+
+    def clear(self) -> None:
+        """清空进程内缓存"""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        缓存统计
+
+        Returns:
+            进程内缓存和 Redis 缓存的命中/未命中统计
+        """
+        return {
+            "model": self._model,
+            "backend": "redis" if self._redis_store is not None else "memory",
+            "memory": self._cache.stats(),
+            "redis": self._redis_store.stats() if self._redis_store is not None else None,
+        }
+
+
+def _create_redis_store() -> RedisEmbeddingStore | None:
+    """按配置创建 Redis 存储，失败时退化为仅进程内缓存"""
+    try:
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            password=settings.redis_password if settings.redis_password else None,
+            db=settings.redis_db,
+            max_connections=settings.redis_max_connections,
+        )
+        return RedisEmbeddingStore(client, ttl_seconds=settings.cache_ttl)
+    except Exception as e:
+        logger.error(f"❌ Failed to create embedding cache redis client: {e}, using memory only")
+        return None
+
+
+def wrap_with_cache(embeddings: Embeddings, model: str) -> Embeddings:
+    """
+    按配置为 Embeddings 实例添加查询向量缓存
+
+    Args:
+        embeddings: 原始 Embeddings 实例
+        model: 模型名称（缓存键的一部分）
+
+    Returns:
+        启用缓存时返回 CachedEmbeddings，否则原样返回
+    """
+    if not settings.embedding_cache_enabled or settings.cache_ttl <= 0:
+        return embeddings
+
+    cache = TTLCache(
+        max_entries=settings.embedding_cache_max_entries,
+        ttl_seconds=settings.cache_ttl,
+    )
+    redis_store = _create_redis_store() if settings.embedding_cache_backend == "redis" else None
+
+    logger.info(
+        f"Embedding cache enabled: backend={settings.embedding_cache_backend}, "
+        f"max_entries={settings.embedding_cache_max_entries}, ttl={settings.cache_ttl}s"
+    )
+    return CachedEmbeddings(embeddings, model=model, cache=cache, redis_store=redis_store)
@@ -0,0 +1,112 @@
+"""
+共享 HTTP 客户端
+
+为外部 API 调用（如 Embedding）提供长生命周期的 httpx.AsyncClient，
+跨请求复用 TCP/TLS 连接，避免每次调用重新建立连接。
+
+- 连接池上限、keep-alive 和 HTTP/2 通过 settings 配置
+- 客户端绑定创建时的事件循环；在其他事件循环中（如同步接口在工作线程中运行）
+  自动退化为临时客户端
+- 应用关闭时由 FastAPI lifespan 钩子调用 close_http_client() 释放连接
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_shared_client: httpx.AsyncClient | None = None
+_shared_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    """
+    按配置构造 httpx.AsyncClient
+
+    Returns:
+        httpx.AsyncClient 实例
+    """
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    timeout = httpx.Timeout(settings.embedding_timeout, connect=settings.http_connect_timeout)
+
+    if settings.http2_enabled:
+        try:
+            return httpx.AsyncClient(limits=limits, timeout=timeout, http2=True)
+        except ImportError:
+            logger.warning("⚠️ h2 not installed, falling back to HTTP/1.1. Run: pip install h2")
+
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+def get_http_client() -> httpx.AsyncClient | None:
+    """
+    获取当前事件循环的共享客户端
+
+    Returns:
+        共享客户端；若共享客户端属于另一个仍在运行的事件循环则返回 None
+    """
+    global _shared_client, _shared_loop
+
+    loop = asyncio.get_running_loop()
+
+    if _shared_client is not None and _shared_client.is_closed is False:
+        if _shared_loop is loop:
+            return _shared_client
+        if _shared_loop is not None and not _shared_loop.is_closed():
+            return None
+
+    # 首次使用，或原客户端已关闭/原事件循环已结束：为当前事件循环重建
+    _shared_client = _build_client()
+    _shared_loop = loop
+    logger.info(
+        f"Shared HTTP client created (max_connections={settings.http_max_connections}, "
+        f"keepalive={settings.http_max_keepalive_connections}, http2={settings.http2_enabled})"
+    )
+    return _shared_client
+
+
+@asynccontextmanager
+async def http_client_session() -> AsyncIterator[httpx.AsyncClient]:
+    """
+    获取可用于当前事件循环的 HTTP 客户端
+
+    优先返回共享客户端（调用结束后不关闭）；无法共享时返回临时客户端并在退出时关闭。
+
+    Yields:
+        httpx.AsyncClient 实例
+    """
+    client = get_http_client()
+    if client is not None:
+        yield client
+        return
+
+    async with _build_client() as temp_client:
+        yield temp_client
+
+
+async def close_http_client() -> None:
+    """关闭共享客户端，释放连接池"""
+    global _shared_client, _shared_loop
+
+    client = _shared_client
+    _shared_client = None
+    _shared_loop = None
+
+    if client is None:
+        return
+
+    try:
+        await client.aclose()
+        logger.info("✅ Shared HTTP client closed")
+    except Exception as e:
+        logger.error(f"Error closing shared HTTP client: {e}")
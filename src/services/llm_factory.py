@@ -2,26 +2,101 @@
 LLM 模型工厂
 
 根据配置返回对应的 LLM 实例（支持插件化架构）。
+
+构造出的 Chat Model 与 Embeddings 实例按配置键缓存在进程内，
+跨请求复用其 HTTP 客户端和连接池（TCP/TLS 连接复用）。
+配置重载后调用 clear_model_cache() 显式失效。
 """
 
+import hashlib
 import logging
-from typing import Any
+import threading
+from typing import Any, Callable
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_openai import ChatOpenAI
 
 from src.core.config import settings
 from src.core.exceptions import ConfigurationError
+from src.services.embedding_batcher import wrap_with_batching
+from src.services.embedding_cache import CachedEmbeddings, wrap_with_cache
 from src.services.providers import create_provider
 
 logger = logging.getLogger(__name__)
 
+# 进程级模型缓存：缓存键 → Chat Model / Embeddings 实例
+_model_cache: dict[tuple, Any] = {}
+_model_cache_lock = threading.Lock()
+
+
+def _fingerprint(secret: str | None) -> str:
+    """API Key 指纹（缓存键中不保存明文）"""
+    return hashlib.sha256(str(secret or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _get_or_create(key: tuple, factory: Callable[[], Any]) -> Any:
+    """
+    按缓存键获取模型实例，不存在时构造并缓存
+
+    Args:
+        key: 缓存键
+        factory: 实例构造函数
+
+    Returns:
+        缓存的模型实例
+    """
+    instance = _model_cache.get(key)
+    if instance is not None:
+        return instance
+
+    with _model_cache_lock:
+        instance = _model_cache.get(key)
+        if instance is None:
+            instance = factory()
+            _model_cache[key] = instance
+            logger.info(f"Model instance cached: kind={key[0]}, provider={key[1]}, model={key[2]}")
+    return instance
+
+
+def clear_model_cache() -> None:
+    """
+    清空模型实例缓存
+
+    配置重载（如更换模型、Base URL、API Key）后调用，
+    下一次 create_llm()/create_embeddings() 将按新配置重新构造实例。
+    """
+    with _model_cache_lock:
+        count = len(_model_cache)
+        _model_cache.clear()
+    logger.info(f"Model cache cleared ({count} instances)")
+
+
+def get_model_cache_size() -> int:
+    """返回当前缓存的模型实例数量"""
+    return len(_model_cache)
+
+
+def embedding_cache_stats() -> list[dict[str, Any]]:
+    """
+    获取已缓存 Embeddings 实例的查询向量缓存统计
+
+    Returns:
+        每个启用了查询向量缓存的 Embeddings 实例的统计（模型、后端、进程内/Redis 命中率），
+        尚未创建实例或未启用缓存时为空列表
+    """
+    with _model_cache_lock:
+        instances = list(_model_cache.values())
+    return [
+        instance.stats() for instance in instances if isinstance(instance, CachedEmbeddings)
+    ]
+
 
 def create_llm() -> BaseChatModel:
     """
     创建 LLM 实例
 
     根据 settings.llm_provider 返回对应的 Chat Model。
+    相同配置（提供商、模型、Base URL、温度、最大 Token 数）复用同一实例。
 
     Returns:
         BaseChatModel 实例
@@ -30,14 +105,36 @@ def create_llm() -> BaseChatModel:
         ConfigurationError: 不支持的 LLM 提供商或缺少 API Key
     """
     provider = settings.llm_provider
+    key: tuple[Any, ...]
+    llm: BaseChatModel
 
     try:
         # 使用插件化架构
         if provider in ["openai", "deepseek", "siliconflow"]:
-            return _create_plugin_llm(provider)
+            key = (
+                "llm",
+                provider,
+                settings.llm_model_name,
+                settings.llm_base_url,
+                settings.llm_temperature,
+                settings.llm_max_tokens,
+                _fingerprint(settings.llm_api_key),
+            )
+            llm = _get_or_create(key, lambda: _create_plugin_llm(provider))
+            return llm
         elif provider == "anthropic":
             # Anthropic 暂时保持原有实现
-            return _create_anthropic_llm()
+            key = (
+                "llm",
+                provider,
+                settings.anthropic_model,
+                settings.llm_base_url,
+                settings.llm_temperature,
+                settings.llm_max_tokens,
+                _fingerprint(settings.anthropic_api_key),
+            )
+            llm = _get_or_create(key, _create_anthropic_llm)
+            return llm
         else:
             raise ConfigurationError(f"Unsupported LLM provider: {provider}")
     except Exception as e:
@@ -145,19 +242,40 @@ def create_embeddings() -> Any:
     创建 Embedding 模型
 
     根据 settings.embedding_provider 返回对应的 Embeddings 实例。
+    相同配置（提供商、模型、Base URL）复用同一实例。
+    启用查询向量缓存/微批处理时返回对应的包装实例。
 
     Returns:
         Embeddings 实例
     """
     provider = settings.embedding_provider
+    key: tuple[Any, ...]
 
     try:
         # 使用插件化架构
         if provider in ["openai", "deepseek", "siliconflow"]:
-            return _create_plugin_embeddings(provider)
+            key = (
+                "embedding",
+                provider,
+                settings.embedding_model_name,
+                settings.get_embedding_base_url(),
+                None,
+                None,
+                _fingerprint(settings.embedding_api_key),
+            )
+            return _get_or_create(
+                key,
+                lambda: _wrap_embeddings(
+                    _create_plugin_embeddings(provider), settings.embedding_model_name
+                ),
+            )
         elif provider == "local":
             # 本地模型暂时保持原有实现
-            return _create_local_embeddings()
+            key = ("embedding", provider, settings.embedding_model, None, None, None, "")
+            return _get_or_create(
+                key,
+                lambda: wrap_with_cache(_create_local_embeddings(), settings.embedding_model),
+            )
         else:
             raise ConfigurationError(f"Unsupported embedding provider: {provider}")
     except Exception as e:
@@ -165,6 +283,22 @@ def create_embeddings() -> Any:
         raise
 
 
+def _wrap_embeddings(embeddings: Any, model: str) -> Any:
+    """
+    为远程 Embeddings 实例添加微批处理和查询向量缓存
+
+    缓存在外层：命中缓存的查询不进入批次。
+
+    Args:
+        embeddings: 原始 Embeddings 实例
+        model: 模型名称
+
+    Returns:
+        包装后的 Embeddings 实例
+    """
+    return wrap_with_cache(wrap_with_batching(embeddings), model)
+
+
 def _create_plugin_embeddings(provider: str) -> Any:
     """
     使用插件化架构创建 Embeddings 实例
@@ -179,6 +313,7 @@ def _create_plugin_embeddings(provider: str) -> Any:
     config = {
         "api_key": settings.embedding_api_key,
         "model": settings.embedding_model_name,
+        "timeout": settings.embedding_timeout,
     }
 
     # 添加 Base URL（如果需要）
@@ -2,11 +2,17 @@
 Milvus 向量数据库服务
 
 提供知识库和对话历史的向量存储与检索功能。
+
+pymilvus 为同步客户端，检索/插入/查询在独立的有界线程池中执行，
+并受并发上限（按进行中的调用计）和单次调用超时约束，避免慢查询阻塞事件循环。
 """
 
+import asyncio
+import functools
 import logging
 import time
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
 from pymilvus import (
     Collection,
@@ -18,18 +24,122 @@ from pymilvus import (
 )
 
 from src.core.config import settings
-from src.core.exceptions import MilvusConnectionError
+from src.core.exceptions import MilvusConnectionError, MilvusTimeoutError
 
 logger = logging.getLogger(__name__)
 
 
 class MilvusService:
-    """Milvus 向量数据库服务"""
+    """
+    Milvus 向量数据库服务
+
+    Args:
+        conn_alias: 连接别名
+        host: 服务器地址（为空时使用 settings.milvus_host）
+        port: 端口（为空时使用 settings.milvus_port）
+        read_only: 只读副本：初始化时只加载已存在的知识库 Collection，不创建 Collection 和索引
+    """
 
-    def __init__(self) -> None:
-        self.conn_alias = "default"
+    def __init__(
+        self,
+        conn_alias: str = "default",
+        host: str | None = None,
+        port: int | None = None,
+        read_only: bool = False,
+    ) -> None:
+        self.conn_alias = conn_alias
+        self._host = host
+        self._port = port
+        self.read_only = read_only
         self.knowledge_collection: Collection | None = None
         self.history_collection: Collection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """获取 Milvus 调用线程池（首次使用时创建）"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.milvus_max_workers,
+                thread_name_prefix="milvus",
+            )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环的并发限制信号量"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(settings.milvus_max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _run(
+        self,
+        operation: str,
+        func: Callable[..., Any],
+        *args: Any,
+        wait_for_result: bool = True,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        在线程池中执行同步 Milvus 调用
+
+        并发名额在线程中的调用真正结束时才归还（超时只停止等待，线程仍在执行），
+        因此进行中的 Milvus 调用数始终不超过 milvus_max_concurrency。
+
+        Args:
+            operation: 操作名称（用于日志和异常信息）
+            func: 同步调用
+            *args: 位置参数
+            wait_for_result: 是否对执行阶段应用超时（写入操作为 False：超时后写入仍可能提交，
+                报告失败会导致客户端重试时重复写入，执行时间由 pymilvus 的 timeout 参数约束）
+            **kwargs: 关键字参数
+
+        Returns:
+            调用结果
+
+        Raises:
+            MilvusTimeoutError: 等待并发名额与执行的总时间超过 milvus_timeout_ms
+        """
+        timeout_s = settings.milvus_timeout_ms / 1000
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_s
+        semaphore = self._get_semaphore()
+
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=timeout_s)
+        except asyncio.TimeoutError as e:
+            logger.error(
+                f"⏱️ Milvus {operation} waited {settings.milvus_timeout_ms}ms for a concurrency slot"
+            )
+            raise MilvusTimeoutError(
+                f"Milvus {operation} timed out after {settings.milvus_timeout_ms}ms "
+                f"waiting for a concurrency slot"
+            ) from e
+
+        try:
+            future = loop.run_in_executor(
+                self._get_executor(), functools.partial(func, *args, **kwargs)
+            )
+        except BaseException:
+            semaphore.release()
+            raise
+        future.add_done_callback(lambda _: semaphore.release())
+
+        if not wait_for_result:
+            # shield：调用方被取消时不取消线程中的调用，名额仍在调用结束时归还
+            return await asyncio.shield(future)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(future), timeout=max(0.0, deadline - loop.time())
+            )
+        except asyncio.TimeoutError as e:
+            logger.error(f"⏱️ Milvus {operation} timed out after {settings.milvus_timeout_ms}ms")
+            raise MilvusTimeoutError(
+                f"Milvus {operation} timed out after {settings.milvus_timeout_ms}ms"
+            ) from e
 
     async def initialize(self) -> None:
         """
@@ -38,20 +148,25 @@ class MilvusService:
         Raises:
             MilvusConnectionError: 连接失败
         """
+        host = self._host or settings.milvus_host
+        port = self._port or settings.milvus_port
         try:
             # 连接 Milvus
             connections.connect(
                 alias=self.conn_alias,
-                host=settings.milvus_host,
-                port=settings.milvus_port,
+                host=host,
+                port=port,
                 user=settings.milvus_user,
                 password=settings.milvus_password,
                 db_name=settings.milvus_database,
                 timeout=10,
             )
-            logger.info(
-                f"✅ Connected to Milvus: {settings.milvus_host}:{settings.milvus_port}"
-            )
+            logger.info(f"✅ Connected to Milvus ({self.conn_alias}): {host}:{port}")
+
+            if self.read_only:
+                # 只读副本上不能创建 Collection，只加载检索使用的知识库
+                self._load_knowledge_collection()
+                return
 
             # 创建或加载 Collections
             await self._create_knowledge_collection()
@@ -61,6 +176,22 @@ class MilvusService:
             logger.error(f"❌ Failed to connect to Milvus: {e}")
             raise MilvusConnectionError(f"Failed to connect to Milvus: {e}") from e
 
+    def _load_knowledge_collection(self) -> None:
+        """
+        加载已存在的知识库 Collection（只读副本）
+
+        Raises:
+            MilvusConnectionError: Collection 不存在
+        """
+        collection_name = settings.milvus_knowledge_collection
+        if not utility.has_collection(collection_name, using=self.conn_alias):
+            raise MilvusConnectionError(
+                f"Collection '{collection_name}' not found on read-only replica"
+            )
+        self.knowledge_collection = Collection(collection_name, using=self.conn_alias)
+        self.knowledge_collection.load()
+        logger.info(f"📂 Collection '{collection_name}' loaded from read-only replica")
+
     async def _create_knowledge_collection(self) -> None:
         """创建知识库 Collection（如果不存在）"""
         collection_name = settings.milvus_knowledge_collection
@@ -221,12 +352,15 @@ class MilvusService:
         # 执行向量检索
         search_params = {"metric_type": "COSINE", "params": {"nprobe": 16}}
 
-        results = self.knowledge_collection.search(
+        results = await self._run(
+            "search_knowledge",
+            self.knowledge_collection.search,
             data=[query_embedding],
             anns_field="embedding",
             param=search_params,
             limit=top_k,
             output_fields=["text", "metadata", "created_at"],
+            timeout=settings.milvus_timeout_ms / 1000,
         )
 
         # 格式化结果
@@ -274,13 +408,17 @@ class MilvusService:
         metadatas = [doc.get("metadata", {}) for doc in documents]
         timestamps = [int(time.time())] * len(documents)
 
-        # 插入
-        self.knowledge_collection.insert(
-            [ids, texts, embeddings, metadatas, timestamps]
-        )
+        collection = self.knowledge_collection
+        timeout_s = settings.milvus_timeout_ms / 1000
+
+        def _insert_and_flush() -> None:
+            # 插入
+            collection.insert([ids, texts, embeddings, metadatas, timestamps], timeout=timeout_s)
+            # 刷新索引
+            collection.flush(timeout=timeout_s)
 
-        # 刷新索引
-        self.knowledge_collection.flush()
+        # 写入不设置整体超时：超时后写入仍可能提交，报告失败会导致重试时重复写入
+        await self._run("insert_knowledge", _insert_and_flush, wait_for_result=False)
 
         logger.info(f"📥 Inserted {len(documents)} documents into knowledge base")
         return len(documents)
@@ -303,10 +441,13 @@ class MilvusService:
         if not self.history_collection:
             raise MilvusConnectionError("History collection not initialized")
 
-        results = self.history_collection.query(
+        results = await self._run(
+            "search_history_by_session",
+            self.history_collection.query,
             expr=f'session_id == "{session_id}"',
             output_fields=["text", "role", "timestamp"],
             limit=limit,
+            timeout=settings.milvus_timeout_ms / 1000,
         )
 
         # 按时间排序
@@ -336,7 +477,24 @@ class MilvusService:
         except Exception as e:
             logger.error(f"Error closing Milvus connection: {e}")
 
+        if self._executor is not None:
+            # 不等待仍在执行的调用（其结果已无人等待）
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
 
 # 全局服务实例
 milvus_service = MilvusService()
 
+# 只读副本（未配置时为 None）
+milvus_replica_service: MilvusService | None = (
+    MilvusService(
+        conn_alias="replica",
+        host=settings.milvus_replica_host,
+        port=settings.milvus_replica_port,
+        read_only=True,
+    )
+    if settings.milvus_replica_host
+    else None
+)
+
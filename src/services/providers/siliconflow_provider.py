@@ -12,6 +12,8 @@ import httpx
 from langchain_core.embeddings import Embeddings
 from langchain_openai import ChatOpenAI
 
+from src.services.http_client import http_client_session
+
 from .base import EmbeddingProvider, LLMProvider
 
 logger = logging.getLogger(__name__)
@@ -54,12 +56,22 @@ class SiliconFlowLLMProvider(LLMProvider):
 
 
 class SiliconFlowEmbeddings(Embeddings):
-    """硅基流动自定义Embedding类，确保发送文本而不是token ID数组"""
-
-    def __init__(self, api_key: str, model: str = "BAAI/bge-large-zh-v1.5", base_url: str = "https://api.siliconflow.cn/v1"):
+    """硅基流动自定义Embedding类，确保发送文本而不是token ID数组
+
+    HTTP 请求通过共享连接池发送（见 src.services.http_client），跨调用复用连接。
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "BAAI/bge-large-zh-v1.5",
+        base_url: str = "https://api.siliconflow.cn/v1",
+        timeout: float = 30.0,
+    ):
         self.api_key = api_key
         self.model = model
         self.base_url = base_url
+        self.timeout = timeout  # 单次请求超时（秒）
         self.max_retries = 2  # 最大重试次数
         self.retry_delay = 1.0  # 重试延迟（秒）
 
@@ -101,7 +113,7 @@ class SiliconFlowEmbeddings(Embeddings):
 
         for attempt in range(self.max_retries + 1):
             try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
+                async with http_client_session() as client:
                     response = await client.post(
                         f"{self.base_url}/embeddings",
                         headers={
@@ -111,7 +123,8 @@ class SiliconFlowEmbeddings(Embeddings):
                         json={
                             "input": input_data,
                             "model": self.model
-                        }
+                        },
+                        timeout=self.timeout,
                     )
                     response.raise_for_status()
                     data = response.json()
@@ -175,7 +188,8 @@ class SiliconFlowEmbeddingProvider(EmbeddingProvider):
         return SiliconFlowEmbeddings(
             api_key=self.config["api_key"],
             model=self.config.get("model", "BAAI/bge-large-zh-v1.5"),
-            base_url=self.config.get("base_url", "https://api.siliconflow.cn/v1")
+            base_url=self.config.get("base_url", "https://api.siliconflow.cn/v1"),
+            timeout=self.config.get("timeout", 30.0),
         )
 
     def get_models(self) -> List[str]:
@@ -196,3 +196,13 @@ def cleanup_env():
     yield
     # 测试后的清理工作可以在这里执行
 
+
+
+@pytest.fixture(autouse=True)
+def reset_runtime_state():
+    """每个测试前后重置各模块登记的进程内状态（熔断器、缓存、统计等），避免状态跨测试累积"""
+    from src.core.runtime_state import reset_runtime_state as reset
+
+    reset()
+    yield
+    reset()
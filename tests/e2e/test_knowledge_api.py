@@ -6,6 +6,8 @@
 
 from unittest.mock import patch
 
+from src.agent.recall.cache import recall_cache_stats
+
 
 def test_knowledge_upsert_unauthorized(test_client):
     """测试未授权访问知识库上传"""
@@ -55,6 +57,9 @@ def test_knowledge_upsert_success(
             assert data["inserted_count"] == 2
             assert "message" in data
 
+            # 写入后清空召回结果缓存
+            assert recall_cache_stats()["invalidations"] == 1
+
 
 def test_knowledge_upsert_empty_documents(test_client, api_headers):
     """测试上传空文档列表"""
@@ -0,0 +1,103 @@
+"""
+召回提前结束性能测试
+
+FAQ 为主的流量（约 60% 查询与 FAQ 问题完全匹配）下，对比开启/关闭提前结束时的
+召回延迟和向量检索（Embedding + Milvus）调用次数。向量检索使用固定延迟的桩。
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.agent.recall.graph import invoke_recall_agent
+from src.agent.recall.schema import RecallRequest
+
+EMBEDDING_MS = 30
+MILVUS_MS = 50
+
+FAQ_QUERIES = [
+    "你们的退货政策是什么？",
+    "如何联系客服？",
+    "配送时间需要多久？",
+    "支持哪些支付方式？",
+    "退货",
+    "如何联系客服？",
+]
+OTHER_QUERIES = ["怎么开发票", "会员有什么权益", "API 调用限额", "你们几点上班"]
+QUERIES = (FAQ_QUERIES + OTHER_QUERIES) * 3
+
+
+def _mock_settings(mock_settings, early_exit: bool) -> None:
+    mock_settings.recall_sources = ["vector", "faq", "keyword"]
+    mock_settings.recall_source_weights = "vector:1.0,faq:0.8,keyword:0.6"
+    mock_settings.recall_timeout_ms = 1000
+    mock_settings.recall_retry = 0
+    mock_settings.recall_merge_strategy = "weighted"
+    mock_settings.recall_degrade_threshold = 0.5
+    mock_settings.recall_fallback_enabled = True
+    mock_settings.recall_experiment_enabled = False
+    mock_settings.recall_experiment_platform = None
+    mock_settings.recall_early_exit_enabled = early_exit
+    mock_settings.recall_early_exit_threshold = 0.8
+    mock_settings.recall_early_exit_sources = ["faq", "keyword"]
+
+
+async def _run(early_exit: bool) -> tuple[list[float], int]:
+    """返回每次召回的延迟（毫秒）和 Milvus 检索次数"""
+    embeddings = MagicMock()
+
+    async def embed(text):
+        await asyncio.sleep(EMBEDDING_MS / 1000)
+        return [0.1, 0.2, 0.3]
+
+    embeddings.aembed_query = embed
+    milvus = MagicMock()
+
+    async def search(query_embedding, top_k):
+        await asyncio.sleep(MILVUS_MS / 1000)
+        return [{"text": "向量检索结果", "score": 0.6, "metadata": {}}]
+
+    milvus.search_knowledge = AsyncMock(side_effect=search)
+
+    latencies = []
+    # 查询会重复出现，关闭召回结果缓存以测量实际召回耗时
+    with patch("src.agent.recall.nodes.settings") as mock_settings, \
+         patch("src.agent.recall.cache.settings.recall_cache_enabled", False), \
+         patch("src.agent.recall.sources.vector_source.truncate_text_to_tokens",
+               side_effect=lambda text, max_tokens: text), \
+         patch("src.agent.recall.sources.vector_source.create_embeddings", return_value=embeddings), \
+         patch("src.agent.recall.sources.vector_source.milvus_service", milvus):
+        _mock_settings(mock_settings, early_exit)
+        for query in QUERIES:
+            request = RecallRequest(query=query, session_id="s", trace_id="t", top_k=5)
+            start = time.perf_counter()
+            result = await invoke_recall_agent(request)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert result.hits
+
+    return latencies, milvus.search_knowledge.await_count
+
+
+class TestEarlyExitPerformance:
+    """提前结束延迟测试"""
+
+    @pytest.mark.asyncio
+    async def test_early_exit_skips_vector_roundtrip(self):
+        baseline, baseline_calls = await _run(early_exit=False)
+        early, early_calls = await _run(early_exit=True)
+
+        baseline_avg = sum(baseline) / len(baseline)
+        early_avg = sum(early) / len(early)
+        print(
+            f"\n关闭提前结束: 平均 {baseline_avg:.1f}ms, 向量检索 {baseline_calls}/{len(QUERIES)} 次"
+        )
+        print(
+            f"开启提前结束: 平均 {early_avg:.1f}ms, 向量检索 {early_calls}/{len(QUERIES)} 次"
+        )
+
+        assert baseline_calls == len(QUERIES)
+        # FAQ 完全匹配的查询不再等待向量检索
+        assert early_calls <= len(OTHER_QUERIES) * 3
+        assert early_avg < baseline_avg * 0.7
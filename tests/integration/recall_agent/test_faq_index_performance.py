@@ -0,0 +1,96 @@
+"""
+FAQ 倒排索引性能测试
+
+使用 10k/100k 条合成 FAQ 对比索引模式与逐条扫描的单次查询延迟。
+"""
+
+import random
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.agent.recall.schema import RecallRequest
+from src.agent.recall.sources.faq_source import FAQRecallSource
+from src.core.config import settings
+
+TOPICS = [
+    "退货", "退款", "换货", "配送", "快递", "物流", "发票", "会员", "积分", "优惠券",
+    "支付", "分期", "客服", "密码", "账号", "登录", "保修", "维修", "价格", "订单",
+]
+
+
+def _make_faqs(count: int) -> list[dict]:
+    """生成合成 FAQ：每条由主题词 + 编号构成，关键词包含编号专属词以模拟大词表"""
+    rng = random.Random(42)
+    faqs = []
+    for i in range(count):
+        topic_a, topic_b = rng.sample(TOPICS, 2)
+        product = f"型号{i:06d}"
+        faqs.append({
+            "id": f"faq_{i:06d}",
+            "question": f"{product}的{topic_a}和{topic_b}规则是什么？",
+            "answer": f"{product}支持{topic_a}服务，{topic_b}请参考帮助中心第{i % 97}章。",
+            "category": topic_a,
+            "keywords": [product, f"{product}{topic_a}", f"{product}{topic_b}"],
+        })
+    return faqs
+
+
+def _make_queries(count: int) -> list[str]:
+    """型号查询（精确命中少量 FAQ）、无命中查询和含高频词的多词查询"""
+    return [
+        f"型号{count // 3:06d}退货",
+        f"型号{count // 2:06d}的发票怎么开",
+        f"我的型号{count - 1:06d}忘记密码了",
+        "退货政策是什么",
+        "会员 积分",
+    ]
+
+
+async def _measure(
+    source: FAQRecallSource, queries: list[str], index_enabled: bool, rounds: int
+) -> tuple[list[float], list]:
+    """返回每个查询的平均延迟（毫秒）和各查询结果"""
+    latencies = [0.0] * len(queries)
+    results = []
+    with patch.object(settings, "recall_faq_index_enabled", index_enabled):
+        for i, query in enumerate(queries):
+            request = RecallRequest(query=query, session_id="s", trace_id="t", top_k=5)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                hits = await source.acquire(request)
+            latencies[i] = (time.perf_counter() - start) * 1000 / rounds
+            results.append([(h.metadata["faq_id"], h.score) for h in hits])
+    return latencies, results
+
+
+class TestFAQIndexPerformance:
+    """测试 FAQ 倒排索引查询延迟"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("count", [10_000, 100_000])
+    async def test_index_latency(self, count):
+        """索引模式单次查询延迟显著低于逐条扫描，且结果一致"""
+        faqs = _make_faqs(count)
+
+        build_start = time.perf_counter()
+        source = FAQRecallSource(faq_data=faqs)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        queries = _make_queries(count)
+        index_ms, index_results = await _measure(source, queries, index_enabled=True, rounds=5)
+        scan_ms, scan_results = await _measure(source, queries, index_enabled=False, rounds=1)
+
+        print(f"\n{count} 条 FAQ: 索引构建={build_ms:.0f}ms")
+        for query, index_latency, scan_latency in zip(queries, index_ms, scan_ms):
+            print(
+                f"  {query!r}: 索引={index_latency:.3f}ms, 扫描={scan_latency:.1f}ms, "
+                f"加速={scan_latency / index_latency:.0f}x"
+            )
+
+        assert index_results == scan_results
+        assert all(index_results[:3])  # 型号查询均有命中
+        assert sum(index_ms) < sum(scan_ms) / 5
+        # 精确查询只对少量候选打分
+        assert max(index_ms[:4]) < min(scan_ms) / 50
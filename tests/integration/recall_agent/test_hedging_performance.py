@@ -0,0 +1,119 @@
+"""
+向量召回对冲请求性能测试
+
+使用注入随机慢调用的桩后端（约 4% 的检索耗时 200ms，其余 5-15ms），预热后
+对比开启/关闭对冲时向量召回的 p50/p99 延迟和对冲率。
+"""
+
+import asyncio
+import random
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.agent.recall.hedging import hedger_stats, reset_hedgers
+from src.agent.recall.schema import RecallRequest
+from src.agent.recall.sources.vector_source import VectorRecallSource
+from src.core.config import settings
+
+WARMUP_COUNT = 100
+REQUEST_COUNT = 400
+CONCURRENCY = 20
+SLOW_RATE = 0.04
+SLOW_MS = 200
+MAX_HEDGE_RATE = 0.1
+
+
+class SlowTailBackend:
+    """随机注入慢调用的 Milvus 检索桩"""
+
+    def __init__(self, seed: int) -> None:
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    async def search_knowledge(self, query_embedding, top_k):
+        self.calls += 1
+        if self._rng.random() < SLOW_RATE:
+            delay_ms = SLOW_MS
+        else:
+            delay_ms = self._rng.uniform(5, 15)
+        await asyncio.sleep(delay_ms / 1000)
+        return [{"text": "退货政策：7天无理由退货", "score": 0.9, "metadata": {}}]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _slow_fraction(values: list[float]) -> float:
+    return sum(1 for value in values if value >= SLOW_MS * 0.9) / len(values)
+
+
+async def _run_load(hedge_enabled: bool) -> tuple[list[float], SlowTailBackend]:
+    """
+    以固定并发发起向量召回，返回稳态下每次请求的延迟（毫秒）
+
+    先发起 WARMUP_COUNT 次预热请求积累延迟样本（不计入结果），再测量 REQUEST_COUNT 次。
+    """
+    backend = SlowTailBackend(seed=7)
+    embeddings = MagicMock()
+    embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2, 0.3])
+    source = VectorRecallSource()
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies: list[float] = []
+
+    async def one(i: int, measured: bool) -> None:
+        request = RecallRequest(query=f"退货政策 {i}", session_id="s", trace_id="t")
+        async with semaphore:
+            start = time.perf_counter()
+            hits = await source.acquire(request)
+            if measured:
+                latencies.append((time.perf_counter() - start) * 1000)
+        assert hits
+
+    with patch.object(settings, "recall_hedge_enabled", hedge_enabled), \
+         patch.object(settings, "recall_hedge_percentile", 0.95), \
+         patch.object(settings, "recall_hedge_max_rate", MAX_HEDGE_RATE), \
+         patch.object(settings, "recall_hedge_min_samples", 20), \
+         patch("src.agent.recall.sources.vector_source.truncate_text_to_tokens", side_effect=lambda text, max_tokens: text), \
+         patch("src.agent.recall.sources.vector_source.create_embeddings", return_value=embeddings), \
+         patch("src.agent.recall.sources.vector_source.milvus_service", backend), \
+         patch("src.agent.recall.sources.vector_source.milvus_replica_service", None):
+        reset_hedgers()
+        await asyncio.gather(*(one(i, measured=False) for i in range(WARMUP_COUNT)))
+        backend.calls = 0
+        await asyncio.gather(*(one(i, measured=True) for i in range(REQUEST_COUNT)))
+
+    return latencies, backend
+
+
+class TestHedgingPerformance:
+    """对冲请求尾延迟测试"""
+
+    @pytest.mark.asyncio
+    async def test_hedging_cuts_tail_latency(self):
+        baseline, baseline_backend = await _run_load(hedge_enabled=False)
+        hedged, hedged_backend = await _run_load(hedge_enabled=True)
+        stats = hedger_stats()["vector"]
+
+        print(
+            f"\n关闭对冲: p50={_percentile(baseline, 0.5):.1f}ms, p99={_percentile(baseline, 0.99):.1f}ms, "
+            f"慢请求占比 {_slow_fraction(baseline):.1%}, 后端调用 {baseline_backend.calls} 次"
+        )
+        print(
+            f"开启对冲: p50={_percentile(hedged, 0.5):.1f}ms, p99={_percentile(hedged, 0.99):.1f}ms, "
+            f"慢请求占比 {_slow_fraction(hedged):.1%}, "
+            f"后端调用 {hedged_backend.calls} 次, 对冲率 {stats['hedge_rate']:.1%}, "
+            f"对冲胜出 {stats['hedge_wins']} 次, 触发延迟 {stats['delay_ms']:.1f}ms"
+        )
+
+        assert baseline_backend.calls == REQUEST_COUNT
+        # 慢请求（接近注入的慢调用耗时）占比显著下降；按占比断言，避免单个 p99 样本受调度抖动影响
+        assert _slow_fraction(hedged) < _slow_fraction(baseline) / 3
+        assert _percentile(hedged, 0.99) < _percentile(baseline, 0.99)
+        # 对冲率受上限约束，额外后端负载有界
+        assert stats["hedge_rate"] <= MAX_HEDGE_RATE
+        assert hedged_backend.calls <= REQUEST_COUNT * (1 + MAX_HEDGE_RATE)
+        assert stats["hedge_wins"] > 0
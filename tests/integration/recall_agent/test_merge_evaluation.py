@@ -0,0 +1,36 @@
+"""
+召回合并策略离线评测测试
+
+在标注评测集上对比 weighted 与 rrf 的 recall@k 和合并延迟。
+"""
+
+from pathlib import Path
+
+from src.agent.recall.evaluation import (
+    evaluate_merge_strategies,
+    format_report,
+    load_eval_set,
+)
+
+EVAL_SET_PATH = Path(__file__).resolve().parents[3] / "scripts" / "data" / "recall_merge_eval.json"
+
+
+class TestMergeStrategyEvaluation:
+    """测试合并策略评测"""
+
+    def test_rrf_vs_weighted(self):
+        """分数尺度不一致时 RRF 的 recall@1 不低于加权合并"""
+        eval_set = load_eval_set(EVAL_SET_PATH)
+        report = evaluate_merge_strategies(eval_set, ["weighted", "rrf"], k_values=(1, 3, 5))
+
+        print(f"\n评测集: {len(eval_set['queries'])} 条查询")
+        print(format_report(report))
+
+        for metrics in report.values():
+            for k in (1, 3, 5):
+                assert 0.0 <= metrics[f"recall@{k}"] <= 1.0
+            # 合并为纯内存计算，单次应在毫秒级以内
+            assert metrics["latency_p99_ms"] < 5.0
+
+        assert report["rrf"]["recall@1"] >= report["weighted"]["recall@1"]
+        assert report["rrf"]["recall@3"] >= report["weighted"]["recall@3"]
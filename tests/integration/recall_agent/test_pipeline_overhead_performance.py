@@ -0,0 +1,62 @@
+"""
+召回工作流执行方式性能测试
+
+对比 LangGraph 子图（graph）与直接顺序执行（direct）的单次调用开销。
+只启用 FAQ 和关键词召回（纯内存、亚毫秒级），关闭召回结果缓存，使编排开销成为主要耗时。
+"""
+
+import statistics
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.agent.recall.config import refresh_recall_snapshot
+from src.agent.recall.graph import invoke_recall_agent
+from src.agent.recall.schema import RecallRequest
+from src.core.config import settings
+
+WARMUP = 50
+ITERATIONS = 500
+QUERIES = ["你们的退货政策是什么？", "如何联系客服？", "怎么开发票", "会员有什么权益"]
+
+
+async def _measure(mode: str) -> list[float]:
+    """返回每次召回的耗时（微秒）"""
+    latencies = []
+    with patch.object(settings, "recall_pipeline_mode", mode), \
+         patch.object(settings, "recall_sources", ["faq", "keyword"]), \
+         patch.object(settings, "recall_cache_enabled", False):
+        refresh_recall_snapshot()
+        for i in range(WARMUP + ITERATIONS):
+            request = RecallRequest(
+                query=QUERIES[i % len(QUERIES)], session_id="s", trace_id=f"t{i}", top_k=5
+            )
+            start = time.perf_counter()
+            result = await invoke_recall_agent(request)
+            elapsed = (time.perf_counter() - start) * 1_000_000
+            assert result.source_stats
+            if i >= WARMUP:
+                latencies.append(elapsed)
+    return latencies
+
+
+class TestPipelineOverhead:
+    """graph / direct 执行开销对比"""
+
+    @pytest.mark.asyncio
+    async def test_direct_pipeline_has_lower_overhead(self):
+        graph_latencies = await _measure("graph")
+        direct_latencies = await _measure("direct")
+
+        graph_p50 = statistics.median(graph_latencies)
+        direct_p50 = statistics.median(direct_latencies)
+        print(
+            f"\ngraph:  p50 {graph_p50:.0f}µs, 平均 {statistics.mean(graph_latencies):.0f}µs"
+        )
+        print(
+            f"direct: p50 {direct_p50:.0f}µs, 平均 {statistics.mean(direct_latencies):.0f}µs"
+        )
+        print(f"每次调用节省: {graph_p50 - direct_p50:.0f}µs ({1 - direct_p50 / graph_p50:.0%})")
+
+        assert direct_p50 < graph_p50
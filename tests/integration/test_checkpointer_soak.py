@@ -0,0 +1,159 @@
+"""
+有界内存 Checkpointer 浸泡测试
+
+模拟 100k 个会话（每个请求使用新的会话 ID，与未携带会话 ID 的 /v1/chat/completions 流量一致），
+按 Agent 工作流一轮对话的 checkpoint 写入模式（输入、router、retrieve、llm 各一个 checkpoint 及其中间写入）
+直接调用 Checkpointer 接口，断言会话数、序列化数据量和进程 RSS 在会话数达到上限后不再增长。
+作为对照，MemorySaver 的内存随会话数线性增长。
+
+浸泡测试耗时约 20s，默认不运行（设置 RUN_SOAK_TESTS=1 启用）；
+测量在独立的子进程中进行，RSS 不受同一进程中其他测试的内存占用影响。
+"""
+
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.agent.main.checkpointer import BoundedMemorySaver
+
+CONVERSATIONS = 100_000
+WARMUP = 20_000
+MAX_THREADS = 2_000
+MAX_CHECKPOINTS = 3
+STEPS = ("__input__", "router", "retrieve", "llm")
+ANSWER = "根据知识库，商品签收后 7 天内支持无理由退货，退货运费由买家承担。" * 4
+
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        os.environ.get("RUN_SOAK_TESTS") != "1", reason="soak test, set RUN_SOAK_TESTS=1 to run"
+    ),
+    pytest.mark.skipif(
+        not sys.platform.startswith("linux"), reason="RSS is read from /proc/self/statm"
+    ),
+]
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def _conversation(saver, index: int) -> None:
+    """一轮对话：读取会话状态，依次写入各步骤的 checkpoint 和中间写入"""
+    config = {"configurable": {"thread_id": f"session-{index}", "checkpoint_ns": ""}}
+    saver.get_tuple(config)
+
+    messages = [f"用户问题 {index}: 退货政策是什么？"]
+    versions: dict[str, int] = {}
+    for step, name in enumerate(STEPS):
+        if name == "llm":
+            messages = messages + [ANSWER]
+        channels = {"messages": messages, "next_step": name, "tool_calls": [{"node": name}]}
+        new_versions = {channel: step + 1 for channel in channels}
+        versions.update(new_versions)
+
+        checkpoint = empty_checkpoint()  # id 按时间递增
+        checkpoint["channel_values"] = channels
+        checkpoint["channel_versions"] = dict(versions)
+        config = saver.put(config, checkpoint, {"source": "loop", "step": step}, new_versions)
+        saver.put_writes(config, [("next_step", name)], task_id=f"task-{step}")
+
+
+def _run(saver, start: int, count: int) -> None:
+    for index in range(start, start + count):
+        _conversation(saver, index)
+
+
+def _measure() -> dict[str, Any]:
+    """运行浸泡测试并返回测量结果（在子进程中执行）"""
+    saver = BoundedMemorySaver(
+        max_threads=MAX_THREADS, max_checkpoints_per_thread=MAX_CHECKPOINTS
+    )
+
+    start = time.perf_counter()
+    _run(saver, 0, WARMUP)
+    warm_rss = _rss_mb()
+    warm_stats = saver.stats()
+
+    _run(saver, WARMUP, CONVERSATIONS - WARMUP)
+    elapsed = time.perf_counter() - start
+    final_rss = _rss_mb()
+    final_stats = saver.stats()
+
+    # 对照：MemorySaver 的内存随会话数线性增长
+    reference = MemorySaver()
+    reference_start_rss = _rss_mb()
+    _run(reference, 0, WARMUP)
+    reference_growth = _rss_mb() - reference_start_rss
+    del reference
+    gc.collect()
+
+    return {
+        "elapsed": elapsed,
+        "warm_rss": warm_rss,
+        "final_rss": final_rss,
+        "warm_stats": warm_stats,
+        "final_stats": final_stats,
+        "final_blobs": len(saver.blobs),
+        "final_writes": len(saver.writes),
+        "reference_growth": reference_growth,
+    }
+
+
+class TestCheckpointerSoak:
+    """测试有界内存 Checkpointer 在大量会话下的内存占用"""
+
+    def test_bounded_rss_over_100k_conversations(self):
+        """会话数达到上限后，RSS 和序列化数据量不再随会话数增长"""
+        root = Path(__file__).resolve().parents[2]
+        completed = subprocess.run(
+            [sys.executable, "-m", "tests.integration.test_checkpointer_soak"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            timeout=300,
+            check=True,
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        elapsed = result["elapsed"]
+        warm_rss, final_rss = result["warm_rss"], result["final_rss"]
+        warm_stats, final_stats = result["warm_stats"], result["final_stats"]
+        reference_growth = result["reference_growth"]
+
+        print(f"\n有界内存 Checkpointer 浸泡测试（{CONVERSATIONS} 个会话，"
+              f"上限 {MAX_THREADS} 个会话 × {MAX_CHECKPOINTS} 个 checkpoint）:")
+        print(f"  耗时: {elapsed:.1f}s（{elapsed / CONVERSATIONS * 1e6:.0f}µs/会话）")
+        print(f"  RSS: {WARMUP} 个会话后 {warm_rss:.1f}MB → "
+              f"{CONVERSATIONS} 个会话后 {final_rss:.1f}MB")
+        print(f"  序列化数据: {warm_stats['serialized_bytes'] / 1024:.0f}KB → "
+              f"{final_stats['serialized_bytes'] / 1024:.0f}KB")
+        print(f"  淘汰会话: {final_stats['evicted']}，"
+              f"删除 checkpoint: {final_stats['pruned_checkpoints']}")
+        print(f"  对照 MemorySaver: {WARMUP} 个会话 RSS 增长 {reference_growth:.1f}MB"
+              f"（按线性外推 {CONVERSATIONS} 个会话约 "
+              f"{reference_growth * CONVERSATIONS / WARMUP:.0f}MB）")
+
+        assert final_stats["threads"] == MAX_THREADS
+        assert final_stats["checkpoints"] == MAX_THREADS * MAX_CHECKPOINTS
+        assert final_stats["evicted"] == CONVERSATIONS - MAX_THREADS
+        assert final_stats["pruned_checkpoints"] == CONVERSATIONS * (len(STEPS) - MAX_CHECKPOINTS)
+        assert final_stats["serialized_bytes"] <= warm_stats["serialized_bytes"] * 1.05
+        assert result["final_blobs"] == warm_stats["blobs"]
+        assert result["final_writes"] == warm_stats["writes"]
+        assert final_rss - warm_rss < 16
+
+
+if __name__ == "__main__":
+    print(json.dumps(_measure()))
@@ -0,0 +1,126 @@
+"""
+Embedding 连接池性能测试
+
+使用本地 HTTP/1.1 stub 服务器模拟 Embedding API，
+对比共享连接池与每次调用新建客户端的连接数和延迟。
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.services.http_client import close_http_client
+from src.services.providers.siliconflow_provider import SiliconFlowEmbeddings
+
+REQUEST_COUNT = 50
+
+
+class StubEmbeddingServer:
+    """支持 keep-alive 的最小 Embedding API 服务器，统计建立的 TCP 连接数"""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.connections = 0
+        self.requests = 0
+        self._server: asyncio.base_events.Server | None = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in head.decode().split("\r\n")[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                body = json.loads(await reader.readexactly(int(headers.get("content-length", "0"))))
+                self.requests += 1
+
+                inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                payload = json.dumps({
+                    "data": [{"embedding": [0.1] * self.dim, "index": i} for i in range(len(inputs))]
+                }).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _run_queries(base_url: str) -> float:
+    """顺序执行查询嵌入，返回平均延迟（毫秒）"""
+    embeddings = SiliconFlowEmbeddings(api_key="test-key", model="stub-model", base_url=base_url)
+    start = time.perf_counter()
+    for i in range(REQUEST_COUNT):
+        result = await embeddings.aembed_query(f"查询{i}")
+        assert len(result) == 8
+    return (time.perf_counter() - start) / REQUEST_COUNT * 1000
+
+
+class TestEmbeddingConnectionPool:
+    """测试 Embedding 请求的连接复用"""
+
+    @pytest.mark.asyncio
+    async def test_pooled_client_reuses_connection(self):
+        """共享连接池下所有请求复用同一连接；每次新建客户端则每个请求一个连接"""
+        await close_http_client()
+
+        pooled_server = StubEmbeddingServer()
+        pooled_url = await pooled_server.start()
+        try:
+            pooled_ms = await _run_queries(pooled_url)
+        finally:
+            await close_http_client()
+            await pooled_server.stop()
+
+        # 模拟旧实现：每次调用创建并关闭一个客户端
+        per_call_server = StubEmbeddingServer()
+        per_call_url = await per_call_server.start()
+
+        class PerCallSession:
+            async def __aenter__(self):
+                self.client = httpx.AsyncClient(timeout=30.0)
+                return self.client
+
+            async def __aexit__(self, *exc):
+                await self.client.aclose()
+
+        try:
+            with patch(
+                "src.services.providers.siliconflow_provider.http_client_session",
+                side_effect=lambda: PerCallSession(),
+            ):
+                per_call_ms = await _run_queries(per_call_url)
+        finally:
+            await per_call_server.stop()
+
+        print(f"共享连接池: {pooled_server.connections} 个连接, 平均延迟 {pooled_ms:.2f}ms")
+        print(f"每次新建客户端: {per_call_server.connections} 个连接, 平均延迟 {per_call_ms:.2f}ms")
+
+        assert pooled_server.requests == REQUEST_COUNT
+        assert per_call_server.requests == REQUEST_COUNT
+        assert pooled_server.connections == 1
+        assert per_call_server.connections == REQUEST_COUNT
@@ -0,0 +1,52 @@
+"""
+LLM 工厂性能测试
+
+对比每请求构造模型实例与复用缓存实例的开销。
+"""
+
+import time
+
+from src.services.llm_factory import clear_model_cache, create_embeddings, create_llm
+
+ITERATIONS = 200
+
+
+def _measure(factory, cached: bool) -> float:
+    """返回单次调用的平均耗时（微秒）"""
+    clear_model_cache()
+    factory()  # 预热（导入、tokenizer 初始化等一次性开销）
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        if not cached:
+            clear_model_cache()
+        factory()
+    elapsed = time.perf_counter() - start
+
+    clear_model_cache()
+    return elapsed / ITERATIONS * 1_000_000
+
+
+class TestLLMFactoryPerformance:
+    """测试模型实例缓存的构造开销"""
+
+    def test_llm_construction_overhead(self):
+        """缓存命中的开销应远低于每请求重新构造"""
+        uncached_us = _measure(create_llm, cached=False)
+        cached_us = _measure(create_llm, cached=True)
+
+        print(f"create_llm 每请求构造: {uncached_us:.1f}µs")
+        print(f"create_llm 缓存命中: {cached_us:.1f}µs")
+        print(f"加速比: {uncached_us / cached_us:.1f}x")
+
+        assert cached_us * 5 < uncached_us
+
+    def test_embeddings_construction_overhead(self):
+        """Embeddings 缓存命中的开销应低于每请求重新构造"""
+        uncached_us = _measure(create_embeddings, cached=False)
+        cached_us = _measure(create_embeddings, cached=True)
+
+        print(f"create_embeddings 每请求构造: {uncached_us:.1f}µs")
+        print(f"create_embeddings 缓存命中: {cached_us:.1f}µs")
+
+        assert cached_us < uncached_us
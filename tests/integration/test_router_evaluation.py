@@ -0,0 +1,63 @@
+"""
+路由离线评测测试
+
+在标注评测集上对比纯关键词路由与关键词 + 意图分类器路由的准确率、跳过检索比例和路由延迟。
+分类器使用本地字符二元组哈希向量代替 Embedding 服务（不依赖网络）；
+接入真实 Embedding 模型的评测见 scripts/eval_router.py。
+"""
+
+import hashlib
+import math
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.agent.main.evaluation import evaluate_routers, format_report, load_eval_set
+from src.agent.main.router import DEFAULT_INTENTS, IntentClassifier, RouterEngine
+from src.core.text_similarity import char_shingles
+
+EVAL_SET_PATH = Path(__file__).resolve().parents[2] / "scripts" / "data" / "router_eval.json"
+DIMENSIONS = 256
+
+
+class BigramHashEmbeddings(Embeddings):
+    """字符二元组哈希向量（离线评测用的轻量 Embeddings）"""
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = [0.0] * DIMENSIONS
+        for shingle in char_shingles(text):
+            digest = hashlib.md5(shingle.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "big") % DIMENSIONS] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+class TestRouterEvaluation:
+    """测试路由评测"""
+
+    @pytest.mark.asyncio
+    async def test_keywords_vs_classifier(self):
+        """分类器路由的准确率高于纯关键词路由，且路由延迟在毫秒级以内"""
+        eval_set = load_eval_set(EVAL_SET_PATH)
+        classifier = IntentClassifier(DEFAULT_INTENTS, BigramHashEmbeddings())
+        routers = {
+            "keywords": RouterEngine(),
+            "keywords+classifier": RouterEngine(classifier=classifier, min_similarity=0.1),
+        }
+
+        report, errors = await evaluate_routers(eval_set, routers)
+
+        print(f"\n评测集: {len(eval_set['queries'])} 条查询")
+        print(format_report(report))
+        for name, wrong in errors.items():
+            print(f"{name} 路由错误: {', '.join(wrong)}")
+
+        for metrics in report.values():
+            assert 0.0 <= metrics["accuracy"] <= 1.0
+        assert report["keywords"]["latency_p99_ms"] < 1.0
+        assert report["keywords+classifier"]["latency_p99_ms"] < 5.0
+        assert report["keywords+classifier"]["accuracy"] > report["keywords"]["accuracy"]
@@ -0,0 +1,115 @@
+"""
+推测式检索性能测试
+
+对比顺序执行（router → retrieve）与推测式检索（路由与召回并发）的端到端延迟和浪费的召回比例。
+路由和召回均为模拟延迟：路由耗时对应意图分类器的一次 Embedding 调用，召回耗时对应多源召回；
+路由结果使用路由评测集的标注（retrieve / direct 比例与线上流量接近）。
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.agent.main import speculative
+from src.agent.main.speculative import speculative_router_node, speculative_stats
+
+EVAL_SET_PATH = Path(__file__).resolve().parents[2] / "scripts" / "data" / "router_eval.json"
+ROUTER_DELAY = 0.03
+RECALL_DELAY = 0.08
+
+
+async def _router(state):
+    await asyncio.sleep(ROUTER_DELAY)
+    return {
+        "next_step": state["context"]["route"],
+        "tool_calls": state["tool_calls"] + [{"node": "router"}],
+    }
+
+
+async def _retrieve(state):
+    state["context"]["recall_calls"] += 1
+    await asyncio.sleep(RECALL_DELAY)
+    return {
+        "retrieved_docs": [{"content": "doc"}],
+        "confidence_score": 0.9,
+        "tool_calls": state["tool_calls"] + [{"node": "retrieve"}],
+    }
+
+
+async def _sequential(state):
+    route = await _router(state)
+    if route["next_step"] != "retrieve":
+        return route
+    state = {**state, **route}
+    return {**route, **await _retrieve(state)}
+
+
+def _states(queries: list[dict]) -> list[dict]:
+    return [
+        {
+            "messages": [HumanMessage(content=item["query"])],
+            "retrieved_docs": [],
+            "tool_calls": [],
+            "session_id": "perf",
+            "context": {"route": item["route"], "recall_calls": 0},
+        }
+        for item in queries
+    ]
+
+
+async def _run(node, states: list[dict]) -> dict[str, float]:
+    """并发执行所有查询，返回各路由的平均延迟和召回调用次数"""
+    latencies: dict[str, list[float]] = {"retrieve": [], "direct": []}
+
+    async def one(state):
+        start = time.perf_counter()
+        result = await node(state)
+        latencies[state["context"]["route"]].append((time.perf_counter() - start) * 1000)
+        assert ("retrieved_docs" in result) == (result["next_step"] == "retrieve")
+
+    await asyncio.gather(*(one(state) for state in states))
+    all_latencies = latencies["retrieve"] + latencies["direct"]
+    return {
+        "retrieve_ms": sum(latencies["retrieve"]) / len(latencies["retrieve"]),
+        "direct_ms": sum(latencies["direct"]) / len(latencies["direct"]),
+        "avg_ms": sum(all_latencies) / len(all_latencies),
+        "recall_calls": sum(state["context"]["recall_calls"] for state in states),
+    }
+
+
+class TestSpeculativeRetrievalPerformance:
+    """测试推测式检索的端到端延迟与浪费的召回"""
+
+    @pytest.mark.asyncio
+    async def test_latency_and_wasted_work(self, mocker):
+        """需要检索的查询节省路由耗时，浪费的召回比例等于 direct 路由的比例"""
+        mocker.patch.object(speculative, "router_node", side_effect=_router)
+        mocker.patch.object(speculative, "retrieve_node", side_effect=_retrieve)
+
+        queries = json.loads(EVAL_SET_PATH.read_text(encoding="utf-8"))["queries"]
+        direct_ratio = sum(item["route"] == "direct" for item in queries) / len(queries)
+
+        sequential = await _run(_sequential, _states(queries))
+        spec = await _run(speculative_router_node, _states(queries))
+        stats = speculative_stats()
+
+        print(f"\n推测式检索性能（{len(queries)} 条查询，路由 {ROUTER_DELAY * 1000:.0f}ms，"
+              f"召回 {RECALL_DELAY * 1000:.0f}ms，direct 占比 {direct_ratio:.0%}）:")
+        print(f"  需要检索的查询: 顺序 {sequential['retrieve_ms']:.1f}ms → "
+              f"推测式 {spec['retrieve_ms']:.1f}ms")
+        print(f"  跳过检索的查询: 顺序 {sequential['direct_ms']:.1f}ms → "
+              f"推测式 {spec['direct_ms']:.1f}ms")
+        print(f"  平均端到端延迟: 顺序 {sequential['avg_ms']:.1f}ms → 推测式 {spec['avg_ms']:.1f}ms")
+        print(f"  召回调用次数: 顺序 {sequential['recall_calls']} → 推测式 {spec['recall_calls']}")
+        print(f"  浪费的召回比例: {stats['wasted_ratio']:.1%}"
+              f"（取消 {stats['cancelled']}，丢弃 {stats['discarded']}）")
+
+        assert spec["retrieve_ms"] < sequential["retrieve_ms"] - ROUTER_DELAY * 1000 * 0.5
+        assert spec["direct_ms"] < sequential["direct_ms"] + 20
+        assert spec["recall_calls"] == len(queries)
+        assert stats["wasted_ratio"] == pytest.approx(direct_ratio)
+        assert stats["cancelled"] == len(queries) - sequential["recall_calls"]
@@ -0,0 +1,113 @@
+"""
+流式响应性能测试
+
+使用带延迟的假流式 LLM 测量 /v1/chat/completions 的首 token 延迟（TTFT）。
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.agent.main.graph import create_agent_graph
+from src.api.v1.openai_compat import _stream_response
+from src.core.config import settings
+
+TOKENS = ["您好", "，", "我们", "提供", "30", "天", "无理由", "退货", "服务", "。"] * 3
+TOKEN_DELAY_S = 0.02
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """每个 token 间隔固定延迟的假流式 LLM"""
+
+    tokens: list[str]
+    delay_s: float
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def _generate(self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.delay_s * len(self.tokens))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(self.tokens)))])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.delay_s * len(self.tokens))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(self.tokens)))])
+
+    async def _astream(self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        for token in self.tokens:
+            await asyncio.sleep(self.delay_s)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+async def _measure_stream(streaming_enabled: bool) -> dict[str, Any]:
+    """执行一次流式请求，返回 TTFT、总耗时、内容分片数和拼接后的内容"""
+    app = create_agent_graph().compile(checkpointer=MemorySaver())
+    fake_llm = FakeStreamingChatModel(tokens=TOKENS, delay_s=TOKEN_DELAY_S)
+
+    with patch("src.api.v1.openai_compat.get_agent_app", return_value=app), \
+            patch("src.agent.main.nodes.create_llm", return_value=fake_llm), \
+            patch.object(settings, "llm_streaming_enabled", streaming_enabled):
+        start = time.perf_counter()
+        ttft = None
+        content_chunks = []
+        async for line in _stream_response(
+            user_message="你好",
+            session_id=f"bench-{streaming_enabled}",
+            completion_id="chatcmpl-bench",
+            created_timestamp=0,
+            model="deepseek-chat",
+            requested_model="deepseek-chat",
+        ):
+            payload = line.removeprefix("data: ").strip()
+            if payload == "[DONE]":
+                continue
+            delta = json.loads(payload)["choices"][0]["delta"]
+            if delta.get("content"):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                content_chunks.append(delta["content"])
+        total = time.perf_counter() - start
+
+    return {
+        "ttft": ttft,
+        "total": total,
+        "chunks": len(content_chunks),
+        "content": "".join(content_chunks),
+    }
+
+
+class TestStreamingTTFT:
+    """测试 token 级流式输出的首 token 延迟"""
+
+    @pytest.mark.asyncio
+    async def test_token_streaming_ttft(self):
+        """token 模式下首 token 延迟应远小于完整生成时间"""
+        token_mode = await _measure_stream(streaming_enabled=True)
+        node_mode = await _measure_stream(streaming_enabled=False)
+
+        print(f"token 模式: TTFT={token_mode['ttft'] * 1000:.1f}ms, 总耗时={token_mode['total'] * 1000:.1f}ms, 分片数={token_mode['chunks']}")
+        print(f"节点模式: TTFT={node_mode['ttft'] * 1000:.1f}ms, 总耗时={node_mode['total'] * 1000:.1f}ms, 分片数={node_mode['chunks']}")
+
+        # 两种模式输出内容一致
+        assert token_mode["content"] == "".join(TOKENS)
+        assert node_mode["content"] == "".join(TOKENS)
+
+        # token 模式逐 token 推送，节点模式一次性推送
+        assert token_mode["chunks"] == len(TOKENS)
+        assert node_mode["chunks"] == 1
+
+        # token 模式首 token 延迟应小于完整生成时间的一半
+        assert token_mode["ttft"] < token_mode["total"] / 2
+        assert token_mode["ttft"] < node_mode["ttft"] / 2
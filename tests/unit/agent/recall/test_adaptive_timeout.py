@@ -0,0 +1,150 @@
+"""
+自适应召回超时单元测试
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.agent.recall.latency import (
+    LatencyTracker,
+    effective_timeout_ms,
+    get_latency_tracker,
+    latency_stats,
+)
+from src.agent.recall.nodes import fanout_node
+from src.agent.recall.schema import RecallHit, RecallRequest
+from src.core.config import settings
+
+
+def _fill(source_name: str, latency_ms: float, count: int) -> None:
+    tracker = get_latency_tracker(source_name)
+    for _ in range(count):
+        tracker.record(latency_ms)
+
+
+class TestEffectiveTimeout:
+    """有效超时计算"""
+
+    def test_ceiling_without_samples(self):
+        assert effective_timeout_ms("faq", 3000) == 3000
+
+    def test_ceiling_below_min_samples(self):
+        _fill("faq", 2.0, settings.recall_adaptive_timeout_min_samples - 1)
+
+        assert effective_timeout_ms("faq", 3000) == 3000
+
+    def test_percentile_times_factor(self, mocker):
+        mocker.patch.object(settings, "recall_adaptive_timeout_factor", 3.0)
+        _fill("vector", 100.0, 99)
+        _fill("vector", 400.0, 1)
+
+        # p99 = 400ms（100 个样本的第 99 位）
+        assert effective_timeout_ms("vector", 3000) == 1200.0
+
+    def test_clamped(self):
+        _fill("faq", 1.0, 100)
+        _fill("vector", 5000.0, 100)
+
+        assert effective_timeout_ms("faq", 3000) == settings.recall_adaptive_timeout_min_ms
+        assert effective_timeout_ms("vector", 3000) == 3000
+
+    def test_disabled(self, mocker):
+        mocker.patch.object(settings, "recall_adaptive_timeout_enabled", False)
+        _fill("faq", 1.0, 100)
+
+        assert effective_timeout_ms("faq", 3000) == 3000
+
+    def test_histogram_and_stats(self):
+        tracker = LatencyTracker()
+        for value in (1.0, 5.0, 7.0, 30.0, 20000.0):
+            tracker.record(value)
+
+        histogram = tracker.histogram()
+        assert histogram["le_5"] == 2
+        assert histogram["le_10"] == 1
+        assert histogram["le_50"] == 1
+        assert histogram["le_inf"] == 1
+
+        _fill("faq", 2.0, 100)
+        stats = latency_stats(3000)
+        assert stats["faq"]["samples"] == 100
+        assert stats["faq"]["timeout_ms"] == settings.recall_adaptive_timeout_min_ms
+        assert "experiment_timeout_ms" not in stats["faq"]
+
+    def test_latency_stats_uses_experiment_timeouts(self):
+        """实验覆盖 timeout_ms 时按实验的超时上限计算有效超时"""
+        _fill("vector", 1000.0, 100)
+
+        stats = latency_stats(1500, {"long_timeout": 5000})
+
+        assert stats["vector"]["timeout_ms"] == 1500
+        assert stats["vector"]["experiment_timeout_ms"] == {"long_timeout": 2000.0}
+
+    def test_ceiling_when_window_is_empty(self, mocker):
+        """样本数门槛为 0 且没有样本时使用超时上限"""
+        mocker.patch.object(settings, "recall_adaptive_timeout_min_samples", 0)
+        get_latency_tracker("faq")
+
+        assert effective_timeout_ms("faq", 3000) == 3000
+
+
+class TestFanoutAdaptiveTimeout:
+    """fanout_node 按召回源使用独立超时"""
+
+    @pytest.fixture
+    def sources(self, mocker):
+        async def fast_acquire(request):
+            await asyncio.sleep(0.01)
+            return [RecallHit(
+                source="vector", score=0.9, confidence=0.9, reason="向量匹配", content="向量内容", metadata={}
+            )]
+
+        async def slow_acquire(request):
+            await asyncio.sleep(0.3)
+            return []
+
+        vector = mocker.MagicMock()
+        vector.acquire = fast_acquire
+        faq = mocker.MagicMock()
+        faq.acquire = slow_acquire
+        instances = {"vector": vector, "faq": faq}
+        mocker.patch('src.agent.recall.nodes.get_source', side_effect=instances.get)
+        return instances
+
+    @pytest.mark.asyncio
+    async def test_fast_source_gets_short_timeout(self, sources):
+        # FAQ 历史延迟约 2ms → 有效超时为下限 50ms，而不是 1000ms 的总超时
+        _fill("faq", 2.0, 100)
+
+        state = {
+            "request": RecallRequest(query="测试", session_id="s", trace_id="t"),
+            "config": {"sources": ["vector", "faq"], "timeout_ms": 1000, "retry": 0},
+        }
+
+        start = time.perf_counter()
+        result = await fanout_node(state)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.25
+        stats = result["source_stats"]
+        assert stats["faq"].status == "timeout"
+        assert stats["faq"].timeout_ms == settings.recall_adaptive_timeout_min_ms
+        assert stats["vector"].status == "ok"
+        assert stats["vector"].timeout_ms == 1000
+        assert [hit.source for hit in result["hits"]] == ["vector"]
+
+    @pytest.mark.asyncio
+    async def test_latencies_recorded(self, sources):
+        state = {
+            "request": RecallRequest(query="测试", session_id="s", trace_id="t"),
+            "config": {"sources": ["vector", "faq"], "timeout_ms": 100, "retry": 0},
+        }
+
+        await fanout_node(state)
+
+        # 成功和超时都计入延迟样本
+        assert len(get_latency_tracker("vector")) == 1
+        assert len(get_latency_tracker("faq")) == 1
+        assert get_latency_tracker("faq").percentile(0.5) >= 100
@@ -2,30 +2,30 @@
 召回配置单元测试
 """
 
-from unittest.mock import patch
+import pytest
 
-from src.agent.recall.config import load_recall_config, parse_source_weights, validate_recall_config
+from src.agent.recall.config import (
+    build_recall_snapshot,
+    get_recall_snapshot,
+    parse_source_weights,
+    refresh_recall_snapshot,
+    validate_recall_config,
+)
+from src.core.config import Settings, settings
 
 
-class TestLoadRecallConfig:
-    """测试配置加载"""
+class TestBuildRecallConfig:
+    """测试从配置编译召回配置"""
 
-    @patch('src.agent.recall.config.settings')
-    def test_load_recall_config_basic(self, mock_settings):
+    def test_build_recall_config_basic(self):
         """测试基础配置加载"""
-        mock_settings.recall_sources = ["vector", "faq"]
-        mock_settings.recall_source_weights = "vector:1.0,faq:0.8"
-        mock_settings.recall_timeout_ms = 3000
-        mock_settings.recall_retry = 1
-        mock_settings.recall_merge_strategy = "weighted"
-        mock_settings.recall_degrade_threshold = 0.5
-        mock_settings.recall_fallback_enabled = True
-        mock_settings.recall_experiment_enabled = False
-        mock_settings.recall_experiment_platform = None
-
-        config = load_recall_config()
-
-        assert config["sources"] == ["vector", "faq"]
+        snapshot = build_recall_snapshot(_settings(
+            recall_source_weights="vector:1.0,faq:0.8",
+            recall_timeout_ms=3000,
+        ))
+        config = snapshot.base
+
+        assert config["sources"] == ("vector", "faq")
         assert config["weights"]["vector"] == 1.0
         assert config["weights"]["faq"] == 0.8
         assert config["timeout_ms"] == 3000
@@ -34,25 +34,13 @@ class TestLoadRecallConfig:
         assert config["degrade_threshold"] == 0.5
         assert config["fallback_enabled"] is True
         assert config["experiment_enabled"] is False
-        assert config["experiment_platform"] is None
 
-    @patch('src.agent.recall.config.settings')
-    def test_load_recall_config_with_experiment(self, mock_settings):
+    def test_build_recall_config_with_experiment(self):
         """测试实验配置"""
-        mock_settings.recall_sources = ["vector"]
-        mock_settings.recall_source_weights = "vector:1.0"
-        mock_settings.recall_timeout_ms = 3000
-        mock_settings.recall_retry = 1
-        mock_settings.recall_merge_strategy = "weighted"
-        mock_settings.recall_degrade_threshold = 0.5
-        mock_settings.recall_fallback_enabled = True
-        mock_settings.recall_experiment_enabled = True
-        mock_settings.recall_experiment_platform = "internal"
-
-        config = load_recall_config()
+        snapshot = build_recall_snapshot(_settings(recall_experiment_enabled=True))
 
-        assert config["experiment_enabled"] is True
-        assert config["experiment_platform"] == "internal"
+        assert snapshot.base["experiment_enabled"] is True
+        assert snapshot.config_for("exp-recall-v2") is not snapshot.base
 
 
 class TestParseSourceWeights:
@@ -193,3 +181,106 @@ class TestValidateRecallConfig:
         # 应该为缺失的源设置默认权重
         assert "faq" in config["weights"]
         assert config["weights"]["faq"] == 1.0
+
+
+def _settings(**overrides) -> Settings:
+    """构造召回配置对象（真实 Settings 的副本）"""
+    options = {
+        "recall_sources": ["vector", "faq"],
+        "recall_source_weights": "vector:1.0",
+        "recall_timeout_ms": 500,
+        "recall_retry": 1,
+        "recall_merge_strategy": "weighted",
+        "recall_custom_merge_strategy": "",
+        "recall_rrf_k": 60,
+        "recall_early_exit_enabled": False,
+        "recall_early_exit_threshold": 0.9,
+        "recall_early_exit_sources": ["faq"],
+        "recall_near_dup_enabled": True,
+        "recall_near_dup_threshold": 0.8,
+        "recall_degrade_threshold": 0.5,
+        "recall_fallback_enabled": True,
+        "recall_experiment_enabled": False,
+        "recall_experiment_config_path": None,
+    }
+    options.update(overrides)
+    return settings.model_copy(update=options)
+
+
+class TestRecallConfigSnapshot:
+    """测试召回配置快照"""
+
+    def test_base_config(self):
+        snapshot = build_recall_snapshot(_settings())
+
+        assert snapshot.base["sources"] == ("vector", "faq")
+        # 未配置权重的召回源默认 1.0
+        assert snapshot.base["weights"] == {"vector": 1.0, "faq": 1.0}
+        assert snapshot.base["early_exit_threshold"] is None
+        assert snapshot.base["near_dup_threshold"] == 0.8
+        assert snapshot.config_for(None) is snapshot.base
+
+    def test_snapshot_is_read_only(self):
+        snapshot = build_recall_snapshot(_settings())
+
+        with pytest.raises(TypeError):
+            snapshot.base["timeout_ms"] = 1000
+        # 嵌套的权重和召回源列表同样只读（快照在请求间共享）
+        with pytest.raises(TypeError):
+            snapshot.base["weights"]["vector"] = 0.0
+        assert isinstance(snapshot.base["sources"], tuple)
+        assert isinstance(snapshot.base["early_exit_sources"], tuple)
+
+    def test_experiment_config_is_read_only(self):
+        snapshot = build_recall_snapshot(_settings(recall_experiment_enabled=True))
+        config = snapshot.config_for("exp-recall-v2")
+
+        with pytest.raises(TypeError):
+            config["weights"]["keyword"] = 1.0
+        assert isinstance(config["sources"], tuple)
+
+    def test_experiment_overlays_precomputed(self):
+        snapshot = build_recall_snapshot(_settings(recall_experiment_enabled=True))
+
+        config = snapshot.config_for("exp-recall-v2")
+        assert config["sources"] == ("vector", "faq", "keyword")
+        assert config["timeout_ms"] == 5000
+        assert config["weights"]["keyword"] == 0.1
+
+        adjusted = snapshot.config_for("exp-weight-adjust")
+        assert adjusted["weights"] == {"vector": 0.4, "faq": 0.6}
+        assert adjusted["sources"] == ("vector", "faq")
+
+        assert snapshot.config_for("unknown") is snapshot.base
+
+    def test_experiments_ignored_when_disabled(self):
+        snapshot = build_recall_snapshot(_settings())
+
+        assert snapshot.config_for("exp-recall-v2") is snapshot.base
+
+    def test_near_dup_disabled(self):
+        snapshot = build_recall_snapshot(_settings(recall_near_dup_enabled=False))
+
+        assert snapshot.base["near_dup_threshold"] is None
+
+    def test_fingerprint(self):
+        first = build_recall_snapshot(_settings())
+        same = build_recall_snapshot(_settings())
+        changed = build_recall_snapshot(_settings(recall_timeout_ms=800))
+
+        assert first.fingerprint == same.fingerprint
+        assert first.fingerprint != changed.fingerprint
+
+    def test_snapshot_reused_until_refresh(self):
+        source = _settings()
+
+        snapshot = get_recall_snapshot(source)
+        source.recall_timeout_ms = 800
+
+        assert get_recall_snapshot(source) is snapshot
+        assert refresh_recall_snapshot(source).base["timeout_ms"] == 800
+
+    def test_snapshot_rebuilt_for_other_settings_object(self):
+        snapshot = get_recall_snapshot(_settings())
+
+        assert get_recall_snapshot(_settings(recall_retry=2)) is not snapshot
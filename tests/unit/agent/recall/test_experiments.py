@@ -0,0 +1,245 @@
+"""
+单元测试: 召回实验注册表、分桶和实验指标
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.agent.recall.cache import recall_cache_key
+from src.agent.recall.config import get_recall_snapshot, refresh_recall_snapshot
+from src.agent.recall.experiments import (
+    BUCKETS,
+    DEFAULT_EXPERIMENTS,
+    Experiment,
+    bucket_of,
+    experiment_for_bucket,
+    experiment_stats,
+    load_experiments,
+    parse_experiments,
+    traffic_allocation,
+)
+from src.agent.recall.graph import invoke_recall_agent
+from src.agent.recall.nodes import prepare_node
+from src.agent.recall.reload import reload_config
+from src.agent.recall.schema import RecallRequest
+from src.core.config import settings
+
+REGISTRY = {
+    "salt": "test-salt",
+    "experiments": [
+        {
+            "id": "exp-cheap",
+            "traffic": 0.5,
+            "overrides": {"sources": ["faq"], "top_k": 2},
+        },
+        {"id": "exp-manual", "overrides": {"timeout_ms": 200}},
+    ],
+}
+
+
+def _request(session_id: str, experiment_id: str | None = None) -> RecallRequest:
+    return RecallRequest(
+        query="你们的退货政策是什么？",
+        session_id=session_id,
+        trace_id="t",
+        experiment_id=experiment_id,
+    )
+
+
+def _session_in(experiment_id: str | None) -> str:
+    """找到一个分桶落入指定实验的 session_id"""
+    allocation = traffic_allocation(parse_experiments(REGISTRY)[1])
+    for i in range(1000):
+        session_id = f"session-{i}"
+        if experiment_for_bucket(bucket_of(session_id, "test-salt"), allocation) == experiment_id:
+            return session_id
+    raise AssertionError("no session found")
+
+
+@pytest.fixture
+def registry_file(tmp_path):
+    path = tmp_path / "experiments.json"
+    path.write_text(json.dumps(REGISTRY), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def experiments_enabled(registry_file):
+    """启用实验并使用测试注册表"""
+    with patch.object(settings, "recall_experiment_enabled", True), \
+         patch.object(settings, "recall_experiment_config_path", str(registry_file)), \
+         patch.object(settings, "recall_sources", ["faq", "keyword"]):
+        refresh_recall_snapshot()
+        yield
+
+
+class TestRegistry:
+    """实验注册表加载与校验"""
+
+    def test_default_registry(self):
+        salt, experiments = load_experiments(None)
+
+        assert experiments == DEFAULT_EXPERIMENTS
+        assert {e.id for e in experiments} == {"exp-recall-v2", "exp-weight-adjust"}
+        assert traffic_allocation(experiments) == ()
+
+    def test_load_from_file(self, registry_file):
+        salt, experiments = load_experiments(str(registry_file))
+
+        assert salt == "test-salt"
+        assert experiments[0] == Experiment(
+            id="exp-cheap", traffic=0.5, overrides={"sources": ["faq"], "top_k": 2}
+        )
+        assert experiments[1].traffic == 0.0
+
+    @pytest.mark.parametrize("experiments, message", [
+        ([{"id": "a"}, {"id": "a"}], "Duplicate experiment id"),
+        ([{"id": "control"}], "Invalid experiment id"),
+        ([{"id": "a", "traffic": 1.5}], "Invalid traffic"),
+        ([{"id": "a", "traffic": 0.6}, {"id": "b", "traffic": 0.6}], "exceeds 1.0"),
+        ([{"id": "a", "overrides": {"query": "x"}}], "Unsupported experiment override: query"),
+    ])
+    def test_invalid_registry(self, experiments, message):
+        with pytest.raises(ValueError, match=message):
+            parse_experiments({"experiments": experiments})
+
+
+class TestBucketing:
+    """分桶测试"""
+
+    def test_deterministic(self):
+        assert bucket_of("session-1") == bucket_of("session-1")
+        assert 0 <= bucket_of("session-1") < BUCKETS
+        assert bucket_of("session-1", "salt-a") != bucket_of("session-1", "salt-b")
+
+    def test_allocation_boundaries(self):
+        allocation = traffic_allocation((
+            Experiment(id="a", traffic=0.1),
+            Experiment(id="manual"),
+            Experiment(id="b", traffic=0.2),
+        ))
+
+        assert allocation == ((1000, "a"), (3000, "b"))
+        assert experiment_for_bucket(0, allocation) == "a"
+        assert experiment_for_bucket(999, allocation) == "a"
+        assert experiment_for_bucket(1000, allocation) == "b"
+        assert experiment_for_bucket(2999, allocation) == "b"
+        assert experiment_for_bucket(3000, allocation) is None
+
+    def test_traffic_split(self):
+        allocation = traffic_allocation((Experiment(id="a", traffic=0.1),))
+
+        assigned = sum(
+            experiment_for_bucket(bucket_of(f"session-{i}"), allocation) == "a"
+            for i in range(20000)
+        )
+
+        assert 0.09 < assigned / 20000 < 0.11
+
+
+class TestExperimentAssignment:
+    """实验分配与配置覆盖"""
+
+    def test_experiments_disabled(self):
+        snapshot = get_recall_snapshot()
+
+        assert snapshot.allocation == ()
+        assert snapshot.resolve_experiment(_request("s")) is None
+
+    def test_resolve(self, experiments_enabled):
+        snapshot = get_recall_snapshot()
+
+        assert snapshot.resolve_experiment(_request(_session_in("exp-cheap"))) == "exp-cheap"
+        assert snapshot.resolve_experiment(_request(_session_in(None))) is None
+        # 显式指定的实验优先
+        assert snapshot.resolve_experiment(
+            _request(_session_in("exp-cheap"), experiment_id="exp-manual")
+        ) == "exp-manual"
+
+    @pytest.mark.asyncio
+    async def test_prepare_applies_overrides(self, experiments_enabled):
+        result = await prepare_node({"request": _request(_session_in("exp-cheap"))})
+
+        assert result["config"]["experiment_id"] == "exp-cheap"
+        assert result["config"]["sources"] == ("faq",)
+        assert result["request"].experiment_id == "exp-cheap"
+        assert result["request"].top_k == 2
+
+    @pytest.mark.asyncio
+    async def test_prepare_control(self, experiments_enabled):
+        request = _request(_session_in(None))
+
+        result = await prepare_node({"request": request})
+
+        assert result["config"]["sources"] == ("faq", "keyword")
+        assert result["request"] is request
+
+    def test_cache_key_per_experiment(self, experiments_enabled):
+        cheap = recall_cache_key(_request(_session_in("exp-cheap")))
+        control = recall_cache_key(_request(_session_in(None)))
+
+        assert cheap != control
+
+
+class TestExperimentMetrics:
+    """实验指标"""
+
+    @pytest.mark.asyncio
+    async def test_metrics_per_experiment(self, experiments_enabled):
+        with patch.object(settings, "recall_cache_enabled", False):
+            cheap = await invoke_recall_agent(_request(_session_in("exp-cheap")))
+            await invoke_recall_agent(_request(_session_in(None)))
+            await invoke_recall_agent(_request(_session_in(None)))
+
+        assert cheap.experiment_id == "exp-cheap"
+        assert len(cheap.hits) <= 2
+        assert set(cheap.source_stats) == {"faq"}
+
+        stats = experiment_stats()
+        assert stats["exp-cheap"]["requests"] == 1
+        assert stats["control"]["requests"] == 2
+        assert stats["control"]["hit_rate"] == 1.0
+        assert stats["control"]["p50_ms"] is not None
+
+    @pytest.mark.asyncio
+    async def test_not_recorded_when_disabled(self):
+        with patch.object(settings, "recall_cache_enabled", False), \
+             patch.object(settings, "recall_sources", ["faq"]):
+            refresh_recall_snapshot()
+            await invoke_recall_agent(_request("s"))
+
+        assert experiment_stats() == {}
+
+
+class TestReloadRegistry:
+    """实验注册表热重载"""
+
+    @pytest.mark.asyncio
+    async def test_reload_picks_up_file_change(self, experiments_enabled, registry_file):
+        before = get_recall_snapshot()
+        registry_file.write_text(
+            json.dumps({"experiments": [{"id": "exp-new", "traffic": 1.0}]}), encoding="utf-8"
+        )
+
+        with patch("src.agent.recall.reload.load_settings", side_effect=settings.model_copy):
+            result = await reload_config()
+
+        snapshot = get_recall_snapshot()
+        assert result["fingerprint"] == snapshot.fingerprint != before.fingerprint
+        assert snapshot.resolve_experiment(_request("any")) == "exp-new"
+
+    @pytest.mark.asyncio
+    async def test_invalid_file_rejected(self, experiments_enabled, registry_file):
+        before = get_recall_snapshot()
+        registry_file.write_text(
+            json.dumps({"experiments": [{"id": "x", "overrides": {"sources": ["missing"]}}]}),
+            encoding="utf-8",
+        )
+
+        with patch("src.agent.recall.reload.load_settings", side_effect=settings.model_copy):
+            with pytest.raises(ValueError, match="Unsupported recall source: missing"):
+                await reload_config()
+
+        assert get_recall_snapshot() is before
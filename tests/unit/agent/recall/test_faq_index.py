@@ -0,0 +1,99 @@
+"""
+FAQ 倒排索引单元测试
+
+验证索引模式与逐条扫描（兼容模式）的召回结果完全一致。
+"""
+
+import random
+from unittest.mock import patch
+
+import pytest
+
+from src.agent.recall.schema import RecallRequest
+from src.agent.recall.sources.faq_source import FAQIndex, FAQRecallSource
+from src.core.config import settings
+
+VOCAB = [
+    "退货", "退款", "配送", "快递", "发票", "会员", "积分", "支付", "微信", "支付宝",
+    "客服", "电话", "密码", "账号", "登录", "保修", "维修", "价格", "优惠", "订单",
+    "API", "sdk", "App", "30天", "7天", "工作日", "无理由", "包邮",
+]
+
+
+def _make_faqs(count: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    faqs = []
+    for i in range(count):
+        faqs.append({
+            "id": f"faq_{i:05d}",
+            "question": "".join(rng.sample(VOCAB, 3)) + "怎么办？",
+            "answer": " ".join(rng.sample(VOCAB, 4)) + "，详见帮助中心。",
+            "category": "测试",
+            "keywords": rng.sample(VOCAB, 3),
+        })
+    return faqs
+
+
+def _make_queries(count: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    queries = ["", " ", "退", "怎么办", "完全不相关", "api 文档", "App 登录 密码"]
+    for _ in range(count):
+        words = rng.sample(VOCAB, rng.randint(1, 3))
+        separator = rng.choice(["", " ", "的"])
+        queries.append(separator.join(words) + rng.choice(["", "？", "吗"]))
+    return queries
+
+
+async def _acquire_all(source: FAQRecallSource, queries: list[str], index_enabled: bool) -> list:
+    results = []
+    with patch.object(settings, "recall_faq_index_enabled", index_enabled):
+        for query in queries:
+            request = RecallRequest(query=query, session_id="s", trace_id="t", top_k=10)
+            hits = await source.acquire(request)
+            results.append([(h.metadata["faq_id"], h.score) for h in hits])
+    return results
+
+
+class TestFAQIndex:
+    """测试 FAQ 倒排索引"""
+
+    @pytest.mark.asyncio
+    async def test_index_matches_scan(self):
+        """索引模式与扫描模式的结果（含顺序与分数）一致"""
+        source = FAQRecallSource(faq_data=_make_faqs(500))
+        queries = _make_queries(200)
+
+        indexed = await _acquire_all(source, queries, index_enabled=True)
+        scanned = await _acquire_all(source, queries, index_enabled=False)
+
+        assert indexed == scanned
+        assert any(indexed)  # 至少部分查询有结果
+
+    @pytest.mark.asyncio
+    async def test_default_faqs_match_scan(self):
+        """内置 FAQ 的结果与扫描一致"""
+        source = FAQRecallSource()
+        queries = ["退货政策", "如何联系客服", "配送 时间", "支付宝", "你们的退货政策是什么？"]
+
+        indexed = await _acquire_all(source, queries, index_enabled=True)
+        scanned = await _acquire_all(source, queries, index_enabled=False)
+
+        assert indexed == scanned
+
+    def test_candidates_are_subset(self):
+        """候选只包含可能得分的 FAQ"""
+        faqs = [
+            {"id": "a", "question": "如何退货？", "answer": "30天内可退", "category": "", "keywords": ["退货"]},
+            {"id": "b", "question": "如何开发票？", "answer": "订单详情申请", "category": "", "keywords": ["发票"]},
+        ]
+        index = FAQIndex(faqs)
+
+        assert index.candidates("我要退货") == [0]
+        assert index.candidates("发票") == [1]
+        assert index.candidates("如何") == [0, 1]
+        assert index.candidates("天气") == []
+        assert len(index) == 2
+
+    def test_default_index_shared(self):
+        """内置 FAQ 的索引在实例间共享"""
+        assert FAQRecallSource()._index is FAQRecallSource()._index
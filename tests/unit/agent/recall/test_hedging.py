@@ -0,0 +1,240 @@
+"""
+对冲请求单元测试
+"""
+
+import asyncio
+
+import pytest
+
+from src.agent.recall.hedging import Hedger, get_hedger, hedger_stats
+from src.agent.recall.latency import LatencyTracker
+from src.agent.recall.schema import RecallRequest
+from src.agent.recall.sources.vector_source import VectorRecallSource
+from src.core.config import settings
+
+
+def _warm_hedger(**kwargs) -> Hedger:
+    """创建已有延迟样本（约 10ms）的 Hedger"""
+    options = {"percentile": 0.9, "min_delay_ms": 0.0, "max_hedge_rate": 1.0, "min_samples": 5}
+    options.update(kwargs)
+    hedger = Hedger(**options)
+    for _ in range(10):
+        hedger._latency.record(10.0)
+    return hedger
+
+
+class TestLatencyTracker:
+    """延迟统计测试"""
+
+    def test_percentile(self):
+        tracker = LatencyTracker(window_size=100)
+        for value in range(1, 101):
+            tracker.record(float(value))
+
+        assert tracker.percentile(0.5) == 51.0
+        assert tracker.percentile(0.95) == 96.0
+        assert tracker.percentile(1.0) == 100.0
+
+    def test_empty(self):
+        assert LatencyTracker().percentile(0.95) is None
+
+    def test_window(self):
+        tracker = LatencyTracker(window_size=3)
+        for value in (100.0, 1.0, 2.0, 3.0):
+            tracker.record(value)
+
+        assert len(tracker) == 3
+        assert tracker.percentile(1.0) == 3.0
+
+
+class TestHedger:
+    """对冲执行器测试"""
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_samples(self):
+        hedger = Hedger(min_samples=5)
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return "primary"
+
+        assert await hedger.run(call) == "primary"
+        assert calls == 1
+        assert hedger.hedges == 0
+        assert hedger.hedge_delay_ms() is None
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_not_hedged(self):
+        hedger = _warm_hedger()
+
+        async def primary():
+            return "primary"
+
+        async def hedge():
+            raise AssertionError("hedge should not run")
+
+        assert await hedger.run(primary, hedge) == "primary"
+        assert hedger.hedges == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_hedged(self):
+        hedger = _warm_hedger()
+        primary_cancelled = asyncio.Event()
+
+        async def primary():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+            return "primary"
+
+        async def hedge():
+            return "hedge"
+
+        result = await asyncio.wait_for(hedger.run(primary, hedge), timeout=1)
+
+        assert result == "hedge"
+        assert hedger.hedges == 1
+        assert hedger.hedge_wins == 1
+        await asyncio.wait_for(primary_cancelled.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_primary_latency_recorded(self):
+        """输给对冲请求的慢主请求的已耗时计入延迟样本（不只记录较快的对冲请求）"""
+        hedger = _warm_hedger()
+
+        async def primary():
+            await asyncio.sleep(5)
+            return "primary"
+
+        async def hedge():
+            await asyncio.sleep(0.03)
+            return "hedge"
+
+        assert await asyncio.wait_for(hedger.run(primary, hedge), timeout=1) == "hedge"
+        await asyncio.sleep(0)
+
+        # 10 个预置样本 + 对冲请求 + 被取消的主请求
+        assert len(hedger._latency) == 12
+        assert hedger._latency.percentile(1.0) >= 30
+
+    @pytest.mark.asyncio
+    async def test_hedge_failure_falls_back_to_primary(self):
+        hedger = _warm_hedger()
+
+        async def primary():
+            await asyncio.sleep(0.05)
+            return "primary"
+
+        async def hedge():
+            raise RuntimeError("replica down")
+
+        assert await hedger.run(primary, hedge) == "primary"
+        assert hedger.hedge_wins == 0
+
+    @pytest.mark.asyncio
+    async def test_both_fail_raises(self):
+        hedger = _warm_hedger()
+
+        async def primary():
+            await asyncio.sleep(0.03)
+            raise RuntimeError("primary down")
+
+        async def hedge():
+            raise RuntimeError("replica down")
+
+        with pytest.raises(RuntimeError, match="primary down"):
+            await hedger.run(primary, hedge)
+
+    @pytest.mark.asyncio
+    async def test_hedge_rate_cap(self):
+        hedger = _warm_hedger(percentile=0.5, max_hedge_rate=0.25, min_delay_ms=5.0)
+        hedger._latency.clear()
+        for _ in range(100):
+            hedger._latency.record(1.0)
+
+        async def slow():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        for _ in range(20):
+            await hedger.run(slow)
+
+        assert hedger.hedges <= 5
+        assert hedger.hedges > 0
+        assert hedger.stats()["hedge_rate"] <= 0.25
+
+    @pytest.mark.asyncio
+    async def test_outer_cancel_cancels_attempts(self):
+        hedger = _warm_hedger()
+        cancelled = 0
+
+        async def call():
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+
+        task = asyncio.ensure_future(hedger.run(call))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+        assert cancelled == 2
+
+
+class TestVectorSourceHedging:
+    """向量召回源的对冲请求"""
+
+    @pytest.mark.asyncio
+    async def test_hedge_goes_to_replica(self, mocker):
+        mocker.patch.object(settings, "recall_hedge_enabled", True)
+        mocker.patch.object(settings, "recall_hedge_min_samples", 1)
+        mocker.patch.object(settings, "recall_hedge_min_delay_ms", 0.0)
+        mocker.patch.object(settings, "recall_hedge_max_rate", 1.0)
+
+        mock_embeddings = mocker.patch('src.agent.recall.sources.vector_source.create_embeddings')
+        mock_embeddings.return_value.aembed_query = mocker.AsyncMock(return_value=[0.1, 0.2])
+
+        primary_calls = 0
+
+        async def primary_search(**kwargs):
+            nonlocal primary_calls
+            primary_calls += 1
+            if primary_calls > 1:
+                await asyncio.sleep(5)
+            return [{"text": "主实例", "score": 0.9, "metadata": {}}]
+
+        primary = mocker.patch('src.agent.recall.sources.vector_source.milvus_service')
+        primary.search_knowledge = primary_search
+        replica = mocker.patch('src.agent.recall.sources.vector_source.milvus_replica_service')
+        replica.search_knowledge = mocker.AsyncMock(
+            return_value=[{"text": "副本", "score": 0.8, "metadata": {}}]
+        )
+
+        source = VectorRecallSource()
+        request = RecallRequest(query="测试", session_id="s", trace_id="t")
+
+        # 第一次请求积累延迟样本
+        first = await source.acquire(request)
+        assert first[0].content == "主实例"
+
+        # 第二次主实例卡住，对冲请求发往副本
+        second = await asyncio.wait_for(source.acquire(request), timeout=2)
+        assert second[0].content == "副本"
+        assert replica.search_knowledge.await_count == 1
+
+        stats = hedger_stats()["vector"]
+        assert stats["hedges"] == 1
+        assert stats["hedge_wins"] == 1
+
+    def test_disabled_by_default(self):
+        assert get_hedger("vector") is None
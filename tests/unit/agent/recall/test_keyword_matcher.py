@@ -0,0 +1,84 @@
+"""
+关键词规则匹配器单元测试
+
+验证编译后的单次扫描打分与逐条规则打分结果一致。
+"""
+
+import random
+
+import pytest
+
+from src.agent.recall.schema import RecallRequest
+from src.agent.recall.sources.keyword_source import KeywordRecallSource, KeywordRuleMatcher
+
+WORDS = ["价格", "多少钱", "费用", "帮助", "问题", "bug", "登录", "密码", "API", "接口", "SDK", "发票", "退款"]
+
+
+def _make_rules(count: int, seed: int = 5) -> tuple[list[dict], dict[str, list[str]]]:
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        keywords = rng.sample(WORDS, rng.randint(1, 5))
+        patterns = ["|".join(rng.sample(WORDS, 3))]
+        if i % 7 == 0:
+            # 含正则语法的模式走回退路径
+            patterns.append(r"第\d+号")
+        rules.append({
+            "id": f"rule_{i:04d}",
+            "keywords": keywords,
+            "content": f"规则 {i}",
+            "category": "测试",
+            "priority": round(rng.uniform(0.3, 1.0), 2),
+            "patterns": patterns,
+        })
+    synonyms = {"价格": ["价钱", "费用"], "问题": ["故障", "bug"], "API": ["接口", "端点"], "登录": ["登入"]}
+    return rules, synonyms
+
+
+def _make_queries(count: int, seed: int = 9) -> list[str]:
+    rng = random.Random(seed)
+    queries = ["", "完全不相关", "第12号问题", "api 接口文档", "API"]
+    for _ in range(count):
+        queries.append("".join(rng.sample(WORDS + ["的", "怎么", "吗"], rng.randint(1, 4))).lower())
+    return queries
+
+
+class TestKeywordRuleMatcher:
+    """测试编译后的规则匹配"""
+
+    def test_scores_match_reference(self):
+        """单次扫描打分与逐条规则打分完全一致"""
+        rules, synonyms = _make_rules(300)
+        source = KeywordRecallSource(rules=rules, synonyms=synonyms)
+        matcher = KeywordRuleMatcher(rules, synonyms)
+
+        for query in _make_queries(300):
+            query = query.lower()
+            expected = [
+                (i, score)
+                for i, rule in enumerate(rules)
+                if (score := source._calculate_keyword_score(query, rule)) > 0
+            ]
+            assert matcher.score(query) == expected, query
+
+    def test_default_rules_match_reference(self):
+        """内置规则的打分与参考实现一致"""
+        source = KeywordRecallSource()
+        for query in ["价格是多少", "登录密码忘了", "api 文档", "遇到bug了", "你好"]:
+            expected = [
+                (i, score)
+                for i, rule in enumerate(source._keyword_rules)
+                if (score := source._calculate_keyword_score(query, rule)) > 0
+            ]
+            assert source._matcher.score(query) == expected
+
+    def test_default_matcher_shared(self):
+        """内置规则的匹配器在实例间共享"""
+        assert KeywordRecallSource()._matcher is KeywordRecallSource()._matcher
+
+    @pytest.mark.asyncio
+    async def test_acquire_uses_matcher(self):
+        source = KeywordRecallSource()
+        hits = await source.acquire(RecallRequest(query="价格多少钱", session_id="s", trace_id="t"))
+
+        assert hits[0].metadata["rule_id"] == "rule_001"
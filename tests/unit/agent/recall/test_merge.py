@@ -0,0 +1,234 @@
+"""
+召回合并策略单元测试
+"""
+
+import pytest
+
+from src.agent.recall.merge import (
+    _MERGE_STRATEGY_REGISTRY,
+    get_merge_strategy,
+    list_merge_strategies,
+    register_merge_strategy,
+    resolve_merge_strategy,
+    rrf_merge,
+    suppress_near_duplicates,
+    weighted_merge,
+)
+from src.agent.recall.nodes import merge_node, prepare_node
+from src.agent.recall.schema import RecallHit, RecallRequest
+from src.core.config import settings
+
+
+def _hit(source: str, score: float, content: str) -> RecallHit:
+    return RecallHit(
+        source=source,
+        score=score,
+        confidence=score,
+        reason="测试",
+        content=content,
+        metadata={},
+    )
+
+
+class TestWeightedMerge:
+    """测试加权合并"""
+
+    def test_weights_applied_and_sorted(self):
+        hits = [_hit("vector", 0.8, "A"), _hit("keyword", 0.9, "B")]
+        merged = weighted_merge(hits, {"weights": {"vector": 1.0, "keyword": 0.5}})
+
+        assert [h.content for h in merged] == ["A", "B"]
+        assert merged[1].score == 0.45
+        assert merged[1].metadata["original_score"] == 0.9
+        assert merged[1].metadata["weight"] == 0.5
+
+    def test_duplicates_keep_highest(self):
+        hits = [_hit("vector", 0.6, "A"), _hit("faq", 0.9, "A")]
+        merged = weighted_merge(hits, {"weights": {}})
+
+        assert len(merged) == 1
+        assert merged[0].source == "faq"
+
+
+class TestRRFMerge:
+    """测试 Reciprocal Rank Fusion"""
+
+    def test_scale_independent(self):
+        """RRF 只看源内排名：高尺度源不会压制低尺度源的第一名"""
+        hits = [
+            _hit("vector", 0.72, "V1"),
+            _hit("vector", 0.71, "V2"),
+            _hit("keyword", 0.99, "K1"),
+            _hit("keyword", 0.98, "K2"),
+        ]
+        merged = rrf_merge(hits, {"weights": {}, "rrf_k": 60})
+
+        # 各源第一名融合分数相同，排在各源第二名之前
+        assert {h.content for h in merged[:2]} == {"V1", "K1"}
+        assert merged[0].metadata["rrf_score"] == pytest.approx(1 / 61)
+
+    def test_consensus_boosted(self):
+        """多个召回源都命中的内容累加融合分数"""
+        hits = [
+            _hit("vector", 0.9, "A"),
+            _hit("vector", 0.8, "B"),
+            _hit("faq", 0.9, "C"),
+            _hit("faq", 0.5, "B"),
+        ]
+        merged = rrf_merge(hits, {"weights": {}, "rrf_k": 60})
+
+        assert merged[0].content == "B"
+        assert merged[0].metadata["rrf_score"] == pytest.approx(2 / 62)
+        assert sorted(merged[0].metadata["rrf_sources"]) == ["faq", "vector"]
+        # score 保留最高原始分数
+        assert merged[0].score == 0.8
+        assert len(merged) == 3
+
+    def test_weights_and_k(self):
+        """权重缩放各源贡献，k 控制排名差异"""
+        hits = [_hit("vector", 0.9, "A"), _hit("faq", 0.9, "B")]
+        merged = rrf_merge(hits, {"weights": {"vector": 1.0, "faq": 0.5}, "rrf_k": 10})
+
+        assert merged[0].content == "A"
+        assert merged[0].metadata["rrf_score"] == pytest.approx(1 / 11)
+        assert merged[1].metadata["rrf_score"] == pytest.approx(0.5 / 11)
+
+    def test_empty(self):
+        assert rrf_merge([], {}) == []
+
+
+class TestMergeStrategyRegistry:
+    """测试合并策略注册表"""
+
+    def test_builtin_strategies(self):
+        assert {"weighted", "rrf"} <= set(list_merge_strategies())
+        assert get_merge_strategy("rrf") is rrf_merge
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            get_merge_strategy("unknown")
+
+    def test_custom_strategy_resolved(self):
+        def reverse_merge(hits, config):
+            return list(reversed(hits))
+
+        register_merge_strategy("test_reverse", reverse_merge)
+        try:
+            name, strategy = resolve_merge_strategy(
+                {"merge_strategy": "custom", "custom_merge_strategy": "test_reverse"}
+            )
+        finally:
+            _MERGE_STRATEGY_REGISTRY.pop("test_reverse", None)
+
+        assert name == "test_reverse"
+        assert strategy is reverse_merge
+
+    def test_unknown_falls_back_to_weighted(self):
+        name, strategy = resolve_merge_strategy(
+            {"merge_strategy": "custom", "custom_merge_strategy": "not_registered"}
+        )
+
+        assert name == "weighted"
+        assert strategy is weighted_merge
+
+
+class TestMergeStrategySelection:
+    """测试按请求/配置选择合并策略"""
+
+    @pytest.mark.asyncio
+    async def test_merge_node_uses_rrf(self):
+        hits = [
+            _hit("vector", 0.72, "V1"),
+            _hit("keyword", 0.99, "K1"),
+            _hit("keyword", 0.98, "V1"),
+        ]
+        state = {
+            "hits": hits,
+            "config": {"weights": {}, "merge_strategy": "rrf", "rrf_k": 60},
+            "request": RecallRequest(query="测试", session_id="s", trace_id="t", top_k=5),
+        }
+
+        result = await merge_node(state)
+
+        assert result["hits"][0].content == "V1"
+        assert "rrf_score" in result["hits"][0].metadata
+
+    @pytest.mark.asyncio
+    async def test_request_overrides_config(self, mocker):
+        mocker.patch("src.agent.recall.nodes.settings", settings.model_copy(update={
+            "recall_sources": ["vector"],
+            "recall_source_weights": "vector:1.0",
+            "recall_merge_strategy": "weighted",
+            "recall_custom_merge_strategy": "",
+            "recall_rrf_k": 30,
+            "recall_experiment_enabled": False,
+        }))
+
+        request = RecallRequest(query="测试", session_id="s", trace_id="t", merge_strategy="rrf")
+        result = await prepare_node({"request": request})
+
+        assert result["config"]["merge_strategy"] == "rrf"
+        assert result["config"]["rrf_k"] == 30
+
+
+class TestNearDuplicateSuppression:
+    """测试近似重复去除"""
+
+    ORIGINAL = "退款申请提交后，一般会在 3 到 5 个工作日内原路退回到您的支付账户，请耐心等待并留意银行通知。"
+    REWORDED = "退款申请提交以后，一般在3到5个工作日内原路退回您的支付账户，请耐心等待，并留意银行的通知。"
+    UNRELATED = "会员积分可以在个人中心的积分商城兑换优惠券，积分有效期为自获得之日起一年。"
+
+    def test_reworded_text_suppressed(self):
+        hits = [
+            _hit("faq", 0.95, self.ORIGINAL),
+            _hit("vector", 0.90, self.REWORDED),
+            _hit("vector", 0.85, self.UNRELATED),
+        ]
+
+        result = suppress_near_duplicates(hits, threshold=0.6)
+
+        # 保留排在前面的结果
+        assert [hit.content for hit in result] == [self.ORIGINAL, self.UNRELATED]
+
+    def test_short_distinct_texts_kept(self):
+        hits = [_hit("vector", 0.9, "文档1"), _hit("vector", 0.8, "文档2")]
+
+        assert len(suppress_near_duplicates(hits, threshold=0.8)) == 2
+
+    def test_limit(self):
+        hits = [_hit("vector", 0.9 - i * 0.1, f"完全不同的第{i}号内容{'甲乙丙丁'[i]}") for i in range(4)]
+
+        result = suppress_near_duplicates(hits, threshold=0.8, limit=2)
+
+        assert [hit.score for hit in result] == [0.9, 0.8]
+
+    @pytest.mark.asyncio
+    async def test_merge_node_suppresses_before_top_k(self):
+        hits = [
+            _hit("faq", 0.95, self.ORIGINAL),
+            _hit("vector", 0.90, self.REWORDED),
+            _hit("vector", 0.85, self.UNRELATED),
+        ]
+        state = {
+            "hits": hits,
+            "config": {"weights": {}, "merge_strategy": "weighted", "near_dup_threshold": 0.6},
+            "request": RecallRequest(query="退款", session_id="s", trace_id="t", top_k=2),
+        }
+
+        result = await merge_node(state)
+
+        # 重复结果不占用 top_k 名额
+        assert [hit.content for hit in result["hits"]] == [self.ORIGINAL, self.UNRELATED]
+
+    @pytest.mark.asyncio
+    async def test_merge_node_without_threshold(self):
+        hits = [_hit("faq", 0.95, self.ORIGINAL), _hit("vector", 0.90, self.REWORDED)]
+        state = {
+            "hits": hits,
+            "config": {"weights": {}, "merge_strategy": "weighted", "near_dup_threshold": None},
+            "request": RecallRequest(query="退款", session_id="s", trace_id="t", top_k=5),
+        }
+
+        result = await merge_node(state)
+
+        assert len(result["hits"]) == 2
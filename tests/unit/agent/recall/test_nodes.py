@@ -2,17 +2,21 @@
 召回节点单元测试
 """
 
+import asyncio
+import time
+
 import pytest
 
+from src.agent.recall.merge import deduplicate_hits
 from src.agent.recall.nodes import (
-    _deduplicate_hits,
     fallback_node,
     fanout_node,
     merge_node,
     output_node,
     prepare_node,
 )
-from src.agent.recall.schema import RecallHit, RecallRequest, RecallResult
+from src.agent.recall.schema import RecallHit, RecallRequest, RecallResult, SourceStats
+from src.core.config import settings
 
 
 @pytest.fixture
@@ -41,17 +45,20 @@ class TestPrepareNode:
 
     @pytest.fixture
     def mock_settings(self, mocker):
-        """Mock settings"""
-        mock = mocker.patch('src.agent.recall.nodes.settings')
-        mock.recall_sources = ["vector", "faq"]
-        mock.recall_source_weights = "vector:1.0,faq:0.8"
-        mock.recall_timeout_ms = 500
-        mock.recall_retry = 1
-        mock.recall_merge_strategy = "weighted"
-        mock.recall_degrade_threshold = 0.5
-        mock.recall_fallback_enabled = True
-        mock.recall_experiment_enabled = False
-        mock.recall_experiment_platform = None
+        """替换为真实 Settings 的副本"""
+        mock = settings.model_copy(update={
+            "recall_sources": ["vector", "faq"],
+            "recall_source_weights": "vector:1.0,faq:0.8",
+            "recall_timeout_ms": 500,
+            "recall_retry": 1,
+            "recall_merge_strategy": "weighted",
+            "recall_degrade_threshold": 0.5,
+            "recall_fallback_enabled": True,
+            "recall_experiment_enabled": False,
+            "recall_experiment_config_path": None,
+            "recall_early_exit_enabled": False,
+        })
+        mocker.patch('src.agent.recall.nodes.settings', mock)
         return mock
 
     @pytest.mark.asyncio
@@ -69,9 +76,10 @@ class TestPrepareNode:
 
         assert "config" in result
         assert "start_time" in result
-        assert result["config"]["sources"] == ["vector", "faq"]
+        assert result["config"]["sources"] == ("vector", "faq")
         assert result["config"]["weights"]["vector"] == 1.0
         assert result["config"]["weights"]["faq"] == 0.8
+        assert result["config"]["early_exit_threshold"] is None
 
     @pytest.mark.asyncio
     async def test_prepare_node_with_experiment(self, mock_settings):
@@ -99,9 +107,6 @@ class TestFanoutNode:
     @pytest.fixture
     def mock_sources(self, mocker):
         """Mock召回源"""
-        mock_vector = mocker.patch('src.agent.recall.nodes.VectorRecallSource')
-        mock_faq = mocker.patch('src.agent.recall.nodes.FAQRecallSource')
-
         # Mock向量召回源
         mock_vector_instance = mocker.MagicMock()
         mock_vector_instance.acquire = mocker.AsyncMock(return_value=[
@@ -114,7 +119,6 @@ class TestFanoutNode:
                 metadata={}
             )
         ])
-        mock_vector.return_value = mock_vector_instance
 
         # Mock FAQ召回源
         mock_faq_instance = mocker.MagicMock()
@@ -128,7 +132,10 @@ class TestFanoutNode:
                 metadata={}
             )
         ])
-        mock_faq.return_value = mock_faq_instance
+
+        # 注册表返回 Mock 召回源
+        instances = {"vector": mock_vector_instance, "faq": mock_faq_instance}
+        mocker.patch('src.agent.recall.nodes.get_source', side_effect=instances.get)
 
         return mock_vector_instance, mock_faq_instance
 
@@ -183,6 +190,271 @@ class TestFanoutNode:
         assert "hits" in result
         assert len(result["hits"]) == 0
 
+    @pytest.mark.asyncio
+    async def test_fanout_node_global_deadline(self, mock_sources):
+        """测试总截止时间：慢召回源被取消，不拖慢整体"""
+        cancelled = asyncio.Event()
+
+        async def slow_acquire(request):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return []
+
+        mock_sources[0].acquire = slow_acquire
+
+        state = {
+            "request": RecallRequest(
+                query="测试查询",
+                session_id="session-123",
+                trace_id="trace-456"
+            ),
+            "config": {
+                "sources": ["vector", "faq"],
+                "timeout_ms": 100,
+                "retry": 0
+            }
+        }
+
+        start = time.perf_counter()
+        result = await fanout_node(state)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+        assert [hit.source for hit in result["hits"]] == ["faq"]
+
+        stats = result["source_stats"]
+        assert stats["vector"].status == "timeout"
+        assert stats["vector"].latency_ms >= 100
+        assert stats["faq"].status == "ok"
+        assert stats["faq"].hits_count == 1
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_fanout_node_cancelled_cancels_sources(self, mock_sources):
+        """测试扇出被取消时（如推测式检索被丢弃）仍在执行的召回源同时被取消"""
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def slow_acquire(request):
+            started.set()
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return []
+
+        mock_sources[0].acquire = slow_acquire
+
+        state = {
+            "request": RecallRequest(
+                query="测试查询",
+                session_id="session-123",
+                trace_id="trace-456"
+            ),
+            "config": {
+                "sources": ["vector", "faq"],
+                "timeout_ms": 2000,
+                "retry": 0
+            }
+        }
+
+        task = asyncio.create_task(fanout_node(state))
+        await asyncio.wait_for(started.wait(), timeout=1)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_fanout_node_deadline_is_shared(self, mock_sources):
+        """测试多个慢召回源共享一个截止时间，而非逐个累加"""
+        async def slow_acquire(request):
+            await asyncio.sleep(5)
+            return []
+
+        mock_sources[0].acquire = slow_acquire
+        mock_sources[1].acquire = slow_acquire
+
+        state = {
+            "request": RecallRequest(
+                query="测试查询",
+                session_id="session-123",
+                trace_id="trace-456"
+            ),
+            "config": {
+                "sources": ["vector", "faq"],
+                "timeout_ms": 150,
+                "retry": 0
+            }
+        }
+
+        start = time.perf_counter()
+        result = await fanout_node(state)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.3
+        assert result["hits"] == []
+        assert {stats.status for stats in result["source_stats"].values()} == {"timeout"}
+
+    @pytest.mark.asyncio
+    async def test_fanout_node_records_errors(self, mocker, mock_sources):
+        """测试召回源异常记录到执行统计"""
+        mock_sources[1].acquire = mocker.AsyncMock(side_effect=RuntimeError("faq down"))
+
+        state = {
+            "request": RecallRequest(
+                query="测试查询",
+                session_id="session-123",
+                trace_id="trace-456"
+            ),
+            "config": {
+                "sources": ["vector", "faq"],
+                "timeout_ms": 500,
+                "retry": 0
+            }
+        }
+
+        result = await fanout_node(state)
+
+        assert [hit.source for hit in result["hits"]] == ["vector"]
+        assert result["source_stats"]["faq"].status == "error"
+        assert result["source_stats"]["faq"].error == "faq down"
+        assert result["source_stats"]["vector"].status == "ok"
+
+    @pytest.mark.asyncio
+    async def test_fanout_node_circuit_breaker(self, mocker, mock_sources):
+        """测试持续失败的召回源被熔断，熔断期间不再调用"""
+        failing = mocker.AsyncMock(side_effect=RuntimeError("faq down"))
+        mock_sources[1].acquire = failing
+
+        state = {
+            "request": RecallRequest(
+                query="测试查询",
+                session_id="session-123",
+                trace_id="trace-456"
+            ),
+            "config": {
+                "sources": ["vector", "faq"],
+                "timeout_ms": 500,
+                "retry": 0
+            }
+        }
+
+        for _ in range(5):
+            result = await fanout_node(state)
+            assert result["source_stats"]["faq"].status == "error"
+        assert failing.await_count == 5
+
+        result = await fanout_node(state)
+
+        assert failing.await_count == 5
+        assert result["source_stats"]["faq"].status == "circuit_open"
+        assert result["source_stats"]["vector"].status == "ok"
+        assert [hit.source for hit in result["hits"]] == ["vector"]
+
+
+class TestFanoutEarlyExit:
+    """测试fanout_node提前结束"""
+
+    @pytest.fixture
+    def sources(self, mocker):
+        vector_cancelled = asyncio.Event()
+
+        async def slow_vector(request):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                vector_cancelled.set()
+                raise
+            return []
+
+        async def faq_acquire(request):
+            return [RecallHit(
+                source="faq",
+                score=0.9,
+                confidence=0.95,
+                reason="FAQ匹配",
+                content="FAQ内容",
+                metadata={}
+            )]
+
+        vector = mocker.MagicMock()
+        vector.acquire = slow_vector
+        faq = mocker.MagicMock()
+        faq.acquire = faq_acquire
+        instances = {"vector": vector, "faq": faq}
+        mocker.patch('src.agent.recall.nodes.get_source', side_effect=instances.get)
+        return vector_cancelled
+
+    def _state(self, **config):
+        return {
+            "request": RecallRequest(
+                query="测试查询",
+                session_id="session-123",
+                trace_id="trace-456"
+            ),
+            "config": {
+                "sources": ["vector", "faq"],
+                "timeout_ms": 200,
+                "retry": 0,
+                **config,
+            }
+        }
+
+    @pytest.mark.asyncio
+    async def test_early_exit_on_high_confidence(self, sources):
+        """测试高置信度FAQ结果到达后取消其余召回源"""
+        state = self._state(early_exit_threshold=0.9, early_exit_sources=["faq"])
+
+        start = time.perf_counter()
+        result = await fanout_node(state)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.1
+        assert [hit.source for hit in result["hits"]] == ["faq"]
+        assert result["source_stats"]["faq"].status == "ok"
+        assert result["source_stats"]["vector"].status == "skipped"
+        await asyncio.wait_for(sources.wait(), timeout=1)
+
+        # 提前结束跳过的召回源不视为不可用
+        fallback = await fallback_node({
+            "hits": [],
+            "source_stats": result["source_stats"],
+            "config": {"degrade_threshold": 0.5, "fallback_enabled": True},
+        })
+        assert fallback["hits"][0].metadata["unavailable_sources"] == []
+
+    @pytest.mark.asyncio
+    async def test_no_early_exit_below_threshold(self, sources):
+        """测试置信度低于阈值时等待其余召回源"""
+        state = self._state(early_exit_threshold=0.99, early_exit_sources=["faq"])
+
+        result = await fanout_node(state)
+
+        assert result["source_stats"]["vector"].status == "timeout"
+
+    @pytest.mark.asyncio
+    async def test_no_early_exit_from_other_sources(self, sources):
+        """测试非触发召回源的高置信度结果不提前结束"""
+        state = self._state(early_exit_threshold=0.9, early_exit_sources=["keyword"])
+
+        result = await fanout_node(state)
+
+        assert result["source_stats"]["vector"].status == "timeout"
+
+    @pytest.mark.asyncio
+    async def test_disabled_or_invalid_config(self, mocker, sources):
+        """测试未启用或配置无效时不提前结束"""
+        for config in ({}, {"early_exit_threshold": None}, {"early_exit_threshold": mocker.MagicMock()}):
+            result = await fanout_node(self._state(**config))
+            assert result["source_stats"]["vector"].status == "timeout"
+
 
 class TestMergeNode:
     """测试merge_node"""
@@ -385,6 +657,27 @@ class TestFallbackNode:
         # fallback_node不更新任何字段时返回空字典
         assert result == {}
 
+    @pytest.mark.asyncio
+    async def test_fallback_node_sources_unavailable(self):
+        """测试召回源熔断/超时导致无结果时的降级原因"""
+        state = {
+            "hits": [],
+            "source_stats": {
+                "vector": SourceStats(source="vector", status="circuit_open", latency_ms=0.0),
+                "faq": SourceStats(source="faq", status="ok", latency_ms=1.0),
+            },
+            "config": {
+                "degrade_threshold": 0.5,
+                "fallback_enabled": True
+            }
+        }
+
+        result = await fallback_node(state)
+
+        metadata = result["hits"][0].metadata
+        assert metadata["degrade_reason"] == "sources_unavailable"
+        assert metadata["unavailable_sources"] == ["vector"]
+
 
 class TestOutputNode:
     """测试output_node"""
@@ -421,6 +714,51 @@ class TestOutputNode:
         assert result["result"].hits == merged_hits
         assert result["result"].degraded is False
         assert result["result"].trace_id == "trace-456"
+        assert result["result"].source_stats == {}
+
+    @pytest.mark.asyncio
+    async def test_output_node_includes_source_stats(self):
+        """测试输出包含各召回源执行统计"""
+        source_stats = {
+            "vector": SourceStats(source="vector", status="ok", latency_ms=12.5, hits_count=1),
+            "faq": SourceStats(source="faq", status="timeout", latency_ms=500.0),
+        }
+        state = {
+            "request": RecallRequest(
+                query="测试查询",
+                session_id="session-123",
+                trace_id="trace-456"
+            ),
+            "hits": [],
+            "source_stats": source_stats,
+            "start_time": time.time(),
+        }
+
+        result = await output_node(state)
+
+        assert result["result"].source_stats == source_stats
+        # 仅超时（未熔断）且无 fallback 时不标记降级
+        assert result["result"].degraded is False
+
+    @pytest.mark.asyncio
+    async def test_output_node_degraded_when_circuit_open(self):
+        """测试召回源熔断时结果标记为降级"""
+        state = {
+            "request": RecallRequest(
+                query="测试查询",
+                session_id="session-123",
+                trace_id="trace-456"
+            ),
+            "hits": [],
+            "source_stats": {
+                "vector": SourceStats(source="vector", status="circuit_open", latency_ms=0.0),
+            },
+            "start_time": time.time(),
+        }
+
+        result = await output_node(state)
+
+        assert result["result"].degraded is True
 
 
 class TestDeduplicateHits:
@@ -447,7 +785,7 @@ class TestDeduplicateHits:
             )
         ]
 
-        result = _deduplicate_hits(hits)
+        result = deduplicate_hits(hits)
 
         assert len(result) == 2
         assert result == hits
@@ -473,7 +811,7 @@ class TestDeduplicateHits:
             )
         ]
 
-        result = _deduplicate_hits(hits)
+        result = deduplicate_hits(hits)
 
         assert len(result) == 1
         assert result[0].source == "vector"  # 保留高分
@@ -481,6 +819,6 @@ class TestDeduplicateHits:
 
     def test_deduplicate_hits_empty(self):
         """测试空列表去重"""
-        result = _deduplicate_hits([])
+        result = deduplicate_hits([])
 
         assert len(result) == 0
@@ -0,0 +1,75 @@
+"""
+单元测试: 召回工作流直接执行（RECALL_PIPELINE_MODE=direct）
+"""
+
+import dataclasses
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.agent.recall import graph
+from src.agent.recall.config import refresh_recall_snapshot
+from src.agent.recall.graph import RECALL_PIPELINE, invoke_recall_agent, run_recall_pipeline
+from src.agent.recall.schema import RecallRequest
+from src.core.config import settings
+
+
+def _request(query: str) -> RecallRequest:
+    return RecallRequest(query=query, session_id="s", trace_id="t", top_k=5)
+
+
+def _comparable(result):
+    """去掉与执行耗时相关的字段"""
+    data = dataclasses.asdict(result)
+    data.pop("latency_ms")
+    for stats in data["source_stats"].values():
+        stats.pop("latency_ms")
+        stats.pop("timeout_ms")
+    return data
+
+
+@pytest.fixture
+def local_sources():
+    """只使用内存召回源，关闭召回结果缓存"""
+    with patch.object(settings, "recall_sources", ["faq", "keyword"]), \
+         patch.object(settings, "recall_cache_enabled", False):
+        refresh_recall_snapshot()
+        yield
+
+
+class TestRunRecallPipeline:
+    """run_recall_pipeline 测试"""
+
+    def test_pipeline_order(self):
+        assert [name for name, _ in RECALL_PIPELINE] == [
+            "prepare", "fanout", "merge", "fallback", "output"
+        ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("query", ["你们的退货政策是什么？", "怎么开发票", "完全无关的问题"])
+    async def test_same_result_as_graph(self, local_sources, query):
+        with patch.object(settings, "recall_pipeline_mode", "graph"):
+            expected = await invoke_recall_agent(_request(query))
+        with patch.object(settings, "recall_pipeline_mode", "direct"):
+            actual = await invoke_recall_agent(_request(query))
+
+        assert _comparable(actual) == _comparable(expected)
+
+    @pytest.mark.asyncio
+    async def test_does_not_mutate_initial_state(self, local_sources):
+        initial_state = {"request": _request("如何联系客服？")}
+
+        state = await run_recall_pipeline(initial_state)
+
+        assert set(initial_state) == {"request"}
+        assert state["result"] is not None
+
+    @pytest.mark.asyncio
+    async def test_direct_mode_bypasses_graph(self, local_sources):
+        with patch.object(settings, "recall_pipeline_mode", "direct"), \
+             patch.object(graph, "recall_agent") as agent:
+            agent.ainvoke = AsyncMock()
+            result = await invoke_recall_agent(_request("如何联系客服？"))
+
+        agent.ainvoke.assert_not_called()
+        assert result.hits
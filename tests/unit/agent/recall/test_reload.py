@@ -0,0 +1,117 @@
+"""
+单元测试: 配置热重载
+"""
+
+import pytest
+
+from src.agent.main.router import get_router
+from src.agent.recall.breakers import breaker_stats, get_breaker
+from src.agent.recall.cache import recall_cache_stats
+from src.agent.recall.config import get_recall_snapshot
+from src.agent.recall.reload import reload_config
+from src.core.config import reload_settings, settings
+
+
+@pytest.fixture(autouse=True)
+def restore_settings():
+    """测试结束后恢复全局配置"""
+    saved = settings.model_dump()
+    yield
+    for name, value in saved.items():
+        setattr(settings, name, value)
+
+
+class TestReloadSettings:
+    """reload_settings 测试"""
+
+    def test_updates_settings_in_place(self, monkeypatch):
+        monkeypatch.setenv("RECALL_TIMEOUT_MS", str(settings.recall_timeout_ms + 100))
+        expected = settings.recall_timeout_ms + 100
+
+        changed = reload_settings()
+
+        assert changed == ["recall_timeout_ms"]
+        assert settings.recall_timeout_ms == expected
+
+    def test_applies_changed_fields_to_same_instance(self, monkeypatch):
+        """变化的字段复制到同一实例（其他模块持有的引用随之更新），未变化的字段不受影响"""
+        import src.core.config as config_module
+
+        timeout_ms = settings.recall_timeout_ms + 100
+        retry = (settings.recall_retry + 1) % 4
+        monkeypatch.setenv("RECALL_TIMEOUT_MS", str(timeout_ms))
+        monkeypatch.setenv("RECALL_RETRY", str(retry))
+        before = settings.model_dump(exclude={"recall_timeout_ms", "recall_retry"})
+
+        changed = reload_settings()
+
+        assert sorted(changed) == ["recall_retry", "recall_timeout_ms"]
+        assert config_module.settings is settings
+        assert (settings.recall_timeout_ms, settings.recall_retry) == (timeout_ms, retry)
+        assert settings.model_dump(exclude={"recall_timeout_ms", "recall_retry"}) == before
+
+    def test_invalid_value_leaves_settings_untouched(self, monkeypatch):
+        before = settings.recall_timeout_ms
+        monkeypatch.setenv("RECALL_TIMEOUT_MS", "not-a-number")
+
+        with pytest.raises(ValueError):
+            reload_settings()
+
+        assert settings.recall_timeout_ms == before
+
+
+class TestReloadConfig:
+    """reload_config 测试"""
+
+    @pytest.mark.asyncio
+    async def test_no_changes(self):
+        before = get_recall_snapshot()
+
+        result = await reload_config()
+
+        assert result == {"changed": [], "fingerprint": before.fingerprint}
+        assert get_recall_snapshot() is before
+
+    @pytest.mark.asyncio
+    async def test_recompiles_snapshot_and_invalidates_cache(self, monkeypatch):
+        before = get_recall_snapshot()
+        monkeypatch.setenv("RECALL_SOURCE_WEIGHTS", "vector:0.3")
+
+        result = await reload_config()
+
+        assert result["changed"] == ["recall_source_weights"]
+        snapshot = get_recall_snapshot()
+        assert snapshot.fingerprint == result["fingerprint"] != before.fingerprint
+        assert snapshot.base["weights"]["vector"] == 0.3
+        assert recall_cache_stats()["invalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_breaker_settings_rebuild_breakers(self, monkeypatch):
+        get_breaker("vector")
+        monkeypatch.setenv("RECALL_BREAKER_MIN_CALLS", str(settings.recall_breaker_min_calls + 1))
+
+        await reload_config()
+
+        assert breaker_stats() == {}
+
+    @pytest.mark.asyncio
+    async def test_router_settings_rebuild_router(self, monkeypatch):
+        router = get_router()
+        monkeypatch.setenv("ROUTER_CACHE_TTL_SECONDS", str(settings.router_cache_ttl_seconds + 1))
+
+        await reload_config()
+
+        assert get_router() is not router
+
+    @pytest.mark.asyncio
+    async def test_unknown_source_rolls_back(self, monkeypatch):
+        before_sources = list(settings.recall_sources)
+        before = get_recall_snapshot()
+        monkeypatch.setenv("RECALL_SOURCES", '["vector", "missing"]')
+        monkeypatch.setenv("RECALL_RETRY", "0")
+
+        with pytest.raises(ValueError, match="Unsupported recall source: missing"):
+            await reload_config()
+
+        assert settings.recall_sources == before_sources
+        assert get_recall_snapshot() is before
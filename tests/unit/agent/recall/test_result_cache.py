@@ -0,0 +1,140 @@
+"""
+单元测试: 召回结果缓存
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.agent.recall import graph
+from src.agent.recall.cache import (
+    get_cached_result,
+    invalidate_recall_cache,
+    recall_cache_key,
+    recall_cache_stats,
+)
+from src.agent.recall.config import refresh_recall_snapshot
+from src.agent.recall.schema import RecallHit, RecallRequest, RecallResult, SourceStats
+from src.core.config import settings
+
+
+def _request(query: str = "如何退货？", trace_id: str = "t1", **kwargs) -> RecallRequest:
+    return RecallRequest(query=query, session_id="s", trace_id=trace_id, **kwargs)
+
+
+def _result(trace_id: str = "t1", degraded: bool = False) -> RecallResult:
+    hit = RecallHit(
+        source="faq", score=0.9, confidence=0.9, reason="faq", content="7 天无理由退货", metadata={}
+    )
+    return RecallResult(hits=[hit], latency_ms=80.0, degraded=degraded, trace_id=trace_id)
+
+
+@pytest.fixture
+def mock_graph():
+    """替换召回子图，统计实际执行次数"""
+    with patch.object(graph, "recall_agent") as agent:
+        agent.ainvoke = AsyncMock(side_effect=lambda state: {"result": _result(
+            trace_id=state["request"].trace_id
+        )})
+        yield agent
+
+
+class TestRecallCacheKey:
+    """缓存键测试"""
+
+    def test_normalizes_query(self):
+        assert recall_cache_key(_request("如何退货？")) == recall_cache_key(_request("  如何退货? "))
+
+    def test_trace_and_session_not_in_key(self):
+        assert recall_cache_key(_request(trace_id="a")) == recall_cache_key(_request(trace_id="b"))
+
+    def test_top_k_and_merge_strategy_in_key(self):
+        base = recall_cache_key(_request())
+        assert recall_cache_key(_request(top_k=10)) != base
+        assert recall_cache_key(_request(merge_strategy="rrf")) != base
+
+    def test_config_reload_changes_key(self):
+        base = recall_cache_key(_request())
+        with patch.object(settings, "recall_sources", ["faq"]):
+            refresh_recall_snapshot()
+            assert recall_cache_key(_request()) != base
+
+
+class TestInvokeWithCache:
+    """invoke_recall_agent 缓存行为测试"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_served_from_cache(self, mock_graph):
+        first = await graph.invoke_recall_agent(_request(trace_id="t1"))
+        second = await graph.invoke_recall_agent(_request(trace_id="t2"))
+
+        assert mock_graph.ainvoke.await_count == 1
+        assert first.cached is False
+        assert second.cached is True
+        assert second.trace_id == "t2"
+        assert second.hits == first.hits
+        assert second.hits is not first.hits
+
+        stats = recall_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_degraded_result_not_cached(self, mock_graph):
+        mock_graph.ainvoke = AsyncMock(return_value={"result": _result(degraded=True)})
+
+        await graph.invoke_recall_agent(_request())
+        await graph.invoke_recall_agent(_request())
+
+        assert mock_graph.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", ["timeout", "error", "circuit_open"])
+    async def test_partial_failure_not_cached(self, mock_graph, status):
+        """有召回源未正常完成时（即使未降级）不缓存"""
+        result = _result()
+        result.source_stats = {
+            "faq": SourceStats(source="faq", status="ok", latency_ms=1.0, hits_count=1),
+            "vector": SourceStats(source="vector", status=status, latency_ms=500.0),
+        }
+        mock_graph.ainvoke = AsyncMock(return_value={"result": result})
+
+        await graph.invoke_recall_agent(_request())
+        await graph.invoke_recall_agent(_request())
+
+        assert mock_graph.ainvoke.await_count == 2
+        assert recall_cache_stats()["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, mock_graph):
+        with patch("src.agent.recall.cache.settings.recall_cache_enabled", False):
+            await graph.invoke_recall_agent(_request())
+            await graph.invoke_recall_agent(_request())
+            assert recall_cache_stats()["enabled"] is False
+
+        assert mock_graph.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_clears_cache(self, mock_graph):
+        await graph.invoke_recall_agent(_request())
+        invalidate_recall_cache()
+        await graph.invoke_recall_agent(_request())
+
+        assert mock_graph.ainvoke.await_count == 2
+        assert recall_cache_stats()["invalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_result_not_stored_after_concurrent_invalidation(self, mock_graph):
+        async def slow_invoke(state):
+            await asyncio.sleep(0.01)
+            return {"result": _result()}
+
+        mock_graph.ainvoke = AsyncMock(side_effect=slow_invoke)
+
+        pending = asyncio.create_task(graph.invoke_recall_agent(_request()))
+        await asyncio.sleep(0)
+        invalidate_recall_cache()
+        await pending
+
+        assert get_cached_result(recall_cache_key(_request())) is None
@@ -0,0 +1,188 @@
+"""
+召回源注册表单元测试
+"""
+
+import pytest
+
+from src.agent.recall.schema import RecallHit, RecallRequest
+from src.agent.recall.sources import (
+    _SOURCE_REGISTRY,
+    FAQRecallSource,
+    KeywordRecallSource,
+    _source_instances,
+    close_sources,
+    get_source,
+    list_sources,
+    register_source,
+    warmup_sources,
+)
+from src.agent.recall.sources.base import RecallSource
+
+
+class _TrackingSource(RecallSource):
+    """记录生命周期调用的召回源"""
+
+    created = 0
+
+    def __init__(self):
+        _TrackingSource.created += 1
+        self.warmed = False
+        self.closed = False
+
+    @property
+    def source_name(self) -> str:
+        return "tracking"
+
+    async def warmup(self) -> None:
+        self.warmed = True
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def acquire(self, request: RecallRequest) -> list[RecallHit]:
+        return []
+
+
+class _BrokenSource(_TrackingSource):
+    async def warmup(self) -> None:
+        raise RuntimeError("warmup failed")
+
+
+@pytest.fixture(autouse=True)
+def isolated_registry():
+    """每个测试使用独立的注册表和实例缓存"""
+    registry = dict(_SOURCE_REGISTRY)
+    instances = dict(_source_instances)
+    _source_instances.clear()
+    _TrackingSource.created = 0
+    yield
+    _SOURCE_REGISTRY.clear()
+    _SOURCE_REGISTRY.update(registry)
+    _source_instances.clear()
+    _source_instances.update(instances)
+
+
+class TestSourceRegistry:
+    """召回源注册表测试"""
+
+    def test_builtin_sources_registered(self):
+        assert {"vector", "faq", "keyword"} <= set(list_sources())
+
+    def test_instance_reused_across_calls(self):
+        first = get_source("faq")
+        second = get_source("faq")
+
+        assert isinstance(first, FAQRecallSource)
+        assert first is second
+
+    def test_unknown_source_returns_none(self):
+        assert get_source("nonexistent") is None
+
+    def test_register_third_party_source(self):
+        register_source("tracking", _TrackingSource)
+
+        source = get_source("tracking")
+        assert isinstance(source, _TrackingSource)
+        assert get_source("tracking") is source
+        assert _TrackingSource.created == 1
+        assert "tracking" in list_sources()
+
+    def test_reregister_drops_existing_instance(self):
+        register_source("tracking", _TrackingSource)
+        first = get_source("tracking")
+
+        register_source("tracking", _TrackingSource)
+        second = get_source("tracking")
+
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_warmup_and_close_lifecycle(self):
+        register_source("tracking", _TrackingSource)
+
+        await warmup_sources(["tracking", "nonexistent"])
+        source = get_source("tracking")
+        assert source.warmed is True
+
+        await close_sources()
+        assert source.closed is True
+        # 关闭后重新创建
+        assert get_source("tracking") is not source
+
+    @pytest.mark.asyncio
+    async def test_warmup_failure_isolated(self):
+        register_source("broken", _BrokenSource)
+        register_source("tracking", _TrackingSource)
+
+        await warmup_sources(["broken", "tracking"])
+
+        assert get_source("tracking").warmed is True
+
+    @pytest.mark.asyncio
+    async def test_default_hooks_are_noop(self):
+        source = get_source("keyword")
+
+        await source.warmup()
+        await source.close()
+
+
+class TestRegistryVectorSource:
+    """注册表中的向量召回源"""
+
+    @pytest.mark.asyncio
+    async def test_registry_vector_source_raises(self, mocker):
+        """注册表创建的向量召回源把异常交给 fanout_node（计入熔断统计）"""
+        mock_embeddings = mocker.patch('src.agent.recall.sources.vector_source.create_embeddings')
+        mock_embeddings.return_value.aembed_query = mocker.AsyncMock(side_effect=Exception("Embedding error"))
+
+        source = get_source("vector")
+        request = RecallRequest(query="测试", session_id="s", trace_id="t")
+
+        with pytest.raises(Exception, match="Embedding error"):
+            await source.acquire(request)
+
+
+class TestRegistrySourcesRaise:
+    """注册表中的 FAQ / 关键词召回源同样把异常交给 fanout_node"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "name, target",
+        [
+            ("faq", "src.agent.recall.sources.faq_source.FAQIndex.candidates"),
+            ("keyword", "src.agent.recall.sources.keyword_source.KeywordRuleMatcher.score"),
+        ],
+    )
+    async def test_registry_source_raises(self, mocker, name, target):
+        mocker.patch(target, side_effect=RuntimeError(f"{name} down"))
+        request = RecallRequest(query="价格是多少", session_id="s", trace_id="t")
+
+        with pytest.raises(RuntimeError, match=f"{name} down"):
+            await get_source(name).acquire(request)
+
+        # 直接创建的实例保持原有行为（返回空结果）
+        direct = FAQRecallSource() if name == "faq" else KeywordRecallSource()
+        assert await direct.acquire(request) == []
+
+    @pytest.mark.asyncio
+    async def test_keyword_source_failures_open_breaker(self, mocker):
+        """关键词召回源持续失败时熔断器打开，之后不再调用"""
+        from src.agent.recall.nodes import fanout_node
+
+        failing = mocker.patch(
+            "src.agent.recall.sources.keyword_source.KeywordRuleMatcher.score",
+            side_effect=RuntimeError("keyword down"),
+        )
+        state = {
+            "request": RecallRequest(query="价格是多少", session_id="s", trace_id="t"),
+            "config": {"sources": ["keyword"], "timeout_ms": 500, "retry": 0},
+        }
+
+        for _ in range(5):
+            result = await fanout_node(state)
+            assert result["source_stats"]["keyword"].status == "error"
+
+        result = await fanout_node(state)
+
+        assert result["source_stats"]["keyword"].status == "circuit_open"
+        assert failing.call_count == 5
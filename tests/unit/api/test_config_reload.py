@@ -0,0 +1,60 @@
+"""
+单元测试: 配置热重载端点
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.config import settings
+from src.main import app
+
+
+@pytest.fixture
+def client():
+    """测试客户端"""
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def restore_settings():
+    """测试结束后恢复全局配置"""
+    saved = settings.model_dump()
+    yield
+    for name, value in saved.items():
+        setattr(settings, name, value)
+
+
+def _headers() -> dict[str, str]:
+    return {"Authorization": f"Bearer {settings.api_key}"}
+
+
+class TestConfigReloadEndpoint:
+    """/api/v1/config/reload 测试"""
+
+    def test_requires_api_key(self, client):
+        response = client.post("/api/v1/config/reload")
+
+        assert response.status_code in (401, 403)
+
+    def test_reload(self, client, monkeypatch):
+        monkeypatch.setenv("RECALL_DEGRADE_THRESHOLD", "0.25")
+
+        response = client.post("/api/v1/config/reload", headers=_headers())
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["changed"] == ["recall_degrade_threshold"]
+        assert settings.recall_degrade_threshold == 0.25
+
+        metrics = client.get("/api/v1/metrics", headers=_headers()).json()
+        assert metrics["recall"]["config_fingerprint"] == data["fingerprint"]
+
+    def test_invalid_config_rejected(self, client, monkeypatch):
+        monkeypatch.setenv("RECALL_DEGRADE_THRESHOLD", "2.0")
+
+        response = client.post("/api/v1/config/reload", headers=_headers())
+
+        assert response.status_code == 400
+        assert response.json()["detail"]["error"]["code"] == "invalid_config"
+        assert settings.recall_degrade_threshold != 2.0
@@ -0,0 +1,75 @@
+"""
+单元测试: 运行时指标端点
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.embeddings import FakeEmbeddings
+
+from src.agent.recall.breakers import get_breaker
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.main import app
+from src.services import llm_factory
+from src.services.embedding_cache import CachedEmbeddings
+
+
+@pytest.fixture
+def client():
+    """测试客户端"""
+    return TestClient(app)
+
+
+class TestMetricsEndpoint:
+    """/api/v1/metrics 测试"""
+
+    def test_requires_api_key(self, client):
+        response = client.get("/api/v1/metrics")
+
+        assert response.status_code in (401, 403)
+
+    def test_circuit_breaker_state(self, client):
+        breaker = get_breaker("vector")
+        for _ in range(settings.recall_breaker_min_calls):
+            breaker.record_failure()
+
+        response = client.get(
+            "/api/v1/metrics",
+            headers={"Authorization": f"Bearer {settings.api_key}"}
+        )
+
+        assert response.status_code == 200
+        breakers = response.json()["recall"]["circuit_breakers"]
+        assert breakers["vector"]["state"] == "open"
+        assert breakers["vector"]["opened_count"] == 1
+
+    def test_recall_cache_stats(self, client):
+        response = client.get(
+            "/api/v1/metrics",
+            headers={"Authorization": f"Bearer {settings.api_key}"}
+        )
+
+        cache = response.json()["recall"]["cache"]
+        assert cache["enabled"] is settings.recall_cache_enabled
+        assert cache["invalidations"] == 0
+
+    def test_embedding_cache_stats(self, client):
+        embeddings = CachedEmbeddings(
+            FakeEmbeddings(size=4), "test-model", TTLCache(max_entries=10, ttl_seconds=60)
+        )
+        embeddings.embed_query("退款政策")
+        embeddings.embed_query("退款政策")
+        llm_factory.clear_model_cache()
+        llm_factory._model_cache[("embedding", "test")] = embeddings
+        try:
+            response = client.get(
+                "/api/v1/metrics",
+                headers={"Authorization": f"Bearer {settings.api_key}"}
+            )
+        finally:
+            llm_factory.clear_model_cache()
+
+        stats = response.json()["recall"]["embedding_cache"]
+        assert stats == [embeddings.stats()]
+        assert stats[0]["memory"]["hits"] == 1
+        assert stats[0]["memory"]["misses"] == 1
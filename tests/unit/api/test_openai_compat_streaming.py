@@ -0,0 +1,147 @@
+"""
+token 级流式输出测试
+
+测试 /v1/chat/completions 流式响应逐 token 推送 LLM 增量。
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+
+from src.api.v1.openai_compat import (
+    _extract_llm_content,
+    _extract_token_delta,
+    _stream_response,
+)
+from src.core.config import settings
+
+
+def _make_app(chunks: list) -> MagicMock:
+    """构造 astream 依次返回给定 chunk 的假 Agent 应用"""
+
+    async def astream(*args, **kwargs):
+        for chunk in chunks:
+            yield chunk
+
+    app = MagicMock()
+    app.astream = MagicMock(side_effect=astream)
+    return app
+
+
+async def _collect_contents(app: MagicMock) -> list[str]:
+    contents = []
+    with patch("src.api.v1.openai_compat.get_agent_app", return_value=app):
+        async for line in _stream_response(
+            user_message="你好",
+            session_id="session-test",
+            completion_id="chatcmpl-test",
+            created_timestamp=0,
+            model="deepseek-chat",
+            requested_model="deepseek-chat",
+        ):
+            payload = line.removeprefix("data: ").strip()
+            if payload == "[DONE]":
+                continue
+            content = json.loads(payload)["choices"][0]["delta"].get("content")
+            if content:
+                contents.append(content)
+    return contents
+
+
+class TestExtractTokenDelta:
+    """测试 messages 流增量提取"""
+
+    def test_llm_node_chunk(self):
+        """llm 节点的 AIMessageChunk 返回增量文本"""
+        payload = (AIMessageChunk(content="你好"), {"langgraph_node": "llm"})
+        assert _extract_token_delta(payload) == "你好"
+
+    def test_other_node_ignored(self):
+        """非 llm 节点的消息被忽略"""
+        payload = (AIMessageChunk(content="内部"), {"langgraph_node": "router"})
+        assert _extract_token_delta(payload) is None
+
+    def test_human_message_ignored(self):
+        """非 AI 消息被忽略"""
+        payload = (HumanMessage(content="问题"), {"langgraph_node": "llm"})
+        assert _extract_token_delta(payload) is None
+
+    def test_content_blocks_joined(self):
+        """内容块列表被拼接为文本"""
+        payload = (
+            AIMessageChunk(content=[{"type": "text", "text": "退"}, {"type": "text", "text": "货"}]),
+            {"langgraph_node": "llm"},
+        )
+        assert _extract_token_delta(payload) == "退货"
+
+    def test_empty_content(self):
+        """空增量返回 None"""
+        payload = (AIMessageChunk(content=""), {"langgraph_node": "llm"})
+        assert _extract_token_delta(payload) is None
+
+    def test_invalid_payload(self):
+        """非法 payload 返回 None"""
+        assert _extract_token_delta("invalid") is None
+
+
+class TestExtractLLMContent:
+    """测试 llm 节点输出提取"""
+
+    def test_dict_output(self):
+        assert _extract_llm_content({"messages": [AIMessage(content="回复")]}) == "回复"
+
+    def test_string_output(self):
+        assert _extract_llm_content("字符串回复") == "字符串回复"
+
+    def test_unexpected_output(self):
+        assert _extract_llm_content(12345) is None
+
+    def test_empty_messages(self):
+        assert _extract_llm_content({"messages": []}) is None
+
+
+class TestTokenStreaming:
+    """测试流式响应的 token 推送"""
+
+    @pytest.mark.asyncio
+    async def test_streams_each_token(self):
+        """每个 token 增量作为独立 chunk 推送，节点完整输出不重复推送"""
+        app = _make_app([
+            ("updates", {"router": {"next_step": "direct"}}),
+            ("messages", (AIMessageChunk(content="您"), {"langgraph_node": "llm"})),
+            ("messages", (AIMessageChunk(content="好"), {"langgraph_node": "llm"})),
+            ("updates", {"llm": {"messages": [AIMessage(content="您好")]}}),
+        ])
+
+        with patch.object(settings, "llm_streaming_enabled", True):
+            contents = await _collect_contents(app)
+
+        assert contents == ["您", "好"]
+        assert app.astream.call_args.kwargs["stream_mode"] == ["updates", "messages"]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_node_output(self):
+        """模型未产生增量时回退为推送节点完整输出"""
+        app = _make_app([
+            ("updates", {"llm": {"messages": [AIMessage(content="抱歉，系统遇到了一些问题")]}}),
+        ])
+
+        with patch.object(settings, "llm_streaming_enabled", True):
+            contents = await _collect_contents(app)
+
+        assert contents == ["抱歉，系统遇到了一些问题"]
+
+    @pytest.mark.asyncio
+    async def test_streaming_disabled_uses_node_output(self):
+        """关闭 token 流式时按节点输出一次性推送"""
+        app = _make_app([
+            {"llm": {"messages": [AIMessage(content="完整回复")]}},
+        ])
+
+        with patch.object(settings, "llm_streaming_enabled", False):
+            contents = await _collect_contents(app)
+
+        assert contents == ["完整回复"]
+        assert "stream_mode" not in app.astream.call_args.kwargs
@@ -0,0 +1,83 @@
+"""
+测试进程内 TTL + LRU 缓存
+
+测试命中统计、LRU 淘汰和 TTL 过期。
+"""
+
+from unittest.mock import patch
+
+from src.core.cache import TTLCache
+
+
+def test_get_set_and_stats():
+    """写入后可命中，统计命中/未命中"""
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    assert cache.get("a") is None
+
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+    assert cache.hit_rate == 0.5
+
+
+def test_lru_eviction():
+    """超出容量时淘汰最久未使用的条目"""
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # a 变为最近使用
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+
+def test_ttl_expiration():
+    """超过 TTL 的条目视为未命中并被移除"""
+    cache = TTLCache(max_entries=10, ttl_seconds=5)
+    with patch("src.core.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with patch("src.core.cache.time.monotonic", return_value=104.0):
+        assert cache.get("a") == 1
+    with patch("src.core.cache.time.monotonic", return_value=106.0):
+        assert cache.get("a") is None
+
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_zero_ttl_never_expires():
+    """ttl_seconds 为 0 时条目不过期"""
+    cache = TTLCache(max_entries=10, ttl_seconds=0)
+    with patch("src.core.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with patch("src.core.cache.time.monotonic", return_value=1e9):
+        assert cache.get("a") == 1
+
+
+def test_zero_capacity_disables_cache():
+    """max_entries 为 0 时不缓存"""
+    cache = TTLCache(max_entries=0, ttl_seconds=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_delete_and_clear():
+    """删除单个条目与清空缓存"""
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.delete("a")
+    assert cache.get("a") is None
+
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,159 @@
+"""
+熔断器单元测试
+"""
+
+from src.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _make_breaker(clock: FakeClock, **kwargs) -> CircuitBreaker:
+    options = {
+        "failure_rate_threshold": 0.5,
+        "window_size": 10,
+        "min_calls": 4,
+        "open_seconds": 30.0,
+        "half_open_max_calls": 1,
+        "clock": clock,
+    }
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+class TestCircuitBreaker:
+    """熔断器状态机测试"""
+
+    def test_stays_closed_below_min_calls(self):
+        breaker = _make_breaker(FakeClock())
+
+        for _ in range(3):
+            breaker.record_failure()
+
+        assert breaker.state == CLOSED
+        assert breaker.allow_request() is True
+
+    def test_opens_on_failure_rate(self):
+        breaker = _make_breaker(FakeClock())
+
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+
+        breaker.record_failure()  # 2/4 = 0.5
+
+        assert breaker.state == OPEN
+        assert breaker.allow_request() is False
+        assert breaker.stats()["rejected"] == 1
+        assert breaker.stats()["opened_count"] == 1
+
+    def test_opens_on_slow_call_rate(self):
+        breaker = _make_breaker(FakeClock(), slow_call_ms=100, slow_call_rate_threshold=0.75)
+
+        breaker.record_success(latency_ms=10)
+        for _ in range(3):
+            breaker.record_success(latency_ms=500)
+
+        assert breaker.state == OPEN
+
+    def test_slow_calls_ignored_when_disabled(self):
+        breaker = _make_breaker(FakeClock())
+
+        for _ in range(10):
+            breaker.record_success(latency_ms=60_000)
+
+        assert breaker.state == CLOSED
+
+    def test_half_open_after_cooldown_then_close(self):
+        clock = FakeClock()
+        breaker = _make_breaker(clock)
+        for _ in range(4):
+            breaker.record_failure()
+        assert breaker.state == OPEN
+
+        clock.now = 29.9
+        assert breaker.allow_request() is False
+
+        clock.now = 30.0
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow_request() is True
+        # 半开状态只放行有限的探测调用
+        assert breaker.allow_request() is False
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.stats()["window_calls"] == 0
+
+    def test_half_open_failure_reopens(self):
+        clock = FakeClock()
+        breaker = _make_breaker(clock)
+        for _ in range(4):
+            breaker.record_failure()
+
+        clock.now = 30.0
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert breaker.stats()["opened_count"] == 2
+
+        clock.now = 59.0
+        assert breaker.allow_request() is False
+
+    def test_release_returns_half_open_probe(self):
+        clock = FakeClock()
+        breaker = _make_breaker(clock)
+        for _ in range(4):
+            breaker.record_failure()
+
+        clock.now = 30.0
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+
+        # 探测调用被取消（无结果），名额归还
+        breaker.release()
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow_request() is True
+
+    def test_late_results_ignored_while_open(self):
+        breaker = _make_breaker(FakeClock())
+        for _ in range(4):
+            breaker.record_failure()
+
+        breaker.record_success()
+        breaker.record_failure()
+
+        stats = breaker.stats()
+        assert stats["state"] == OPEN
+        assert stats["window_calls"] == 0
+
+    def test_window_slides(self):
+        breaker = _make_breaker(FakeClock(), window_size=4, min_calls=4)
+
+        breaker.record_failure()
+        for _ in range(3):
+            breaker.record_success()
+        # 最早的失败滑出窗口
+        breaker.record_success()
+
+        stats = breaker.stats()
+        assert stats["window_calls"] == 4
+        assert stats["failure_rate"] == 0.0
+
+    def test_reset(self):
+        breaker = _make_breaker(FakeClock())
+        for _ in range(4):
+            breaker.record_failure()
+
+        breaker.reset()
+
+        assert breaker.state == CLOSED
+        assert breaker.allow_request() is True
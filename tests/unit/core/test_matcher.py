@@ -0,0 +1,54 @@
+"""
+测试多模式匹配器
+
+测试 Aho-Corasick 自动机的匹配结果与逐个子串查找一致。
+"""
+
+import random
+
+from src.core.matcher import AhoCorasickMatcher
+
+
+def test_find_all_basic():
+    """找出所有出现的模式"""
+    matcher = AhoCorasickMatcher(["he", "she", "his", "hers"])
+    assert matcher.find_all("ushers") == {0, 1, 3}
+    assert matcher.find_all("xyz") == set()
+
+
+def test_overlapping_and_nested():
+    """重叠和嵌套的模式都能找到"""
+    matcher = AhoCorasickMatcher(["退货", "退货政策", "政策", "货"])
+    assert matcher.find_all("请问退货政策") == {0, 1, 2, 3}
+
+
+def test_iter_matches_positions():
+    """iter_matches 返回匹配结束位置"""
+    matcher = AhoCorasickMatcher(["ab", "b"])
+    assert sorted(matcher.iter_matches("abab")) == [(2, 0), (2, 1), (4, 0), (4, 1)]
+
+
+def test_contains_any():
+    matcher = AhoCorasickMatcher(["价格", "多少钱"])
+    assert matcher.contains_any("这个多少钱")
+    assert not matcher.contains_any("你好")
+
+
+def test_empty_and_duplicate_patterns():
+    """空模式被忽略，重复模式各自报告"""
+    matcher = AhoCorasickMatcher(["", "ab", "ab"])
+    assert matcher.find_all("xab") == {1, 2}
+    assert len(matcher) == 3
+
+
+def test_matches_naive_search():
+    """随机模式与文本下结果与 in 判断一致"""
+    rng = random.Random(3)
+    alphabet = "abc退货价"
+    for _ in range(200):
+        patterns = ["".join(rng.choices(alphabet, k=rng.randint(1, 4))) for _ in range(8)]
+        text = "".join(rng.choices(alphabet, k=rng.randint(0, 30)))
+        matcher = AhoCorasickMatcher(patterns)
+        expected = {i for i, p in enumerate(patterns) if p in text}
+        assert matcher.find_all(text) == expected
+        assert matcher.contains_any(text) == bool(expected)
@@ -0,0 +1,34 @@
+"""
+测试进程内运行时状态的重置登记
+"""
+
+from src.core import runtime_state
+from src.core.runtime_state import register_reset, reset_runtime_state
+
+
+def test_registered_hooks_are_called_once(monkeypatch):
+    """登记的重置函数被调用；重复登记只调用一次"""
+    monkeypatch.setattr(runtime_state, "_reset_hooks", [])
+    calls = []
+
+    def hook() -> None:
+        calls.append("reset")
+
+    assert register_reset(hook) is hook
+    register_reset(hook)
+
+    reset_runtime_state()
+
+    assert calls == ["reset"]
+
+
+def test_recall_modules_register_their_resets():
+    """召回模块导入后登记自己的重置函数"""
+    from src.agent.recall.breakers import breaker_stats, get_breaker
+
+    get_breaker("faq")
+    assert "faq" in breaker_stats()
+
+    reset_runtime_state()
+
+    assert breaker_stats() == {}
@@ -0,0 +1,36 @@
+"""
+测试字符 shingle 文本相似度
+
+测试归一化、shingle 提取和 Jaccard 相似度。
+"""
+
+from src.core.text_similarity import char_shingles, jaccard_similarity, normalize_for_shingles
+
+
+def test_normalize_ignores_width_case_and_punctuation():
+    """全角/半角、大小写和标点不影响归一化结果"""
+    assert normalize_for_shingles("ＡＢＣ，退款！ 3天") == normalize_for_shingles("abc退款3天")
+
+
+def test_char_shingles():
+    """提取字符二元组"""
+    assert char_shingles("退款流程") == frozenset({"退款", "款流", "流程"})
+    assert char_shingles("退") == frozenset({"退"})
+    assert char_shingles("，。") == frozenset()
+
+
+def test_jaccard_similarity():
+    """相同文本为 1，无交集为 0"""
+    a = char_shingles("如何申请退款")
+    assert jaccard_similarity(a, a) == 1.0
+    assert jaccard_similarity(a, char_shingles("会员积分规则")) == 0.0
+    assert jaccard_similarity(frozenset(), frozenset()) == 1.0
+    assert jaccard_similarity(a, frozenset()) == 0.0
+
+
+def test_small_edit_keeps_high_similarity():
+    """措辞细微差异仍保持较高相似度"""
+    original = char_shingles("订单发货后可在我的订单页面查看物流信息，一般 48 小时内更新。")
+    edited = char_shingles("订单发货以后可以在我的订单页面查看物流信息，通常48小时内更新。")
+
+    assert jaccard_similarity(original, edited) >= 0.6
@@ -0,0 +1,148 @@
+"""
+测试有界内存 Checkpointer
+
+测试会话数 LRU 淘汰、checkpoint 深度限制、TTL 过期、内存统计以及 compile_agent_graph 的选择。
+"""
+
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import add_messages
+
+from src.agent.main.checkpointer import BoundedMemorySaver
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+    turns: int
+
+
+def _echo(state: ChatState) -> dict:
+    reply = ("ai", f"echo {state['messages'][-1].content}")
+    return {"messages": [reply], "turns": state.get("turns", 0) + 1}
+
+
+def _app(saver: BoundedMemorySaver):
+    """单节点对话图（每轮产生 3 个 checkpoint）"""
+    workflow = StateGraph(ChatState)
+    workflow.add_node("echo", _echo)
+    workflow.set_entry_point("echo")
+    workflow.add_edge("echo", END)
+    return workflow.compile(checkpointer=saver)
+
+
+def _chat(app, thread_id: str, text: str) -> dict:
+    return app.invoke({"messages": [("user", text)]}, {"configurable": {"thread_id": thread_id}})
+
+
+def _history(app, thread_id: str) -> list[str]:
+    state = app.get_state({"configurable": {"thread_id": thread_id}})
+    return [m.content for m in state.values.get("messages", [])]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction():
+    """超过会话数上限时淘汰最久未访问的会话"""
+    saver = BoundedMemorySaver(max_threads=2, max_checkpoints_per_thread=10)
+    app = _app(saver)
+
+    _chat(app, "a", "1")
+    _chat(app, "b", "1")
+    _chat(app, "a", "2")  # a 最近访问
+    _chat(app, "c", "1")  # 淘汰 b
+
+    assert _history(app, "a") == ["1", "echo 1", "2", "echo 2"]
+    assert _history(app, "b") == []
+    stats = saver.stats()
+    assert (stats["threads"], stats["evicted"]) == (2, 1)
+    assert all(key[0] != "b" for key in list(saver.blobs) + list(saver.writes))
+
+
+def test_checkpoint_depth_limit_keeps_latest_state():
+    """只保留最近的 checkpoint，最新状态完整可用"""
+    saver = BoundedMemorySaver(max_threads=10, max_checkpoints_per_thread=2)
+    app = _app(saver)
+
+    for turn in range(5):
+        result = _chat(app, "a", str(turn))
+
+    assert result["turns"] == 5
+    assert len(_history(app, "a")) == 10
+    remaining = list(saver.list({"configurable": {"thread_id": "a"}}))
+    assert len(remaining) == 2
+    assert saver.stats()["pruned_checkpoints"] == 5 * 3 - 2
+    # 只保留被剩余 checkpoint 引用的通道值
+    referenced = {
+        version for item in remaining for version in item.checkpoint["channel_versions"].items()
+    }
+    assert {key[2:] for key in saver.blobs} == referenced
+
+
+def test_ttl_expiry():
+    """空闲超过 TTL 的会话过期"""
+    clock = FakeClock()
+    saver = BoundedMemorySaver(
+        max_threads=10, max_checkpoints_per_thread=10, ttl_seconds=60, clock=clock
+    )
+    app = _app(saver)
+
+    _chat(app, "a", "1")
+    _chat(app, "b", "1")
+    clock.now = 30
+    _chat(app, "b", "2")
+
+    clock.now = 70
+    assert _history(app, "a") == []  # 读取时过期
+    assert _history(app, "b") == ["1", "echo 1", "2", "echo 2"]
+
+    clock.now = 200
+    _chat(app, "c", "1")  # 写入时清理过期会话
+    assert saver.stats()["threads"] == 1
+    assert saver.stats()["expired"] == 2
+
+
+def test_stats_and_delete_thread():
+    """内存统计随会话删除归零"""
+    saver = BoundedMemorySaver(max_threads=10, max_checkpoints_per_thread=10)
+    app = _app(saver)
+    _chat(app, "a", "1")
+
+    stats = saver.stats()
+    assert stats["threads"] == 1
+    assert stats["checkpoints"] == 3
+    assert stats["serialized_bytes"] > 0
+
+    saver.delete_thread("a")
+    stats = saver.stats()
+    assert (stats["threads"], stats["checkpoints"], stats["blobs"], stats["writes"]) == (0, 0, 0, 0)
+    assert stats["serialized_bytes"] == 0
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        BoundedMemorySaver(max_threads=0, max_checkpoints_per_thread=1)
+
+
+def test_compile_agent_graph_selects_bounded_memory(mocker):
+    """LANGGRAPH_CHECKPOINTER=bounded_memory 时使用有界内存 Checkpointer"""
+    from src.agent.main import graph
+    from src.core.config import settings
+
+    mocker.patch.object(settings, "langgraph_checkpointer", "bounded_memory")
+    mocker.patch.object(settings, "checkpointer_max_threads", 5)
+    mocker.patch.object(graph, "_agent_app", None)
+
+    app = graph.get_agent_app()
+
+    assert isinstance(app.checkpointer, BoundedMemorySaver)
+    assert app.checkpointer.max_threads == 5
+    assert graph.checkpointer_stats()["type"] == "BoundedMemorySaver"
+    assert graph.checkpointer_stats()["threads"] == 0
@@ -0,0 +1,120 @@
+"""
+测试多轮对话历史对齐
+
+测试 OpenAI 格式消息的转换以及客户端历史与 Checkpointer 中会话历史的对齐。
+"""
+
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
+
+from src.agent.main.conversation import reconcile_messages, to_state_messages, window_messages
+
+
+def _stored(*contents: str) -> list:
+    """交替的用户/助手消息（带 id，与 add_messages 写入后的状态一致）"""
+    return [
+        (HumanMessage if i % 2 == 0 else AIMessage)(content=content, id=f"m{i}")
+        for i, content in enumerate(contents)
+    ]
+
+
+def _incoming(*contents: str) -> list:
+    return [
+        (HumanMessage if i % 2 == 0 else AIMessage)(content=content)
+        for i, content in enumerate(contents)
+    ]
+
+
+def test_to_state_messages():
+    """丢弃 system 消息和最后一条用户消息之后的助手消息"""
+    messages = [
+        SimpleNamespace(role="system", content="你是客服"),
+        SimpleNamespace(role="user", content="退货政策是什么"),
+        SimpleNamespace(role="assistant", content="7 天无理由"),
+        SimpleNamespace(role="user", content="运费谁出"),
+        SimpleNamespace(role="assistant", content="预填充"),
+    ]
+
+    converted = to_state_messages(messages)
+
+    assert [(m.type, m.content) for m in converted] == [
+        ("human", "退货政策是什么"), ("ai", "7 天无理由"), ("human", "运费谁出"),
+    ]
+    assert to_state_messages([SimpleNamespace(role="system", content="x")]) == []
+
+
+def test_new_session_takes_client_history():
+    """会话无历史时原样写入客户端历史（保留助手回复，后续问题的指代才完整）"""
+    incoming = _incoming("推荐一款耳机", "推荐 X1 降噪耳机", "它多少钱")
+    assert reconcile_messages([], incoming) == incoming
+
+
+def test_unaligned_assistant_message_is_not_written():
+    """与存储历史不一致的助手消息不写入"""
+    stored = _stored("退货政策是什么", "7 天无理由")
+    incoming = _incoming("退货政策是什么", "全部免费退货", "运费谁出")
+
+    update = reconcile_messages(stored, incoming)
+
+    assert [m.id for m in update if isinstance(m, RemoveMessage)] == ["m1"]
+    assert [m for m in update if not isinstance(m, RemoveMessage)] == [incoming[2]]
+
+
+def test_full_history_appends_only_new_messages():
+    """客户端发送完整历史时只追加新增的消息"""
+    stored = _stored("退货政策是什么", "7 天无理由")
+    incoming = _incoming("退货政策是什么", "7 天无理由", "运费谁出")
+
+    assert reconcile_messages(stored, incoming) == incoming[2:]
+
+
+def test_latest_message_only_is_appended():
+    """只发送最新一条消息的客户端"""
+    stored = _stored("退货政策是什么", "7 天无理由")
+    incoming = _incoming("运费谁出")
+
+    assert reconcile_messages(stored, incoming) == incoming
+
+
+def test_truncated_window_overlapping_stored_history():
+    """客户端只发送最近几轮时按重叠部分对齐"""
+    stored = _stored("退货政策是什么", "7 天无理由", "运费谁出", "商家承担")
+    incoming = [AIMessage(content="商家承担"), HumanMessage(content="多久到账")]
+
+    assert reconcile_messages(stored, incoming) == incoming[1:]
+
+
+def test_diverged_history_keeps_common_prefix():
+    """客户端重新生成或编辑了历史时保留相同的前缀，删除其后存储的消息"""
+    stored = _stored("退货政策是什么", "7 天无理由", "运费谁出", "商家承担")
+    incoming = _incoming("退货政策是什么", "7 天无理由", "换货政策呢")
+
+    update = reconcile_messages(stored, incoming)
+
+    removed = [m for m in update if isinstance(m, RemoveMessage)]
+    assert [m.id for m in removed] == ["m2", "m3"]
+    assert update[len(removed):] == incoming[2:]
+
+
+def test_max_messages_drops_oldest_stored_messages():
+    """超过 max_messages 时删除最早的消息，窗口从用户消息开始"""
+    stored = _stored("退货政策是什么", "7 天无理由", "运费谁出", "商家承担")
+    incoming = _incoming("多久到账")
+
+    update = reconcile_messages(stored, incoming, max_messages=4)
+
+    assert [m.id for m in update if isinstance(m, RemoveMessage)] == ["m0", "m1"]
+    assert update[-1] == incoming[0]
+
+    # 新会话的客户端历史同样截断
+    incoming = _incoming("a", "b", "c", "d", "e")
+    assert reconcile_messages([], incoming, max_messages=3) == incoming[2:]
+
+
+def test_window_messages():
+    """取最近的消息且不以助手消息开头"""
+    messages = _stored("退货政策是什么", "7 天无理由", "运费谁出", "商家承担", "多久到账")
+
+    assert [m.id for m in window_messages(messages, 4)] == ["m2", "m3", "m4"]
+    assert window_messages(messages, 0) == messages
@@ -0,0 +1,237 @@
+"""
+测试意图路由引擎
+
+测试关键词规则、意图分类器、分类失败退回、路由缓存和 router_node 集成。
+"""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import HumanMessage
+
+from src.agent.main.nodes import router_node
+from src.agent.main.router import (
+    DIRECT,
+    RETRIEVE,
+    Intent,
+    IntentClassifier,
+    RouterEngine,
+    get_router,
+    parse_intents,
+    reset_router,
+    router_stats,
+)
+from src.core.cache import TTLCache
+
+INTENTS = (
+    Intent("after_sales", RETRIEVE, ("东西坏了能换吗", "多久能到货")),
+    Intent("chitchat", DIRECT, ("谢谢", "你是机器人吗")),
+)
+
+
+class AxisEmbeddings(Embeddings):
+    """按文本中的标记字映射到坐标轴的向量：含"换/货"→ 售后轴，含"谢/机器人"→ 闲聊轴"""
+
+    def __init__(self, fail: bool = False, delay: float = 0.0) -> None:
+        self.fail = fail
+        self.delay = delay
+        self.query_calls = 0
+
+    def embed_query(self, text: str) -> list[float]:
+        return [
+            1.0 if any(mark in text for mark in "换货") else 0.0,
+            1.0 if any(mark in text for mark in ("谢", "机器人")) else 0.0,
+            0.1,
+        ]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.query_calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("embedding service unavailable")
+        return self.embed_query(text)
+
+
+def _router(embeddings: Embeddings | None = None, **options) -> RouterEngine:
+    classifier = IntentClassifier(INTENTS, embeddings) if embeddings is not None else None
+    return RouterEngine(classifier=classifier, **options)
+
+
+@pytest.mark.asyncio
+async def test_keyword_rules():
+    """打招呼、业务关键词、疑问词和无关键词的路由"""
+    router = _router()
+
+    assert (await router.route("你好")).reason == "greeting"
+    assert (await router.route("Hello!")).decision == DIRECT
+    # 长消息中的问候不视为打招呼
+    decision = await router.route("你好，我想问一下你们的产品保修多久，收到后发现有划痕")
+    assert (decision.decision, decision.reason) == (RETRIEVE, "keywords")
+    assert (await router.route("怎么联系人工")).decision == RETRIEVE
+    assert (await router.route("嗯嗯")).reason == "no_keywords"
+
+
+@pytest.mark.asyncio
+async def test_classifier_routes_queries_without_keywords():
+    """无业务关键词的查询按最近的意图路由"""
+    router = _router(AxisEmbeddings(), min_similarity=0.8)
+
+    decision = await router.route("屏幕坏了可以换吗")
+    assert (decision.decision, decision.reason, decision.intent) == (RETRIEVE, "classifier", "after_sales")
+    assert decision.similarity > 0.8
+
+    # 含疑问词但属于闲聊，不再浪费一次检索
+    decision = await router.route("你是什么机器人")
+    assert (decision.decision, decision.intent) == (DIRECT, "chitchat")
+    assert decision.as_tool_call()["intent"] == "chitchat"
+
+
+@pytest.mark.asyncio
+async def test_keywords_take_precedence_over_classifier():
+    """命中业务关键词时不调用分类器"""
+    embeddings = AxisEmbeddings()
+    router = _router(embeddings)
+
+    assert (await router.route("谢谢，产品不错")).reason == "keywords"
+    assert embeddings.query_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_low_similarity_falls_back_to_keywords():
+    """相似度低于阈值时退回关键词规则"""
+    router = _router(AxisEmbeddings(), min_similarity=0.8)
+
+    decision = await router.route("什么时候下雨")
+    assert (decision.decision, decision.reason) == (RETRIEVE, "keywords")
+
+
+@pytest.mark.asyncio
+async def test_classifier_failure_falls_back_and_is_not_cached():
+    """分类失败时退回关键词规则，且结果不缓存"""
+    embeddings = AxisEmbeddings(fail=True)
+    router = _router(embeddings, cache=TTLCache(max_entries=10, ttl_seconds=60))
+
+    assert (await router.route("屏幕坏了可以换吗")).reason == "no_keywords"
+    await router.route("屏幕坏了可以换吗")
+
+    assert embeddings.query_calls == 2
+    assert router.stats()["classifier"]["errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_classifier_timeout():
+    """分类超时时退回关键词规则"""
+    router = _router(AxisEmbeddings(delay=0.5), classifier_timeout_ms=20)
+
+    decision = await router.route("屏幕坏了可以换吗")
+
+    assert decision.reason == "no_keywords"
+    assert router.stats()["classifier"]["errors"] == 1
+
+
+class SlowWarmupEmbeddings(AxisEmbeddings):
+    """计算示例向量时挂起（模拟 Embedding 服务无响应）"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.document_calls = 0
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.document_calls += 1
+        await asyncio.sleep(10)
+        return self.embed_documents(texts)
+
+
+@pytest.mark.asyncio
+async def test_warmup_timeout_backs_off():
+    """意图中心计算超时后在重试间隔内不再尝试，直接退回关键词规则"""
+    embeddings = SlowWarmupEmbeddings()
+    router = _router(embeddings, warmup_timeout_ms=20, warmup_retry_seconds=60)
+
+    start = time.perf_counter()
+    assert (await router.route("屏幕坏了可以换吗")).reason == "no_keywords"
+    assert (await router.route("屏幕坏了可以换吗")).reason == "no_keywords"
+
+    assert time.perf_counter() - start < 1
+    assert embeddings.document_calls == 1
+    assert router.stats()["classifier"]["errors"] == 1
+
+    # 重试间隔过后再次尝试
+    router.warmup_retry_seconds = 0
+    router._warmup_retry_at = 0.0
+    await router.route("屏幕坏了可以换吗")
+    assert embeddings.document_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_startup_warmup_is_bounded():
+    """启动时预先计算意图中心同样受超时约束，失败时不抛出，重试间隔内按关键词规则路由"""
+    embeddings = SlowWarmupEmbeddings()
+    router = _router(embeddings, warmup_timeout_ms=20, warmup_retry_seconds=60)
+
+    start = time.perf_counter()
+    await router.warmup()
+    assert time.perf_counter() - start < 1
+
+    assert (await router.route("屏幕坏了可以换吗")).reason == "no_keywords"
+    assert embeddings.document_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_decision_cache():
+    """相同的归一化查询直接返回缓存的路由结果"""
+    embeddings = AxisEmbeddings()
+    router = _router(embeddings, min_similarity=0.8, cache=TTLCache(max_entries=10, ttl_seconds=60))
+
+    first = await router.route("屏幕坏了可以换吗")
+    second = await router.route("  屏幕坏了可以换吗 ")
+
+    assert second == first
+    assert embeddings.query_calls == 1
+    stats = router.stats()
+    assert stats["cache"]["hits"] == 1
+    assert stats["decisions"] == {"retrieve:classifier": 2}
+    assert stats["retrieve_rate"] == 1.0
+
+
+def test_parse_intents_validation():
+    """意图示例校验"""
+    intents = parse_intents({"intents": [{"name": "faq", "route": "retrieve", "examples": ["退款"]}]})
+    assert intents == (Intent("faq", RETRIEVE, ("退款",)),)
+
+    with pytest.raises(ValueError, match="Unsupported intent route"):
+        parse_intents({"intents": [{"name": "faq", "route": "search", "examples": ["退款"]}]})
+    with pytest.raises(ValueError, match="no examples"):
+        parse_intents({"intents": [{"name": "faq", "route": "retrieve", "examples": [" "]}]})
+    with pytest.raises(ValueError, match="duplicate"):
+        parse_intents({"intents": [
+            {"name": "faq", "route": "retrieve", "examples": ["退款"]},
+            {"name": "faq", "route": "direct", "examples": ["谢谢"]},
+        ]})
+
+
+@pytest.mark.asyncio
+async def test_router_node_uses_shared_router():
+    """router_node 使用共享路由引擎并记录路由原因"""
+    assert router_stats() == {}
+
+    result = await router_node({
+        "messages": [HumanMessage(content="退货政策是什么？")],
+        "retrieved_docs": [],
+        "tool_calls": [],
+        "session_id": "s",
+    })
+
+    assert result["next_step"] == RETRIEVE
+    assert result["tool_calls"] == [{"node": "router", "decision": RETRIEVE, "reason": "keywords"}]
+    assert router_stats()["decisions"] == {"retrieve:keywords": 1}
+
+    router = get_router()
+    reset_router()
+    assert get_router() is not router
@@ -0,0 +1,121 @@
+"""
+测试推测式检索
+
+测试路由与召回并发执行时召回结果的使用、取消和丢弃，tool_calls 合并以及工作流构建。
+"""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.agent.main import speculative
+from src.agent.main.speculative import speculative_router_node, speculative_stats
+
+
+def _state(content: str = "退货政策是什么？") -> dict:
+    return {
+        "messages": [HumanMessage(content=content)],
+        "retrieved_docs": [],
+        "tool_calls": [{"node": "previous_turn"}],
+        "session_id": "s",
+    }
+
+
+def _fake_nodes(mocker, decision: str, router_delay: float, recall_delay: float) -> dict:
+    """替换路由和召回节点，返回召回调用记录"""
+    calls = {"recall_started": 0, "recall_finished": 0}
+
+    async def fake_router(state):
+        await asyncio.sleep(router_delay)
+        return {
+            "next_step": decision,
+            "tool_calls": state["tool_calls"] + [{"node": "router", "decision": decision}],
+        }
+
+    async def fake_retrieve(state):
+        calls["recall_started"] += 1
+        await asyncio.sleep(recall_delay)
+        calls["recall_finished"] += 1
+        return {
+            "retrieved_docs": [{"content": "doc"}],
+            "confidence_score": 0.9,
+            "tool_calls": state["tool_calls"] + [{"node": "retrieve", "results_count": 1}],
+        }
+
+    mocker.patch.object(speculative, "router_node", side_effect=fake_router)
+    mocker.patch.object(speculative, "retrieve_node", side_effect=fake_retrieve)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_retrieve_route_uses_recall_result(mocker):
+    """路由为 retrieve 时使用并发召回的结果，tool_calls 与顺序执行一致"""
+    _fake_nodes(mocker, "retrieve", router_delay=0.02, recall_delay=0.05)
+
+    start = asyncio.get_running_loop().time()
+    result = await speculative_router_node(_state())
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert result["next_step"] == "retrieve"
+    assert result["retrieved_docs"] == [{"content": "doc"}]
+    assert [call["node"] for call in result["tool_calls"]] == ["previous_turn", "router", "retrieve"]
+    # 路由耗时被召回耗时掩盖
+    assert elapsed < 0.065
+
+    stats = speculative_stats()
+    assert (stats["started"], stats["used"], stats["wasted_ratio"]) == (1, 1, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_direct_route_cancels_running_recall(mocker):
+    """路由为 direct 时取消仍在进行的召回"""
+    calls = _fake_nodes(mocker, "direct", router_delay=0.01, recall_delay=0.5)
+
+    result = await speculative_router_node(_state("谢谢"))
+
+    assert result["next_step"] == "direct"
+    assert "retrieved_docs" not in result
+    assert [call["node"] for call in result["tool_calls"]] == ["previous_turn", "router"]
+    assert calls == {"recall_started": 1, "recall_finished": 0}
+    assert speculative_stats()["cancelled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_direct_route_discards_finished_recall(mocker):
+    """路由为 direct 且召回已完成时丢弃结果"""
+    _fake_nodes(mocker, "direct", router_delay=0.05, recall_delay=0.0)
+
+    result = await speculative_router_node(_state("谢谢"))
+
+    assert "retrieved_docs" not in result
+    stats = speculative_stats()
+    assert (stats["discarded"], stats["wasted_ratio"]) == (1, 1.0)
+
+
+@pytest.mark.asyncio
+async def test_router_failure_cancels_recall(mocker):
+    """路由异常时取消召回并向上抛出"""
+    calls = _fake_nodes(mocker, "retrieve", router_delay=0.0, recall_delay=0.5)
+    mocker.patch.object(speculative, "router_node", side_effect=RuntimeError("router down"))
+
+    with pytest.raises(RuntimeError, match="router down"):
+        await speculative_router_node(_state())
+
+    await asyncio.sleep(0)
+    assert calls["recall_finished"] == 0
+    assert speculative_stats()["started"] == 0
+
+
+def test_graph_retrieval_mode(mocker):
+    """speculative 模式下工作流不再包含独立的 retrieve 节点"""
+    from src.agent.main.graph import create_agent_graph
+    from src.core.config import settings
+
+    assert "retrieve" in create_agent_graph().nodes
+
+    mocker.patch.object(settings, "langgraph_retrieval_mode", "speculative")
+    workflow = create_agent_graph()
+
+    assert set(workflow.nodes) == {"router", "llm"}
+    assert workflow.nodes["router"].runnable.afunc is speculative_router_node
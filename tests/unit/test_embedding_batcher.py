@@ -0,0 +1,126 @@
+"""
+测试查询向量微批处理
+
+测试 BatchingEmbeddings 的批次合并、去重、错误传播和按配置包装。
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core.config import settings
+from src.services.embedding_batcher import BatchingEmbeddings, wrap_with_batching
+
+
+def _make_inner() -> MagicMock:
+    """按文本长度返回向量的假 Embeddings"""
+    inner = MagicMock()
+    inner.model = "BAAI/bge-m3"
+    inner.aembed_documents = AsyncMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+    inner.aembed_query = AsyncMock(side_effect=lambda text: [float(len(text))])
+    return inner
+
+
+class TestBatchingEmbeddings:
+    """测试批次合并"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_coalesced(self):
+        """并发查询合并为一次 aembed_documents 调用，结果按调用方分发"""
+        inner = _make_inner()
+        batcher = BatchingEmbeddings(inner, max_batch_size=32, max_wait_ms=5)
+
+        results = await asyncio.gather(*(batcher.aembed_query("a" * n) for n in range(1, 11)))
+
+        assert results == [[float(n)] for n in range(1, 11)]
+        inner.aembed_documents.assert_awaited_once()
+        inner.aembed_query.assert_not_awaited()
+        assert batcher.stats()["batches"] == 1
+        assert batcher.stats()["batched_queries"] == 10
+
+    @pytest.mark.asyncio
+    async def test_max_batch_size_splits(self):
+        """超过最大批大小时拆分为多个批次"""
+        inner = _make_inner()
+        batcher = BatchingEmbeddings(inner, max_batch_size=4, max_wait_ms=5)
+
+        await asyncio.gather(*(batcher.aembed_query(f"q{i}") for i in range(10)))
+
+        batch_sizes = [len(call.args[0]) for call in inner.aembed_documents.await_args_list]
+        assert batch_sizes == [4, 4, 2]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_texts_embedded_once(self):
+        """批内重复文本只嵌入一次"""
+        inner = _make_inner()
+        batcher = BatchingEmbeddings(inner, max_batch_size=32, max_wait_ms=5)
+
+        results = await asyncio.gather(*(batcher.aembed_query("退货") for _ in range(5)))
+
+        assert results == [[2.0]] * 5
+        inner.aembed_documents.assert_awaited_once_with(["退货"])
+
+    @pytest.mark.asyncio
+    async def test_error_propagates_to_all_callers(self):
+        """批量请求失败时每个调用方都收到异常"""
+        inner = _make_inner()
+        inner.aembed_documents = AsyncMock(side_effect=RuntimeError("provider down"))
+        batcher = BatchingEmbeddings(inner, max_batch_size=32, max_wait_ms=5)
+
+        results = await asyncio.gather(
+            *(batcher.aembed_query(f"q{i}") for i in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_size_mismatch_raises(self):
+        """返回向量数量与输入不一致时报错"""
+        inner = _make_inner()
+        inner.aembed_documents = AsyncMock(return_value=[[0.1]])
+        batcher = BatchingEmbeddings(inner, max_batch_size=32, max_wait_ms=5)
+
+        with pytest.raises(ValueError):
+            await asyncio.gather(batcher.aembed_query("a"), batcher.aembed_query("b"))
+
+    @pytest.mark.asyncio
+    async def test_documents_pass_through(self):
+        """文档嵌入直接透传"""
+        inner = _make_inner()
+        batcher = BatchingEmbeddings(inner)
+
+        assert await batcher.aembed_documents(["ab"]) == [[2.0]]
+        assert batcher.stats()["batches"] == 0
+
+    def test_attribute_passthrough(self):
+        assert BatchingEmbeddings(_make_inner()).model == "BAAI/bge-m3"
+
+    def test_usable_across_event_loops(self):
+        """同一实例可在先后不同的事件循环中使用"""
+        inner = _make_inner()
+        batcher = BatchingEmbeddings(inner, max_wait_ms=1)
+
+        assert asyncio.run(batcher.aembed_query("ab")) == [2.0]
+        assert asyncio.run(batcher.aembed_query("abc")) == [3.0]
+
+
+class TestWrapWithBatching:
+    """测试按配置包装"""
+
+    def test_disabled_by_default(self):
+        inner = _make_inner()
+        with patch.object(settings, "embedding_batch_enabled", False):
+            assert wrap_with_batching(inner) is inner
+
+    def test_enabled_uses_settings(self):
+        inner = _make_inner()
+        with patch.object(settings, "embedding_batch_enabled", True), \
+                patch.object(settings, "embedding_batch_max_size", 8), \
+                patch.object(settings, "embedding_batch_max_wait_ms", 2.0):
+            wrapped = wrap_with_batching(inner)
+
+        assert isinstance(wrapped, BatchingEmbeddings)
+        assert wrapped.inner is inner
+        assert wrapped.stats()["max_batch_size"] == 8
+        assert wrapped.stats()["max_wait_ms"] == 2.0
@@ -0,0 +1,197 @@
+"""
+测试查询向量缓存
+
+测试 CachedEmbeddings 的缓存键归一化、Redis 二级缓存和 llm_factory 集成。
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.services.embedding_cache import (
+    CachedEmbeddings,
+    RedisEmbeddingStore,
+    normalize_query_text,
+    wrap_with_cache,
+)
+from src.services.llm_factory import clear_model_cache, create_embeddings
+
+
+def _make_inner() -> MagicMock:
+    inner = MagicMock()
+    inner.model = "BAAI/bge-m3"
+    inner.aembed_query = AsyncMock(return_value=[0.1, 0.2, 0.3])
+    inner.aembed_documents = AsyncMock(return_value=[[0.1], [0.2]])
+    inner.embed_query = MagicMock(return_value=[0.4, 0.5])
+    return inner
+
+
+def _make_cached(inner: MagicMock, redis_store: RedisEmbeddingStore | None = None) -> CachedEmbeddings:
+    return CachedEmbeddings(
+        inner,
+        model="BAAI/bge-m3",
+        cache=TTLCache(max_entries=100, ttl_seconds=300),
+        redis_store=redis_store,
+    )
+
+
+class TestNormalizeQueryText:
+    """测试查询文本归一化"""
+
+    def test_whitespace_and_case(self):
+        assert normalize_query_text("  How   to\tReturn  ") == "how to return"
+
+    def test_fullwidth(self):
+        """全角字符统一为半角"""
+        assert normalize_query_text("ＡＢＣ　退货") == normalize_query_text("abc 退货")
+
+
+class TestCachedEmbeddings:
+    """测试进程内查询向量缓存"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_query_hits_cache(self):
+        """重复查询（含空白/大小写差异）只调用一次底层模型"""
+        inner = _make_inner()
+        embeddings = _make_cached(inner)
+
+        first = await embeddings.aembed_query("如何退货？")
+        second = await embeddings.aembed_query("  如何退货？ ")
+
+        assert first == second == [0.1, 0.2, 0.3]
+        inner.aembed_query.assert_awaited_once_with("如何退货？")
+
+        stats = embeddings.stats()
+        assert stats["backend"] == "memory"
+        assert stats["memory"]["hits"] == 1
+        assert stats["memory"]["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_returned_vector_is_copy(self):
+        """修改返回的向量不影响缓存内容"""
+        embeddings = _make_cached(_make_inner())
+
+        vector = await embeddings.aembed_query("退货")
+        vector = await embeddings.aembed_query("退货")
+        vector.append(9.9)
+
+        assert await embeddings.aembed_query("退货") == [0.1, 0.2, 0.3]
+
+    @pytest.mark.asyncio
+    async def test_documents_not_cached(self):
+        """文档向量直接透传"""
+        inner = _make_inner()
+        embeddings = _make_cached(inner)
+
+        await embeddings.aembed_documents(["a", "b"])
+        await embeddings.aembed_documents(["a", "b"])
+
+        assert inner.aembed_documents.await_count == 2
+
+    def test_sync_embed_query_cached(self):
+        """同步接口同样使用进程内缓存"""
+        inner = _make_inner()
+        embeddings = _make_cached(inner)
+
+        assert embeddings.embed_query("退货") == [0.4, 0.5]
+        assert embeddings.embed_query("退货") == [0.4, 0.5]
+        inner.embed_query.assert_called_once()
+
+    def test_attribute_passthrough(self):
+        """未定义的属性透传到底层实例"""
+        embeddings = _make_cached(_make_inner())
+        assert embeddings.model == "BAAI/bge-m3"
+
+
+class TestRedisBackend:
+    """测试 Redis 二级缓存"""
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_skips_model(self):
+        """Redis 命中时不调用底层模型，并回填进程内缓存"""
+        inner = _make_inner()
+        client = MagicMock()
+        client.get = AsyncMock(return_value="[0.7, 0.8]")
+        client.set = AsyncMock()
+        embeddings = _make_cached(inner, RedisEmbeddingStore(client, ttl_seconds=300))
+
+        assert await embeddings.aembed_query("退货") == [0.7, 0.8]
+        assert await embeddings.aembed_query("退货") == [0.7, 0.8]
+
+        inner.aembed_query.assert_not_awaited()
+        client.get.assert_awaited_once()
+        assert embeddings.stats()["redis"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_miss_writes_back(self):
+        """Redis 未命中时调用模型并写回 Redis（带 TTL）"""
+        inner = _make_inner()
+        client = MagicMock()
+        client.get = AsyncMock(return_value=None)
+        client.set = AsyncMock()
+        embeddings = _make_cached(inner, RedisEmbeddingStore(client, ttl_seconds=120))
+
+        assert await embeddings.aembed_query("退货") == [0.1, 0.2, 0.3]
+
+        client.set.assert_awaited_once()
+        assert client.set.call_args.kwargs["ex"] == 120
+        assert client.set.call_args.args[0].startswith("emb:BAAI/bge-m3:")
+
+    @pytest.mark.asyncio
+    async def test_redis_error_falls_back_to_model(self):
+        """Redis 异常时退化为直接调用模型"""
+        inner = _make_inner()
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=ConnectionError("redis down"))
+        client.set = AsyncMock(side_effect=ConnectionError("redis down"))
+        embeddings = _make_cached(inner, RedisEmbeddingStore(client, ttl_seconds=300))
+
+        assert await embeddings.aembed_query("退货") == [0.1, 0.2, 0.3]
+        assert embeddings.stats()["redis"]["errors"] == 2
+
+
+class TestWrapWithCache:
+    """测试按配置包装"""
+
+    def test_disabled(self):
+        inner = _make_inner()
+        with patch.object(settings, "embedding_cache_enabled", False):
+            assert wrap_with_cache(inner, "m") is inner
+
+    def test_zero_ttl_disables(self):
+        """cache_ttl 为 0 时不缓存"""
+        inner = _make_inner()
+        with patch.object(settings, "embedding_cache_enabled", True), \
+                patch.object(settings, "cache_ttl", 0):
+            assert wrap_with_cache(inner, "m") is inner
+
+    def test_enabled_uses_settings(self):
+        inner = _make_inner()
+        with patch.object(settings, "embedding_cache_enabled", True), \
+                patch.object(settings, "embedding_cache_backend", "memory"), \
+                patch.object(settings, "embedding_cache_max_entries", 50), \
+                patch.object(settings, "cache_ttl", 60):
+            wrapped = wrap_with_cache(inner, "m")
+
+        assert isinstance(wrapped, CachedEmbeddings)
+        assert wrapped.inner is inner
+        assert wrapped.stats()["memory"]["max_entries"] == 50
+        assert wrapped.stats()["memory"]["ttl_seconds"] == 60
+
+    def test_create_embeddings_returns_cached_wrapper(self):
+        """create_embeddings() 返回带缓存的包装实例"""
+        clear_model_cache()
+        try:
+            with patch.object(settings, "embedding_provider", "siliconflow"), \
+                    patch.object(settings, "embedding_cache_enabled", True), \
+                    patch.object(settings, "cache_ttl", 300), \
+                    patch("src.services.llm_factory._create_plugin_embeddings") as mock_create:
+                mock_create.return_value = _make_inner()
+                embeddings = create_embeddings()
+
+            assert isinstance(embeddings, CachedEmbeddings)
+            assert embeddings.inner is mock_create.return_value
+        finally:
+            clear_model_cache()
@@ -0,0 +1,104 @@
+"""
+测试共享 HTTP 客户端
+
+验证客户端复用、事件循环绑定、HTTP/2 降级和关闭逻辑。
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.core.config import settings
+from src.services import http_client
+from src.services.http_client import (
+    close_http_client,
+    get_http_client,
+    http_client_session,
+)
+
+
+@pytest.fixture(autouse=True)
+async def reset_shared_client():
+    """每个测试前后关闭共享客户端"""
+    await close_http_client()
+    yield
+    await close_http_client()
+
+
+class TestSharedHTTPClient:
+    """测试共享客户端生命周期"""
+
+    @pytest.mark.asyncio
+    async def test_client_reused_within_loop(self):
+        """同一事件循环内复用同一客户端"""
+        client1 = get_http_client()
+        client2 = get_http_client()
+
+        assert client1 is client2
+        assert isinstance(client1, httpx.AsyncClient)
+
+    @pytest.mark.asyncio
+    async def test_session_does_not_close_shared_client(self):
+        """会话结束后共享客户端保持打开"""
+        async with http_client_session() as client:
+            pass
+
+        assert not client.is_closed
+        assert get_http_client() is client
+
+    @pytest.mark.asyncio
+    async def test_close_releases_client(self):
+        """关闭后重新获取得到新客户端"""
+        client1 = get_http_client()
+        await close_http_client()
+
+        assert client1.is_closed
+        assert get_http_client() is not client1
+
+    @pytest.mark.asyncio
+    async def test_limits_from_settings(self):
+        """连接池上限来自配置"""
+        with patch.object(settings, "http_max_connections", 7), \
+                patch.object(settings, "http_max_keepalive_connections", 3):
+            client = get_http_client()
+
+        pool = client._transport._pool
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+
+    @pytest.mark.asyncio
+    async def test_http2_falls_back_without_h2(self):
+        """未安装 h2 时降级为 HTTP/1.1"""
+        real_client = httpx.AsyncClient
+
+        def fake_client(*args, **kwargs):
+            if kwargs.get("http2"):
+                raise ImportError("h2 not installed")
+            return real_client(*args, **kwargs)
+
+        with patch.object(settings, "http2_enabled", True), \
+                patch.object(http_client.httpx, "AsyncClient", side_effect=fake_client):
+            client = get_http_client()
+
+        assert isinstance(client, real_client)
+
+    @pytest.mark.asyncio
+    async def test_other_loop_uses_temporary_client(self):
+        """在其他事件循环中使用临时客户端，不影响共享客户端"""
+        shared = get_http_client()
+
+        def run_in_thread():
+            async def inner():
+                async with http_client_session() as client:
+                    return client
+
+            return asyncio.run(inner())
+
+        temp_client = await asyncio.to_thread(run_in_thread)
+
+        assert temp_client is not shared
+        assert temp_client.is_closed
+        assert not shared.is_closed
+        assert get_http_client() is shared
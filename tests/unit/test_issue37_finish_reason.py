@@ -9,6 +9,7 @@ from unittest.mock import patch
 import pytest
 from fastapi.testclient import TestClient
 
+from src.core.message_filter import FilterVerdict
 from src.main import app
 from src.models.openai_schema import ChatCompletionChoice, ChatMessage
 
@@ -65,9 +66,11 @@ class TestIssue37FinishReason:
         client = TestClient(app)
 
         # 模拟消息过滤场景，应该返回 content_filter
-        with patch("src.api.v1.openai_compat._validate_message_source") as mock_validate:
+        with patch("src.api.v1.openai_compat.check_message") as mock_check:
             # 模拟消息被过滤
-            mock_validate.return_value = False
+            mock_check.return_value = FilterVerdict(
+                allowed=False, reason="system_message_detected", matched=("system:",)
+            )
 
             response = client.post(
                 "/v1/chat/completions",
@@ -91,9 +94,11 @@ class TestIssue37FinishReason:
         client = TestClient(app)
 
         # 模拟消息过滤场景
-        with patch("src.api.v1.openai_compat._validate_message_source") as mock_validate:
+        with patch("src.api.v1.openai_compat.check_message") as mock_check:
             # 模拟消息被过滤
-            mock_validate.return_value = False
+            mock_check.return_value = FilterVerdict(
+                allowed=False, reason="system_message_detected", matched=("system:",)
+            )
 
             response = client.post(
                 "/v1/chat/completions",
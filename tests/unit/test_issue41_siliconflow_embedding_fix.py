@@ -47,7 +47,7 @@ class TestIssue41SiliconFlowEmbeddingFix:
         mock_response.raise_for_status.return_value = None
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+            mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
             result = await embeddings.aembed_query("退货")
 
@@ -55,7 +55,7 @@ class TestIssue41SiliconFlowEmbeddingFix:
             assert result == [0.1, 0.2, 0.3]
 
             # 验证API调用参数
-            call_args = mock_client.return_value.__aenter__.return_value.post.call_args
+            call_args = mock_client.return_value.post.call_args
             assert call_args[1]["json"]["input"] == "退货"  # 文本格式
             assert call_args[1]["json"]["model"] == "BAAI/bge-large-zh-v1.5"
             assert "input" in call_args[1]["json"]
@@ -80,7 +80,7 @@ class TestIssue41SiliconFlowEmbeddingFix:
         mock_response.raise_for_status.return_value = None
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+            mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
             result = await embeddings.aembed_documents(["退货", "退款"])
 
@@ -90,7 +90,7 @@ class TestIssue41SiliconFlowEmbeddingFix:
             assert result[1] == [0.4, 0.5, 0.6]
 
             # 验证API调用参数
-            call_args = mock_client.return_value.__aenter__.return_value.post.call_args
+            call_args = mock_client.return_value.post.call_args
             assert call_args[1]["json"]["input"] == ["退货", "退款"]  # 文本列表格式
             assert call_args[1]["json"]["model"] == "BAAI/bge-large-zh-v1.5"
             assert "input" in call_args[1]["json"]
@@ -182,7 +182,7 @@ class TestIssue41SiliconFlowEmbeddingFix:
         mock_response = Mock()
         mock_response.status_code = 500
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+            mock_client.return_value.post = AsyncMock(
                 side_effect=httpx.HTTPStatusError("500 Internal Server Error", request=Mock(), response=mock_response)
             )
 
@@ -206,7 +206,7 @@ class TestIssue41SiliconFlowEmbeddingFix:
 
         with patch("httpx.AsyncClient") as mock_client:
             mock_post = AsyncMock(return_value=mock_response)
-            mock_client.return_value.__aenter__.return_value.post = mock_post
+            mock_client.return_value.post = mock_post
 
             await embeddings.aembed_query("退货")
 
@@ -248,7 +248,7 @@ class TestIssue41SiliconFlowEmbeddingFix:
                 httpx.HTTPStatusError("500 Internal Server Error", request=Mock(), response=mock_5xx_response),
                 mock_response_success
             ])
-            mock_client.return_value.__aenter__.return_value.post = mock_post
+            mock_client.return_value.post = mock_post
 
             result = await embeddings.aembed_query("退货")
 
@@ -272,7 +272,7 @@ class TestIssue41SiliconFlowEmbeddingFix:
         with patch("httpx.AsyncClient") as mock_client:
             # 模拟4xx错误
             mock_post = AsyncMock(side_effect=httpx.HTTPStatusError("400 Bad Request", request=Mock(), response=mock_4xx_response))
-            mock_client.return_value.__aenter__.return_value.post = mock_post
+            mock_client.return_value.post = mock_post
 
             with pytest.raises(httpx.HTTPStatusError):
                 await embeddings.aembed_query("退货")
@@ -301,7 +301,7 @@ class TestIssue41SiliconFlowEmbeddingFix:
                 httpx.TimeoutException("Request timeout"),
                 mock_response_success
             ])
-            mock_client.return_value.__aenter__.return_value.post = mock_post
+            mock_client.return_value.post = mock_post
 
             result = await embeddings.aembed_query("退货")
 
@@ -321,7 +321,7 @@ class TestIssue41SiliconFlowEmbeddingFix:
         with patch("httpx.AsyncClient") as mock_client:
             # 模拟持续的网络错误
             mock_post = AsyncMock(side_effect=httpx.TimeoutException("Request timeout"))
-            mock_client.return_value.__aenter__.return_value.post = mock_post
+            mock_client.return_value.post = mock_post
 
             with pytest.raises(httpx.TimeoutException):
                 await embeddings.aembed_query("退货")
@@ -0,0 +1,111 @@
+"""
+测试 LLM 工厂的模型实例缓存
+
+验证相同配置复用实例、配置变化生成新实例以及显式失效。
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.core.config import settings
+from src.services import llm_factory
+from src.services.llm_factory import (
+    clear_model_cache,
+    create_embeddings,
+    create_llm,
+    get_model_cache_size,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_model_cache():
+    """每个测试前后清空模型缓存"""
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+
+class TestLLMCache:
+    """测试 Chat Model 缓存"""
+
+    def test_same_config_reuses_instance(self):
+        """相同配置返回同一实例"""
+        llm1 = create_llm()
+        llm2 = create_llm()
+
+        assert llm1 is llm2
+        assert get_model_cache_size() == 1
+
+    def test_provider_constructed_once(self):
+        """提供商实例只构造一次"""
+        with patch.object(llm_factory, "create_provider", wraps=llm_factory.create_provider) as spy:
+            for _ in range(5):
+                create_llm()
+
+        assert spy.call_count == 1
+
+    def test_temperature_change_creates_new_instance(self):
+        """温度变化生成新实例"""
+        llm1 = create_llm()
+        with patch.object(settings, "llm_temperature", 0.1):
+            llm2 = create_llm()
+
+        assert llm1 is not llm2
+        assert get_model_cache_size() == 2
+
+    def test_max_tokens_change_creates_new_instance(self):
+        """最大 Token 数变化生成新实例"""
+        llm1 = create_llm()
+        with patch.object(settings, "llm_max_tokens", 128):
+            llm2 = create_llm()
+
+        assert llm1 is not llm2
+
+    def test_model_change_creates_new_instance(self):
+        """模型名称变化生成新实例"""
+        llm1 = create_llm()
+        with patch.object(settings, "deepseek_model", "deepseek-coder"):
+            llm2 = create_llm()
+
+        assert llm1 is not llm2
+        assert llm2.model_name == "deepseek-coder"
+
+    def test_clear_cache_invalidates(self):
+        """清空缓存后重新构造实例"""
+        llm1 = create_llm()
+        clear_model_cache()
+
+        assert get_model_cache_size() == 0
+        assert create_llm() is not llm1
+
+    def test_failed_creation_not_cached(self):
+        """构造失败不写入缓存"""
+        with patch.object(llm_factory, "_create_plugin_llm", side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                create_llm()
+
+        assert get_model_cache_size() == 0
+
+
+class TestEmbeddingsCache:
+    """测试 Embeddings 缓存"""
+
+    def test_same_config_reuses_instance(self):
+        """相同配置返回同一实例"""
+        assert create_embeddings() is create_embeddings()
+
+    def test_base_url_change_creates_new_instance(self):
+        """Base URL 变化生成新实例"""
+        embeddings1 = create_embeddings()
+        with patch.object(settings, "embedding_base_url", "https://other-embedding.example.com/v1"):
+            embeddings2 = create_embeddings()
+
+        assert embeddings1 is not embeddings2
+
+    def test_llm_and_embeddings_cached_separately(self):
+        """LLM 与 Embeddings 使用独立缓存键"""
+        create_llm()
+        create_embeddings()
+
+        assert get_model_cache_size() == 2
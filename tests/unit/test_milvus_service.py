@@ -4,10 +4,15 @@
 测试 Milvus 向量数据库的连接、检索和插入逻辑。
 """
 
+import asyncio
+import threading
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from src.core.config import settings
+from src.core.exceptions import MilvusTimeoutError
 from src.services.milvus_service import MilvusService
 
 
@@ -239,3 +244,182 @@ async def test_milvus_search_score_is_similarity_not_distance():
         # 验证相似度语义：第一个结果比第二个更相似
         assert results[0]["score"] > results[1]["score"]
 
+
+
+def _slow_search(delay_s: float):
+    """返回阻塞 delay_s 秒的同步检索桩"""
+
+    def search(**kwargs):
+        time.sleep(delay_s)
+        return [[]]
+
+    return search
+
+
+async def _max_tick_gap(stop: asyncio.Event, interval_s: float = 0.01) -> float:
+    """周期性让出事件循环，返回相邻两次唤醒的最大间隔"""
+    max_gap = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval_s)
+        now = time.perf_counter()
+        max_gap = max(max_gap, now - last)
+        last = now
+    return max_gap
+
+
+@pytest.mark.asyncio
+async def test_milvus_slow_search_does_not_block_event_loop():
+    """慢检索在线程池中执行，期间事件循环保持响应"""
+    service = MilvusService()
+    service.knowledge_collection = MagicMock()
+    service.knowledge_collection.search.side_effect = _slow_search(0.5)
+
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_max_tick_gap(stop))
+
+    start = time.perf_counter()
+    results = await service.search_knowledge(query_embedding=[0.1] * 768, top_k=3)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    max_gap = await ticker
+    await service.close()
+
+    assert results == []
+    assert elapsed >= 0.5
+    # 同步阻塞时最大间隔约为 500ms；线程池执行时应接近 tick 间隔
+    assert max_gap < 0.1
+
+
+@pytest.mark.asyncio
+async def test_milvus_search_timeout():
+    """超过 milvus_timeout_ms 时抛出 MilvusTimeoutError"""
+    service = MilvusService()
+    service.knowledge_collection = MagicMock()
+    service.knowledge_collection.search.side_effect = _slow_search(0.5)
+
+    with patch.object(settings, "milvus_timeout_ms", 100):
+        start = time.perf_counter()
+        with pytest.raises(MilvusTimeoutError):
+            await service.search_knowledge(query_embedding=[0.1] * 768, top_k=3)
+        elapsed = time.perf_counter() - start
+
+    await service.close()
+    assert elapsed < 0.4
+
+
+@pytest.mark.asyncio
+async def test_milvus_concurrency_limited():
+    """并发调用数不超过 milvus_max_concurrency"""
+    service = MilvusService()
+    service.knowledge_collection = MagicMock()
+
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def search(**kwargs):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+        return [[]]
+
+    service.knowledge_collection.search.side_effect = search
+
+    with patch.object(settings, "milvus_max_concurrency", 2), \
+            patch.object(settings, "milvus_max_workers", 8):
+        await asyncio.gather(
+            *(service.search_knowledge(query_embedding=[0.1] * 768) for _ in range(6))
+        )
+
+    await service.close()
+    assert state["peak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_milvus_timed_out_call_keeps_its_slot():
+    """超时的调用在线程中结束前仍占用并发名额，进行中的调用数不超过上限"""
+    service = MilvusService()
+    service.knowledge_collection = MagicMock()
+
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def search(**kwargs):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.2)
+        with lock:
+            state["active"] -= 1
+        return [[]]
+
+    service.knowledge_collection.search.side_effect = search
+
+    with patch.object(settings, "milvus_max_concurrency", 1), \
+            patch.object(settings, "milvus_max_workers", 4), \
+            patch.object(settings, "milvus_timeout_ms", 50):
+        with pytest.raises(MilvusTimeoutError):
+            await service.search_knowledge(query_embedding=[0.1] * 768)
+        # 第一个调用仍在执行，第二个调用等不到名额
+        with pytest.raises(MilvusTimeoutError, match="concurrency slot"):
+            await service.search_knowledge(query_embedding=[0.1] * 768)
+
+    # 第一个调用结束后名额归还
+    await asyncio.sleep(0.25)
+    await service.search_knowledge(query_embedding=[0.1] * 768)
+
+    await service.close()
+    assert state["peak"] == 1
+    assert service.knowledge_collection.search.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_milvus_insert_is_not_timed_out():
+    """写入不设置整体超时（超时后写入仍可能提交），等待写入完成"""
+    service = MilvusService()
+    service.knowledge_collection = MagicMock()
+    service.knowledge_collection.flush.side_effect = lambda **kwargs: time.sleep(0.2)
+
+    with patch.object(settings, "milvus_timeout_ms", 100):
+        inserted = await service.insert_knowledge(
+            [{"id": "d1", "text": "退货政策", "embedding": [0.1] * 768}]
+        )
+
+    await service.close()
+    assert inserted == 1
+    assert service.knowledge_collection.flush.call_args.kwargs["timeout"] == 0.1
+
+
+@pytest.mark.asyncio
+async def test_milvus_search_passes_timeout_to_client():
+    """检索调用携带 pymilvus 超时参数"""
+    service = MilvusService()
+    service.knowledge_collection = MagicMock()
+    service.knowledge_collection.search.return_value = [[]]
+
+    with patch.object(settings, "milvus_timeout_ms", 2500):
+        await service.search_knowledge(query_embedding=[0.1] * 768)
+
+    await service.close()
+    assert service.knowledge_collection.search.call_args.kwargs["timeout"] == 2.5
+
+
+@pytest.mark.asyncio
+async def test_milvus_initialize_read_only_replica():
+    """只读副本只加载已存在的知识库 Collection，不创建 Collection"""
+    service = MilvusService(conn_alias="replica", host="replica", read_only=True)
+
+    with patch("pymilvus.connections.connect"), \
+            patch("src.services.milvus_service.utility.has_collection", return_value=True), \
+            patch("src.services.milvus_service.Collection") as mock_collection, \
+            patch.object(service, "_create_knowledge_collection", new_callable=AsyncMock) as create_knowledge, \
+            patch.object(service, "_create_history_collection", new_callable=AsyncMock) as create_history:
+        await service.initialize()
+
+    create_knowledge.assert_not_called()
+    create_history.assert_not_called()
+    mock_collection.assert_called_once_with(settings.milvus_knowledge_collection, using="replica")
+    assert service.knowledge_collection is mock_collection.return_value